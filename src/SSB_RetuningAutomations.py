@@ -38,14 +38,22 @@ if str(_PROJECT_ROOT_DIR) not in sys.path:
 from src.utils.utils_datetime import format_duration_hms
 from src.utils.utils_dialog import tk, ttk, filedialog, messagebox, ask_reopen_launcher, ask_yes_no_dialog, ask_yes_no_dialog_custom, browse_input_folders, select_step0_subfolders, get_multi_step0_items, pick_checkboxes_dialog
 from src.utils.utils_infrastructure import LoggerDual, get_resource_path
-from src.utils.utils_io import load_cfg_values, save_cfg_values, log_module_exception, to_long_path, pretty_path, folder_or_zip_has_valid_logs, detect_pre_post_subfolders, write_compared_folders_file, ensure_logs_available, materialize_step0_zip_runs_as_folders
-from src.utils.utils_infrastructure import attach_output_log_mirror
+from src.utils.utils_io import load_cfg_values, save_cfg_values, log_module_exception, to_long_path, pretty_path, folder_or_zip_has_valid_logs, detect_pre_post_subfolders, write_compared_folders_file, ensure_logs_available, materialize_step0_zip_runs_as_folders, configure_zip_native, configure_zip_extraction, is_logs_dir
+from src.utils.utils_tree_index import get_step0_tree_index
+from src.utils.utils_infrastructure import attach_output_log_mirror, install_process_logger, derive_log_path
 
-from src.utils.utils_parsing import normalize_csv_list, parse_arfcn_csv_to_set, infer_parent_timestamp_and_market
+from src.utils.utils_parsing import normalize_csv_list, parse_arfcn_csv_to_set, infer_parent_timestamp_and_market, parse_output_formats
+from src.utils.utils_zip import configure_zip_export
+from src.utils.utils_zip_cache import configure_zip_cache, run_zip_cache_command
+from src.utils.utils_parse_cache import configure_parse_cache, run_parse_cache_warm
+from src.utils.utils_excel import configure_sheet_spill
+from src.utils.utils_output_stage import BackgroundOutputStage, configure_background_output, background_output_enabled
+from src.utils.utils_artifacts import ARTIFACTS, register_artifact, configure_artifact_registry, copy_workbook_sidecar
 
 
 from src.modules.ConsistencyChecks.ConsistencyChecks import ConsistencyChecks
 from src.modules.ConfigurationAudit import ConfigurationAudit
+from src.modules.ConfigurationAudit.ca_summary_ppt import configure_ppt_summary
 from src.modules.CleanUp.FinalCleanUp import FinalCleanUp
 
 
@@ -62,10 +70,6 @@ Multi-Platform/Multi-Arch tool designed to Automate some process during SSB Retu
 {COPYRIGHT_TEXT}
 """)
 
-# ================================ CACHE ================================= #
-# Cache SummaryAudit (in-memory) per generated ConfigurationAudit Excel path (used to avoid re-reading from disk in ConsistencyChecks)
-CONFIG_AUDIT_SUMMARY_CACHE: Dict[str, object] = {}
-
 # ================================ DEFAULTS ================================= #
 # Input Folder(s)
 INPUT_FOLDER = ""        # single-input default if not defined
@@ -844,6 +848,36 @@ def parse_args() -> argparse.Namespace:
     # Fast Excel exports
     parser.add_argument("--fast-excel", dest="fast_excel_export", action=argparse.BooleanOptionalAction, default=None, help="Enable/disable fast Excel export using xlsxwriter engine (reduced formatting features if compared to openpyxl). Default Value: Disabled (use --fast-excel to enable enable it)")
 
+    # ConfigurationAudit: split raw MO tables into companion workbooks
+    parser.add_argument("--ca-split-workbooks", dest="ca_split_workbooks", action=argparse.BooleanOptionalAction, default=False, help="Enable/disable writing raw MO tables of Configuration Audit into companion workbooks per MO group (NR, LTE, Profiles, Externals, Other) under 'RawMO_Workbooks', written in parallel processes. The main workbook keeps Summary/SummaryAudit/pivots/MeContext and links to the external sheets. Default Value: Disabled (use --ca-split-workbooks to enable it)")
+
+    # ConfigurationAudit: oversized MO tables (sheet-size guardrails)
+    parser.add_argument("--ca-spill-policy", dest="ca_spill_policy", choices=["sheets", "csv", "parquet"], default=None, help="What to do with Configuration Audit MO tables above --ca-spill-rows: sheets (paged into 'Sheet (2)', 'Sheet (3)'...), csv (compressed .csv.gz next to the workbook with a linked stub sheet) or parquet (same with .parquet, requires pyarrow). Rows are never truncated. Default Value: sheets")
+    parser.add_argument("--ca-spill-rows", dest="ca_spill_rows", type=int, default=None, help="Maximum data rows per Excel sheet before a Configuration Audit MO table is spilled (lower values keep Excel generation time bounded). Default Value: 1048575 (Excel limit)")
+
+    # ZIP logs: parse members straight from the archive (no extraction)
+    parser.add_argument("--zip-native", dest="zip_native", action=argparse.BooleanOptionalAction, default=None, help="Enable/disable zip-native mode: Step0 logs inside a ZIP are parsed straight from the archive (members decompressed in parallel worker processes) instead of being extracted to a temporary folder first. Default Value: Disabled (use --zip-native to enable it)")
+    parser.add_argument("--zip-native-workers", dest="zip_native_workers", type=int, default=None, help="Number of worker processes decompressing ZIP members in zip-native mode. Default Value: min(8, CPU count)")
+    parser.add_argument("--zip-extract-workers", dest="zip_extract_workers", type=int, default=None, help="Number of threads extracting Step0 ZIP logs when they are extracted (zip-native mode disabled); members are split by compressed size across threads. 1 uses a single-threaded extraction. Default Value: min(8, CPU count)")
+    parser.add_argument("--zip-extract-min-mb", dest="zip_extract_min_mb", type=int, default=None, help="Minimum Step0 ZIP size (MB) for parallel extraction; smaller archives are extracted single-threaded. Default Value: 64")
+    parser.add_argument("--zip-cache-quota-mb", dest="zip_cache_quota_mb", type=int, default=None, help="Maximum size (MB) of the Step0 ZIP extraction cache (<TEMP>/__unzipped_logs__); least recently used extractions and local ZIP copies are deleted above it. 0 deletes each extraction after use. Default Value: 10240")
+    parser.add_argument("--zip-cache", dest="zip_cache", choices=["list", "purge"], default=None, help="List or purge the Step0 ZIP extraction cache (<TEMP>/__unzipped_logs__) and exit. Entries in use by a running execution are never purged.")
+    parser.add_argument("--parse-cache-dir", dest="parse_cache_dir", default=None, help="Folder of the parsed log tables cache. Logs already parsed (same file name, size and CRC-32) are loaded from it instead of being parsed again in ConfigurationAudit PHASE 1. Default Value: disabled")
+    parser.add_argument("--parse-cache-quota-mb", dest="parse_cache_quota_mb", type=int, default=None, help="Maximum size (MB) of the parsed log tables cache; least recently used entries are deleted above it. Default Value: 10240")
+    parser.add_argument("--parse-cache-warm", dest="parse_cache_warm", action="store_true", help="Parse every log of --input (folder or ZIP, including the logs inside its ZIPs) into the parse cache (--parse-cache-dir) and exit.")
+
+    # Consistency Checks: market scheduler
+    parser.add_argument("--cc-market-workers", type=int, default=1, help="Number of markets processed in parallel (one worker process per market) in Consistency Checks. Default Value: 1 (sequential)")
+    parser.add_argument("--cc-parallel-audits", dest="cc_parallel_audits", action=argparse.BooleanOptionalAction, default=False, help="Enable/disable running PRE and POST Configuration Audits concurrently (separate processes) in Consistency Checks. Default Value: Disabled (use --cc-parallel-audits to enable it)")
+    parser.add_argument("--background-output", dest="background_output", action=argparse.BooleanOptionalAction, default=None, help="Enable/disable the background output stage: in batch Configuration Audits and sequential Consistency Checks (default, without --cc-parallel-audits), the Excel close, Correction Commands ZIPs and PPT of each audit are written in background while the next folder (or the POST audit and comparison of the same market) is parsed. Default Value: Enabled (use --no-background-output to disable it)")
+    parser.add_argument("--artifact-cache-mb", dest="artifact_cache_mb", type=int, default=None, help="Memory cap (MB) of the in-memory registry of written workbooks that lets later modules skip re-reading those XLSX files. Above it, least recently used sheets are spilled to temporary Parquet files (SummaryAudit always stays in memory). Default Value: 1024")
+    parser.add_argument("--ppt-max-nodes-per-metric", dest="ppt_max_nodes_per_metric", type=int, default=None, help="Maximum nodes listed per inconsistency/discrepancy metric in the Configuration Audit PPT; longer lists show the first N nodes and link to the workbook (SummaryAudit keeps the full list). 0 lists every node (100 per slide). Default Value: 0")
+    parser.add_argument("--cc-output-format", dest="cc_output_formats", default="xlsx", help="Comma-separated output formats for Consistency Checks tables: xlsx, parquet, arrow (e.g. 'parquet,xlsx'). Parquet/Arrow files are written to 'Columnar_CC' without XLSX styling (requires pyarrow). Default Value: xlsx")
+
+    # Correction commands ZIP export
+    parser.add_argument("--zip-compression", dest="zip_compression", choices=["deflated", "stored"], default=None, help="Compression used for Correction Commands ZIP files: deflated (compressed in a background writer thread) or stored (no compression, fastest for local runs). Default Value: deflated")
+    parser.add_argument("--zip-level", dest="zip_level", type=int, choices=range(0, 10), metavar="{0..9}", default=None, help="DEFLATE compression level (0-9) for Correction Commands ZIP files (lower = faster). Default Value: zlib default (6)")
+
     parser.add_argument("--no-gui", action="store_true", help="Disable GUI usage.")
 
     args = parser.parse_args()
@@ -889,9 +923,12 @@ def run_configuration_audit(
     fast_excel_export: bool = False,  # <<< NEW: use xlsxwriter engine (faster, reduced styling)
     fast_excel_autofit_rows: int = 50,  # <<< NEW: limit rows used to estimate column widths (xlsxwriter only)
     fast_excel_autofit_max_width: int = 60,  # <<< NEW: cap column width (xlsxwriter only)
+    split_workbooks: bool = False,  # <<< NEW: write raw MO tables into companion workbooks (RawMO_Workbooks/)
     module_name_override: Optional[str] = None,  # <<< NEW
     recursive_if_missing_logs: Optional[bool] = None,  # <<< NEW: None=ask, True=force recursive, False=skip
     skip_existing_audit_prompt: bool = False,  # <<< NEW: used by batch wrapper to avoid per-folder Yes/No dialogs
+    on_summary_ready=None,  # <<< NEW: optional callback(summary_audit_df, excel_path) fired before Excel/PPT write-out
+    output_stage: Optional[BackgroundOutputStage] = None,  # <<< NEW: queue Excel close / ZIP / PPT to this stage (caller waits on it)
 ) -> Optional[str]:
     """
     Run ConfigurationAudit on a folder or recursively on all its subfolders
@@ -918,7 +955,7 @@ def run_configuration_audit(
 
     base_dir_fs = to_long_path(input_dir)
 
-    if not os.path.isdir(base_dir_fs):
+    if not is_logs_dir(base_dir_fs):
         print(f"{module_name} [ERROR] Input folder does not exist or is not a directory: '{pretty_path(base_dir_fs)}'")
         return None
 
@@ -984,46 +1021,17 @@ def run_configuration_audit(
                 except Exception:
                     return None
 
-            for e in os.scandir(folder_fs):
-                if not e.is_dir():
-                    continue
-
-                name = e.name or ""
-                if not name.startswith("ConfigurationAudit_"):
-                    continue
-
-                if version_tag not in name:
-                    continue
-
-                excel_files: List[str] = []
-                try:
-                    for f in os.scandir(e.path):
-                        if not f.is_file():
-                            continue
-                        fn = f.name or ""
-                        if not fn.startswith("ConfigurationAudit_") or not fn.lower().endswith(".xlsx"):
-                            continue
-                        try:
-                            if os.path.getsize(to_long_path(f.path)) <= 0:
-                                continue
-                        except Exception:
-                            continue
-                        excel_files.append(f.path)
-                except Exception:
-                    excel_files = []
-
-                if not excel_files:
+            # NEW: ConfigurationAudit_* folders and their Excel files come from the cached Step0 tree index
+            for audit in get_step0_tree_index(folder_fs, max_depth=1).audit_folders(folder_fs):
+                if version_tag not in audit.name or not audit.excel_files:
                     continue
-
-                excel_files.sort()
-                dt = _extract_dt_from_folder_name(name)
+                dt = _extract_dt_from_folder_name(audit.name)
                 if dt is None:
                     try:
-                        dt = datetime.fromtimestamp(os.path.getmtime(to_long_path(e.path)))
+                        dt = datetime.fromtimestamp(audit.mtime)
                     except Exception:
                         dt = datetime.fromtimestamp(0)
-
-                candidates.append((dt, to_long_path(excel_files[-1])))
+                candidates.append((dt, to_long_path(audit.excel_files[-1])))
 
             if not candidates:
                 return None
@@ -1034,7 +1042,7 @@ def run_configuration_audit(
         except Exception:
             return None
 
-    def run_for_folder(folder: str, is_batch_mode: bool = False, force_rerun_existing: bool = False) -> Optional[str]:
+    def run_for_folder(folder: str, is_batch_mode: bool = False, force_rerun_existing: bool = False, stage: Optional[BackgroundOutputStage] = None) -> Optional[str]:
 
         """
         Run ConfigurationAudit for a single folder that is already known
@@ -1099,6 +1107,7 @@ def run_configuration_audit(
         print(f"{module_name} [INFO] Profiles Audit enabled       = {bool(profiles_audit)}")
         print(f"{module_name} [INFO] Export correction commands   = {bool(export_correction_cmd)} (Folder='Correction_Cmd_CA')")
         print(f"{module_name} [INFO] Fast Excel export            = {bool(fast_excel_export)} (AutofitRows={fast_excel_autofit_rows}, MaxWidth={fast_excel_autofit_max_width})")
+        print(f"{module_name} [INFO] Split MO companion workbooks = {bool(split_workbooks)}")
 
         if versioned_suffix:
             print(f"{module_name} [INFO] Output suffix override       = '{versioned_suffix}'")
@@ -1124,7 +1133,10 @@ def run_configuration_audit(
         resolved = ensure_logs_available(folder_fs)
         folder_to_process_fs = resolved.process_dir
         if pretty_path(folder_to_process_fs) != pretty_path(folder_fs):
-            print(f"{module_name} [INFO] ZIP logs detected. Using extracted logs folder: '{pretty_path(folder_to_process_fs)}'")
+            if resolved.is_extracted:
+                print(f"{module_name} [INFO] ZIP logs detected. Using extracted logs folder: '{pretty_path(folder_to_process_fs)}'")
+            else:
+                print(f"{module_name} [INFO] ZIP logs detected. Parsing logs straight from the ZIP (zip-native): '{pretty_path(folder_to_process_fs)}'")
 
         # If market_label is provided and not GLOBAL, append it as suffix (ONLY affects output folder name)
         suffix = ""
@@ -1165,7 +1177,7 @@ def run_configuration_audit(
                     app = ConfigurationAudit(n77_ssb_pre=local_n77_ssb_pre, n77_ssb_post=local_n77_ssb_post)
 
         # Include output_dir in kwargs passed to ConfigurationAudit.run
-        kwargs = dict(module_name=module_name, versioned_suffix=file_versioned_suffix, tables_order=TABLES_ORDER, output_dir=output_dir, profiles_audit=profiles_audit, frequency_audit=frequency_audit, export_correction_cmd=export_correction_cmd, correction_cmd_folder_name="Correction_Cmd_CA", fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width)
+        kwargs = dict(module_name=module_name, versioned_suffix=file_versioned_suffix, tables_order=TABLES_ORDER, output_dir=output_dir, profiles_audit=profiles_audit, frequency_audit=frequency_audit, export_correction_cmd=export_correction_cmd, correction_cmd_folder_name="Correction_Cmd_CA", fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width, split_workbooks=split_workbooks)
 
         # Provide ZIP context to ConfigurationAudit so Summary.LogPath can point to "<zip>/<log>"
         if resolved and resolved.zip_path:
@@ -1175,6 +1187,12 @@ def run_configuration_audit(
         if ca_freq_filters_csv:
             kwargs["filter_frequencies"] = [x.strip() for x in ca_freq_filters_csv.split(",") if x.strip()]
 
+        if on_summary_ready is not None:
+            kwargs["on_summary_ready"] = on_summary_ready
+
+        if (stage or output_stage) is not None:
+            kwargs["output_stage"] = stage or output_stage
+
         out = None
         try:
             try:
@@ -1190,18 +1208,6 @@ def run_configuration_audit(
                 # else:
                 #     raise
 
-            if out and hasattr(app, "_last_summary_audit_df"):
-                try:
-                    df_cached = getattr(app, "_last_summary_audit_df")
-                    CONFIG_AUDIT_SUMMARY_CACHE[out] = df_cached
-                    try:
-                        out_long = to_long_path(out)
-                        CONFIG_AUDIT_SUMMARY_CACHE[out_long] = df_cached
-                    except Exception:
-                        pass
-                except Exception:
-                    pass
-
             print(f"{module_name} [INFO] Output folder: '{pretty_path(output_dir)}'")
 
             # End marker for the log per batch in putput folder
@@ -1284,18 +1290,569 @@ def run_configuration_audit(
 
     print(f"{module_name} [INFO] Found {len(candidate_dirs)} subfolder(s) with valid log files. Running Configuration Audit for each of them...")
 
+    # NEW: each folder queues its Excel close / ZIP / PPT to a background output stage and the loop moves on to parse the next folder
+    batch_stage = output_stage
+    if batch_stage is None and len(candidate_dirs) > 1 and background_output_enabled():
+        batch_stage = BackgroundOutputStage(module_name=module_name)
+
     last_excel: Optional[str] = None
-    for sub_dir in candidate_dirs:
-        print(f"{module_name} [INFO] → Running Configuration Audit in subfolder: '{pretty_path(sub_dir)}'")
+    try:
+        for sub_dir in candidate_dirs:
+            print(f"{module_name} [INFO] → Running Configuration Audit in subfolder: '{pretty_path(sub_dir)}'")
+            try:
+                excel_path = run_for_folder(sub_dir, is_batch_mode=True, stage=batch_stage)
+                if excel_path:
+                    last_excel = excel_path
+            except Exception as ex:
+                print(f"{module_name} [WARNING] Failed to run Configuration Audit in '{pretty_path(sub_dir)}': {ex}")
+    finally:
+        # Barrier: every queued artifact is on disk before the batch reports back (only for a stage created here)
+        if batch_stage is not None and batch_stage is not output_stage:
+            batch_stage.wait()
+
+    return last_excel
+
+
+
+# ----------------------------- NEW: Concurrent PRE/POST ConfigurationAudits ----------------------------- #
+def _configuration_audit_worker(side: str, audit_kwargs: Dict[str, object], log_path: str, msg_queue) -> None:
+    """
+    Process entry point for one ConfigurationAudit (PRE or POST) launched by ParallelAuditRunner.
+
+    Messages sent to msg_queue (side, kind, excel_path, payload):
+      - ("summary") as soon as SummaryAudit is built (payload = SummaryAudit DataFrame), before Excel/PPT write-out.
+      - ("done") when the audit finishes (payload = None).
+      - ("error") if the audit raised (payload = error text).
+    """
+    install_process_logger(log_path)
+
+    def _on_summary_ready(summary_audit_df, excel_path: str) -> None:
+        msg_queue.put((side, "summary", excel_path, summary_audit_df))
+
+    try:
+        out = run_configuration_audit(on_summary_ready=_on_summary_ready, **audit_kwargs)
+        msg_queue.put((side, "done", out, None))
+    except Exception as ex:
+        msg_queue.put((side, "error", None, f"{type(ex).__name__}: {ex}"))
+    finally:
         try:
-            excel_path = run_for_folder(sub_dir, is_batch_mode=True)
-            if excel_path:
-                last_excel = excel_path
+            sys.stdout.flush()
+        except Exception:
+            pass
+
+
+class ParallelAuditRunner:
+    """
+    Run ConfigurationAudits (PRE/POST) concurrently in separate processes.
+
+    - wait_summaries(): block until every started audit has delivered its SummaryAudit (or finished/failed).
+    - wait_finished(): barrier for the background Excel/PPT write-out; appends each audit log into logger_obj. Idempotent.
+    """
+
+    def __init__(self, module_name: str = "", market_tag: str = "", logger_obj: Optional[object] = None):
+        import multiprocessing
+
+        self.module_name = module_name
+        self.market_tag = market_tag
+        self.logger_obj = logger_obj
+        self._queue = multiprocessing.Queue()
+        self._procs: Dict[str, object] = {}
+        self._log_paths: Dict[str, str] = {}
+        self._start_ts: Dict[str, float] = {}
+        self._finished: Dict[str, bool] = {}
+        self.summaries: Dict[str, Tuple[Optional[str], Optional[object]]] = {}
+        self.outputs: Dict[str, Optional[str]] = {}
+        self.durations: Dict[str, float] = {}
+        self._closed = False
+
+    def start(self, side: str, audit_kwargs: Dict[str, object], log_path: str) -> None:
+        import multiprocessing
+
+        proc = multiprocessing.Process(target=_configuration_audit_worker, args=(side, audit_kwargs, log_path, self._queue), name=f"ConfigurationAudit_{side}")
+        self._procs[side] = proc
+        self._log_paths[side] = log_path
+        self._finished[side] = False
+        self._start_ts[side] = time.perf_counter()
+        proc.start()
+        print(f"{self.module_name} {self.market_tag} [INFO] {side} Configuration Audit started in background process (pid={proc.pid}).")
+
+    def _handle(self, side: str, kind: str, excel_path: Optional[str], payload: object) -> None:
+        if kind == "summary":
+            self.summaries[side] = (excel_path, payload)
+        elif kind in ("done", "error"):
+            self._finished[side] = True
+            self.durations[side] = time.perf_counter() - self._start_ts.get(side, time.perf_counter())
+            self.outputs[side] = excel_path
+            if side not in self.summaries:
+                self.summaries[side] = (excel_path, None)
+            if kind == "error":
+                print(f"{self.module_name} {self.market_tag} [ERROR] {side} Configuration Audit failed: {payload}")
+
+    def _pump(self, until) -> None:
+        import queue as queue_mod
+
+        while not until():
+            try:
+                side, kind, excel_path, payload = self._queue.get(timeout=0.5)
+            except queue_mod.Empty:
+                # Detect processes that died without reporting (e.g. hard crash)
+                for side, proc in self._procs.items():
+                    if not self._finished.get(side) and not proc.is_alive():
+                        try:
+                            side_msg = self._queue.get(timeout=1.0)
+                            self._handle(*side_msg)
+                        except queue_mod.Empty:
+                            self._handle(side, "error", None, f"process exited with code {proc.exitcode}")
+                continue
+            self._handle(side, kind, excel_path, payload)
+
+    def wait_summaries(self) -> None:
+        self._pump(lambda: all(side in self.summaries for side in self._procs))
+
+    def wait_finished(self) -> None:
+        if self._closed:
+            return
+        self._pump(lambda: all(self._finished.get(side) for side in self._procs))
+        for proc in self._procs.values():
+            try:
+                proc.join()
+            except Exception:
+                pass
+        self._closed = True
+
+        # Keep the market log (and its output-folder mirror) complete with the audit process logs
+        append_fn = getattr(self.logger_obj, "append_log_file", None)
+        if callable(append_fn):
+            for side in sorted(self._log_paths):
+                append_fn(self._log_paths[side], header=f"{self.module_name} {self.market_tag} [INFO] ----- {side} Configuration Audit process log -----")
+        for side in sorted(self._procs):
+            print(f"{self.module_name} {self.market_tag} [INFO] {side} Configuration Audit finished in {format_duration_hms(self.durations.get(side, 0.0))}: '{pretty_path(self.outputs.get(side) or '')}'")
+
+
+# ----------------------------- NEW: Per-market Consistency Checks execution ----------------------------- #
+def run_consistency_check_market(
+    market_label: str,
+    pre_dir: str,
+    post_dir: str,
+    module_name: str,
+    exec_timestamp: str,
+    n77_ssb_pre: Optional[str],
+    n77_ssb_post: Optional[str],
+    n77b_ssb: Optional[str] = None,
+    ca_freq_filters_csv: str = "",
+    cc_filter_list: Optional[List[str]] = None,
+    allowed_n77_ssb_pre_csv: Optional[str] = None,
+    allowed_n77_arfcn_pre_csv: Optional[str] = None,
+    allowed_n77_ssb_post_csv: Optional[str] = None,
+    allowed_n77_arfcn_post_csv: Optional[str] = None,
+    frequency_audit: bool = True,
+    profiles_audit: bool = True,
+    export_correction_cmd_post: bool = True,
+    fast_excel_export: bool = False,
+    fast_excel_autofit_rows: int = 50,
+    fast_excel_autofit_max_width: int = 60,
+    split_workbooks: bool = False,
+    output_root_dir: Optional[str] = None,
+    parallel_audits: bool = False,
+    market_logger: Optional[LoggerDual] = None,
+    output_formats: Optional[List[str]] = None,
+    output_stage: Optional[BackgroundOutputStage] = None,
+) -> Dict[str, object]:
+    """
+    Run PRE audit + POST audit + ConsistencyChecks for ONE market PRE/POST pair.
+
+    Kept at module level (not nested) so it can be dispatched to a worker process by the market scheduler.
+    If market_logger is provided, the per-output log mirror is attached to it instead of the global sys.stdout.
+    If parallel_audits is True, PRE and POST ConfigurationAudits run concurrently in their own processes and the
+    comparison starts as soon as both SummaryAudit frames are available (their Excel/PPT write-out continues in background).
+    output_formats selects the CC outputs to write ("xlsx", "parquet", "arrow"); defaults to ["xlsx"].
+    If parallel_audits is False, the Excel close / ZIP / PPT of the PRE and POST audits are queued to a background output
+    stage (output_stage, shared by the caller across markets, or a per-market one awaited before leaving the market).
+
+    Returns a timing record (seconds per stage) used to build the consolidated timing table.
+    """
+    folder_versioned_suffix = f"{exec_timestamp}_v{TOOL_VERSION}"
+    cc_filter_list = list(cc_filter_list or [])
+
+    # market_tag = f"[Market: {market_label}]" if market_label != "GLOBAL" else ""
+    market_tag = f"[Market: {market_label}]"
+
+    # Start marker for the log per batch in output folder
+    start_marker = f"{module_name} [INFO]  === START ConsistencyCheck for: : {market_label} ==="
+
+    # Per-market timing record (returned to the scheduler to build the consolidated timing table)
+    market_start_ts = time.perf_counter()
+    timings: Dict[str, object] = {"market": market_label, "status": "OK", "pre_audit": 0.0, "post_audit": 0.0, "compare": 0.0, "save": 0.0, "total": 0.0, "output_dir": "", "log_file": getattr(market_logger, "log_path", "") or ""}
+
+    print(f"{module_name} [INFO] Processing Market: {market_label}")
+    print(f"\n{start_marker}")
+    print("=" * 80)
+    print(f"{module_name} {market_tag} [INFO] Processing PRE/POST pair:")
+    print(f"{module_name} {market_tag} [INFO] PRE folder:  '{pretty_path(pre_dir)}'")
+    print(f"{module_name} {market_tag} [INFO] POST folder: '{pretty_path(post_dir)}'")
+
+    pre_dir_fs = to_long_path(pre_dir)
+    post_dir_fs = to_long_path(post_dir)
+
+    # Timestamp/Market inference for FILE names (folder remains execution timestamp)
+    pre_parent_ts, pre_parent_market = infer_parent_timestamp_and_market(pre_dir_fs)
+    post_parent_ts, post_parent_market = infer_parent_timestamp_and_market(post_dir_fs)
+
+    cc_file_ts = (post_parent_ts or pre_parent_ts or exec_timestamp)
+    cc_base_file_suffix = f"{cc_file_ts}_v{TOOL_VERSION}"
+    parent_market = post_parent_market or pre_parent_market or ""
+
+    market_for_files = market_label if market_label and market_label != "GLOBAL" else (parent_market or "")
+    file_versioned_suffix = f"{market_for_files}_{cc_base_file_suffix}" if market_for_files else cc_base_file_suffix
+
+    # NEW: Use different timestamps for PRE/POST audit artifacts, and place _Pre/_Post AFTER the timestamp
+    pre_file_ts = pre_parent_ts or cc_file_ts
+    post_file_ts = post_parent_ts or cc_file_ts
+    base_file_suffix_pre = f"{pre_file_ts}_Pre_v{TOOL_VERSION}"
+    base_file_suffix_post = f"{post_file_ts}_Post_v{TOOL_VERSION}"
+
+    pre_resolved = ensure_logs_available(pre_dir_fs)
+    post_resolved = ensure_logs_available(post_dir_fs)
+
+    pre_dir_process_fs = pre_resolved.process_dir
+    post_dir_process_fs = post_resolved.process_dir
+
+    if pretty_path(pre_dir_process_fs) != pretty_path(pre_dir_fs):
+        print(f"{module_name} {market_tag} [INFO] PRE ZIP logs detected. Using {'extracted folder' if pre_resolved.is_extracted else 'ZIP members (zip-native)'}: '{pretty_path(pre_dir_process_fs)}'")
+    if pretty_path(post_dir_process_fs) != pretty_path(post_dir_fs):
+        print(f"{module_name} {market_tag} [INFO] POST ZIP logs detected. Using {'extracted folder' if post_resolved.is_extracted else 'ZIP members (zip-native)'}: '{pretty_path(post_dir_process_fs)}'")
+
+    audit_runner: Optional[ParallelAuditRunner] = None
+    market_stage: Optional[BackgroundOutputStage] = None
+    try:
+        # Compute output_dir upfront so both audits and consistency outputs land together.
+        output_base_root = to_long_path(output_root_dir) if output_root_dir else post_dir_fs
+        if market_label != "GLOBAL":
+            output_dir = os.path.join(output_base_root, f"ConsistencyChecks_{folder_versioned_suffix}_{market_label}")
+        else:
+            output_dir = os.path.join(output_base_root, f"ConsistencyChecks_{folder_versioned_suffix}")
+
+        # Attach log mirror early so the whole execution is captured into the per-output folder mirror file
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except Exception:
+            pass
+        attach_output_log_mirror(output_dir, copy_existing_log=True, start_marker=start_marker, end_marker=None, logger_obj=market_logger)
+        timings["output_dir"] = output_dir
+
+        # NEW: write FoldersCompared.txt with the exact PRE/POST folders used
+        try:
+            txt_path = write_compared_folders_file(output_dir=output_dir, pre_dir=pre_dir_fs, post_dir=post_dir_fs)
+            if txt_path:
+                print(f"{module_name} {market_tag} [INFO] Compared folders file written: '{pretty_path(txt_path)}'")
         except Exception as ex:
-            print(f"{module_name} [WARNING] Failed to run Configuration Audit in '{pretty_path(sub_dir)}': {ex}")
+            print(f"{module_name} {market_tag} [WARNING] Failed to write FoldersCompared.txt: {ex}")
+
+        # Ensure PRE/POST audit files do not overwrite each other inside shared output_dir
+        audit_pre_suffix = f"{market_for_files}_{base_file_suffix_pre}" if market_for_files else base_file_suffix_pre
+        audit_post_suffix = f"{market_for_files}_{base_file_suffix_post}" if market_for_files else base_file_suffix_post
+
+        # --- Run Configuration Audit for PRE and POST ---
+        def _try_parse_audit_folder_ts(folder_name: str) -> Optional[datetime]:
+            # Expected patterns (examples):
+            #   ConfigurationAudit_20260127_1530_vX.Y.Z
+            #   ConfigurationAudit_20260127_1530_vX.Y.Z_MARKET
+            if not folder_name:
+                return None
+            m = re.search(r"_(\d{8}_\d{4})_v", folder_name)
+            if not m:
+                return None
+            try:
+                return datetime.strptime(m.group(1), "%Y%m%d_%H%M")
+            except Exception:
+                return None
 
-    return last_excel
+        def _find_latest_audit_folder(search_root: str) -> Optional[str]:
+            # Search for previous ConfigurationAudit folders inside PRE/POST root folder and pick the newest one WITH a valid ConfigurationAudit_*.xlsx inside.
+            try:
+                if not search_root or not os.path.isdir(search_root):
+                    return None
+
+                # NEW: ConfigurationAudit_* folders (and whether they hold a non-empty ConfigurationAudit_*.xlsx) come from the cached Step0 tree index
+                candidates: List[Tuple[datetime, float, str, bool]] = []
+                for audit in get_step0_tree_index(search_root, max_depth=1).audit_folders(search_root):
+                    ts = _try_parse_audit_folder_ts(audit.name) or datetime.min
+                    candidates.append((ts, audit.mtime, audit.path, bool(audit.excel_files)))
+
+                if not candidates:
+                    return None
+
+                candidates.sort(key=lambda x: (x[0], x[1]), reverse=True)
+
+                # Try newest first; if it doesn't contain a valid ConfigurationAudit_*.xlsx, fallback to previous by timestamp.
+                for _ts, _mt, audit_dir, has_excel in candidates:
+                    if has_excel:
+                        return audit_dir
+
+                return None
+            except Exception:
+                return None
+
+        def _pick_latest_file_by_ext(folder: str, ext: str, preferred_prefixes: Optional[List[str]] = None) -> Optional[str]:
+            try:
+                if not folder or not os.path.isdir(folder):
+                    return None
+                preferred_prefixes = preferred_prefixes or []
+                files = []
+                for name in os.listdir(folder):
+                    p = os.path.join(folder, name)
+                    if not os.path.isfile(p):
+                        continue
+                    if not str(name).lower().endswith(ext.lower()):
+                        continue
+                    files.append(p)
+                if not files:
+                    return None
+
+                # Prefer files with expected prefixes (ConfigurationAudit_ / ProfilesAudit_) when available
+                preferred = []
+                if preferred_prefixes:
+                    for p in files:
+                        bn = os.path.basename(p)
+                        if any(bn.startswith(pref) for pref in preferred_prefixes):
+                            preferred.append(p)
+                target_list = preferred if preferred else files
+                target_list.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0.0, reverse=True)
+                return target_list[0]
+            except Exception:
+                return None
+
+        def _copy_audit_artifacts_to_current_output(src_audit_dir: str, dst_output_dir: str, dst_versioned_suffix: str, copy_cmd_folders: bool) -> Optional[str]:
+            # Copy Excel + PPT from previous audit folder into current output_dir with current execution naming.
+            try:
+                if not src_audit_dir or not os.path.isdir(src_audit_dir):
+                    return None
+                os.makedirs(dst_output_dir, exist_ok=True)
+
+                src_excel = _pick_latest_file_by_ext(src_audit_dir, ".xlsx", preferred_prefixes=["ConfigurationAudit_"])
+                if not src_excel or not os.path.basename(src_excel).startswith("ConfigurationAudit_"):
+                    return None
+
+                dst_excel = os.path.join(dst_output_dir, f"ConfigurationAudit_{dst_versioned_suffix}.xlsx")
+                shutil.copy2(to_long_path(src_excel), to_long_path(dst_excel))
+                # Parquet sidecar (if the previous audit wrote one): SummaryAudit is then loaded without parsing the XLSX
+                copy_workbook_sidecar(src_excel, dst_excel)
+
+                # Try to find matching PPT (same basename), otherwise pick newest PPT in folder
+                paired_ppt = os.path.splitext(src_excel)[0] + ".pptx"
+                src_ppt = paired_ppt if os.path.isfile(paired_ppt) else _pick_latest_file_by_ext(src_audit_dir, ".pptx", preferred_prefixes=["ConfigurationAudit_", "ProfilesAudit_"])
+                if src_ppt and os.path.isfile(src_ppt):
+                    dst_ppt = os.path.join(dst_output_dir, f"ConfigurationAudit_{dst_versioned_suffix}.pptx")
+                    shutil.copy2(to_long_path(src_ppt), to_long_path(dst_ppt))
+
+                # Copy command folders only for POST (if exist)
+                if copy_cmd_folders:
+                    for cmd_folder in ["Correction_Cmd_CA", "Correction_Cmd"]:
+                        src_cmd = os.path.join(src_audit_dir, cmd_folder)
+                        dst_cmd = os.path.join(dst_output_dir, cmd_folder)
+                        if os.path.isdir(src_cmd):
+                            if os.path.isdir(dst_cmd):
+                                shutil.rmtree(to_long_path(dst_cmd), ignore_errors=True)
+                            shutil.copytree(to_long_path(src_cmd), to_long_path(dst_cmd), dirs_exist_ok=True)
+
+                return dst_excel
+            except Exception:
+                return None
+
+        # --- Run Configuration Audit for PRE and POST (reuse existing audits when available) ---
+        pre_audit_kwargs = dict(input_dir=pre_dir_process_fs, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb,
+                                allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv,
+                                allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, versioned_suffix=audit_pre_suffix, market_label=market_label, external_output_dir=output_dir,
+                                frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=False, fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width, split_workbooks=split_workbooks)
+        post_audit_kwargs = dict(pre_audit_kwargs, input_dir=post_dir_process_fs, versioned_suffix=audit_post_suffix, export_correction_cmd=export_correction_cmd_post)
+
+        print("-" * 80)
+        print(f"{module_name} {market_tag} [INFO] Running Configuration Audit for PRE folder before consistency checks...")
+        phase_ts = time.perf_counter()
+        pre_existing_audit_dir = _find_latest_audit_folder(pre_dir_fs)
+        pre_audit_excel = None
+        if pre_existing_audit_dir:
+            print(f"{module_name} {market_tag} [INFO] Reusing existing PRE Audit folder: '{pretty_path(pre_existing_audit_dir)}'")
+            pre_audit_excel = _copy_audit_artifacts_to_current_output(pre_existing_audit_dir, output_dir, audit_pre_suffix, copy_cmd_folders=False)
+            if not pre_audit_excel:
+                print(f"{module_name} {market_tag} [WARNING] Existing PRE Audit folder is missing a valid ConfigurationAudit_*.xlsx. Running a new PRE Configuration Audit.")
+
+        print(f"{module_name} {market_tag} [INFO] Running Configuration Audit for POST folder before consistency checks...")
+        post_existing_audit_dir = _find_latest_audit_folder(post_dir_fs)
+        post_audit_excel = None
+        if post_existing_audit_dir:
+            print(f"{module_name} {market_tag} [INFO] Reusing existing POST Audit folder: '{pretty_path(post_existing_audit_dir)}'")
+            post_audit_excel = _copy_audit_artifacts_to_current_output(post_existing_audit_dir, output_dir, audit_post_suffix, copy_cmd_folders=True)
+            if not post_audit_excel:
+                print(f"{module_name} {market_tag} [WARNING] Existing POST Audit folder is missing a valid ConfigurationAudit_*.xlsx. Running a new POST Configuration Audit.")
+
+        pending_audits = {side: kw for side, kw, done in (("PRE", pre_audit_kwargs, pre_audit_excel), ("POST", post_audit_kwargs, post_audit_excel)) if not done}
+
+        if parallel_audits and pending_audits:
+            # Run pending audits in their own processes. We only wait for their SummaryAudit frames here; the Excel/PPT write-out keeps running
+            # in background and is awaited by audit_runner.wait_finished() before leaving this market.
+            logger_obj = market_logger if market_logger is not None else sys.stdout
+            base_log_path = str(getattr(logger_obj, "log_path", "") or "")
+            side_log_tag = "" if market_logger is not None else f"{market_label}_"
+            audit_runner = ParallelAuditRunner(module_name=module_name, market_tag=market_tag, logger_obj=logger_obj)
+            for side, kw in pending_audits.items():
+                audit_runner.start(side, kw, derive_log_path(base_log_path, f"{side_log_tag}{side}"))
+
+            audit_runner.wait_summaries()
+            for side, (excel_path, summary_df) in audit_runner.summaries.items():
+                if excel_path and summary_df is not None:
+                    # Only SummaryAudit crosses the process boundary: register it as a partial workbook (other sheets are read from disk)
+                    register_artifact(excel_path, {"SummaryAudit": summary_df}, complete=False)
+            if "PRE" in pending_audits:
+                pre_audit_excel = audit_runner.summaries.get("PRE", (None, None))[0]
+            if "POST" in pending_audits:
+                post_audit_excel = audit_runner.summaries.get("POST", (None, None))[0]
+            print(f"{module_name} {market_tag} [INFO] SummaryAudit available for {', '.join(sorted(pending_audits))} audit(s) in {format_duration_hms(time.perf_counter() - phase_ts)}. Excel/PPT write-out continues in background.")
+        else:
+            # Sequential audits: the PRE Excel/PPT write-out overlaps the POST parse (and the comparison) on the background output stage
+            if output_stage is None and pending_audits and background_output_enabled():
+                market_stage = BackgroundOutputStage(module_name=f"{module_name} {market_tag}")
+            stage = output_stage or market_stage
+            if "PRE" in pending_audits:
+                pre_audit_excel = run_configuration_audit(**pre_audit_kwargs, output_stage=stage)
+            timings["pre_audit"] = time.perf_counter() - phase_ts
+            phase_ts = time.perf_counter()
+            if "POST" in pending_audits:
+                post_audit_excel = run_configuration_audit(**post_audit_kwargs, output_stage=stage)
+            timings["post_audit"] = time.perf_counter() - phase_ts
+
+        if pre_audit_excel:
+            print(f"{module_name} {market_tag} [INFO] PRE Configuration Audit output: '{pretty_path(pre_audit_excel)}'")
+        else:
+            print(f"{module_name} {market_tag} [INFO] PRE Configuration Audit did not generate an output Excel file.")
+        if post_audit_excel:
+            print(f"{module_name} {market_tag} [INFO] POST Configuration Audit output: '{pretty_path(post_audit_excel)}'")
+        else:
+            print(f"{module_name} {market_tag} [INFO] POST Configuration Audit did not generate an output Excel file.")
+        print("-" * 80)
+
+        # --- Run ConsistencyChecks for this market ---
+        print(f"{module_name} {market_tag} [INFO] Running ConsistencyCheck for this market...")
+        phase_ts = time.perf_counter()
+        try:
+            app = ConsistencyChecks(n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, freq_filter_list=cc_filter_list)
+        except TypeError:
+            app = ConsistencyChecks(n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post)
+
+        loaded = False
+        try:
+            app.loadPrePost(input_dir_or_pre=pre_dir_process_fs, post_dir=post_dir_process_fs, module_name=module_name, market_tag=market_tag)
+            loaded = True
+        except TypeError:
+            loaded = False
+
+        if not loaded:
+            print(f"{module_name} {market_tag} [ERROR] ConsistencyChecks class does not support dual folders (Pre/Post).")
+            print(f"{module_name} {market_tag}         Please update ConsistencyChecks.loadPrePost(pre_dir, post_dir) to enable dual-input mode.")
+            timings["status"] = "SKIPPED"
+            return timings
+
+        results = None
+        if n77_ssb_pre and n77_ssb_post:
+            # SummaryAudit frames registered by the audits of this process (or received from the audit worker processes)
+            pre_summary_df = ARTIFACTS.get_sheet(pre_audit_excel, "SummaryAudit") if pre_audit_excel else None
+            post_summary_df = ARTIFACTS.get_sheet(post_audit_excel, "SummaryAudit") if post_audit_excel else None
+
+            results = app.comparePrePost(freq_before=n77_ssb_pre, freq_after=n77_ssb_post, audit_pre_excel=pre_audit_excel, audit_post_excel=post_audit_excel, audit_pre_summary_audit_df=pre_summary_df, audit_post_summary_audit_df=post_summary_df, module_name=module_name, market_tag=market_tag)
+
+        else:
+            print(f"{module_name} {market_tag} [INFO] Frequencies not provided. Comparison will be skipped; only tables will be saved.")
+        timings["compare"] = time.perf_counter() - phase_ts
+
+        phase_ts = time.perf_counter()
+        app.save_outputs_excel(output_dir=output_dir, results=results, versioned_suffix=file_versioned_suffix, module_name=module_name, market_tag=market_tag, fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width, output_formats=output_formats)
+        timings["save"] = time.perf_counter() - phase_ts
+
+        if output_formats and "xlsx" not in output_formats:
+            print(f"{module_name} {market_tag} [INFO] Wrote CC tables as {', '.join(output_formats)} (XLSX output disabled).")
+        elif results:
+            print(f"{module_name} {market_tag} [INFO] Wrote CellRelation.xlsx and ConsistencyChecks_CellRelation.xlsx (with Summary and details).")
+        else:
+            print(f"{module_name} {market_tag} [INFO] Wrote CellRelation.xlsx (all tables). No comparison Excel because frequencies were not provided.")
+
+        # Barrier: wait for the background audit write-out (Excel/PPT/correction commands) before closing this market
+        if audit_runner is not None:
+            audit_runner.wait_finished()
+            timings["pre_audit"] = audit_runner.durations.get("PRE", timings["pre_audit"])
+            timings["post_audit"] = audit_runner.durations.get("POST", timings["post_audit"])
+        if market_stage is not None:
+            market_stage.wait()
+        elif output_stage is not None:
+            # Shared stage: this market's jobs must finish before its outputs are reported and its mirror log is closed
+            output_stage.drain()
+
+        print(f"{module_name} {market_tag} [INFO] Outputs saved to: '{pretty_path(output_dir)}'")
+
+        # End marker for the log per batch in putput folder
+        end_marker = f"{module_name} {market_tag} [INFO] === END ConsistencyCheck for: '{pretty_path(output_dir)}' ==="
+        print(f"\n{end_marker}")
+
+        # Stop mirroring after this execution to avoid leaking next batch execution lines into this mirror file
+        try:
+            logger_obj = market_logger if market_logger is not None else sys.stdout
+            if hasattr(logger_obj, "clear_mirror_files") and callable(getattr(logger_obj, "clear_mirror_files")):
+                logger_obj.clear_mirror_files()
+        except Exception:
+            pass
+
+    finally:
+        # Never remove extracted logs while an audit process may still be running
+        if audit_runner is not None:
+            audit_runner.wait_finished()
+        if market_stage is not None:
+            market_stage.wait()
+        pre_resolved.cleanup()
+        post_resolved.cleanup()
+        timings["total"] = time.perf_counter() - market_start_ts
+
+    return timings
+
+
+def _consistency_check_market_worker(market_label: str, pre_dir: str, post_dir: str, market_kwargs: Dict[str, object], market_log_path: str) -> Dict[str, object]:
+    """
+    Process entry point for the market scheduler (one market per call).
+
+    Each worker process gets its own LoggerDual writing to market_log_path, so the per-output
+    log mirror never depends on (nor writes into) the parent process sys.stdout.
+    """
+    market_logger = install_process_logger(market_log_path)
+    try:
+        return run_consistency_check_market(market_label, pre_dir, post_dir, market_logger=market_logger, **market_kwargs)
+    finally:
+        try:
+            market_logger.flush()
+        except Exception:
+            pass
+
+
+def print_market_timing_table(timings: List[Dict[str, object]], module_name: str) -> None:
+    """Print the consolidated per-market timing table at the end of a Consistency Checks run."""
+    if not timings:
+        return
+
+    headers = ["Market", "Status", "PRE Audit", "POST Audit", "Compare", "Save Outputs", "Total"]
+    rows = []
+    for t in sorted(timings, key=lambda x: str(x.get("market", ""))):
+        rows.append([str(t.get("market", "")), str(t.get("status", "")), *(format_duration_hms(float(t.get(k, 0.0) or 0.0)) for k in ("pre_audit", "post_audit", "compare", "save", "total"))])
+
+    widths = [max(len(headers[i]), *(len(r[i]) for r in rows)) for i in range(len(headers))]
+    sep = "-+-".join("-" * w for w in widths)
 
+    print("=" * 80)
+    print(f"{module_name} [TIMER] [INFO] Consolidated timing per market:")
+    print(f"{module_name} [TIMER] [INFO] {' | '.join(h.ljust(widths[i]) for i, h in enumerate(headers))}")
+    print(f"{module_name} [TIMER] [INFO] {sep}")
+    for r in rows:
+        print(f"{module_name} [TIMER] [INFO] {' | '.join(v.ljust(widths[i]) for i, v in enumerate(r))}")
+    for t in sorted(timings, key=lambda x: str(x.get("market", ""))):
+        if t.get("log_file"):
+            print(f"{module_name} [TIMER] [INFO] Log for market {t.get('market', '')}: '{pretty_path(str(t.get('log_file')))}'")
+    print("=" * 80)
 
 
 # ----------------------------- NEW: Unified Consistency Checks runner ----------------------------- #
@@ -1318,8 +1875,12 @@ def run_consistency_checks(
     fast_excel_export: bool = False,
     fast_excel_autofit_rows: int = 50,
     fast_excel_autofit_max_width: int = 60,
+    split_workbooks: bool = False,
     mode: str = "",
     output_root_dir: Optional[str] = None,
+    market_workers: int = 1,
+    parallel_audits: bool = False,
+    output_formats: str = "xlsx",
 ) -> None:
     """
     Unified runner for ConsistencyChecks:
@@ -1333,6 +1894,13 @@ def run_consistency_checks(
     Shared logic to run ConfigurationAudit + ConsistencyChecks for each
     PRE/POST market pair.
 
+    Market scheduling:
+      - market_workers <= 1 -> markets are processed sequentially in this process.
+      - market_workers > 1  -> each market runs in its own worker process (own log + log mirror).
+      - In both cases a consolidated timing table is printed at the end.
+      - parallel_audits=True runs the PRE and POST ConfigurationAudits of each market concurrently.
+      - output_formats is a CSV of CC output formats (e.g. "parquet,xlsx"); Parquet/Arrow skip all XLSX styling.
+
     This function is used by:
     - run_consistency_checks_manual (explicit PRE/POST)
     - run_consistency_checks_bulk   (auto-detected PRE/POST with markets)
@@ -1346,7 +1914,6 @@ def run_consistency_checks(
     print(f"{module_name} [INFO] Running Consistency Check ({'bulk mode' if is_bulk else 'manual mode'})…")
 
     exec_timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    folder_versioned_suffix = f"{exec_timestamp}_v{TOOL_VERSION}"
 
     # Normalize filters once here so they are reused for all markets
     ca_freq_filters_csv = normalize_csv_list(ca_freq_filters_csv or "")
@@ -1467,7 +2034,7 @@ def run_consistency_checks(
         # Convert them into Step0 "run" folders so auto-detection works as usual.
         step0_zip_files: List[str] = []
         try:
-            has_any_subdir = any(e.is_dir() for e in os.scandir(base_dir_fs))
+            has_any_subdir = get_step0_tree_index(base_dir_fs).has_subdirs(base_dir_fs)
         except Exception:
             has_any_subdir = False
 
@@ -1516,10 +2083,10 @@ def run_consistency_checks(
         if not base_pre or not base_post:
             fallback_pairs: Dict[str, Tuple[str, str]] = {}
             try:
-                for name in sorted(os.listdir(base_dir_fs)):
-                    child = os.path.join(base_dir_fs, name)
-                    if not os.path.isdir(child):
-                        continue
+                # NEW: children come from the cached Step0 tree index (detect_pre_post_subfolders below reuses the same index)
+                for child_node in sorted(get_step0_tree_index(base_dir_fs).subdirs(base_dir_fs), key=lambda n: n.name):
+                    name = child_node.name
+                    child = child_node.path
                     name_low = name.lower()
                     if any(tok in name_low for tok in BLACKLIST):
                         continue
@@ -1591,315 +2158,67 @@ def run_consistency_checks(
 
     def main_logic(market_pairs: Dict[str, Tuple[str, str]]) -> None:
         # ----------------------------- SHARED PER-MARKET EXECUTION ----------------------------- #
-        for market_label, (pre_dir, post_dir) in sorted(market_pairs.items()):
-            # market_tag = f"[Market: {market_label}]" if market_label != "GLOBAL" else ""
-            market_tag = f"[Market: {market_label}]"
-
-            # Start marker for the log per batch in output folder
-            start_marker = f"{module_name} [INFO]  === START ConsistencyCheck for: : {market_label} ==="
-
-            print(f"{module_name} [INFO] Processing Market: {market_label}")
-            print(f"\n{start_marker}")
-            print("=" * 80)
-            print(f"{module_name} {market_tag} [INFO] Processing PRE/POST pair:")
-            print(f"{module_name} {market_tag} [INFO] PRE folder:  '{pretty_path(pre_dir)}'")
-            print(f"{module_name} {market_tag} [INFO] POST folder: '{pretty_path(post_dir)}'")
-
-            pre_dir_fs = to_long_path(pre_dir)
-            post_dir_fs = to_long_path(post_dir)
-
-            # Timestamp/Market inference for FILE names (folder remains execution timestamp)
-            pre_parent_ts, pre_parent_market = infer_parent_timestamp_and_market(pre_dir_fs)
-            post_parent_ts, post_parent_market = infer_parent_timestamp_and_market(post_dir_fs)
-
-            cc_file_ts = (post_parent_ts or pre_parent_ts or exec_timestamp)
-            cc_base_file_suffix = f"{cc_file_ts}_v{TOOL_VERSION}"
-            parent_market = post_parent_market or pre_parent_market or ""
-
-            market_for_files = market_label if market_label and market_label != "GLOBAL" else (parent_market or "")
-            file_versioned_suffix = f"{market_for_files}_{cc_base_file_suffix}" if market_for_files else cc_base_file_suffix
+        market_kwargs = dict(module_name=module_name, exec_timestamp=exec_timestamp, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, ca_freq_filters_csv=ca_freq_filters_csv, cc_filter_list=cc_filter_list,
+                             allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv,
+                             frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd_post=export_correction_cmd_post, fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows,
+                             fast_excel_autofit_max_width=fast_excel_autofit_max_width, split_workbooks=split_workbooks, output_root_dir=output_root_dir, parallel_audits=parallel_audits, output_formats=parse_output_formats(output_formats))
 
-            # NEW: Use different timestamps for PRE/POST audit artifacts, and place _Pre/_Post AFTER the timestamp
-            pre_file_ts = pre_parent_ts or cc_file_ts
-            post_file_ts = post_parent_ts or cc_file_ts
-            base_file_suffix_pre = f"{pre_file_ts}_Pre_v{TOOL_VERSION}"
-            base_file_suffix_post = f"{post_file_ts}_Post_v{TOOL_VERSION}"
-
-            pre_resolved = ensure_logs_available(pre_dir_fs)
-            post_resolved = ensure_logs_available(post_dir_fs)
-
-            pre_dir_process_fs = pre_resolved.process_dir
-            post_dir_process_fs = post_resolved.process_dir
+        sorted_pairs = sorted(market_pairs.items())
+        try:
+            workers = max(1, int(market_workers or 1))
+        except Exception:
+            workers = 1
+        workers = min(workers, len(sorted_pairs))
 
-            if pretty_path(pre_dir_process_fs) != pretty_path(pre_dir_fs):
-                print(f"{module_name} {market_tag} [INFO] PRE ZIP logs detected. Using extracted folder: '{pretty_path(pre_dir_process_fs)}'")
-            if pretty_path(post_dir_process_fs) != pretty_path(post_dir_fs):
-                print(f"{module_name} {market_tag} [INFO] POST ZIP logs detected. Using extracted folder: '{pretty_path(post_dir_process_fs)}'")
+        timings: List[Dict[str, object]] = []
 
+        # Sequential path (default): same behavior as before, all output goes through the global sys.stdout logger
+        if workers <= 1:
+            # Without parallel audits, one background output stage is shared by all markets: each market drains its own jobs
+            # before it is closed (so its log mirror gets every line) and the barrier below reports every artifact.
+            shared_stage = BackgroundOutputStage(module_name=module_name) if not parallel_audits and len(sorted_pairs) > 1 and background_output_enabled() else None
             try:
-                # Compute output_dir upfront so both audits and consistency outputs land together.
-                output_base_root = to_long_path(output_root_dir) if output_root_dir else post_dir_fs
-                if market_label != "GLOBAL":
-                    output_dir = os.path.join(output_base_root, f"ConsistencyChecks_{folder_versioned_suffix}_{market_label}")
-                else:
-                    output_dir = os.path.join(output_base_root, f"ConsistencyChecks_{folder_versioned_suffix}")
-
-                # Attach log mirror early so the whole execution is captured into the per-output folder mirror file
-                try:
-                    os.makedirs(output_dir, exist_ok=True)
-                except Exception:
-                    pass
-                attach_output_log_mirror(output_dir, copy_existing_log=True, start_marker=start_marker, end_marker=None)
-
-                # NEW: write FoldersCompared.txt with the exact PRE/POST folders used
-                try:
-                    txt_path = write_compared_folders_file(output_dir=output_dir, pre_dir=pre_dir_fs, post_dir=post_dir_fs)
-                    if txt_path:
-                        print(f"{module_name} {market_tag} [INFO] Compared folders file written: '{pretty_path(txt_path)}'")
-                except Exception as ex:
-                    print(f"{module_name} {market_tag} [WARNING] Failed to write FoldersCompared.txt: {ex}")
-
-                # Ensure PRE/POST audit files do not overwrite each other inside shared output_dir
-                audit_pre_suffix = f"{market_for_files}_{base_file_suffix_pre}" if market_for_files else base_file_suffix_pre
-                audit_post_suffix = f"{market_for_files}_{base_file_suffix_post}" if market_for_files else base_file_suffix_post
-
-                # --- Run Configuration Audit for PRE and POST ---
-                def _try_parse_audit_folder_ts(folder_name: str) -> Optional[datetime]:
-                    # Expected patterns (examples):
-                    #   ConfigurationAudit_20260127_1530_vX.Y.Z
-                    #   ConfigurationAudit_20260127_1530_vX.Y.Z_MARKET
-                    if not folder_name:
-                        return None
-                    m = re.search(r"_(\d{8}_\d{4})_v", folder_name)
-                    if not m:
-                        return None
-                    try:
-                        return datetime.strptime(m.group(1), "%Y%m%d_%H%M")
-                    except Exception:
-                        return None
-
-                def _find_latest_audit_folder(search_root: str) -> Optional[str]:
-                    # Search for previous ConfigurationAudit folders inside PRE/POST root folder and pick the newest one WITH a valid ConfigurationAudit_*.xlsx inside.
-                    try:
-                        if not search_root or not os.path.isdir(search_root):
-                            return None
-
-                        def _has_valid_configurationaudit_excel(audit_dir: str) -> bool:
-                            # A "valid" audit folder must contain at least one non-empty ConfigurationAudit_*.xlsx file.
-                            try:
-                                for fn in os.listdir(audit_dir):
-                                    if not str(fn).startswith("ConfigurationAudit_"):
-                                        continue
-                                    if not str(fn).lower().endswith(".xlsx"):
-                                        continue
-                                    fp = os.path.join(audit_dir, fn)
-                                    if os.path.isfile(fp) and os.path.getsize(fp) > 0:
-                                        return True
-                                return False
-                            except Exception:
-                                return False
-
-                        candidates: List[Tuple[datetime, float, str]] = []
-                        for name in os.listdir(search_root):
-                            full = os.path.join(search_root, name)
-                            if not os.path.isdir(full):
-                                continue
-                            if not str(name).startswith("ConfigurationAudit_"):
-                                continue
-                            ts = _try_parse_audit_folder_ts(str(name)) or datetime.min
-                            try:
-                                mt = os.path.getmtime(full)
-                            except Exception:
-                                mt = 0.0
-                            candidates.append((ts, mt, full))
-
-                        if not candidates:
-                            return None
-
-                        candidates.sort(key=lambda x: (x[0], x[1]), reverse=True)
-
-                        # Try newest first; if it doesn't contain a valid ConfigurationAudit_*.xlsx, fallback to previous by timestamp.
-                        for _ts, _mt, audit_dir in candidates:
-                            if _has_valid_configurationaudit_excel(audit_dir):
-                                return audit_dir
-
-                        return None
-                    except Exception:
-                        return None
-
-                def _pick_latest_file_by_ext(folder: str, ext: str, preferred_prefixes: Optional[List[str]] = None) -> Optional[str]:
-                    try:
-                        if not folder or not os.path.isdir(folder):
-                            return None
-                        preferred_prefixes = preferred_prefixes or []
-                        files = []
-                        for name in os.listdir(folder):
-                            p = os.path.join(folder, name)
-                            if not os.path.isfile(p):
-                                continue
-                            if not str(name).lower().endswith(ext.lower()):
-                                continue
-                            files.append(p)
-                        if not files:
-                            return None
-
-                        # Prefer files with expected prefixes (ConfigurationAudit_ / ProfilesAudit_) when available
-                        preferred = []
-                        if preferred_prefixes:
-                            for p in files:
-                                bn = os.path.basename(p)
-                                if any(bn.startswith(pref) for pref in preferred_prefixes):
-                                    preferred.append(p)
-                        target_list = preferred if preferred else files
-                        target_list.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0.0, reverse=True)
-                        return target_list[0]
-                    except Exception:
-                        return None
-
-                def _copy_audit_artifacts_to_current_output(src_audit_dir: str, dst_output_dir: str, dst_versioned_suffix: str, copy_cmd_folders: bool) -> Optional[str]:
-                    # Copy Excel + PPT from previous audit folder into current output_dir with current execution naming.
-                    try:
-                        if not src_audit_dir or not os.path.isdir(src_audit_dir):
-                            return None
-                        os.makedirs(dst_output_dir, exist_ok=True)
+                for market_label, (pre_dir, post_dir) in sorted_pairs:
+                    timings.append(run_consistency_check_market(market_label, pre_dir, post_dir, **market_kwargs, output_stage=shared_stage))
+            finally:
+                if shared_stage is not None:
+                    shared_stage.wait()
+            print_market_timing_table(timings, module_name)
+            return
 
-                        src_excel = _pick_latest_file_by_ext(src_audit_dir, ".xlsx", preferred_prefixes=["ConfigurationAudit_"])
-                        if not src_excel or not os.path.basename(src_excel).startswith("ConfigurationAudit_"):
-                            return None
+        # Parallel path: one worker process per market (markets are fully independent: separate folders and output dirs)
+        from concurrent.futures import ProcessPoolExecutor, as_completed
 
-                        dst_excel = os.path.join(dst_output_dir, f"ConfigurationAudit_{dst_versioned_suffix}.xlsx")
-                        shutil.copy2(to_long_path(src_excel), to_long_path(dst_excel))
-
-                        # Try to find matching PPT (same basename), otherwise pick newest PPT in folder
-                        paired_ppt = os.path.splitext(src_excel)[0] + ".pptx"
-                        src_ppt = paired_ppt if os.path.isfile(paired_ppt) else _pick_latest_file_by_ext(src_audit_dir, ".pptx", preferred_prefixes=["ConfigurationAudit_", "ProfilesAudit_"])
-                        if src_ppt and os.path.isfile(src_ppt):
-                            dst_ppt = os.path.join(dst_output_dir, f"ConfigurationAudit_{dst_versioned_suffix}.pptx")
-                            shutil.copy2(to_long_path(src_ppt), to_long_path(dst_ppt))
-
-                        # Copy command folders only for POST (if exist)
-                        if copy_cmd_folders:
-                            for cmd_folder in ["Correction_Cmd_CA", "Correction_Cmd"]:
-                                src_cmd = os.path.join(src_audit_dir, cmd_folder)
-                                dst_cmd = os.path.join(dst_output_dir, cmd_folder)
-                                if os.path.isdir(src_cmd):
-                                    if os.path.isdir(dst_cmd):
-                                        shutil.rmtree(to_long_path(dst_cmd), ignore_errors=True)
-                                    shutil.copytree(to_long_path(src_cmd), to_long_path(dst_cmd), dirs_exist_ok=True)
-
-                        return dst_excel
-                    except Exception:
-                        return None
+        parent_log_path = str(getattr(sys.stdout, "log_path", "") or "")
+        print(f"{module_name} [INFO] Running {len(sorted_pairs)} markets with {workers} parallel workers (one process per market)...")
 
-                print("-" * 80)
-                print(f"{module_name} {market_tag} [INFO] Running Configuration Audit for PRE folder before consistency checks...")
-                pre_existing_audit_dir = _find_latest_audit_folder(pre_dir_fs)
-                pre_audit_excel = None
-                if pre_existing_audit_dir:
-                    print(f"{module_name} {market_tag} [INFO] Reusing existing PRE Audit folder: '{pretty_path(pre_existing_audit_dir)}'")
-                    pre_audit_excel = _copy_audit_artifacts_to_current_output(pre_existing_audit_dir, output_dir, audit_pre_suffix, copy_cmd_folders=False)
-                    if not pre_audit_excel:
-                        print(f"{module_name} {market_tag} [WARNING] Existing PRE Audit folder is missing a valid ConfigurationAudit_*.xlsx. Running a new PRE Configuration Audit.")
-                if not pre_audit_excel:
-                    pre_audit_excel = run_configuration_audit(input_dir=pre_dir_process_fs, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb,
-                                                              allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv,
-                                                              allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, versioned_suffix=audit_pre_suffix, market_label=market_label, external_output_dir=output_dir,
-                                                              frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=False, fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width)
-
-                if pre_audit_excel:
-                    print(f"{module_name} {market_tag} [INFO] PRE Configuration Audit output: '{pretty_path(pre_audit_excel)}'")
-                else:
-                    print(f"{module_name} {market_tag} [INFO] PRE Configuration Audit did not generate an output Excel file.")
-
-                print("-" * 80)
-                print(f"{module_name} {market_tag} [INFO] Running Configuration Audit for POST folder before consistency checks...")
-                post_existing_audit_dir = _find_latest_audit_folder(post_dir_fs)
-                post_audit_excel = None
-                if post_existing_audit_dir:
-                    print(f"{module_name} {market_tag} [INFO] Reusing existing POST Audit folder: '{pretty_path(post_existing_audit_dir)}'")
-                    post_audit_excel = _copy_audit_artifacts_to_current_output(post_existing_audit_dir, output_dir, audit_post_suffix, copy_cmd_folders=True)
-                    if not post_audit_excel:
-                        print(f"{module_name} {market_tag} [WARNING] Existing POST Audit folder is missing a valid ConfigurationAudit_*.xlsx. Running a new POST Configuration Audit.")
-                if not post_audit_excel:
-                    post_audit_excel = run_configuration_audit(input_dir=post_dir_process_fs, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb,
-                                                               allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv,
-                                                               allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, versioned_suffix=audit_post_suffix, market_label=market_label, external_output_dir=output_dir,
-                                                               frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=export_correction_cmd_post, fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width)
-
-                if post_audit_excel:
-                    print(f"{module_name} {market_tag} [INFO] POST Configuration Audit output: '{pretty_path(post_audit_excel)}'")
-                else:
-                    print(f"{module_name} {market_tag} [INFO] POST Configuration Audit did not generate an output Excel file.")
-                print("-" * 80)
+        def _market_log_path(market_label: str) -> str:
+            # Per-market log next to the main log: <main_log_stem>_<market>.log
+            return derive_log_path(parent_log_path, market_label)
 
-                # --- Run ConsistencyChecks for this market ---
-                print(f"{module_name} {market_tag} [INFO] Running ConsistencyCheck for this market...")
-                try:
-                    app = ConsistencyChecks(n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, freq_filter_list=cc_filter_list)
-                except TypeError:
-                    app = ConsistencyChecks(n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for market_label, (pre_dir, post_dir) in sorted_pairs:
+                fut = pool.submit(_consistency_check_market_worker, market_label, pre_dir, post_dir, market_kwargs, _market_log_path(market_label))
+                futures[fut] = market_label
 
-                loaded = False
+            for fut in as_completed(futures):
+                market_label = futures[fut]
                 try:
-                    app.loadPrePost(input_dir_or_pre=pre_dir_process_fs, post_dir=post_dir_process_fs, module_name=module_name, market_tag=market_tag)
-                    loaded = True
-                except TypeError:
-                    loaded = False
-
-                if not loaded:
-                    print(f"{module_name} {market_tag} [ERROR] ConsistencyChecks class does not support dual folders (Pre/Post).")
-                    print(f"{module_name} {market_tag}         Please update ConsistencyChecks.loadPrePost(pre_dir, post_dir) to enable dual-input mode.")
-                    continue
-
-                results = None
-                if n77_ssb_pre and n77_ssb_post:
-                    pre_summary_df = None
-                    post_summary_df = None
-
-                    if pre_audit_excel and "CONFIG_AUDIT_SUMMARY_CACHE" in globals():
-                        try:
-                            pre_key = to_long_path(pre_audit_excel)
-                        except Exception:
-                            pre_key = pre_audit_excel
-                        _tmp = CONFIG_AUDIT_SUMMARY_CACHE.get(pre_key)
-                        pre_summary_df = _tmp if _tmp is not None else CONFIG_AUDIT_SUMMARY_CACHE.get(pre_audit_excel)
-
-                    if post_audit_excel and "CONFIG_AUDIT_SUMMARY_CACHE" in globals():
-                        try:
-                            post_key = to_long_path(post_audit_excel)
-                        except Exception:
-                            post_key = post_audit_excel
-                        _tmp = CONFIG_AUDIT_SUMMARY_CACHE.get(post_key)
-                        post_summary_df = _tmp if _tmp is not None else CONFIG_AUDIT_SUMMARY_CACHE.get(post_audit_excel)
-
-                    results = app.comparePrePost(freq_before=n77_ssb_pre, freq_after=n77_ssb_post, audit_pre_excel=pre_audit_excel, audit_post_excel=post_audit_excel, audit_pre_summary_audit_df=pre_summary_df, audit_post_summary_audit_df=post_summary_df, module_name=module_name, market_tag=market_tag)
-
-                else:
-                    print(f"{module_name} {market_tag} [INFO] Frequencies not provided. Comparison will be skipped; only tables will be saved.")
-
-                app.save_outputs_excel(output_dir=output_dir, results=results, versioned_suffix=file_versioned_suffix, module_name=module_name, market_tag=market_tag, fast_excel_export=fast_excel_export, fast_excel_autofit_rows=fast_excel_autofit_rows, fast_excel_autofit_max_width=fast_excel_autofit_max_width)
-
-                if results:
-                    print(f"{module_name} {market_tag} [INFO] Wrote CellRelation.xlsx and ConsistencyChecks_CellRelation.xlsx (with Summary and details).")
-                else:
-                    print(f"{module_name} {market_tag} [INFO] Wrote CellRelation.xlsx (all tables). No comparison Excel because frequencies were not provided.")
-
-                print(f"{module_name} {market_tag} [INFO] Outputs saved to: '{pretty_path(output_dir)}'")
-
-                # End marker for the log per batch in putput folder
-                end_marker = f"{module_name} {market_tag} [INFO] === END ConsistencyCheck for: '{pretty_path(output_dir)}' ==="
-                print(f"\n{end_marker}")
+                    record = fut.result()
+                    print(f"{module_name} [INFO] Market {market_label} finished with status {record.get('status', 'OK')} in {format_duration_hms(float(record.get('total', 0.0) or 0.0))}")
+                except Exception as ex:
+                    print(f"{module_name} [ERROR] Market {market_label} failed: {ex}")
+                    record = {"market": market_label, "status": "FAILED", "log_file": _market_log_path(market_label)}
+                timings.append(record)
 
-                # Stop mirroring after this execution to avoid leaking next batch execution lines into this mirror file
-                try:
-                    if hasattr(sys.stdout, "clear_mirror_files") and callable(getattr(sys.stdout, "clear_mirror_files")):
-                        sys.stdout.clear_mirror_files()
-                except Exception:
-                    pass
+        # Keep the main log complete: append each per-market log (in market order) once all workers are done
+        if hasattr(sys.stdout, "append_log_file") and callable(getattr(sys.stdout, "append_log_file")):
+            for record in sorted(timings, key=lambda x: str(x.get("market", ""))):
+                if record.get("log_file"):
+                    sys.stdout.append_log_file(str(record.get("log_file")), header=f"{module_name} [INFO] ----- Worker log for market {record.get('market', '')} -----")
 
-            finally:
-                pre_resolved.cleanup()
-                post_resolved.cleanup()
+        print_market_timing_table(timings, module_name)
 
     market_pairs = run_consistency_check_bulk() if is_bulk else run_consistency_check_manual()
     if not market_pairs:
@@ -1943,23 +2262,19 @@ def run_update_network_frequencies(input_dir: str, *_args) -> None:
     logs_ctx = ensure_logs_available(input_dir_fs)
     process_dir = logs_ctx.process_dir or input_dir_fs
 
-    from src.utils.utils_io import find_log_files, read_text_file
+    from src.utils.utils_io import find_log_files, iter_log_texts
     from src.utils.utils_parsing import find_all_subnetwork_headers, extract_mo_from_subnetwork_line, parse_table_slice_from_subnetwork
     from src.utils.utils_frequency import resolve_column_case_insensitive
 
     log_files = find_log_files(process_dir, recursive=True)
     if not log_files:
         print(f"{module_name} [WARNING] No log files found in: '{pretty_path(process_dir)}'")
+        logs_ctx.cleanup()
         return
 
     found_freqs = set()
 
-    for lf in log_files:
-        try:
-            lines, _enc = read_text_file(lf)
-        except Exception:
-            continue
-
+    for _lf, lines, _enc in iter_log_texts(log_files, skip_unreadable=True):
         if not lines:
             continue
 
@@ -1990,6 +2305,9 @@ def run_update_network_frequencies(input_dir: str, *_args) -> None:
                 if sv and sv.isdigit():
                     found_freqs.add(sv)
 
+    # Release the extracted logs (cache entry) as soon as they are parsed
+    logs_ctx.cleanup()
+
     if not found_freqs:
         print(f"{module_name} [WARNING] NRFrequency found, but no valid arfcnValueNRDl values were extracted.")
         return
@@ -2046,6 +2364,10 @@ def execute_module(
     fast_excel_export: bool = False,
     selected_module: str = "",
     output_root_dir: str = "",
+    cc_market_workers: int = 1,
+    cc_parallel_audits: bool = False,
+    cc_output_formats: str = "xlsx",
+    ca_split_workbooks: bool = False,
 ) -> None:
     """
     Launch selected module with the proper signature (and measure execution time).
@@ -2076,9 +2398,9 @@ def execute_module(
                 total = len(input_list)
                 for idx, one_dir in enumerate(input_list, start=1):
                     print(f"[Consistency Checks (Bulk Pre/Post Auto-Detection)] [INFO] ({idx}/{total}) Processing base folder: '{pretty_path(one_dir)}'")
-                    module_fn(input_dir=one_dir, input_pre_dir=input_pre_dir, input_post_dir=input_post_dir, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, ca_freq_filters_csv=ca_freq_filters_csv, cc_freq_filters_csv=cc_freq_filters_csv, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd_post=export_correction_cmd, fast_excel_export=fast_excel_export, mode=selected_module, output_root_dir=output_root_dir)
+                    module_fn(input_dir=one_dir, input_pre_dir=input_pre_dir, input_post_dir=input_post_dir, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, ca_freq_filters_csv=ca_freq_filters_csv, cc_freq_filters_csv=cc_freq_filters_csv, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd_post=export_correction_cmd, fast_excel_export=fast_excel_export, mode=selected_module, output_root_dir=output_root_dir, market_workers=cc_market_workers, parallel_audits=cc_parallel_audits, output_formats=cc_output_formats, split_workbooks=ca_split_workbooks)
             else:
-                module_fn(input_dir=input_dir, input_pre_dir=input_pre_dir, input_post_dir=input_post_dir, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, ca_freq_filters_csv=ca_freq_filters_csv, cc_freq_filters_csv=cc_freq_filters_csv, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd_post=export_correction_cmd, fast_excel_export=fast_excel_export, mode=selected_module, output_root_dir=output_root_dir)
+                module_fn(input_dir=input_dir, input_pre_dir=input_pre_dir, input_post_dir=input_post_dir, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, ca_freq_filters_csv=ca_freq_filters_csv, cc_freq_filters_csv=cc_freq_filters_csv, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd_post=export_correction_cmd, fast_excel_export=fast_excel_export, mode=selected_module, output_root_dir=output_root_dir, market_workers=cc_market_workers, parallel_audits=cc_parallel_audits, output_formats=cc_output_formats, split_workbooks=ca_split_workbooks)
 
 
         elif module_fn is run_configuration_audit:
@@ -2121,44 +2443,17 @@ def execute_module(
                         except Exception:
                             return None
 
-                    for e in os.scandir(folder_fs):
-                        if not e.is_dir():
-                            continue
-                        name = e.name or ""
-                        if not name.startswith("ConfigurationAudit_"):
-                            continue
-                        if version_tag not in name:
+                    # NEW: ConfigurationAudit_* folders and their Excel files come from the cached Step0 tree index
+                    for audit in get_step0_tree_index(folder_fs, max_depth=1).audit_folders(folder_fs):
+                        if version_tag not in audit.name or not audit.excel_files:
                             continue
-
-                        excel_files: List[str] = []
-                        try:
-                            for f in os.scandir(e.path):
-                                if not f.is_file():
-                                    continue
-                                fn = f.name or ""
-                                if not fn.startswith("ConfigurationAudit_") or not fn.lower().endswith(".xlsx"):
-                                    continue
-                                try:
-                                    if os.path.getsize(to_long_path(f.path)) <= 0:
-                                        continue
-                                except Exception:
-                                    continue
-                                excel_files.append(f.path)
-                        except Exception:
-                            excel_files = []
-
-                        if not excel_files:
-                            continue
-
-                        excel_files.sort()
-                        dt = _extract_dt_from_folder_name(name)
+                        dt = _extract_dt_from_folder_name(audit.name)
                         if dt is None:
                             try:
-                                dt = datetime.fromtimestamp(os.path.getmtime(to_long_path(e.path)))
+                                dt = datetime.fromtimestamp(audit.mtime)
                             except Exception:
                                 dt = datetime.fromtimestamp(0)
-
-                        candidates.append((dt, to_long_path(excel_files[-1])))
+                        candidates.append((dt, to_long_path(audit.excel_files[-1])))
 
                     if not candidates:
                         return None
@@ -2223,23 +2518,29 @@ def execute_module(
                 rerun_set = set(to_long_path(x) for x in (selected or []) if x)
 
             if not input_list:
-                module_fn(input_dir, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=export_correction_cmd, fast_excel_export=fast_excel_export, recursive_if_missing_logs=None, skip_existing_audit_prompt=False, external_output_dir=output_root_dir or None)
+                module_fn(input_dir, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=export_correction_cmd, fast_excel_export=fast_excel_export, split_workbooks=ca_split_workbooks, recursive_if_missing_logs=None, skip_existing_audit_prompt=False, external_output_dir=output_root_dir or None)
             else:
                 total = len(input_list)
-                for idx, one_dir in enumerate(input_list, start=1):
-                    print(f"")
-                    if total > 1:
-                        print(f"[Configuration Audit] [INFO] ({idx}/{total}) Processing input folder: '{pretty_path(one_dir)}'")
+                # NEW: folders share one background output stage (Excel close / ZIP / PPT of folder N overlap the parse of folder N+1)
+                batch_stage = BackgroundOutputStage(module_name="[Configuration Audit]") if total > 1 and background_output_enabled() else None
+                try:
+                    for idx, one_dir in enumerate(input_list, start=1):
+                        print(f"")
+                        if total > 1:
+                            print(f"[Configuration Audit] [INFO] ({idx}/{total}) Processing input folder: '{pretty_path(one_dir)}'")
 
-                    if one_dir in existing_by_folder and one_dir not in rerun_set:
-                        print(f"[Configuration Audit] [INFO] Reusing existing Audit (batch selection): '{pretty_path(existing_by_folder[one_dir])}'")
-                        continue
+                        if one_dir in existing_by_folder and one_dir not in rerun_set:
+                            print(f"[Configuration Audit] [INFO] Reusing existing Audit (batch selection): '{pretty_path(existing_by_folder[one_dir])}'")
+                            continue
 
-                    recursive_if_missing_logs = None
-                    if one_dir in missing_dirs:
-                        recursive_if_missing_logs = bool(recursive_answer)
+                        recursive_if_missing_logs = None
+                        if one_dir in missing_dirs:
+                            recursive_if_missing_logs = bool(recursive_answer)
 
-                    module_fn(one_dir, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=export_correction_cmd, fast_excel_export=fast_excel_export, recursive_if_missing_logs=recursive_if_missing_logs, skip_existing_audit_prompt=(total > 1), external_output_dir=output_root_dir or None)
+                        module_fn(one_dir, ca_freq_filters_csv=ca_freq_filters_csv, n77_ssb_pre=n77_ssb_pre, n77_ssb_post=n77_ssb_post, n77b_ssb=n77b_ssb, allowed_n77_ssb_pre_csv=allowed_n77_ssb_pre_csv, allowed_n77_arfcn_pre_csv=allowed_n77_arfcn_pre_csv, allowed_n77_ssb_post_csv=allowed_n77_ssb_post_csv, allowed_n77_arfcn_post_csv=allowed_n77_arfcn_post_csv, frequency_audit=frequency_audit, profiles_audit=profiles_audit, export_correction_cmd=export_correction_cmd, fast_excel_export=fast_excel_export, split_workbooks=ca_split_workbooks, recursive_if_missing_logs=recursive_if_missing_logs, skip_existing_audit_prompt=(total > 1), external_output_dir=output_root_dir or None, output_stage=batch_stage)
+                finally:
+                    if batch_stage is not None:
+                        batch_stage.wait()
 
 
         elif module_fn is run_final_cleanup:
@@ -2326,6 +2627,26 @@ def main():
 
     # Parse CLI
     args = parse_args()
+    # Correction commands ZIP options, sheet spill options, the background output switch, the artifact cache cap and PPT options are published as env vars so worker processes inherit them
+    configure_zip_export(compression=getattr(args, "zip_compression", None), level=getattr(args, "zip_level", None))
+    configure_sheet_spill(policy=getattr(args, "ca_spill_policy", None), max_rows=getattr(args, "ca_spill_rows", None))
+    configure_background_output(getattr(args, "background_output", None))
+    configure_artifact_registry(getattr(args, "artifact_cache_mb", None))
+    configure_ppt_summary(getattr(args, "ppt_max_nodes_per_metric", None))
+    configure_zip_native(getattr(args, "zip_native", None), getattr(args, "zip_native_workers", None))
+    configure_zip_extraction(getattr(args, "zip_extract_workers", None), getattr(args, "zip_extract_min_mb", None))
+    configure_zip_cache(getattr(args, "zip_cache_quota_mb", None))
+    configure_parse_cache(getattr(args, "parse_cache_dir", None), getattr(args, "parse_cache_quota_mb", None))
+
+    # NEW: ZIP extraction cache maintenance (--zip-cache list|purge) runs standalone
+    if getattr(args, "zip_cache", None):
+        run_zip_cache_command(args.zip_cache)
+        return
+
+    # NEW: parse cache warm job (--parse-cache-warm --input <folder|zip>) runs standalone (used by the web interface after uploads)
+    if getattr(args, "parse_cache_warm", False):
+        sys.exit(run_parse_cache_warm(getattr(args, "input", None) or ""))
+
     parser = getattr(args, "_parser")
     no_args = (len(sys.argv) == 1)
 
@@ -2658,6 +2979,7 @@ def main():
             fast_excel_export=cli_fast_excel_export,
             selected_module=args.module,
             output_root_dir=(args.output or ""),
+            ca_split_workbooks=args.ca_split_workbooks,
         )
         return
 
@@ -2689,6 +3011,10 @@ def main():
             fast_excel_export=cli_fast_excel_export,
             selected_module=args.module,
             output_root_dir=(args.output or ""),
+            cc_market_workers=args.cc_market_workers,
+            cc_parallel_audits=args.cc_parallel_audits,
+            cc_output_formats=args.cc_output_formats,
+            ca_split_workbooks=args.ca_split_workbooks,
         )
         return
 
@@ -2717,6 +3043,10 @@ def main():
             fast_excel_export=cli_fast_excel_export,
             selected_module=args.module,
             output_root_dir=(args.output or ""),
+            cc_market_workers=args.cc_market_workers,
+            cc_parallel_audits=args.cc_parallel_audits,
+            cc_output_formats=args.cc_output_formats,
+            ca_split_workbooks=args.ca_split_workbooks,
         )
         return
 
@@ -2747,4 +3077,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Needed by the market scheduler worker processes in frozen (PyInstaller/Nuitka) Windows builds
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
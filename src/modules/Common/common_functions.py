@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import os
-import re
 from typing import Optional
 
 import pandas as pd
 
 from src.utils.utils_io import to_long_path
+from src.utils.utils_artifacts import ARTIFACTS, read_excel_sheet_cached
+from src.modules.Common.summary_audit_model import SummaryAuditModel, summary_audit_model_for
 
 # ----------------------------- LOAD NODES FROM SUMMARY EXCEL ----------------------------- #
 def load_nodes_names_and_id_from_summary_audit(
@@ -16,7 +17,7 @@ def load_nodes_names_and_id_from_summary_audit(
     module_name: Optional[str] = "",
 ) -> tuple[set[str], set[str]]:
     """
-    Read a ConfigurationAudit SummaryAudit dataset (from a DataFrame, list of rows, or an Excel path)
+    Read a ConfigurationAudit SummaryAudit dataset (from a SummaryAuditModel, a DataFrame, list of rows, or an Excel path)
     and extract:
       - nodes_id: numeric identifiers (leading digits of the node name)
       - nodes_names: full node names as they appear in ExtraInfo.
@@ -25,7 +26,8 @@ def load_nodes_names_and_id_from_summary_audit(
       - Category == 'NRCellDU'
       - Metric contains: 'NR nodes with N77 SSB in <stage>-Retune allowed list'
 
-    Then it parses the 'ExtraInfo' field assuming it contains a comma-separated list of node names.
+    Then it takes the node list of those rows from the shared SummaryAuditModel (ExtraInfo is split only once per
+    SummaryAudit frame, however many times this function is called on it).
 
     For each node name token, it:
       - stores the full token in nodes_names
@@ -35,6 +37,7 @@ def load_nodes_names_and_id_from_summary_audit(
 
     Parameters:
       audit_excel:
+        - SummaryAuditModel: already built model
         - pd.DataFrame: already loaded SummaryAudit-like table
         - list: list of rows/dicts convertible to DataFrame (e.g. generated via add_row)
         - str: path to an Excel file containing a 'SummaryAudit' sheet
@@ -51,19 +54,24 @@ def load_nodes_names_and_id_from_summary_audit(
         return nodes_id, nodes_names
 
     df: Optional[pd.DataFrame] = None
+    model: Optional[SummaryAuditModel] = None
+
+    # --- Case 0: audit_excel is already a SummaryAuditModel ---
+    if isinstance(audit_excel, SummaryAuditModel):
+        model = audit_excel
 
     # --- Case 1: audit_excel is already a DataFrame ---
-    if isinstance(audit_excel, pd.DataFrame):
-        df = audit_excel.copy()
+    elif isinstance(audit_excel, pd.DataFrame):
+        df = audit_excel
 
     # --- Case 2: audit_excel is a list of rows (generated via add_row) ---
     elif isinstance(audit_excel, list):
         if not audit_excel:
             return nodes_id, nodes_names
         try:
-            df = pd.DataFrame(audit_excel)
+            model = SummaryAuditModel.from_records(audit_excel)
         except Exception as e:
-            print(f"{module_name} [WARNING] Could not convert list to DataFrame: {e}. Skipping node exclusion based on SummaryAudit.")
+            print(f"{module_name} [WARNING] Could not convert list to SummaryAudit model: {e}. Skipping node exclusion based on SummaryAudit.")
             return nodes_id, nodes_names
 
     # --- Case 3: audit_excel is a path or string ---
@@ -73,51 +81,35 @@ def load_nodes_names_and_id_from_summary_audit(
         except Exception:
             audit_path = audit_excel
 
-        if not os.path.isfile(audit_path):
+        if not os.path.isfile(audit_path) and not ARTIFACTS.has(audit_path):
             print(f"{module_name} [WARNING] POST audit Excel not found: '{audit_excel}'. Skipping node exclusion based on SummaryAudit.")
             return nodes_id, nodes_names
 
         try:
-            df = pd.read_excel(audit_path, sheet_name="SummaryAudit")
+            df = read_excel_sheet_cached(audit_path, "SummaryAudit")
         except Exception as e:
             print(f"{module_name} [WARNING] Could not read 'SummaryAudit' sheet from POST audit Excel: {e}. Skipping node exclusion based on SummaryAudit.")
             return nodes_id, nodes_names
 
     # --- Unsupported type ---
     else:
-        print(f"{module_name} [WARNING] Unsupported type for audit_excel: {type(audit_excel)}. Expected DataFrame, list, or path string.")
+        print(f"{module_name} [WARNING] Unsupported type for audit_excel: {type(audit_excel)}. Expected SummaryAuditModel, DataFrame, list, or path string.")
         return nodes_id, nodes_names
 
-    required_cols = {"Category", "SubCategory", "Metric", "ExtraInfo"}
-    if not required_cols.issubset(df.columns):
-        print(f"{module_name} [WARNING] 'SummaryAudit' data does not contain required columns {required_cols}. Skipping node exclusion based on SummaryAudit.")
-        return nodes_id, nodes_names
+    if model is None:
+        required_cols = {"Category", "SubCategory", "Metric", "ExtraInfo"}
+        if not required_cols.issubset(df.columns):
+            print(f"{module_name} [WARNING] 'SummaryAudit' data does not contain required columns {required_cols}. Skipping node exclusion based on SummaryAudit.")
+            return nodes_id, nodes_names
+        # Memoised per frame: ExtraInfo is only split the first time
+        model = summary_audit_model_for(df)
 
-    sub = df.copy()
-    sub["Category"] = sub["Category"].astype(str).str.strip()
-    sub["Metric"] = sub["Metric"].astype(str)
-    sub["ExtraInfo"] = sub["ExtraInfo"].astype(str)
-
-    mask = (sub["Category"] == "NRCellDU") & sub["Metric"].str.contains(
-        f"NR nodes with N77 SSB in {stage}-Retune allowed list",
-        case=False,
-        na=False,
-    )
-    rows = sub.loc[mask]
-    if rows.empty:
+    rows = model.find(category="NRCellDU", metric_contains=f"NR nodes with N77 SSB in {stage}-Retune allowed list")
+    if not rows:
         return nodes_id, nodes_names
 
-    pattern_id = re.compile(r"^\s*(\d+)")
-
-    for extra in rows["ExtraInfo"]:
-        if not extra:
-            continue
-        parts = [p.strip() for p in str(extra).split(",") if p.strip()]
-        for token in parts:
-            nodes_names.add(token.strip())
-            m = pattern_id.match(token)
-            if m:
-                nodes_id.add(m.group(1))
+    nodes_names = model.node_set(rows)
+    nodes_id = SummaryAuditModel.numeric_node_ids(nodes_names)
 
     if print_lists:
         print(f"{module_name} [INFO] Nodes with {stage}-SSB (complete node names): {sorted(nodes_names)}")
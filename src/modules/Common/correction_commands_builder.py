@@ -5,8 +5,7 @@ from typing import Optional
 
 import pandas as pd
 
-from src.utils.utils_dataframe import build_row_lookup, pick_non_empty_value, ensure_column_after
-from src.utils.utils_parsing import extract_gnbcucp_segment, resolve_nrcell_ref
+from src.utils.utils_dataframe import ensure_column_after, lookup_relation_fields, pick_non_empty_series, MATCHED_COL
 
 """
 Helpers to build Correction_Cmd columns and export them to text files.
@@ -43,6 +42,77 @@ def _wrap_with_relations_wrappers(body: str, include_gs: bool = True) -> str:
     header += "lt all\nalt\n"
     return f"{header}{text}\nalt"
 
+def _wrap_with_relations_wrappers_series(body: pd.Series, include_gs: bool = True) -> pd.Series:
+    # Vectorised _wrap_with_relations_wrappers() over a Series of command bodies.
+    text = body.astype(str).str.replace("\r\n", "\n", regex=False).str.replace("\r", "\n", regex=False).str.strip()
+    header = "confb+\n"
+    if include_gs:
+        header += "gs+\n"
+    header += "lt all\nalt\n"
+    return (header + text + "\nalt").where(text.ne(""), "").astype(object)
+
+
+def _join_lines_series(parts, index) -> pd.Series:
+    # Vectorised "\n".join(p for p in parts if p) for each row. Parts can be Series (aligned to index) or constant strings.
+    out = pd.Series("", index=index, dtype=object)
+    for part in parts:
+        if isinstance(part, str):
+            if not part:
+                continue
+            part = pd.Series(part, index=index, dtype=object)
+        has_part = part.ne("")
+        joined = (out + "\n" + part).where(out.ne(""), part)
+        out = joined.where(has_part, out)
+    return out
+
+
+def _optional_line(prefix: str, values: pd.Series, suffix: str = "") -> pd.Series:
+    # Build f"{prefix}{value}{suffix}" only where value is not empty.
+    return (prefix + values + suffix).where(values.ne(""), "")
+
+
+def _slice_from_token(values: pd.Series, token: str) -> pd.Series:
+    # Vectorised s[s.find(token):] where token is present; '' otherwise.
+    has_token = values.str.contains(token, regex=False)
+    sliced = values.str.replace(rf"^.*?(?={re.escape(token)})", "", n=1, regex=True, flags=re.DOTALL)
+    return sliced.where(has_token, "")
+
+
+def _gnbcucp_segment_series(df: pd.DataFrame, relations_df: Optional[pd.DataFrame], rel_values: Optional[pd.DataFrame] = None) -> pd.Series:
+    # GNBCUCPFunction segment of each row's nRCellRef (relation value first, then the row's own value); '' if absent.
+    if rel_values is None:
+        rel_values = lookup_relation_fields(df, relations_df, NR_KEY_COLS, ["nRCellRef"], extra_strip_cols=["nRCellRef"])
+    nrcell_ref = pick_non_empty_series(rel_values["nRCellRef"], df, "nRCellRef")
+    return _slice_from_token(nrcell_ref, "GNBCUCPFunction=").str.strip()
+
+
+def _combine_disc_commands(del_cmds: pd.Series, create_cmds: pd.Series) -> list:
+    # Combine delete + create blocks for *_disc rows (create block without its own file wrappers).
+    def _build_correction_command(del_cmd: str, create_cmd: str) -> str:
+        """
+        Build combined correction command for a *_disc row.
+        Safely returns empty string if both parts are empty.
+        """
+        del_cmd = (del_cmd or "").strip()
+        create_cmd = _strip_file_wrappers_block(create_cmd or "")
+
+        if del_cmd and create_cmd:
+            return _wrap_with_relations_wrappers(f"{del_cmd}\n{create_cmd}", include_gs=True)
+        if del_cmd:
+            return _wrap_with_relations_wrappers(del_cmd, include_gs=True)
+        if create_cmd:
+            return _wrap_with_relations_wrappers(create_cmd, include_gs=True)
+        return ""
+
+    return [_build_correction_command(d, c) for d, c in zip(del_cmds, create_cmds)]
+
+
+GU_KEY_COLS = ["NodeId", "EUtranCellFDDId", "GUtranCellRelationId"]
+NR_KEY_COLS = ["NodeId", "NRCellCUId", "NRCellRelationId"]
+
+# NOTE: Builders below are vectorised: relation fields are resolved with a single left merge against relations_df
+# (lookup_relation_fields) and commands are assembled column-wise (no per-row df.apply), so large tables stay fast.
+
 # ----------------------------------------------------------------------
 #  GU  -  NEW
 # ----------------------------------------------------------------------
@@ -93,41 +163,21 @@ def build_correction_command_gu_new_relations(df: pd.DataFrame, relations_df: Op
         df["EUtranCellFDDId"] = df["EUtranCellFDDId"].astype(str).str.strip()
         df["GUtranCellRelationId"] = df["GUtranCellRelationId"].astype(str).str.strip()
 
-        relations_lookup = build_row_lookup(relations_df, ["EUtranCellFDDId", "GUtranCellRelationId"])
-
-        def _get_rel_row(row: pd.Series) -> Optional[pd.Series]:
-            key = (
-                str(row.get("EUtranCellFDDId", "")).strip(),
-                str(row.get("GUtranCellRelationId", "")).strip(),
-            )
-            return relations_lookup.get(key)
-
-        def _from_rel(row: pd.Series, field: str) -> str:
-            rel_row = _get_rel_row(row)
-            return pick_non_empty_value(rel_row, row, field)
+        rel = lookup_relation_fields(df, relations_df, ["EUtranCellFDDId", "GUtranCellRelationId"], ["GUtranFreqRelationId", "createdBy", "timeOfCreation"])
+        matched = rel[MATCHED_COL]
 
         # Make sure GUtranFreqRelationId, createdBy and timeOfCreation are taken from relations_df
-        df["GUtranFreqRelationId"] = df.apply(lambda r: _from_rel(r, "GUtranFreqRelationId"), axis=1)
-        df["createdBy"] = df.apply(lambda r: _from_rel(r, "createdBy"), axis=1)
-        df["timeOfCreation"] = df.apply(lambda r: _from_rel(r, "timeOfCreation"), axis=1)
+        for field in ("GUtranFreqRelationId", "createdBy", "timeOfCreation"):
+            df[field] = pick_non_empty_series(rel[field], df, field)
 
-        def _build_correction_command(row: pd.Series, rel_row: Optional[pd.Series]) -> str:
-            """
-            Build correction command for GU_new row.
-            Safely returns empty string if mandatory parameters are missing.
-            """
-            src = rel_row if rel_row is not None else row
+        # Command source is the relation row when found (raw value, no fallback), else the df row
+        eu_cell = df["EUtranCellFDDId"]
+        cell_rel = df["GUtranCellRelationId"]
+        freq_rel = rel["GUtranFreqRelationId"].map(lambda v: str(v or "").strip()).where(matched, df["GUtranFreqRelationId"])
 
-            eu_cell = str(src.get("EUtranCellFDDId") or "").strip()
-            freq_rel = str(src.get("GUtranFreqRelationId") or "").strip()
-            cell_rel = str(src.get("GUtranCellRelationId") or "").strip()
-
-            if not (eu_cell and freq_rel and cell_rel):
-                return ""
-
-            return f"del EUtranCellFDD={eu_cell},GUtranFreqRelation={freq_rel},GUtranCellRelation={cell_rel}"
-
-        df["Correction_Cmd"] = df.apply(lambda r: _build_correction_command(r, _get_rel_row(r)), axis=1)
+        valid = eu_cell.ne("") & freq_rel.ne("") & cell_rel.ne("")
+        cmd = "del EUtranCellFDD=" + eu_cell + ",GUtranFreqRelation=" + freq_rel + ",GUtranCellRelation=" + cell_rel
+        df["Correction_Cmd"] = cmd.where(valid, "")
 
     # Final column set: keep only relevant columns and force Correction_Cmd to be last
     desired_cols = [
@@ -159,7 +209,7 @@ def build_correction_command_gu_missing_relations(
     Add 'Correction_Cmd' column for GU_missing sheet, building a multiline correction script.
 
     All placeholders are taken from the relation table whenever possible (GU_relations),
-    using (EUtranCellFDDId, GUtranCellRelationId) as lookup key.
+    using (NodeId, EUtranCellFDDId, GUtranCellRelationId) as lookup key.
     """
     if df is None or df.empty:
         df = df.copy() if df is not None else pd.DataFrame()
@@ -202,87 +252,61 @@ def build_correction_command_gu_missing_relations(
     df["EUtranCellFDDId"] = df["EUtranCellFDDId"].astype(str).str.strip()
     df["GUtranCellRelationId"] = df["GUtranCellRelationId"].astype(str).str.strip()
 
-    relations_lookup = build_row_lookup(relations_df, ["NodeId", "EUtranCellFDDId", "GUtranCellRelationId"])
-
-    def _get_rel_row(row: pd.Series) -> Optional[pd.Series]:
-        key = (
-            str(row.get("NodeId", "")).strip(),
-            str(row.get("EUtranCellFDDId", "")).strip(),
-            str(row.get("GUtranCellRelationId", "")).strip(),
-        )
-        return relations_lookup.get(key)
-
-    def from_rel(row: pd.Series, field: str) -> str:
-        rel_row = _get_rel_row(row)
-        return pick_non_empty_value(rel_row, row, field)
+    fields = ["ENodeBFunctionId", "EUtranCellFDDId", "GUtranFreqRelationId", "GUtranCellRelationId", "neighborCellRef", "isEndcAllowed", "isHoAllowed", "isRemoveAllowed", "isVoiceHoAllowed", "userLabel", "coverageIndicator"]
+    rel = lookup_relation_fields(df, relations_df, GU_KEY_COLS, fields)
 
     # Make sure GUtranFreqRelationId is taken from relations_df
-    df["GUtranFreqRelationId"] = df.apply(lambda r: from_rel(r, "GUtranFreqRelationId"), axis=1)
-
-    def _build_correction_command(row: pd.Series, rel_row: Optional[pd.Series]) -> str:
-        """
-        Build correction command for GU_missing row.
-        Safely returns empty string if mandatory parameters are missing.
-        """
-        enb_func = pick_non_empty_value(rel_row, row, "ENodeBFunctionId")
-        eu_cell = pick_non_empty_value(rel_row, row, "EUtranCellFDDId")
-        freq_rel = pick_non_empty_value(rel_row, row, "GUtranFreqRelationId")
-        cell_rel = pick_non_empty_value(rel_row, row, "GUtranCellRelationId")
-        neighbor_ref = pick_non_empty_value(rel_row, row, "neighborCellRef")
-        is_endc = pick_non_empty_value(rel_row, row, "isEndcAllowed")
-        is_ho = pick_non_empty_value(rel_row, row, "isHoAllowed")
-        is_remove = pick_non_empty_value(rel_row, row, "isRemoveAllowed")
-        is_voice_ho = pick_non_empty_value(rel_row, row, "isVoiceHoAllowed")
-        user_label = pick_non_empty_value(rel_row, row, "userLabel")
-        coverage = pick_non_empty_value(rel_row, row, "coverageIndicator")
-
-        retune_needed = False
-
-        # Overwrite GUtranFreqRelationId to a hardcoded value (new SSB) only when old SSB is found
-        if n77_ssb_pre and isinstance(freq_rel, str) and freq_rel.startswith(str(n77_ssb_pre)):
-            retune_needed = True
-            freq_rel = f"{n77_ssb_post}-30-20-0-1" if n77_ssb_post else freq_rel
-
-        if not user_label:
-            user_label = "SSBretune"
-
-        if not (enb_func and eu_cell and freq_rel and cell_rel):
-            return ""
-
-        # NEW: keep only GUtraNetwork / ExternalGNodeBFunction / ExternalGUtranCell part
-        clean_neighbor_ref = neighbor_ref
-        if isinstance(neighbor_ref, str) and "GUtraNetwork=" in neighbor_ref:
-            pos = neighbor_ref.find("GUtraNetwork=")
-            clean_neighbor_ref = neighbor_ref[pos:]
-
-        # NEW: Add ExternalGUtranCell gUtranSyncSignalFrequencyRef line when retuning from Old SSB to SSB-Post
-        set_external_cmd = ""
-        if retune_needed and n77_ssb_post and isinstance(clean_neighbor_ref, str) and clean_neighbor_ref.startswith("GUtraNetwork=") and "," in clean_neighbor_ref:
-            external_part = clean_neighbor_ref.split(",", 1)[1].strip()
-            if external_part:
-                set_external_cmd = f"set {external_part} gUtranSyncSignalFrequencyRef GUtraNetwork=1,GUtranSyncSignalFrequency={n77_ssb_post}-30"
-
-        parts = [
-            set_external_cmd,
-            f"crn ENodeBFunction={enb_func},EUtranCellFDD={eu_cell},GUtranFreqRelation={freq_rel},GUtranCellRelation={cell_rel}",
-            f"neighborCellRef {clean_neighbor_ref}" if clean_neighbor_ref else "",
-            f"isEndcAllowed {is_endc}" if is_endc else "",
-            f"isHoAllowed {is_ho}" if is_ho else "",
-            f"isRemoveAllowed {is_remove}" if is_remove else "",
-            f"isVoiceHoAllowed {is_voice_ho}" if is_voice_ho else "",
-            f"userlabel {user_label}",
-            "end",
-            (
-                f"set EUtranCellFDD={eu_cell},GUtranFreqRelation={freq_rel},GUtranCellRelation={cell_rel} coverageIndicator {coverage}"
-                if coverage
-                else f"set EUtranCellFDD={eu_cell},GUtranFreqRelation={freq_rel},GUtranCellRelation={cell_rel}"
-            ),
-        ]
-        # keep non-empty
-        lines = [p for p in parts if p]
-        return _wrap_with_relations_wrappers("\n".join(lines), include_gs=True)
-
-    df["Correction_Cmd"] = df.apply(lambda r: _build_correction_command(r, _get_rel_row(r)), axis=1)
+    df["GUtranFreqRelationId"] = pick_non_empty_series(rel["GUtranFreqRelationId"], df, "GUtranFreqRelationId")
+
+    enb_func = pick_non_empty_series(rel["ENodeBFunctionId"], df, "ENodeBFunctionId")
+    eu_cell = pick_non_empty_series(rel["EUtranCellFDDId"], df, "EUtranCellFDDId")
+    freq_rel = pick_non_empty_series(rel["GUtranFreqRelationId"], df, "GUtranFreqRelationId")
+    cell_rel = pick_non_empty_series(rel["GUtranCellRelationId"], df, "GUtranCellRelationId")
+    neighbor_ref = pick_non_empty_series(rel["neighborCellRef"], df, "neighborCellRef")
+    is_endc = pick_non_empty_series(rel["isEndcAllowed"], df, "isEndcAllowed")
+    is_ho = pick_non_empty_series(rel["isHoAllowed"], df, "isHoAllowed")
+    is_remove = pick_non_empty_series(rel["isRemoveAllowed"], df, "isRemoveAllowed")
+    is_voice_ho = pick_non_empty_series(rel["isVoiceHoAllowed"], df, "isVoiceHoAllowed")
+    user_label = pick_non_empty_series(rel["userLabel"], df, "userLabel")
+    coverage = pick_non_empty_series(rel["coverageIndicator"], df, "coverageIndicator")
+
+    # Overwrite GUtranFreqRelationId to a hardcoded value (new SSB) only when old SSB is found
+    if n77_ssb_pre:
+        retune_needed = freq_rel.str.startswith(str(n77_ssb_pre))
+    else:
+        retune_needed = pd.Series(False, index=df.index)
+    if n77_ssb_post:
+        freq_rel = freq_rel.mask(retune_needed, f"{n77_ssb_post}-30-20-0-1")
+
+    user_label = user_label.mask(user_label.eq(""), "SSBretune")
+
+    valid = enb_func.ne("") & eu_cell.ne("") & freq_rel.ne("") & cell_rel.ne("")
+
+    # NEW: keep only GUtraNetwork / ExternalGNodeBFunction / ExternalGUtranCell part
+    clean_neighbor_ref = _slice_from_token(neighbor_ref, "GUtraNetwork=").where(neighbor_ref.str.contains("GUtraNetwork=", regex=False), neighbor_ref)
+
+    # NEW: Add ExternalGUtranCell gUtranSyncSignalFrequencyRef line when retuning from Old SSB to SSB-Post
+    set_external_cmd = pd.Series("", index=df.index, dtype=object)
+    if n77_ssb_post:
+        external_part = clean_neighbor_ref.str.split(",", n=1, regex=False).str[1].fillna("").astype(str).str.strip()
+        use_external = retune_needed & clean_neighbor_ref.str.startswith("GUtraNetwork=") & clean_neighbor_ref.str.contains(",", regex=False) & external_part.ne("")
+        set_external_cmd = ("set " + external_part + f" gUtranSyncSignalFrequencyRef GUtraNetwork=1,GUtranSyncSignalFrequency={n77_ssb_post}-30").where(use_external, "")
+
+    rel_mo = "EUtranCellFDD=" + eu_cell + ",GUtranFreqRelation=" + freq_rel + ",GUtranCellRelation=" + cell_rel
+    parts = [
+        set_external_cmd,
+        "crn ENodeBFunction=" + enb_func + "," + rel_mo,
+        _optional_line("neighborCellRef ", clean_neighbor_ref),
+        _optional_line("isEndcAllowed ", is_endc),
+        _optional_line("isHoAllowed ", is_ho),
+        _optional_line("isRemoveAllowed ", is_remove),
+        _optional_line("isVoiceHoAllowed ", is_voice_ho),
+        "userlabel " + user_label,
+        "end",
+        "set " + rel_mo + _optional_line(" coverageIndicator ", coverage),
+    ]
+    commands = _wrap_with_relations_wrappers_series(_join_lines_series(parts, df.index), include_gs=True)
+    df["Correction_Cmd"] = commands.where(valid, "")
 
     # Final column set: keep only relevant columns and force Correction_Cmd to be last
     desired_cols = [
@@ -320,32 +344,14 @@ def build_correction_command_gu_discrepancies(
     if "NodeId" not in work.columns:
         work["NodeId"] = ""
 
-    # Reuse existing builders (they already include their own internal _build_correction_command)
+    # Reuse existing builders (both are vectorised)
     del_df = build_correction_command_gu_new_relations(disc_df.copy(), relations_df)
     create_df = build_correction_command_gu_missing_relations(disc_df.copy(), relations_df, n77_ssb_pre, n77_ssb_post)
 
     del_cmds = del_df.get("Correction_Cmd", pd.Series("", index=disc_df.index)).astype(str)
     create_cmds = create_df.get("Correction_Cmd", pd.Series("", index=disc_df.index)).astype(str)
 
-    def _build_correction_command(del_cmd: str, create_cmd: str) -> str:
-        """
-        Build combined correction command for GU_disc row.
-        Safely returns empty string if both parts are empty.
-        """
-        del_cmd = (del_cmd or "").strip()
-        create_cmd = _strip_file_wrappers_block(create_cmd or "")
-
-        if del_cmd and create_cmd:
-            return _wrap_with_relations_wrappers(f"{del_cmd}\n{create_cmd}", include_gs=True)
-        if del_cmd:
-            return _wrap_with_relations_wrappers(del_cmd, include_gs=True)
-        if create_cmd:
-            return _wrap_with_relations_wrappers(create_cmd, include_gs=True)
-        return ""
-
-    work["Correction_Cmd"] = [
-        _build_correction_command(d, c) for d, c in zip(del_cmds, create_cmds)
-    ]
+    work["Correction_Cmd"] = _combine_disc_commands(del_cmds, create_cmds)
 
     # For _disc we keep all original discrepancy columns + Correction_Cmd
     return work
@@ -407,45 +413,19 @@ def build_correction_command_nr_new_relations(df: pd.DataFrame, relations_df: Op
         df["NRCellCUId"] = df["NRCellCUId"].astype(str).str.strip()
         df["NRCellRelationId"] = df["NRCellRelationId"].astype(str).str.strip()
 
-        # Lookup that also carries nRCellRef to be able to extract GNBCUCPFunction segment
-        relations_lookup = build_row_lookup(
-            relations_df,
-            ["NodeId", "NRCellCUId", "NRCellRelationId"],
-            extra_strip_cols=["nRCellRef"],
-        )
-
-        def _get_rel_row(row: pd.Series) -> Optional[pd.Series]:
-            key = (
-                str(row.get("NodeId", "")).strip(),
-                str(row.get("NRCellCUId", "")).strip(),
-                str(row.get("NRCellRelationId", "")).strip(),
-            )
-            return relations_lookup.get(key)
-
         # -----------------------------
         # Build delete commands
         # -----------------------------
-        def _build_correction_command(row: pd.Series, rel_row: Optional[pd.Series]) -> str:
-            """
-            Build correction command for NR_new row.
-            Safely returns empty string if mandatory parameters are missing.
-            """
-            src = rel_row if rel_row is not None else row
-            nr_cell_cu = str(src.get("NRCellCUId") or "").strip()
-            nr_cell_rel = str(src.get("NRCellRelationId") or "").strip()
-            if not (nr_cell_cu and nr_cell_rel):
-                return ""
-            return f"del NRCellCU={nr_cell_cu},NRCellRelation={nr_cell_rel}"
-
-        df["Correction_Cmd"] = df.apply(lambda r: _build_correction_command(r, _get_rel_row(r)), axis=1)
+        # Both id fields are lookup keys, so relation row and df row always carry the same (stripped) values
+        nr_cell_cu = df["NRCellCUId"]
+        nr_cell_rel = df["NRCellRelationId"]
+        cmd = "del NRCellCU=" + nr_cell_cu + ",NRCellRelation=" + nr_cell_rel
+        df["Correction_Cmd"] = cmd.where(nr_cell_cu.ne("") & nr_cell_rel.ne(""), "")
 
         # -----------------------------
         # Fill GNBCUCPFunctionId from nRCellRef (same logic style as missing/disc)
         # -----------------------------
-        df["GNBCUCPFunctionId"] = df.apply(
-            lambda r: extract_gnbcucp_segment(resolve_nrcell_ref(r, relations_lookup)),
-            axis=1,
-        )
+        df["GNBCUCPFunctionId"] = _gnbcucp_segment_series(df, relations_df)
 
     # Place GNBCUCPFunctionId after NRCellRelationId
     df = ensure_column_after(df, "GNBCUCPFunctionId", "NRCellRelationId")
@@ -527,97 +507,56 @@ def build_correction_command_nr_missing_relations(
     df["NRCellCUId"] = df["NRCellCUId"].astype(str).str.strip()
     df["NRCellRelationId"] = df["NRCellRelationId"].astype(str).str.strip()
 
-    relations_lookup = build_row_lookup(
-        relations_df, ["NodeId", "NRCellCUId", "NRCellRelationId"], extra_strip_cols=["nRCellRef"]
-    )
-
-    def _get_rel_row(row: pd.Series) -> Optional[pd.Series]:
-        key = (
-            str(row.get("NodeId", "")).strip(),
-            str(row.get("NRCellCUId", "")).strip(),
-            str(row.get("NRCellRelationId", "")).strip(),
-        )
-        return relations_lookup.get(key)
-
-    def _build_correction_command(row: pd.Series, rel_row: Optional[pd.Series]) -> str:
-        """
-        Build correction command for NR_missing row.
-        Safely returns empty string if mandatory parameters are missing.
-        """
-        nr_cell_cu = pick_non_empty_value(rel_row, row, "NRCellCUId")
-        nr_cell_rel = pick_non_empty_value(rel_row, row, "NRCellRelationId")
-        coverage = pick_non_empty_value(rel_row, row, "coverageIndicator")
-        is_ho = pick_non_empty_value(rel_row, row, "isHoAllowed")
-        is_remove = pick_non_empty_value(rel_row, row, "isRemoveAllowed")
-        s_cell_candidate = pick_non_empty_value(rel_row, row, "sCellCandidate")
-        aca_mode = pick_non_empty_value(rel_row, row, "acaMode")
-        nrcell_ref = pick_non_empty_value(rel_row, row, "nRCellRef")
-        nrfreq_ref = pick_non_empty_value(rel_row, row, "nRFreqRelationRef")
-
-        if not (nr_cell_cu and nr_cell_rel):
-            return ""
-
-        # --------- nRCellRef cleanup: keep everything from GNBCUCPFunction= ---------
-        clean_nrcell_ref = ""
-        clean_nrcell_ref_short = ""
-        if isinstance(nrcell_ref, str) and "GNBCUCPFunction=" in nrcell_ref:
-            clean_nrcell_ref = nrcell_ref[nrcell_ref.find("GNBCUCPFunction="):]
-            if "ExternalGNBCUCPFunction=" in nrcell_ref:
-                clean_nrcell_ref_short = nrcell_ref[nrcell_ref.find("ExternalGNBCUCPFunction="):]
-
-        # --------- nRFreqRelationRef cleanup ---------
-        clean_nrfreq_ref = ""
-        if isinstance(nrfreq_ref, str) and "GNBCUCPFunction=" in nrfreq_ref:
-            sub = nrfreq_ref[nrfreq_ref.find("GNBCUCPFunction="):]
-            gnb_part = sub.split(",", 1)[0]
-            gnb_val = gnb_part.split("=", 1)[1] if "=" in gnb_part else ""
-
-            m_nr_cell = re.search(r"NRCellCU=([^,]+)", sub)
-            m_freq = re.search(r"NRFreqRelation=([^,]+)", sub)
-            nr_cell_for_freq = m_nr_cell.group(1) if m_nr_cell else ""
-            freq_id = m_freq.group(1) if m_freq else ""
-
-            # Replace old SSB (Pre) with Post SSB using provided values
-            if n77_ssb_pre and freq_id == str(n77_ssb_pre):
-                freq_id = str(n77_ssb_post)
-
-            if gnb_val and nr_cell_for_freq and freq_id:
-                clean_nrfreq_ref = f"GNBCUCPFunction={gnb_val},NRCellCU={nr_cell_for_freq},NRFreqRelation={freq_id}"
-
-        parts = [
-            f"set {clean_nrcell_ref_short} nRFrequencyRef NRNetwork=1,NRFrequency={n77_ssb_post}-30" if clean_nrcell_ref_short else "",
-            f"crn NRCellCU={nr_cell_cu},NRCellRelation={nr_cell_rel}",
-            f"nRCellRef {clean_nrcell_ref}" if clean_nrcell_ref else "",
-            f"nRFreqRelationRef {clean_nrfreq_ref}" if clean_nrfreq_ref else "",
-            f"isHoAllowed {is_ho}" if is_ho else "",
-            f"isRemoveAllowed {is_remove}" if is_remove else "",
-            "end",
-            (
-                f"set NRCellCU={nr_cell_cu},NRCellRelation={nr_cell_rel} coverageIndicator {coverage}"
-                if coverage
-                else f"set NRCellCU={nr_cell_cu},NRCellRelation={nr_cell_rel}"
-            ),
-            (
-                f"set NRCellCU={nr_cell_cu},NRCellRelation={nr_cell_rel} sCellCandidate {s_cell_candidate}"
-                if s_cell_candidate
-                else ""
-            ),
-            (
-                f"set NRCellCU={nr_cell_cu},NRCellRelation={nr_cell_rel} acaMode {aca_mode}"
-                if aca_mode
-                else ""
-            ),
-        ]
-        lines = [p for p in parts if p]
-        return _wrap_with_relations_wrappers("\n".join(lines), include_gs=True)
-
-    df["Correction_Cmd"] = df.apply(lambda r: _build_correction_command(r, _get_rel_row(r)), axis=1)
+    fields = ["NRCellCUId", "NRCellRelationId", "coverageIndicator", "isHoAllowed", "isRemoveAllowed", "sCellCandidate", "acaMode", "nRCellRef", "nRFreqRelationRef"]
+    rel = lookup_relation_fields(df, relations_df, NR_KEY_COLS, fields, extra_strip_cols=["nRCellRef"])
+
+    nr_cell_cu = pick_non_empty_series(rel["NRCellCUId"], df, "NRCellCUId")
+    nr_cell_rel = pick_non_empty_series(rel["NRCellRelationId"], df, "NRCellRelationId")
+    coverage = pick_non_empty_series(rel["coverageIndicator"], df, "coverageIndicator")
+    is_ho = pick_non_empty_series(rel["isHoAllowed"], df, "isHoAllowed")
+    is_remove = pick_non_empty_series(rel["isRemoveAllowed"], df, "isRemoveAllowed")
+    s_cell_candidate = pick_non_empty_series(rel["sCellCandidate"], df, "sCellCandidate")
+    aca_mode = pick_non_empty_series(rel["acaMode"], df, "acaMode")
+    nrcell_ref = pick_non_empty_series(rel["nRCellRef"], df, "nRCellRef")
+    nrfreq_ref = pick_non_empty_series(rel["nRFreqRelationRef"], df, "nRFreqRelationRef")
+
+    valid = nr_cell_cu.ne("") & nr_cell_rel.ne("")
+
+    # --------- nRCellRef cleanup: keep everything from GNBCUCPFunction= ---------
+    clean_nrcell_ref = _slice_from_token(nrcell_ref, "GNBCUCPFunction=")
+    clean_nrcell_ref_short = _slice_from_token(nrcell_ref, "ExternalGNBCUCPFunction=").where(clean_nrcell_ref.ne(""), "")
+
+    # --------- nRFreqRelationRef cleanup ---------
+    sub = _slice_from_token(nrfreq_ref, "GNBCUCPFunction=")
+    gnb_val = sub.str.extract(r"^GNBCUCPFunction=([^,]*)", expand=False).fillna("")
+    nr_cell_for_freq = sub.str.extract(r"NRCellCU=([^,]+)", expand=False).fillna("")
+    freq_id = sub.str.extract(r"NRFreqRelation=([^,]+)", expand=False).fillna("")
+
+    # Replace old SSB (Pre) with Post SSB using provided values
+    if n77_ssb_pre:
+        freq_id = freq_id.mask(freq_id.eq(str(n77_ssb_pre)), str(n77_ssb_post))
+
+    has_freq_ref = sub.ne("") & gnb_val.ne("") & nr_cell_for_freq.ne("") & freq_id.ne("")
+    clean_nrfreq_ref = ("GNBCUCPFunction=" + gnb_val + ",NRCellCU=" + nr_cell_for_freq + ",NRFreqRelation=" + freq_id).where(has_freq_ref, "")
+
+    rel_mo = "NRCellCU=" + nr_cell_cu + ",NRCellRelation=" + nr_cell_rel
+    parts = [
+        _optional_line("set ", clean_nrcell_ref_short, f" nRFrequencyRef NRNetwork=1,NRFrequency={n77_ssb_post}-30"),
+        "crn " + rel_mo,
+        _optional_line("nRCellRef ", clean_nrcell_ref),
+        _optional_line("nRFreqRelationRef ", clean_nrfreq_ref),
+        _optional_line("isHoAllowed ", is_ho),
+        _optional_line("isRemoveAllowed ", is_remove),
+        "end",
+        "set " + rel_mo + _optional_line(" coverageIndicator ", coverage),
+        ("set " + rel_mo + " sCellCandidate " + s_cell_candidate).where(s_cell_candidate.ne(""), ""),
+        ("set " + rel_mo + " acaMode " + aca_mode).where(aca_mode.ne(""), ""),
+    ]
+    commands = _wrap_with_relations_wrappers_series(_join_lines_series(parts, df.index), include_gs=True)
+    df["Correction_Cmd"] = commands.where(valid, "")
 
     # GNBCUCPFunctionId se rellena desde nRCellRef usando la tabla de relaciones
-    df["GNBCUCPFunctionId"] = df.apply(
-        lambda r: extract_gnbcucp_segment(resolve_nrcell_ref(r, relations_lookup)),
-        axis=1,
-    )
+    df["GNBCUCPFunctionId"] = _slice_from_token(nrcell_ref, "GNBCUCPFunction=").str.strip()
 
     df = ensure_column_after(df, "GNBCUCPFunctionId", "NRCellRelationId")
 
@@ -671,40 +610,16 @@ def build_correction_command_nr_discrepancies(
             work[col] = ""
         work[col] = work[col].astype(str).str.strip()
 
-    relations_lookup = build_row_lookup(
-        relations_df, ["NodeId", "NRCellCUId", "NRCellRelationId"], extra_strip_cols=["nRCellRef"]
-    )
-
-    work["GNBCUCPFunctionId"] = work.apply(
-        lambda r: extract_gnbcucp_segment(resolve_nrcell_ref(r, relations_lookup)), axis=1
-    )
+    work["GNBCUCPFunctionId"] = _gnbcucp_segment_series(work, relations_df)
 
-    # Reuse existing builders (they already include their own internal _build_correction_command)
+    # Reuse existing builders (both are vectorised)
     del_df = build_correction_command_nr_new_relations(disc_df.copy(), relations_df)
     create_df = build_correction_command_nr_missing_relations(disc_df.copy(), relations_df, n77_ssb_pre, n77_ssb_post)
 
     del_cmds = del_df.get("Correction_Cmd", pd.Series("", index=disc_df.index)).astype(str)
     create_cmds = create_df.get("Correction_Cmd", pd.Series("", index=disc_df.index)).astype(str)
 
-    def _build_correction_command(del_cmd: str, create_cmd: str) -> str:
-        """
-        Build combined correction command for NR_disc row.
-        Safely returns empty string if both parts are empty.
-        """
-        del_cmd = (del_cmd or "").strip()
-        create_cmd = _strip_file_wrappers_block(create_cmd or "")
-
-        if del_cmd and create_cmd:
-            return _wrap_with_relations_wrappers(f"{del_cmd}\n{create_cmd}", include_gs=True)
-        if del_cmd:
-            return _wrap_with_relations_wrappers(del_cmd, include_gs=True)
-        if create_cmd:
-            return _wrap_with_relations_wrappers(create_cmd, include_gs=True)
-        return ""
-
-    work["Correction_Cmd"] = [
-        _build_correction_command(d, c) for d, c in zip(del_cmds, create_cmds)
-    ]
+    work["Correction_Cmd"] = _combine_disc_commands(del_cmds, create_cmds)
 
     work = ensure_column_after(work, "GNBCUCPFunctionId", "NRCellRelationId")
 
@@ -12,6 +12,8 @@ import pandas as pd
 from typing import Dict, Optional, List, Tuple
 
 from src.utils.utils_io import to_long_path, pretty_path
+from src.utils.utils_zip import BackgroundZipWriter
+from src.utils.utils_artifacts import ARTIFACTS
 
 # ----------------------------------------------------------------------
 #  INTERNAL HELPERS
@@ -232,7 +234,7 @@ def _reorder_cmds_del_first(cmds: List[object]) -> List[str]:
 # ----------------------------------------------------------------------
 #  EXPORT CORRECTION COMMNANDS TO TEXT FILES
 # ----------------------------------------------------------------------
-def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.DataFrame], base_folder_name: str = "Correction_Cmd", export_to_zip: bool = True, module_name: str = "", market_tag: str = "GLOBAL") -> int:
+def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.DataFrame], base_folder_name: str = "Correction_Cmd", export_to_zip: bool = True, module_name: str = "", market_tag: str = "GLOBAL", zip_compression: Optional[str] = None, zip_level: Optional[int] = None) -> int:
     """
     Export Correction_Cmd values to text files grouped by NodeId and category.
 
@@ -240,9 +242,9 @@ def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.Dat
       <output_dir>/<base_folder_name>/(NewRelations|MissingRelations|RelationsDiscrepancies)/(NR|GU)/<NodeId>_<Category>.txt
 
     By default, outputs are written into a ZIP (same behavior as ConfigurationAudit exporters).
+    ZIP members are compressed in a background writer thread (see BackgroundZipWriter); zip_compression ('deflated'/'stored') and
+    zip_level (0-9) override the SSB_RA_ZIP_COMPRESSION / SSB_RA_ZIP_LEVEL defaults.
     """
-    import zipfile
-
     def _detect_layer_from_category(category: str) -> str:
         s = str(category or "").strip().upper()
         if s.startswith("NR"):
@@ -265,7 +267,7 @@ def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.Dat
         if export_to_zip:
             zip_path = os.path.join(base_dir, "Relations_CorrectionCmds.zip")
             zip_path_long = to_long_path(zip_path)
-            zip_file = zipfile.ZipFile(zip_path_long, "w", compression=zipfile.ZIP_DEFLATED)
+            zip_file = BackgroundZipWriter(zip_path_long, compression=zip_compression, compresslevel=zip_level)
 
         def _write_text(target_dir: str, file_name: str, text: str) -> None:
             if export_to_zip and zip_file is not None:
@@ -289,9 +291,9 @@ def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.Dat
             if "NodeId" not in df.columns or "Correction_Cmd" not in df.columns:
                 continue
 
-            work = df.copy()
-            work["NodeId"] = work["NodeId"].astype(str).str.strip()
-            work["Correction_Cmd"] = work["Correction_Cmd"].astype(str)
+            # NEW: group the command column directly by the stripped NodeId keys (no full DataFrame copy)
+            node_keys = df["NodeId"].astype(str).str.strip()
+            cmd_values = df["Correction_Cmd"].astype(str)
 
             category_lower = str(category).lower()
 
@@ -312,12 +314,12 @@ def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.Dat
             else:
                 rel_dir = ""
 
-            for node_id, group in work.groupby("NodeId"):
+            for node_id, group_cmds in cmd_values.groupby(node_keys):
                 node_str = str(node_id).strip()
                 if not node_str:
                     continue
 
-                raw_cmds = [cmd for cmd in group["Correction_Cmd"] if str(cmd).strip()]
+                raw_cmds = [cmd for cmd in group_cmds if str(cmd).strip()]
                 if not raw_cmds:
                     continue
 
@@ -388,7 +390,7 @@ def export_relations_commands(output_dir: str, dfs_by_category: Dict[str, pd.Dat
 
 
 # ----------------------------- EXTERNAL/TERMPOINTS COMMANDS ----------------------------- #
-def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: str, base_folder_name: str = "Correction_Cmd", sheet_dfs: Optional[dict[str, pd.DataFrame]] = None, export_to_zip: bool = True, module_name: str = "") -> int:
+def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: str, base_folder_name: str = "Correction_Cmd", sheet_dfs: Optional[dict[str, pd.DataFrame]] = None, export_to_zip: bool = True, module_name: str = "", zip_compression: Optional[str] = None, zip_level: Optional[int] = None) -> int:
     """
     Export correction commands coming from POST Configuration Audit Excel:
       - ExternalNRCellCU (SSB-Post)
@@ -408,6 +410,7 @@ def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: st
 
     Additionally:
       - All 'del ...' commands are moved to the top of each node file.
+      - ZIP members are compressed in a background writer thread (zip_compression / zip_level as in export_relations_commands).
     """
 
     base_dir = os.path.join(output_dir, base_folder_name)
@@ -434,10 +437,9 @@ def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: st
     try:
         # If we export to zip, create it inside the base_dir and avoid duplicating base folder inside the zip
         if export_to_zip:
-            import zipfile
             os.makedirs(base_dir, exist_ok=True)
             zip_path = to_long_path(os.path.join(base_dir, "CellRelation_Externals_Termpoints.zip"))
-            zip_file = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED)
+            zip_file = BackgroundZipWriter(zip_path, compression=zip_compression, compresslevel=zip_level)
 
         # If we export to filesystem, ensure directories exist
         if not export_to_zip:
@@ -453,6 +455,9 @@ def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: st
         # Prepare cached Excel reader only if needed (no in-memory DFs provided)
         xl_cached = None
         sheet_map_cached = {}
+        if not (isinstance(sheet_dfs, dict) and sheet_dfs) and audit_post_excel:
+            # Frames registered by the writer of this workbook (same process) avoid parsing the XLSX at all
+            sheet_dfs = ARTIFACTS.get_sheets(audit_post_excel)
         if not (isinstance(sheet_dfs, dict) and sheet_dfs):
             try:
                 xl_cached = pd.ExcelFile(audit_post_excel) if audit_post_excel and os.path.isfile(audit_post_excel) else None
@@ -528,8 +533,8 @@ def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: st
             if df.empty:
                 return 0
 
-            work = df.copy()
-            work[node_column] = work[node_column].astype(str).str.strip()
+            # NEW: group the command column directly by the stripped node keys (no full DataFrame copy)
+            node_keys = df[node_column].astype(str).str.strip()
 
             suffix = filename_suffix if filename_suffix else str(sheet_name).strip()
             generated_files = 0
@@ -537,13 +542,12 @@ def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: st
             # If exporting to zip, compute relative dir inside zip (no base folder duplication)
             rel_dir = os.path.relpath(output_dir, base_dir).replace("\\", "/")
 
-            for node_id, group in work.groupby(node_column):
+            for node_id, raw_series in df[command_column].groupby(node_keys):
                 node_str = str(node_id).strip()
                 if not node_str:
                     continue
 
                 # IMPORTANT: do NOT cast the whole column to str before dropna(), otherwise NaN becomes "nan"
-                raw_series = group[command_column]
                 raw_series = raw_series[raw_series.notna()]
 
                 cmds = raw_series.astype(str).map(str.strip).loc[lambda s: (s != "") & (s.str.lower() != "nan") & (s.str.lower() != "none")].tolist()
@@ -665,7 +669,7 @@ def export_external_and_termpoint_commands(audit_post_excel: str, output_dir: st
 
 
 
-def export_all_sheets_with_correction_commands(audit_post_excel: str, output_dir: str, base_folder_name: str = "Correction_Cmd", exclude_sheets: Optional[set[str]] = None, sheet_dfs: Optional[dict[str, pd.DataFrame]] = None, export_to_zip: bool = True, module_name: str = "") -> int:
+def export_all_sheets_with_correction_commands(audit_post_excel: str, output_dir: str, base_folder_name: str = "Correction_Cmd", exclude_sheets: Optional[set[str]] = None, sheet_dfs: Optional[dict[str, pd.DataFrame]] = None, export_to_zip: bool = True, module_name: str = "", zip_compression: Optional[str] = None, zip_level: Optional[int] = None) -> int:
     """
     Export Correction_Cmd values from ANY sheet containing a 'Correction_Cmd' column.
     Intended for ConfigurationAudit (NRCellRelation, GUtranCellRelation, etc.).
@@ -682,6 +686,8 @@ def export_all_sheets_with_correction_commands(audit_post_excel: str, output_dir
       - If sheet_dfs is provided, use those DataFrames directly (no Excel re-read).
       - If sheet_dfs is None, fallback to reading from Excel (legacy behavior).
       - ZIP output reduces filesystem latency (especially on synced drives like Google Drive).
+      - ZIP members are compressed in a background writer thread and written in order (BackgroundZipWriter);
+        use zip_compression='stored' (or --zip-compression stored) for the fastest local runs.
     """
     exclude = {s.strip().lower() for s in (exclude_sheets or set())}
 
@@ -694,29 +700,35 @@ def export_all_sheets_with_correction_commands(audit_post_excel: str, output_dir
 
     # Determine sheet sources
     dfs_source: dict[str, pd.DataFrame] = {}
+    if not (isinstance(sheet_dfs, dict) and sheet_dfs) and audit_post_excel:
+        # Frames registered by the writer of this workbook (same process) avoid parsing the XLSX at all
+        registered = ARTIFACTS.get_sheets(audit_post_excel)
+        if registered:
+            sheet_dfs = {sheet: df for sheet, df in registered.items() if df is not None and not df.empty}
     if isinstance(sheet_dfs, dict) and sheet_dfs:
         dfs_source = sheet_dfs
     else:
         if not audit_post_excel or not os.path.isfile(audit_post_excel):
             return 0
         try:
-            xl = pd.ExcelFile(audit_post_excel)
-            for sheet in list(xl.sheet_names):
-                try:
-                    df = xl.parse(sheet)
-                except Exception:
-                    continue
-                if df is None or df.empty:
-                    continue
-                dfs_source[str(sheet)] = df
+            parsed: dict[str, pd.DataFrame] = {}
+            with pd.ExcelFile(audit_post_excel) as xl:
+                sheet_names = list(xl.sheet_names)
+                for sheet in sheet_names:
+                    try:
+                        parsed[str(sheet)] = xl.parse(sheet)
+                    except Exception:
+                        continue
+            if len(parsed) == len(sheet_names):
+                ARTIFACTS.register_parsed(audit_post_excel, parsed)
+            dfs_source = {sheet: df for sheet, df in parsed.items() if df is not None and not df.empty}
         except Exception:
             return 0
 
     try:
         if export_to_zip:
-            import zipfile
             zip_path = to_long_path(os.path.join(base_dir, "Other_MOs.zip"))
-            zip_file = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED)
+            zip_file = BackgroundZipWriter(zip_path, compression=zip_compression, compresslevel=zip_level)
 
         for sheet, df in dfs_source.items():
             if str(sheet).strip().lower() in exclude:
@@ -727,13 +739,10 @@ def export_all_sheets_with_correction_commands(audit_post_excel: str, output_dir
             if "Correction_Cmd" not in df.columns or "NodeId" not in df.columns:
                 continue
 
-            work = df.copy()
-            work["NodeId"] = work["NodeId"].astype(str).str.strip()
-
-            raw_series = work["Correction_Cmd"]
-            raw_series = raw_series[raw_series.notna()]
-            if raw_series.empty:
+            # NEW: group the command column directly by the stripped NodeId keys (no full DataFrame copy)
+            if not df["Correction_Cmd"].notna().any():
                 continue
+            node_keys = df["NodeId"].astype(str).str.strip()
 
             sheet_name = str(sheet).strip()
             sheet_dir = os.path.join(base_dir, sheet_name)
@@ -741,12 +750,12 @@ def export_all_sheets_with_correction_commands(audit_post_excel: str, output_dir
                 os.makedirs(sheet_dir, exist_ok=True)
 
             # Group and export
-            for node_id, group in work.groupby("NodeId"):
+            for node_id, group_cmds in df["Correction_Cmd"].groupby(node_keys):
                 node_str = str(node_id).strip()
                 if not node_str:
                     continue
 
-                raw_cmds = [cmd for cmd in group["Correction_Cmd"] if str(cmd).strip()]
+                raw_cmds = [cmd for cmd in group_cmds if str(cmd).strip()]
                 if not raw_cmds:
                     continue
 
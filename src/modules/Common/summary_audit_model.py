@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Typed SummaryAudit model shared by every SummaryAudit consumer (Excel, PPT, node-id loaders, comparisons).
+
+The SummaryAudit table is still produced as add_row() dicts and written to Excel as a DataFrame, but consumers no longer
+re-parse it on their own: the model is built once per SummaryAudit frame (memoised) and exposes per row
+  - a stable metric id ("<Category>:<normalised metric>", independent of SSB values / allowed lists in the text),
+  - a SummaryKind enum derived from the SubCategory (audit / inconsistency / discrepancy / other),
+  - the node list of ExtraInfo as integer ids into one shared node dictionary (split by ',' / ';' ONCE).
+It serialises to Parquet (node ids as list<int32>, node dictionary in the schema metadata).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import weakref
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.utils.utils_io import to_long_path
+
+SUMMARY_AUDIT_COLUMNS = ["Category", "SubCategory", "Metric", "Value", "ExtraInfo", "Tips"]
+SUMMARY_AUDIT_MODEL_FILE = "SummaryAuditModel.parquet"
+
+_LEADING_ID_RE = re.compile(r"^\s*(\d+)")
+
+
+class SummaryKind(str, Enum):
+    AUDIT = "audit"
+    INCONSISTENCY = "inconsistency"
+    DISCREPANCY = "discrepancy"
+    OTHER = "other"
+
+    @classmethod
+    def from_subcategory(cls, subcategory: object) -> "SummaryKind":
+        s = str(subcategory or "").lower()
+        if "inconsist" in s:  # covers 'Inconsistences' typo as well
+            return cls.INCONSISTENCY
+        if "discrep" in s:
+            return cls.DISCREPANCY
+        if "audit" in s:
+            return cls.AUDIT
+        return cls.OTHER
+
+
+def normalize_metric(text: object) -> str:
+    """Metric text without variable parts (source suffixes, SSB/ARFCN values, allowed lists, ids), casefolded."""
+    s = str(text or "").strip()
+    s = re.sub(r"\s*\(from [^)]*\)", "", s, flags=re.IGNORECASE)  # Remove "(from ...)" source suffix
+    s = re.sub(r"\s*\((?=[^)]*\d)[^)]*\)", "", s)  # Remove any "(...)" group containing digits (frequencies, ids, lists)
+    s = re.sub(r"\d{3,}(?:-\d+)+", "<id>", s)  # Normalize ids like 648672-30-20-0-1 or ranges 646600-660000
+    s = re.sub(r"\d{3,}", "<n>", s)  # Normalize long numeric values like 648672, 653952, 650006, etc.
+    s = re.sub(r"\s+", " ", s).strip()
+    return s.casefold()
+
+
+def make_metric_id(category: object, metric: object) -> str:
+    return f"{str(category or '').strip()}:{normalize_metric(metric)}"
+
+
+def split_extra_info(extra: object) -> List[str]:
+    """Node/cell tokens of an ExtraInfo value (comma or semicolon separated). Empty / NaN -> []."""
+    if extra is None or (isinstance(extra, float) and extra != extra):
+        return []
+    text = str(extra)
+    if not text:
+        return []
+    return [t.strip() for t in text.replace(";", ",").split(",") if t.strip()]
+
+
+def _is_blank(value: object) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+@dataclass(frozen=True)
+class SummaryAuditRow:
+    metric_id: str
+    category: str
+    subcategory: str
+    kind: SummaryKind
+    metric: str
+    value: object
+    extra_info: str
+    tips: str
+    node_ids: Tuple[int, ...] = ()
+
+
+@dataclass
+class SummaryAuditModel:
+    rows: List[SummaryAuditRow] = field(default_factory=list)
+    nodes: List[str] = field(default_factory=list)  # node dictionary: node id -> node name
+    _node_index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    # ---------------------------- building ----------------------------
+    def intern_node(self, name: str) -> int:
+        idx = self._node_index.get(name)
+        if idx is None:
+            idx = len(self.nodes)
+            self.nodes.append(name)
+            self._node_index[name] = idx
+        return idx
+
+    def add(self, category: object, subcategory: object, metric: object, value: object = "", extra: object = "", tips: object = "", nodes: Optional[Iterable[str]] = None) -> SummaryAuditRow:
+        """Append a row. nodes (already structured) skips parsing ExtraInfo."""
+        tokens = split_extra_info(extra) if nodes is None else [str(n).strip() for n in nodes if str(n).strip()]
+        row = SummaryAuditRow(
+            metric_id=make_metric_id(category, metric),
+            category=str(category or "").strip(),
+            subcategory=str(subcategory or "").strip(),
+            kind=SummaryKind.from_subcategory(subcategory),
+            metric=str(metric or ""),
+            value=value,
+            extra_info="" if _is_blank(extra) else str(extra),
+            tips="" if _is_blank(tips) else str(tips),
+            node_ids=tuple(self.intern_node(t) for t in tokens),
+        )
+        self.rows.append(row)
+        return row
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, object]]) -> "SummaryAuditModel":
+        model = cls()
+        for r in records:
+            model.add(r.get("Category", ""), r.get("SubCategory", ""), r.get("Metric", ""), r.get("Value", ""), r.get("ExtraInfo", ""), r.get("Tips", ""))
+        return model
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame]) -> "SummaryAuditModel":
+        model = cls()
+        if df is None or df.empty:
+            return model
+        n = len(df)
+        cols = {c: (df[c].tolist() if c in df.columns else [""] * n) for c in SUMMARY_AUDIT_COLUMNS}
+        for category, subcategory, metric, value, extra, tips in zip(*(cols[c] for c in SUMMARY_AUDIT_COLUMNS)):
+            model.add(category, subcategory, metric, value, extra, tips)
+        return model
+
+    # ---------------------------- queries ----------------------------
+    def node_names(self, row: SummaryAuditRow) -> List[str]:
+        return [self.nodes[i] for i in row.node_ids]
+
+    def find(self, category: Optional[str] = None, metric_contains: Optional[str] = None, kind: Optional[SummaryKind] = None) -> List[SummaryAuditRow]:
+        """Rows filtered by exact Category, SummaryKind and/or a substring of the normalised metric (see normalize_metric)."""
+        needle = normalize_metric(metric_contains) if metric_contains else None
+        out = []
+        for row in self.rows:
+            if category is not None and row.category != category:
+                continue
+            if kind is not None and row.kind != kind:
+                continue
+            if needle and needle not in row.metric_id.split(":", 1)[1]:
+                continue
+            out.append(row)
+        return out
+
+    def node_set(self, rows: Iterable[SummaryAuditRow]) -> set[str]:
+        return {self.nodes[i] for row in rows for i in row.node_ids}
+
+    @staticmethod
+    def numeric_node_ids(node_names: Iterable[str]) -> set[str]:
+        """Leading numeric identifier of each node name (e.g. '12345_SITE' -> '12345')."""
+        out: set[str] = set()
+        for name in node_names:
+            m = _LEADING_ID_RE.match(name)
+            if m:
+                out.add(m.group(1))
+        return out
+
+    # ---------------------------- (de)serialisation ----------------------------
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([{"Category": r.category, "SubCategory": r.subcategory, "Metric": r.metric, "Value": r.value, "ExtraInfo": r.extra_info, "Tips": r.tips} for r in self.rows], columns=SUMMARY_AUDIT_COLUMNS)
+
+    def to_parquet(self, path: str) -> Optional[str]:
+        """Write the model as Parquet (requires pyarrow). Values are JSON-encoded so ints stay ints. Returns the path or None."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except Exception:
+            return None
+        table = pa.table({
+            "metric_id": [r.metric_id for r in self.rows],
+            "category": [r.category for r in self.rows],
+            "subcategory": [r.subcategory for r in self.rows],
+            "kind": [r.kind.value for r in self.rows],
+            "metric": [r.metric for r in self.rows],
+            "value": [json.dumps(r.value.item() if hasattr(r.value, "item") else r.value, default=str) for r in self.rows],
+            "extra_info": [r.extra_info for r in self.rows],
+            "tips": [r.tips for r in self.rows],
+            "node_ids": pa.array([list(r.node_ids) for r in self.rows], type=pa.list_(pa.int32())),
+        }).replace_schema_metadata({"nodes": json.dumps(self.nodes)})
+        path_fs = to_long_path(path)
+        os.makedirs(os.path.dirname(path_fs) or ".", exist_ok=True)
+        pq.write_table(table, path_fs, compression="zstd")
+        return path
+
+    @classmethod
+    def read_parquet(cls, path: str) -> Optional["SummaryAuditModel"]:
+        try:
+            import pyarrow.parquet as pq
+            table = pq.read_table(to_long_path(path))
+        except Exception:
+            return None
+        model = cls()
+        for name in json.loads((table.schema.metadata or {}).get(b"nodes", b"[]")):
+            model.intern_node(name)
+        cols = table.to_pydict()
+        for i in range(table.num_rows):
+            value = cols["value"][i]
+            model.rows.append(SummaryAuditRow(
+                metric_id=cols["metric_id"][i], category=cols["category"][i], subcategory=cols["subcategory"][i], kind=SummaryKind(cols["kind"][i]),
+                metric=cols["metric"][i], value=json.loads(value) if value is not None else None, extra_info=cols["extra_info"][i] or "", tips=cols["tips"][i] or "",
+                node_ids=tuple(cols["node_ids"][i] or ()),
+            ))
+        return model
+
+
+# Memo {id(frame) -> model}: every consumer of the same SummaryAudit frame (registry / sidecar / in-memory) shares one model
+_MODEL_BY_FRAME: Dict[int, SummaryAuditModel] = {}
+
+
+def summary_audit_model_for(source: Union[SummaryAuditModel, pd.DataFrame, List[Dict[str, object]], None]) -> SummaryAuditModel:
+    """Return the SummaryAuditModel of a model / SummaryAudit DataFrame / list of add_row dicts (DataFrames are memoised)."""
+    if isinstance(source, SummaryAuditModel):
+        return source
+    if isinstance(source, pd.DataFrame):
+        key = id(source)
+        model = _MODEL_BY_FRAME.get(key)
+        if model is None:
+            model = SummaryAuditModel.from_frame(source)
+            _MODEL_BY_FRAME[key] = model
+            weakref.finalize(source, _MODEL_BY_FRAME.pop, key, None)
+        return model
+    if isinstance(source, list):
+        return SummaryAuditModel.from_records(source)
+    return SummaryAuditModel()
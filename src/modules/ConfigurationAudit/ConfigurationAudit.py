@@ -5,21 +5,26 @@ import time
 import re
 import shutil
 import tempfile
-from typing import List, Tuple, Optional, Dict
-from openpyxl.styles import Font, PatternFill, Alignment
+from typing import Callable, List, Tuple, Optional, Dict
+from openpyxl.styles import Font, Alignment
 from openpyxl.utils import get_column_letter
 import pandas as pd
 
-from src.utils.utils_io import find_log_files, read_text_file, to_long_path, pretty_path
-from src.utils.utils_parsing import SUMMARY_RE, find_all_subnetwork_headers, extract_mo_from_subnetwork_line, parse_table_slice_from_subnetwork, parse_log_lines, find_subnetwork_header_index, extract_mo_name_from_previous_line, cap_rows
-from src.utils.utils_excel import sanitize_sheet_name, unique_sheet_name, color_summary_tabs, apply_alternating_category_row_fills, style_headers_autofilter_and_autofit, style_headers_autofilter_and_autofit_xlsxwriter
+from src.utils.utils_io import find_log_files, iter_log_texts, is_logs_dir, split_zip_log_path, to_long_path, pretty_path
+from src.utils.utils_parsing import SUMMARY_RE, parse_log_tables
+from src.utils.utils_parse_cache import parse_cache_dir, log_content_key, load_parsed_tables, store_parsed_tables, evict_parse_cache
+from src.utils.utils_excel import sanitize_sheet_name, unique_sheet_name, color_summary_tabs, apply_alternating_category_row_fills, add_conditional_formats, style_headers_autofilter_and_autofit, style_headers_autofilter_and_autofit_xlsxwriter, write_df_with_spill, resolve_sheet_spill
 from src.utils.utils_sorting import natural_logfile_key
 from src.utils.utils_pivot import safe_pivot_count, safe_crosstab_count, apply_frequency_column_filter
 from src.utils.utils_dataframe import concat_or_empty
 from src.utils.utils_datetime import log_phase_timer, format_duration_hms
+from src.utils.utils_output_stage import BackgroundOutputStage
+from src.utils.utils_artifacts import register_artifact, write_workbook_sidecar
+from src.modules.Common.summary_audit_model import SUMMARY_AUDIT_MODEL_FILE, summary_audit_model_for
 from src.modules.Common.correction_commands_exporter import export_all_sheets_with_correction_commands, export_external_and_termpoint_commands
 from .ca_summary_excel import build_summary_audit
 from .ca_summary_ppt import generate_ppt_summary
+from .ca_companion_workbooks import CompanionWorkbookWriter, plan_companion_workbooks
 
 
 class ConfigurationAudit:
@@ -103,7 +108,12 @@ class ConfigurationAudit:
             correction_cmd_folder_name: str = "Correction_Cmd_CA",
             fast_excel_export: bool = False,
             fast_excel_autofit_rows: int = 50,
-            fast_excel_autofit_max_width: int = 60
+            fast_excel_autofit_max_width: int = 60,
+            split_workbooks: bool = False,  # <<< NEW: write raw MO tables into companion workbooks (RawMO_Workbooks/) in parallel processes
+            spill_policy: Optional[str] = None,  # <<< NEW: oversized MO tables -> "sheets" (paged) | "csv" | "parquet" (None = SSB_RA_SPILL_POLICY / "sheets")
+            spill_rows: Optional[int] = None,  # <<< NEW: max data rows per sheet before spilling (None = SSB_RA_SPILL_ROWS / Excel limit)
+            on_summary_ready: Optional[Callable[[pd.DataFrame, str], None]] = None,  # <<< NEW: callback(summary_audit_df, excel_path) fired right after PHASE 4.3
+            output_stage: Optional[BackgroundOutputStage] = None  # <<< NEW: queue PHASE 5.5-7 (Excel close, Correction Commands, PPT) to this background stage
     ) -> str:
 
         """
@@ -121,6 +131,12 @@ class ConfigurationAudit:
 
         Optional:
           - If profiles_audit=True, profiles tables will be collected and checked for old/new SSB replica consistency.
+          - If split_workbooks=True, raw MO tables (except MeContext) are written to companion workbooks grouped by MO family
+            under 'RawMO_Workbooks/' (one process per workbook) and SummaryAudit links point to those external sheets.
+          - MO tables above spill_rows are never truncated: they are paged into '<Sheet> (2)', '<Sheet> (3)'... or
+            exported as RawMO_<Sheet>_<suffix>.csv.gz/.parquet next to the workbook with a linked stub sheet (spill_policy).
+          - If output_stage is given, run() returns as soon as the workbook is populated; closing/moving the Excel, the
+            Correction Commands ZIPs and the PPT are finished by the stage (the caller must call output_stage.wait()).
         """
         prefix = f"{module_name} " if module_name else ""
 
@@ -140,7 +156,8 @@ class ConfigurationAudit:
             return f"[{lvl}] {msg}".strip()
 
         def _log(level: str, message: str) -> None:
-            print(f"{prefix}{_ensure_level_prefix(message, level)}")
+            # Single write per line: PHASE 5.5-7 may log from the background output stage while the main thread keeps logging
+            print(f"{prefix}{_ensure_level_prefix(message, level)}\n", end="")
 
         def _log_info(message: str) -> None:
             _log("INFO", message)
@@ -178,7 +195,7 @@ class ConfigurationAudit:
 
             # --- Validate the input directory ---
             with log_phase_timer("PHASE 0.2: Validate input directory", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
-                if not os.path.isdir(input_dir):
+                if not is_logs_dir(input_dir):  # NEW: zip-native folders ("<zip>/<dir>") are streamed from the archive
                     raise NotADirectoryError(f"Invalid directory: {input_dir}")
 
             # <<< NEW: decide the base output folder and ensure it exists >>>
@@ -225,90 +242,60 @@ class ConfigurationAudit:
 
             with log_phase_timer("PHASE 1: Parse all log/txt files", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
                 file_counter = 0
-                for i, path in enumerate(log_files, start=1):
+                # NEW: parse cache (SSB_RA_PARSE_CACHE_DIR): logs already parsed (by a previous run or the web warm job) are loaded as Parquet tables
+                cache_keys: Dict[int, Optional[str]] = {}
+                cached_tables: Dict[int, List[Dict[str, object]]] = {}
+                if parse_cache_dir():
+                    for pos, path in enumerate(log_files):
+                        cache_keys[pos] = log_content_key(path)
+                        hit = load_parsed_tables(cache_keys[pos])
+                        if hit is not None:
+                            cached_tables[pos] = hit
+                    _log_info(f"PHASE 1: Parse all log/txt files - {len(cached_tables)}/{len(log_files)} files loaded from the parse cache")
+                stored_in_cache = 0
+
+                # NEW: iter_log_texts decodes the next files (ZIP members in worker processes) while this one is parsed
+                texts = iter_log_texts([path for pos, path in enumerate(log_files) if pos not in cached_tables])
+                for pos, path in enumerate(log_files):
                     file_counter += 1
-
                     base_filename = os.path.basename(path)
-                    lines, encoding_used = read_text_file(path)
-
-                    header_indices = find_all_subnetwork_headers(lines)
-
-                    if not header_indices:
-                        table_start = time.perf_counter()
-
-                        header_idx = find_subnetwork_header_index(lines, self.SUMMARY_RE)
-                        df, note = parse_log_lines(lines, self.SUMMARY_RE, forced_header_idx=header_idx)
-                        mo_name_prev = extract_mo_name_from_previous_line(lines, header_idx)
-
-                        if encoding_used:
-                            note = (note + " | " if note else "") + f"encoding={encoding_used}"
-                        df, note = cap_rows(df, note)
-
-                        table_elapsed = time.perf_counter() - table_start
-
-                        mo_name_for_log = mo_name_prev if mo_name_prev else ""
-                        if header_indices and header_indices[0] < len(lines):
-                            mo_from_subnet = extract_mo_from_subnetwork_line(lines[header_indices[0]])
-                            if mo_from_subnet:
-                                mo_name_for_log = mo_from_subnet
-                        if not mo_name_for_log:
-                            mo_name_for_log = "MO NOT FOUND"
-
-                        if show_phase_timings:
-                            tag = "[SLOW]" if table_elapsed >= float(slow_file_seconds_threshold) else ""
-                            _log_info(f"PHASE 1: Parse all log/txt files - MO parse {file_counter:>3}: '{mo_name_for_log}' (File: {base_filename}) --> took {table_elapsed:.3f}s {tag}")
-
-                        idx_in_file = per_file_table_idx.get(base_filename, 0)
-                        per_file_table_idx[base_filename] = idx_in_file + 1
-
-                        table_entries.append({"df": df, "sheet_candidate": mo_name_for_log, "log_file": base_filename, "tables_in_log": 1, "note": note or "", "idx_in_file": idx_in_file})
 
+                    from_cache = pos in cached_tables
+                    if from_cache:
+                        tables = cached_tables[pos]
+                        file_elapsed = sum(float(t["elapsed"]) for t in tables)
                     else:
-                        tables_in_log = len(header_indices)
-                        header_indices.append(len(lines))  # add sentinel index
-
+                        _path, lines, encoding_used = next(texts)
                         file_start = time.perf_counter()
-                        any_slow = False
-                        mo_names: List[str] = []
-
-                        for ix in range(tables_in_log):
-                            h = header_indices[ix]
-                            nxt = header_indices[ix + 1]
-                            table_start = time.perf_counter()
-
-                            mo_name_from_line = extract_mo_from_subnetwork_line(lines[h])
-                            desired_sheet = mo_name_from_line if mo_name_from_line else os.path.splitext(base_filename)[0]
-
-                            df = parse_table_slice_from_subnetwork(lines, h, nxt)
-                            note = "Slice parsed"
-                            if encoding_used:
-                                note += f" | encoding={encoding_used}"
-                            df, note = cap_rows(df, note)
-
-                            table_elapsed = time.perf_counter() - table_start
-                            if table_elapsed >= float(slow_file_seconds_threshold):
-                                any_slow = True
-
-                            mo_names.append(desired_sheet)
-
-                            idx_in_file = per_file_table_idx.get(base_filename, 0)
-                            per_file_table_idx[base_filename] = idx_in_file + 1
-
-                            table_entries.append({"df": df, "sheet_candidate": desired_sheet, "log_file": base_filename, "tables_in_log": tables_in_log, "note": note or "", "idx_in_file": idx_in_file})
-
+                        tables = parse_log_tables(lines, encoding_used, base_filename)
                         file_elapsed = time.perf_counter() - file_start
+                        if cache_keys.get(pos) and store_parsed_tables(cache_keys[pos], tables):
+                            stored_in_cache += 1
+
+                    for table in tables:
+                        idx_in_file = per_file_table_idx.get(base_filename, 0)
+                        per_file_table_idx[base_filename] = idx_in_file + 1
+                        table_entries.append({"df": table["df"], "sheet_candidate": table["sheet_candidate"], "log_file": base_filename, "tables_in_log": table["tables_in_log"], "note": table["note"] or "", "idx_in_file": idx_in_file})
 
-                        if show_phase_timings:
-                            tag = "[SLOW]" if any_slow or (file_elapsed >= float(slow_file_seconds_threshold)) else ""
+                    if show_phase_timings and tables:
+                        any_slow = any(float(t["elapsed"]) >= float(slow_file_seconds_threshold) for t in tables)
+                        tag = "[CACHED]" if from_cache else ("[SLOW]" if any_slow or (file_elapsed >= float(slow_file_seconds_threshold)) else "")
+                        if not tables[0]["sliced"]:
+                            _log_info(f"PHASE 1: Parse all log/txt files - MO parse {file_counter:>3}: '{tables[0]['sheet_candidate']}' (File: {base_filename}) --> took {file_elapsed:.3f}s {tag}")
+                        else:
                             unique_mo_names: List[str] = []
                             seen = set()
-                            for n in mo_names:
+                            for t in tables:
+                                n = t["sheet_candidate"]
                                 if n and n not in seen:
                                     seen.add(n)
                                     unique_mo_names.append(n)
 
                             mo_name_for_log = unique_mo_names[0] if unique_mo_names else "MO NOT FOUND"
-                            _log_info(f"PHASE 1: Parse all log/txt files - MO parse {file_counter:>3}: '{mo_name_for_log}' (File: '{base_filename}' ({tables_in_log} tables)) --> took {file_elapsed:.3f}s {tag}")
+                            _log_info(f"PHASE 1: Parse all log/txt files - MO parse {file_counter:>3}: '{mo_name_for_log}' (File: '{base_filename}' ({len(tables)} tables)) --> took {file_elapsed:.3f}s {tag}")
+
+                if stored_in_cache:
+                    evict_parse_cache()
 
             # =====================================================================
             #                PHASE 2: Determine final sorting order
@@ -423,7 +410,8 @@ class ConfigurationAudit:
                     logs_list = list(dict.fromkeys(logs_list))  # unique, preserve order
 
                     if source_zip_path:
-                        zip_disp = pretty_path(source_zip_path)
+                        # NEW: zip-native input_dir ("<zip>/<dir>") already is the member folder inside the ZIP
+                        zip_disp = pretty_path(input_dir if split_zip_log_path(input_dir) is not None else source_zip_path)
                         logpath_disp = ", ".join([f"{zip_disp}/{lf}" for lf in logs_list]) if logs_list else zip_disp
                     else:
                         logpath_disp = pretty_path(input_dir)
@@ -703,6 +691,13 @@ class ConfigurationAudit:
                 self._last_param_mismatch_nr_df = param_mismatch_nr_df
                 self._last_param_mismatch_gu_df = param_mismatch_gu_df
 
+                # Let callers (e.g. ConsistencyChecks running PRE/POST audits concurrently) start working while Excel/PPT are still being written
+                if on_summary_ready is not None:
+                    try:
+                        on_summary_ready(summary_audit_df, excel_path)
+                    except Exception as ex:
+                        _log_warn(f"PHASE 4.3: on_summary_ready callback failed: {ex}")
+
             # ------------------------------------------------------------------
             # Re-inject modified audit tables back into table_entries
             # ------------------------------------------------------------------
@@ -746,6 +741,7 @@ class ConfigurationAudit:
             # =====================================================================
             #                PHASE 5: Write the Excel file
             # =====================================================================
+            companion_writer: Optional[CompanionWorkbookWriter] = None
             with log_phase_timer("PHASE 5: Write Excel", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
                 tmp_dir, tmp_excel_path = _make_temp_xlsx_path(excel_path_long)
                 tmp_excel_path_long = to_long_path(tmp_excel_path)
@@ -758,7 +754,6 @@ class ConfigurationAudit:
                     _log_info(f"PHASE 5.0: ExcelWriter OPEN starting → tmp: '{pretty_path(tmp_excel_path)}'")
 
                     writer = None
-                    writer_closed = False
                     try:
                         excel_engine = "openpyxl"
                         if fast_excel_export:
@@ -770,9 +765,10 @@ class ConfigurationAudit:
                                 excel_engine = "openpyxl"
 
                         if excel_engine == "xlsxwriter":
-                            # NOTE: Do NOT enable constant_memory when using pandas.to_excel().
+                            # NOTE: Do NOT enable constant_memory workbook-wide when using pandas.to_excel().
                             # Pandas writes cells in an order that violates xlsxwriter constant_memory constraints (row-ordered writes only).
                             # If enabled, sheets end up with only the first column written (and sometimes the last row looks "complete").
+                            # Parsed MO sheets (PHASE 5.3) are written row-ordered by write_df_streaming(), which enables constant_memory per sheet.
                             xlsxwriter_options = {"strings_to_urls": False, "strings_to_numbers": False}
                             writer = pd.ExcelWriter(tmp_excel_path_long, engine="xlsxwriter", engine_kwargs={"options": xlsxwriter_options})
                         else:
@@ -781,6 +777,19 @@ class ConfigurationAudit:
                         written_sheet_dfs: dict[str, pd.DataFrame] = {}
                         _log_info(f"PHASE 5.0: Using Excel engine: {excel_engine}")
 
+                        # NEW: split mode -> raw MO tables go to companion workbooks written by background processes
+                        # while this process keeps writing (and styling) the main workbook.
+                        me_context_sheet = candidate_to_final_sheet.get("MeContext", "MeContext")
+                        autofit_rows_streaming = fast_excel_autofit_rows if excel_engine == "xlsxwriter" else 50
+                        autofit_width_streaming = fast_excel_autofit_max_width if excel_engine == "xlsxwriter" else 100
+                        spill_policy, spill_rows = resolve_sheet_spill(spill_policy, spill_rows)
+                        external_sheet_map: dict[str, str] = {}
+                        if split_workbooks:
+                            companion_sheets = [(str(e["final_sheet"]), e["df"]) for e in table_entries if not bool(e.get("skip_write", False)) and str(e["final_sheet"]) != me_context_sheet]
+                            companion_writer = CompanionWorkbookWriter(base_output_dir_long, plan_companion_workbooks(companion_sheets, versioned_suffix), excel_engine, autofit_rows_streaming, autofit_width_streaming, os.path.basename(excel_path), log_fn=_log_info, log_warn_fn=_log_warn, spill_policy=spill_policy, spill_rows=spill_rows, versioned_suffix=versioned_suffix)
+                            external_sheet_map = companion_writer.external_sheet_map()
+                            companion_writer.start()
+
                         t_open1 = time.perf_counter()
                         _log_info(f"PHASE 5.0: ExcelWriter OPEN done in {format_duration_hms(t_open1 - t_open0)} ({t_open1 - t_open0:.3f}s)")
 
@@ -1082,11 +1091,10 @@ class ConfigurationAudit:
                             summary_audit_df.to_excel(writer, sheet_name="SummaryAudit", index=False)
                             written_sheet_dfs["SummaryAudit"] = summary_audit_df
 
-                            # Apply alternating background colors by Category for SummaryAudit sheet
-                            # NOTE: apply_alternating_category_row_fills is openpyxl-only (xlsxwriter Worksheet is not subscriptable)
+                            # Apply alternating background colors by Category for SummaryAudit sheet (conditional formatting ranges, both engines)
                             ws_summary_audit = writer.sheets.get("SummaryAudit")
-                            if excel_engine == "openpyxl" and ws_summary_audit is not None:
-                                apply_alternating_category_row_fills(ws_summary_audit, category_header="Category")
+                            if ws_summary_audit is not None:
+                                apply_alternating_category_row_fills(ws_summary_audit, category_header="Category", df=summary_audit_df, workbook=writer.book)
 
 
                             # New: separate NR / LTE param mismatching sheets
@@ -1124,15 +1132,29 @@ class ConfigurationAudit:
                         with log_phase_timer("PHASE 5.3: Write parsed MO tables", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
                             # Then write each table in the final determined order
                             written = 0
-                            total_to_write = sum(1 for e in table_entries if not bool(e.get("skip_write", False)))
+                            total_to_write = sum(1 for e in table_entries if not bool(e.get("skip_write", False)) and str(e["final_sheet"]) not in external_sheet_map)
+
+                            # NEW: MO sheets are streamed row by row (constant memory with xlsxwriter) and styled at write time,
+                            # so PHASE 5.4 does not need to revisit their cells. MeContext keeps the pandas path because PHASE 5.4
+                            # rewrites its header row (vertical headers) and adds conditional formatting.
+                            streamed_sheets: set[str] = set()
+                            spill_used_sheet_names: set[str] = set(used_sheet_names) | set(writer.sheets)
 
                             for entry in table_entries:
-                                if bool(entry.get("skip_write", False)):
+                                if bool(entry.get("skip_write", False)) or str(entry["final_sheet"]) in external_sheet_map:
                                     continue
 
                                 written += 1
                                 sheet_start = time.perf_counter()
-                                entry["df"].to_excel(writer, sheet_name=entry["final_sheet"], index=False)
+                                if str(entry["final_sheet"]) == me_context_sheet:
+                                    entry["df"].to_excel(writer, sheet_name=entry["final_sheet"], index=False)
+                                else:
+                                    spill = write_df_with_spill(writer, entry["df"], str(entry["final_sheet"]), spill_used_sheet_names, base_output_dir_long, f"RawMO_{entry['final_sheet']}_{versioned_suffix}", spill_policy=spill_policy, spill_rows=spill_rows,
+                                                                freeze_header=True, align="left", autofit_rows=autofit_rows_streaming, max_col_width=autofit_width_streaming, a1_hyperlink_sheet="SummaryAudit")
+                                    streamed_sheets.update(spill["sheets"])
+                                    if spill["policy"]:
+                                        spill_target = f"{len(spill['sheets'])} sheets" if spill["policy"] == "sheets" else f"'{pretty_path(str(spill['file']))}'"
+                                        _log_info(f"PHASE 5.3: '{entry['final_sheet']}' has {len(entry['df'])} rows (> {spill_rows} per sheet): spilled ({spill['policy']}) to {spill_target}")
                                 written_sheet_dfs[str(entry["final_sheet"])] = entry["df"]
                                 sheet_elapsed = time.perf_counter() - sheet_start
 
@@ -1148,14 +1170,14 @@ class ConfigurationAudit:
                         # ------------------------------------------------------------------
                         with log_phase_timer("PHASE 5.4: Style sheets (tabs, headers, autofit, hyperlinks)", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
                             if excel_engine == "xlsxwriter":
-                                style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs=written_sheet_dfs, freeze_header=True, align="left", max_autofit_rows=fast_excel_autofit_rows, max_col_width=fast_excel_autofit_max_width, enable_a1_hyperlinks=True, hyperlink_sheet="SummaryAudit", category_sheet_map=candidate_to_final_sheet)
+                                style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs=written_sheet_dfs, freeze_header=True, align="left", max_autofit_rows=fast_excel_autofit_rows, max_col_width=fast_excel_autofit_max_width, enable_a1_hyperlinks=True, hyperlink_sheet="SummaryAudit", category_sheet_map=candidate_to_final_sheet, skip_sheets=streamed_sheets, external_sheet_map=external_sheet_map)
                             else:
                                 # Color the 'Summary*' tabs in green
                                 color_summary_tabs(writer, prefix="Summary", rgb_hex="00B050")
 
                                 # Apply header color + auto-fit to all sheets
                                 # Optimization: default autofit only scans the first N rows (handled inside style_headers_autofilter_and_autofit)
-                                style_headers_autofilter_and_autofit(writer, freeze_header=True, align="left", enable_a1_hyperlink=True, hyperlink_sheet="SummaryAudit", category_sheet_map=candidate_to_final_sheet)
+                                style_headers_autofilter_and_autofit(writer, freeze_header=True, align="left", enable_a1_hyperlink=True, hyperlink_sheet="SummaryAudit", category_sheet_map=candidate_to_final_sheet, skip_sheets=streamed_sheets, external_sheet_map=external_sheet_map, sheet_dfs=written_sheet_dfs)
 
                             # MeContext additional conditional formatting (based on slide requirements)
                             try:
@@ -1225,143 +1247,90 @@ class ConfigurationAudit:
                                         idx = me_col_map.get(col_name)
                                         return get_column_letter(idx) if idx else None
 
-                                    def _add_fmt_equals_xlsx(col_target: str, col_ref: str, hex_color: str) -> None:
+                                    # Engine-agnostic rules (formula-based conditional formatting ranges, applied by add_conditional_formats)
+                                    me_last_row = len(me_df) + 1
+                                    me_rules: list[dict] = []
+
+                                    def _add_rule(col_target: str, formula: str, hex_color: str) -> None:
+                                        ct = _xl_col(col_target)
+                                        if ct:
+                                            me_rules.append({"range": f"{ct}2:{ct}{me_last_row}", "formula": formula, "bg_color": hex_color})
+
+                                    def _add_fmt_equals(col_target: str, col_ref: str, hex_color: str) -> None:
                                         ct = _xl_col(col_target)
                                         cr = _xl_col(col_ref)
-                                        if not ct or not cr:
-                                            return
-                                        ws_me.conditional_format(
-                                            1,
-                                            me_col_map[col_target] - 1,
-                                            len(me_df),
-                                            me_col_map[col_target] - 1,
-                                            {
-                                                "type": "formula",
-                                                "criteria": f"=${ct}2=${cr}2",
-                                                "format": writer.book.add_format({"bg_color": hex_color}),
-                                            },
-                                        )
-
-                                    if excel_engine == "xlsxwriter":
-                                        fmt_yellow = writer.book.add_format({"bg_color": "#FFF2CC"})
-                                        fmt_green = writer.book.add_format({"bg_color": "#C6EFCE"})
-                                        fmt_red = writer.book.add_format({"bg_color": "#FFC7CE"})
-                                        fmt_gray = writer.book.add_format({"bg_color": "#D9D9D9"})
-
-                                        for col_name in [
-                                            "N77 Cells",
-                                            "N77A old SSB cells",
-                                            "NRFreqRelation to old N77A SSB",
-                                            "GUtranFreqRelation to old N77A SSB",
-                                        ]:
-                                            idx = me_col_map.get(col_name)
-                                            if idx:
-                                                ws_me.conditional_format(1, idx - 1, len(me_df), idx - 1, {"type": "cell", "criteria": ">", "value": 0, "format": fmt_yellow})
-
-                                        _add_fmt_equals_xlsx("N77A new SSB cells", "N77A old SSB cells", "#C6EFCE")
-                                        _add_fmt_equals_xlsx("NRFreqRelation to new N77A SSB", "NRFreqRelation to old N77A SSB", "#C6EFCE")
-                                        _add_fmt_equals_xlsx("GUtranFreqRelation to new N77A SSB", "GUtranFreqRelation to old N77A SSB", "#C6EFCE")
-                                        _add_fmt_equals_xlsx("NRFreqRelation to new N77A SSB cellReselPrio", "NRFreqRelation to old N77A SSB cellReselPrio", "#C6EFCE")
-
-                                        nr_new = _xl_col("NRFreqRelation to new N77A SSB cellReselPrio")
-                                        nr_old = _xl_col("NRFreqRelation to old N77A SSB cellReselPrio")
-                                        if nr_new and nr_old:
-                                            ws_me.conditional_format(1, me_col_map["NRFreqRelation to new N77A SSB cellReselPrio"] - 1, len(me_df), me_col_map["NRFreqRelation to new N77A SSB cellReselPrio"] - 1, {"type": "formula", "criteria": f"=AND(${nr_new}2<>\"\",${nr_old}2<>\"\",${nr_new}2<>${nr_old}2)", "format": fmt_red})
-
-                                        _add_fmt_equals_xlsx("GUtranFreqRelation to new N77A SSB cellReselPrio", "NRFreqRelation to old N77A SSB cellReselPrio", "#C6EFCE")
-                                        gu_new_resel = _xl_col("GUtranFreqRelation to new N77A SSB cellReselPrio")
-                                        if gu_new_resel and nr_old:
-                                            ws_me.conditional_format(1, me_col_map["GUtranFreqRelation to new N77A SSB cellReselPrio"] - 1, len(me_df), me_col_map["GUtranFreqRelation to new N77A SSB cellReselPrio"] - 1, {"type": "formula", "criteria": f"=AND(${gu_new_resel}2<>\"\",${nr_old}2<>\"\",${gu_new_resel}2<>${nr_old}2)", "format": fmt_red})
-
-                                        gu_old_endc = _xl_col("GUtranFreqRelation to old N77A SSB EndcPrio")
-                                        gu_new_endc = _xl_col("GUtranFreqRelation to new N77A SSB EndcPrio")
-                                        if gu_old_endc and gu_new_endc:
-                                            ws_me.conditional_format(1, me_col_map["GUtranFreqRelation to new N77A SSB EndcPrio"] - 1, len(me_df), me_col_map["GUtranFreqRelation to new N77A SSB EndcPrio"] - 1, {"type": "formula", "criteria": f"=AND(${gu_new_endc}2<>\"\",${gu_old_endc}2<>\"\",${gu_new_endc}2=${gu_old_endc}2)", "format": fmt_red})
-
-                                        step1_col = _xl_col("Step1")
-                                        if step1_col:
-                                            ws_me.conditional_format(1, me_col_map["Step1"] - 1, len(me_df), me_col_map["Step1"] - 1, {"type": "formula", "criteria": f"=${step1_col}2=\"SkipNoRels\"", "format": fmt_gray})
-
-                                        step2ac_col = _xl_col("Step2ac")
-                                        if step2ac_col:
-                                            ws_me.conditional_format(1, me_col_map["Step2ac"] - 1, len(me_df), me_col_map["Step2ac"] - 1, {"type": "formula", "criteria": f"=ISNUMBER(SEARCH(\"Review\",${step2ac_col}2))", "format": fmt_red})
-                                            ws_me.conditional_format(1, me_col_map["Step2ac"] - 1, len(me_df), me_col_map["Step2ac"] - 1, {"type": "formula", "criteria": f"=${step2ac_col}2=\"SkipNoRels\"", "format": fmt_gray})
-                                    else:
-                                        from openpyxl.formatting.rule import FormulaRule, CellIsRule
-
-                                        for col_name in [
-                                            "N77 Cells",
-                                            "N77A old SSB cells",
-                                            "NRFreqRelation to old N77A SSB",
-                                            "GUtranFreqRelation to old N77A SSB",
-                                        ]:
-                                            cl = _xl_col(col_name)
-                                            if cl:
-                                                ws_me.conditional_formatting.add(
-                                                    f"{cl}2:{cl}{len(me_df)+1}",
-                                                    CellIsRule(operator="greaterThan", formula=["0"], stopIfTrue=False, fill=PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")),
-                                                )
-
-                                        def _add_fmt_equals_openpyxl(col_target: str, col_ref: str, rgb: str) -> None:
-                                            ct = _xl_col(col_target)
-                                            cr = _xl_col(col_ref)
-                                            if not ct or not cr:
-                                                return
-                                            ws_me.conditional_formatting.add(
-                                                f"{ct}2:{ct}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=${ct}2=${cr}2"], stopIfTrue=False, fill=PatternFill(start_color=rgb, end_color=rgb, fill_type="solid")),
-                                            )
-
-                                        _add_fmt_equals_openpyxl("N77A new SSB cells", "N77A old SSB cells", "C6EFCE")
-                                        _add_fmt_equals_openpyxl("NRFreqRelation to new N77A SSB", "NRFreqRelation to old N77A SSB", "C6EFCE")
-                                        _add_fmt_equals_openpyxl("GUtranFreqRelation to new N77A SSB", "GUtranFreqRelation to old N77A SSB", "C6EFCE")
-                                        _add_fmt_equals_openpyxl("NRFreqRelation to new N77A SSB cellReselPrio", "NRFreqRelation to old N77A SSB cellReselPrio", "C6EFCE")
-                                        _add_fmt_equals_openpyxl("GUtranFreqRelation to new N77A SSB cellReselPrio", "NRFreqRelation to old N77A SSB cellReselPrio", "C6EFCE")
-
-                                        nr_new = _xl_col("NRFreqRelation to new N77A SSB cellReselPrio")
-                                        nr_old = _xl_col("NRFreqRelation to old N77A SSB cellReselPrio")
-                                        if nr_new and nr_old:
-                                            ws_me.conditional_formatting.add(
-                                                f"{nr_new}2:{nr_new}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=AND(${nr_new}2<>\"\",${nr_old}2<>\"\",${nr_new}2<>${nr_old}2)"], stopIfTrue=False, fill=PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")),
-                                            )
-
-                                        gu_new_resel = _xl_col("GUtranFreqRelation to new N77A SSB cellReselPrio")
-                                        if gu_new_resel and nr_old:
-                                            ws_me.conditional_formatting.add(
-                                                f"{gu_new_resel}2:{gu_new_resel}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=AND(${gu_new_resel}2<>\"\",${nr_old}2<>\"\",${gu_new_resel}2<>${nr_old}2)"], stopIfTrue=False, fill=PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")),
-                                            )
-
-                                        gu_old_endc = _xl_col("GUtranFreqRelation to old N77A SSB EndcPrio")
-                                        gu_new_endc = _xl_col("GUtranFreqRelation to new N77A SSB EndcPrio")
-                                        if gu_old_endc and gu_new_endc:
-                                            ws_me.conditional_formatting.add(
-                                                f"{gu_new_endc}2:{gu_new_endc}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=AND(${gu_new_endc}2<>\"\",${gu_old_endc}2<>\"\",${gu_new_endc}2=${gu_old_endc}2)"], stopIfTrue=False, fill=PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")),
-                                            )
-
-                                        step1_col = _xl_col("Step1")
-                                        if step1_col:
-                                            ws_me.conditional_formatting.add(
-                                                f"{step1_col}2:{step1_col}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=${step1_col}2=\"SkipNoRels\""], stopIfTrue=False, fill=PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")),
-                                            )
-
-                                        step2ac_col = _xl_col("Step2ac")
-                                        if step2ac_col:
-                                            ws_me.conditional_formatting.add(
-                                                f"{step2ac_col}2:{step2ac_col}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=ISNUMBER(SEARCH(\"Review\",${step2ac_col}2))"], stopIfTrue=False, fill=PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")),
-                                            )
-                                            ws_me.conditional_formatting.add(
-                                                f"{step2ac_col}2:{step2ac_col}{len(me_df)+1}",
-                                                FormulaRule(formula=[f"=${step2ac_col}2=\"SkipNoRels\""], stopIfTrue=False, fill=PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")),
-                                            )
+                                        if ct and cr:
+                                            _add_rule(col_target, f"=${ct}2=${cr}2", hex_color)
+
+                                    for col_name in [
+                                        "N77 Cells",
+                                        "N77A old SSB cells",
+                                        "NRFreqRelation to old N77A SSB",
+                                        "GUtranFreqRelation to old N77A SSB",
+                                    ]:
+                                        cl = _xl_col(col_name)
+                                        if cl:
+                                            _add_rule(col_name, f"=${cl}2>0", "FFF2CC")
+
+                                    _add_fmt_equals("N77A new SSB cells", "N77A old SSB cells", "C6EFCE")
+                                    _add_fmt_equals("NRFreqRelation to new N77A SSB", "NRFreqRelation to old N77A SSB", "C6EFCE")
+                                    _add_fmt_equals("GUtranFreqRelation to new N77A SSB", "GUtranFreqRelation to old N77A SSB", "C6EFCE")
+                                    _add_fmt_equals("NRFreqRelation to new N77A SSB cellReselPrio", "NRFreqRelation to old N77A SSB cellReselPrio", "C6EFCE")
+                                    _add_fmt_equals("GUtranFreqRelation to new N77A SSB cellReselPrio", "NRFreqRelation to old N77A SSB cellReselPrio", "C6EFCE")
+
+                                    nr_new = _xl_col("NRFreqRelation to new N77A SSB cellReselPrio")
+                                    nr_old = _xl_col("NRFreqRelation to old N77A SSB cellReselPrio")
+                                    if nr_new and nr_old:
+                                        _add_rule("NRFreqRelation to new N77A SSB cellReselPrio", f"=AND(${nr_new}2<>\"\",${nr_old}2<>\"\",${nr_new}2<>${nr_old}2)", "FFC7CE")
+
+                                    gu_new_resel = _xl_col("GUtranFreqRelation to new N77A SSB cellReselPrio")
+                                    if gu_new_resel and nr_old:
+                                        _add_rule("GUtranFreqRelation to new N77A SSB cellReselPrio", f"=AND(${gu_new_resel}2<>\"\",${nr_old}2<>\"\",${gu_new_resel}2<>${nr_old}2)", "FFC7CE")
+
+                                    gu_old_endc = _xl_col("GUtranFreqRelation to old N77A SSB EndcPrio")
+                                    gu_new_endc = _xl_col("GUtranFreqRelation to new N77A SSB EndcPrio")
+                                    if gu_old_endc and gu_new_endc:
+                                        _add_rule("GUtranFreqRelation to new N77A SSB EndcPrio", f"=AND(${gu_new_endc}2<>\"\",${gu_old_endc}2<>\"\",${gu_new_endc}2=${gu_old_endc}2)", "FFC7CE")
+
+                                    step1_col = _xl_col("Step1")
+                                    if step1_col:
+                                        _add_rule("Step1", f"=${step1_col}2=\"SkipNoRels\"", "D9D9D9")
+
+                                    step2ac_col = _xl_col("Step2ac")
+                                    if step2ac_col:
+                                        _add_rule("Step2ac", f"=ISNUMBER(SEARCH(\"Review\",${step2ac_col}2))", "FFC7CE")
+                                        _add_rule("Step2ac", f"=${step2ac_col}2=\"SkipNoRels\"", "D9D9D9")
+
+                                    add_conditional_formats(ws_me, me_rules, workbook=writer.book)
                             except Exception as ex:
                                 _log_warn(f"PHASE 5.4: Could not apply MeContext conditional formatting: {ex}")
 
+                    except Exception:
+                        # Safety close (avoid leaked handles if something fails mid-write)
+                        try:
+                            if writer is not None:
+                                writer.close()
+                        except Exception:
+                            pass
+                        raise
+                except Exception:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise
+
+            t_written = time.perf_counter()
+
+            # Same-process readers of this workbook (ConsistencyChecks, correction command exporters...) get these frames instead of parsing the XLSX
+            register_artifact(excel_path, written_sheet_dfs)
 
+            def _finalize_outputs() -> List[str]:
+                """
+                PHASE 5.5 - 7: close the populated workbook and move it into place, export Correction Commands and build the PPT.
+                Only uses in-memory frames, so it can run inline or on a background output stage (output_stage).
+                Returns the written artifact paths.
+                """
+                artifacts: List[str] = []
+                try:
+                    try:
                         # ------------------------------------------------------------------
                         # PHASE 5.5: CLOSE / FINALIZE workbook
                         # ------------------------------------------------------------------
@@ -1369,20 +1338,18 @@ class ConfigurationAudit:
                         t_close0 = time.perf_counter()
 
                         writer.close()  # <-- this is where openpyxl can take minutes
-                        writer_closed = True
 
                         t_close1 = time.perf_counter()
 
                         _log_info(f"PHASE 5.5: ExcelWriter CLOSE done in {format_duration_hms(t_close1 - t_close0)} ({t_close1 - t_close0:.3f}s)")
 
-                    finally:
+                    except Exception:
                         # Safety close (avoid leaked handles if something fails mid-write)
                         try:
-                            if writer is not None and not writer_closed:
-                                # If already closed, this is a no-op / may raise; ignore.
-                                writer.close()
+                            writer.close()
                         except Exception:
                             pass
+                        raise
 
                     # ----------------------------------------------------------------------
                     # PHASE 5.6: Inspect temp file size after close (helps diagnose)
@@ -1399,41 +1366,69 @@ class ConfigurationAudit:
                     with log_phase_timer("PHASE 5.7: Move Excel into destination", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
                         # Move into final destination (prefer atomic replace)
                         _move_into_place(tmp_excel_path_long, excel_path_long)
+                        artifacts.append(excel_path)
 
                 finally:
                     shutil.rmtree(tmp_dir, ignore_errors=True)
 
-            t_close2 = time.perf_counter()
-            _log_info(f"PHASE 5: Wrote Excel with {len(table_entries)} sheet(s) in {format_duration_hms(t_close2 - t_open0)} ({t_close2 - t_open0:.3f}s)")
-            _log_info(f"PHASE 5: Wrote Excel with {len(table_entries)} sheet(s) in: '{pretty_path(excel_path)}'")
-
-            # =====================================================================
-            #                PHASE 6: Export Correction Commands (ConfigurationAudit)
-            # =====================================================================
-            if export_correction_cmd:
-                with log_phase_timer("PHASE 6: Export Correction Commands", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
-                    sheet_dfs_map: dict[str, pd.DataFrame] = {str(e.get("final_sheet", "")).strip(): df for e in table_entries if not bool(e.get("skip_write", False)) and str(e.get("final_sheet", "")).strip() and isinstance((df := e.get("df")), pd.DataFrame)}
-
-                    # Export External / TermPoint commands (use in-memory DataFrames to avoid re-reading XLSX)
-                    export_external_and_termpoint_commands(excel_path_long, base_output_dir_long, base_folder_name=correction_cmd_folder_name, sheet_dfs=sheet_dfs_map, export_to_zip=True, module_name=module_name)
-
-                    # Export any other sheet containing a 'Correction_Cmd' column (NRCellRelation, GUtranCellRelation, etc.)
-                    export_all_sheets_with_correction_commands(excel_path_long, base_output_dir_long, base_folder_name=correction_cmd_folder_name, sheet_dfs=sheet_dfs_map, export_to_zip=True, module_name=module_name,
-                                                               exclude_sheets={"Summary", "SummaryAudit", "Summary Param Mismatch NR", "Summary Param Mismatch GU", "ExternalNRCellCU", "ExternalGUtranCell", "TermPointToGNodeB", "TermPointToGNB", "NRCellRelation", "GUtranCellRelation"})
+                # ----------------------------------------------------------------------
+                # PHASE 5.8: Parquet sidecar of the Summary sheets (reused audits load it instead of parsing the XLSX)
+                # ----------------------------------------------------------------------
+                sidecar_dir = write_workbook_sidecar(excel_path, written_sheet_dfs)
+                if sidecar_dir:
+                    # Typed SummaryAudit model (stable metric ids + node dictionary) for tools that read node sets directly
+                    summary_audit_model_for(summary_audit_df).to_parquet(os.path.join(sidecar_dir, SUMMARY_AUDIT_MODEL_FILE))
+                    artifacts.append(sidecar_dir)
+                    _log_info(f"PHASE 5.8: Parquet sidecar written in: '{pretty_path(sidecar_dir)}'")
+
+                t_close2 = time.perf_counter()
+                _log_info(f"PHASE 5: Wrote Excel with {len(table_entries)} sheet(s) in {format_duration_hms(t_close2 - t_open0)} ({t_close2 - t_open0:.3f}s)")
+                _log_info(f"PHASE 5: Wrote Excel with {len(table_entries)} sheet(s) in: '{pretty_path(excel_path)}'")
+
+                # =====================================================================
+                #                PHASE 6: Export Correction Commands (ConfigurationAudit)
+                # =====================================================================
+                if export_correction_cmd:
+                    with log_phase_timer("PHASE 6: Export Correction Commands", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
+                        sheet_dfs_map: dict[str, pd.DataFrame] = {str(e.get("final_sheet", "")).strip(): df for e in table_entries if not bool(e.get("skip_write", False)) and str(e.get("final_sheet", "")).strip() and isinstance((df := e.get("df")), pd.DataFrame)}
+
+                        # Export External / TermPoint commands (use in-memory DataFrames to avoid re-reading XLSX)
+                        export_external_and_termpoint_commands(excel_path_long, base_output_dir_long, base_folder_name=correction_cmd_folder_name, sheet_dfs=sheet_dfs_map, export_to_zip=True, module_name=module_name)
+
+                        # Export any other sheet containing a 'Correction_Cmd' column (NRCellRelation, GUtranCellRelation, etc.)
+                        export_all_sheets_with_correction_commands(excel_path_long, base_output_dir_long, base_folder_name=correction_cmd_folder_name, sheet_dfs=sheet_dfs_map, export_to_zip=True, module_name=module_name,
+                                                                   exclude_sheets={"Summary", "SummaryAudit", "Summary Param Mismatch NR", "Summary Param Mismatch GU", "ExternalNRCellCU", "ExternalGUtranCell", "TermPointToGNodeB", "TermPointToGNB", "NRCellRelation", "GUtranCellRelation"})
+                        cmd_dir = os.path.join(base_output_dir, correction_cmd_folder_name)
+                        if os.path.isdir(to_long_path(cmd_dir)):
+                            artifacts.append(cmd_dir)
+                else:
+                    _log_info("PHASE 6: Export Correction Commands skipped (export_correction_cmd=False or is a Pre-Audit).")
+
+                # =====================================================================
+                #                PHASE 7: Generate PPT textual summary
+                # =====================================================================
+                with log_phase_timer("PHASE 7: Generate PPT summary", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
+                    try:
+                        ppt_path = generate_ppt_summary(summary_audit_df, excel_path, module_name)
+                        if ppt_path:
+                            artifacts.append(ppt_path)
+                            _log_info(f"PPT summary generated in: '{pretty_path(ppt_path)}'")
+                    except Exception as ex:
+                        # Never fail the whole module just for PPT creation
+                        _log_warn(f"PPT summary generation failed: {ex}")
+
+                # Barrier: companion workbooks must be complete before the module reports its output
+                if companion_writer is not None:
+                    artifacts.extend(companion_writer.wait())
+                return artifacts
+
+            if output_stage is not None:
+                # Workbook is populated and every frame is in memory: the caller continues (next folder / POST audit / comparison)
+                # while close + ZIP + PPT run on the background output stage (its wait() is the barrier that reports the artifacts).
+                _log_info(f"PHASE 5: Workbook populated in {format_duration_hms(t_written - t_open0)} ({t_written - t_open0:.3f}s). Excel close, Correction Commands and PPT continue in background.")
+                output_stage.submit(f"ConfigurationAudit {versioned_suffix}".strip(), _finalize_outputs)
             else:
-                _log_info("PHASE 6: Export Correction Commands skipped (export_correction_cmd=False or is a Pre-Audit).")
-
-            # =====================================================================
-            #                PHASE 7: Generate PPT textual summary
-            # =====================================================================
-            with log_phase_timer("PHASE 7: Generate PPT summary", log_fn=_log_info, show_start=show_phase_starts, show_end=False, show_timing=show_phase_timings, line_prefix="", start_level="INFO", end_level="INFO", timing_level="INFO"):
-                try:
-                    ppt_path = generate_ppt_summary(summary_audit_df, excel_path, module_name)
-                    if ppt_path:
-                        _log_info(f"PPT summary generated in: '{pretty_path(ppt_path)}'")
-                except Exception as ex:
-                    # Never fail the whole module just for PPT creation
-                    _log_warn(f"PPT summary generation failed: {ex}")
+                _finalize_outputs()
 
             overall_elapsed = time.perf_counter() - overall_start
             if show_phase_timings:
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+Companion workbooks for ConfigurationAudit (split output mode).
+
+The main ConfigurationAudit_<suffix>.xlsx keeps Summary, SummaryAudit, pivots and MeContext, while the raw MO
+tables are written to one companion workbook per MO group (NR, LTE, Profiles, Externals, Other) under
+<output_dir>/RawMO_Workbooks/. Every companion workbook is written by its own process, concurrently with the
+main workbook, and hyperlinks cross between them (SummaryAudit.Category -> companion sheet, companion A1 -> SummaryAudit).
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.utils_io import to_long_path, pretty_path
+from src.utils.utils_excel import write_df_with_spill
+
+
+RAW_MO_FOLDER = "RawMO_Workbooks"
+MO_GROUPS = ("NR", "LTE", "Profiles", "Externals", "Other")
+
+
+def classify_mo_group(sheet_name: str) -> str:
+    """
+    Map a raw MO sheet name to its companion workbook group.
+    Order matters: profiles and externals/termpoints win over the NR/LTE prefixes (e.g. ExternalGUtranCell -> Externals).
+    """
+    low = str(sheet_name or "").strip().lower()
+    if "profile" in low:
+        return "Profiles"
+    if low.startswith(("external", "termpoint")):
+        return "Externals"
+    if low.startswith(("gutran", "eutran", "enodeb", "lte", "geran", "utran")) or "eutran" in low or "gutran" in low:
+        return "LTE"
+    if low.startswith(("nr", "gnb", "gnodeb", "ssb")):
+        return "NR"
+    return "Other"
+
+
+def companion_workbook_name(group: str, versioned_suffix: str) -> str:
+    return f"RawMO_{group}_{versioned_suffix}.xlsx"
+
+
+def plan_companion_workbooks(sheets: List[Tuple[str, pd.DataFrame]], versioned_suffix: str) -> Dict[str, Dict[str, object]]:
+    """
+    Group (sheet_name, df) pairs by MO group, keeping the original sheet order inside each group.
+    Returns {group: {"file": "<RAW_MO_FOLDER>/<name>.xlsx", "sheets": [(sheet_name, df), ...]}} (relative paths use '/').
+    """
+    plan: Dict[str, Dict[str, object]] = {}
+    for sheet_name, df in sheets:
+        group = classify_mo_group(sheet_name)
+        if group not in plan:
+            plan[group] = {"file": f"{RAW_MO_FOLDER}/{companion_workbook_name(group, versioned_suffix)}", "sheets": []}
+        plan[group]["sheets"].append((sheet_name, df))
+    return {g: plan[g] for g in MO_GROUPS if g in plan}
+
+
+def write_companion_workbook(target_path: str, sheets: List[Tuple[str, pd.DataFrame]], excel_engine: str = "openpyxl", autofit_rows: object = 50, max_col_width: int = 100, main_workbook_relpath: Optional[str] = None, hyperlink_sheet: str = "SummaryAudit", spill_policy: Optional[str] = None, spill_rows: Optional[int] = None, versioned_suffix: str = "") -> Tuple[str, int, float]:
+    """
+    Process entry point: write one companion workbook (row-ordered streaming, styled at write time) into a temp file
+    and move it into place. A1 of every sheet links back to <main_workbook_relpath>#SummaryAudit.
+    Oversized tables follow the spill policy (paged sheets, or CSV/Parquet files next to the companion workbook).
+    Returns (target_path, sheets_written, seconds).
+    """
+    t0 = time.perf_counter()
+    target_path_long = to_long_path(target_path)
+    os.makedirs(os.path.dirname(target_path_long), exist_ok=True)
+
+    tmp_dir = tempfile.mkdtemp(prefix="SSB_RA_")
+    tmp_path = os.path.join(tmp_dir, os.path.basename(target_path_long))
+    try:
+        if excel_engine == "xlsxwriter":
+            writer = pd.ExcelWriter(tmp_path, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False, "strings_to_numbers": False}})
+        else:
+            writer = pd.ExcelWriter(tmp_path, engine="openpyxl")
+        used_sheet_names = {sheet_name for sheet_name, _ in sheets}
+        sheets_written = 0
+        try:
+            for sheet_name, df in sheets:
+                spill = write_df_with_spill(writer, df, sheet_name, used_sheet_names, os.path.dirname(target_path_long), f"RawMO_{sheet_name}_{versioned_suffix}", spill_policy=spill_policy, spill_rows=spill_rows,
+                                            freeze_header=True, align="left", autofit_rows=autofit_rows, max_col_width=max_col_width, a1_hyperlink_sheet=hyperlink_sheet if main_workbook_relpath else None, a1_hyperlink_workbook=main_workbook_relpath)
+                sheets_written += len(spill["sheets"])
+        finally:
+            writer.close()
+        try:
+            os.replace(tmp_path, target_path_long)
+        except Exception:
+            shutil.move(tmp_path, target_path_long)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return target_path, sheets_written, time.perf_counter() - t0
+
+
+class CompanionWorkbookWriter:
+    """
+    Write the companion workbooks of one ConfigurationAudit concurrently (one process per workbook).
+
+    - start(): submit every workbook and return immediately (the main workbook is written meanwhile).
+    - wait(): barrier; logs each workbook and returns the written paths. Idempotent.
+    If worker processes cannot be started, the workbooks are written sequentially in the current process.
+    """
+
+    def __init__(self, output_dir: str, plan: Dict[str, Dict[str, object]], excel_engine: str, autofit_rows: object, max_col_width: int, main_workbook_name: str, log_fn=print, log_warn_fn=print, spill_policy: Optional[str] = None, spill_rows: Optional[int] = None, versioned_suffix: str = ""):
+        self.output_dir = output_dir
+        self.plan = plan
+        self.excel_engine = excel_engine
+        self.autofit_rows = autofit_rows
+        self.max_col_width = max_col_width
+        self.main_workbook_relpath = f"../{main_workbook_name}"
+        self.log_fn = log_fn
+        self.log_warn_fn = log_warn_fn
+        self.spill_policy = spill_policy
+        self.spill_rows = spill_rows
+        self.versioned_suffix = versioned_suffix
+        self._pool = None
+        self._futures: Dict[str, object] = {}
+        self._written: List[str] = []
+        self._done = False
+
+    def _job_args(self, group: str) -> tuple:
+        spec = self.plan[group]
+        target_path = os.path.join(self.output_dir, *str(spec["file"]).split("/"))
+        return (target_path, spec["sheets"], self.excel_engine, self.autofit_rows, self.max_col_width, self.main_workbook_relpath, "SummaryAudit", self.spill_policy, self.spill_rows, self.versioned_suffix)
+
+    def external_sheet_map(self) -> Dict[str, str]:
+        """Sheet name -> companion workbook path relative to the main workbook (for SummaryAudit hyperlinks)."""
+        return {sheet_name: str(spec["file"]) for spec in self.plan.values() for sheet_name, _ in spec["sheets"]}
+
+    def start(self) -> None:
+        if not self.plan:
+            return
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=len(self.plan))
+            for group in self.plan:
+                self._futures[group] = self._pool.submit(write_companion_workbook, *self._job_args(group))
+            self.log_fn(f"PHASE 5.8: Writing {len(self.plan)} companion workbook(s) in background processes ({', '.join(self.plan)})")
+        except Exception as ex:
+            self.log_warn_fn(f"PHASE 5.8: Could not start companion workbook processes ({ex}). They will be written sequentially.")
+            self._shutdown()
+            self._futures = {}
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            try:
+                self._pool.shutdown(wait=True)
+            except Exception:
+                pass
+            self._pool = None
+
+    def wait(self) -> List[str]:
+        if self._done:
+            return self._written
+        for group in self.plan:
+            try:
+                fut = self._futures.get(group)
+                path, n_sheets, seconds = fut.result() if fut is not None else write_companion_workbook(*self._job_args(group))
+                self._written.append(path)
+                self.log_fn(f"PHASE 5.8: Companion workbook {group} ({n_sheets} sheet(s)) written in {seconds:.3f}s: '{pretty_path(path)}'")
+            except Exception as ex:
+                self.log_warn_fn(f"PHASE 5.8: Companion workbook {group} failed: {ex}")
+        self._shutdown()
+        self._done = True
+        return self._written
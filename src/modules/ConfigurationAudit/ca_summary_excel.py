@@ -16,10 +16,10 @@ IMPORTANT:
 
 
 import pandas as pd
-import re
 from typing import List, Dict
 
 from src.modules.Common.common_functions import load_nodes_names_and_id_from_summary_audit
+from src.modules.Common.summary_audit_model import normalize_metric
 from src.modules.ConfigurationAudit.ca_process_external_termpoint_tables import process_external_nr_cell_cu, process_external_gutran_cell, process_termpoint_to_gnodeb, process_termpoint_to_gnb, process_term_point_to_enodeb
 from src.modules.ConfigurationAudit.ca_process_lte_tables import process_gu_sync_signal_freq, process_gu_freq_rel, process_gu_cell_relation
 from src.modules.ConfigurationAudit.ca_process_nr_tables import process_nr_cell_du, process_nr_freq, process_nr_freq_rel, process_nr_sector_carrier, process_nr_cell_relation
@@ -686,14 +686,8 @@ def build_summary_audit(
     }
 
     if not df.empty:
-        def _normalize_metric_for_tip_lookup(text: object) -> str:
-            s = str(text or "").strip()
-            s = re.sub(r"\s*\(from [^)]*\)", "", s, flags=re.IGNORECASE)  # Remove "(from ...)" source suffix
-            s = re.sub(r"\s*\((?=[^)]*\d)[^)]*\)", "", s)  # Remove any "(...)" group containing digits (frequencies, ids, lists)
-            s = re.sub(r"\d{3,}(?:-\d+)+", "<id>", s)  # Normalize ids like 648672-30-20-0-1 or ranges 646600-660000
-            s = re.sub(r"\d{3,}", "<n>", s)  # Normalize long numeric values like 648672, 653952, 650006, etc.
-            s = re.sub(r"\s+", " ", s).strip()
-            return s.casefold()
+        # Same normalisation as the stable SummaryAuditModel metric ids
+        _normalize_metric_for_tip_lookup = normalize_metric
 
         def _tip_for_metric(row_tuple: object) -> str:
             if not isinstance(row_tuple, tuple) or len(row_tuple) != 3:
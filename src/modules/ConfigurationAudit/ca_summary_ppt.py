@@ -1,24 +1,116 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
 from pathlib import Path
+from xml.sax.saxutils import escape as xml_escape
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
+from src.modules.Common.summary_audit_model import SummaryAuditModel, SummaryKind, summary_audit_model_for
 from src.utils.utils_infrastructure import get_resource_path
 from src.utils.utils_io import to_long_path
 
 
+# ============================ PPT SUMMARY OPTIONS ============================
+# Runtime knob (set by the CLI so it is inherited by worker processes):
+#   SSB_RA_PPT_MAX_NODES_PER_METRIC = N   (default: 0 = list every node)
+# With N > 0, inconsistency/discrepancy metrics list at most N nodes and link to the workbook for the full list,
+# so audits with thousands of flagged nodes do not produce hundreds of slides.
+
+PPT_MAX_NODES_ENV = "SSB_RA_PPT_MAX_NODES_PER_METRIC"
+NODES_PER_SLIDE = 100
+NODES_PER_COLUMN = 25
+
+_A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+# Template cache: {template path -> (mtime, bytes, content body geometry or None)}. The template is read from disk once per
+# process and the geometry of the content body placeholder (inherited from layout/master, slow to resolve through
+# python-pptx) is computed once per template instead of once per node column.
+_TEMPLATE_CACHE: Dict[str, Tuple[float, bytes, Optional[Tuple[int, int, int, int]]]] = {}
+
+
+def configure_ppt_summary(max_nodes_per_metric: Optional[int] = None) -> None:
+    """Publish PPT summary options as environment variables (inherited by spawned worker processes)."""
+    if max_nodes_per_metric is not None:
+        os.environ[PPT_MAX_NODES_ENV] = str(max(0, int(max_nodes_per_metric)))
+
+
+def _resolve_max_nodes_per_metric(max_nodes_per_metric: Optional[int]) -> int:
+    if max_nodes_per_metric is not None:
+        return max(0, int(max_nodes_per_metric))
+    try:
+        return max(0, int(str(os.environ.get(PPT_MAX_NODES_ENV, "0")).strip() or 0))
+    except Exception:
+        return 0
+
+
+def _load_template_bytes(template_path: str) -> bytes:
+    """Return the template file content, read from disk only when it is new or changed."""
+    mtime = os.path.getmtime(template_path)
+    cached = _TEMPLATE_CACHE.get(template_path)
+    if cached is None or cached[0] != mtime:
+        with open(template_path, "rb") as f:
+            cached = (mtime, f.read(), None)
+        _TEMPLATE_CACHE[template_path] = cached
+    return cached[1]
+
+
+def _cached_body_geometry(template_path: Optional[str], body) -> Tuple[int, int, int, int]:
+    """(left, top, width, height) of the content body placeholder, resolved once per template."""
+    cached = _TEMPLATE_CACHE.get(template_path) if template_path else None
+    if cached is not None and cached[2] is not None:
+        return cached[2]
+    geometry = (int(body.left), int(body.top), int(body.width), int(body.height))
+    if cached is not None:
+        _TEMPLATE_CACHE[template_path] = (cached[0], cached[1], geometry)
+    return geometry
+
+
+def _paragraph_xml(text: str, level: int, size_centipoints: int) -> str:
+    ppr = f'<a:pPr lvl="{level}"/>' if level else "<a:pPr/>"
+    if not text:
+        return f"<a:p>{ppr}</a:p>"
+    return f'<a:p>{ppr}<a:r><a:rPr sz="{size_centipoints}"/><a:t>{xml_escape(text)}</a:t></a:r></a:p>'
+
+
+def _fill_text_frame(text_frame, lines: List[Tuple[str, int, int]]) -> None:
+    """
+    Replace the paragraphs of a text frame with lines [(text, level, font size in 1/100 pt)] built as one XML fragment
+    (same XML as paragraph.text + paragraph.level + run.font.size, without the per-paragraph python-pptx overhead).
+    Lines with control characters (line breaks...) are set through python-pptx so they are escaped the same way.
+    """
+    from pptx.oxml import parse_xml
+    from pptx.util import Centipoints
+
+    tx_body = text_frame._txBody
+    for p in tx_body.findall(f"{{{_A_NS}}}p"):
+        tx_body.remove(p)
+    lines = lines or [("", 0, 0)]
+    slow = [i for i, (text, _level, _size) in enumerate(lines) if any(ord(ch) < 32 for ch in text)]
+    fragment = parse_xml(f'<a:txBody xmlns:a="{_A_NS}">' + "".join(_paragraph_xml("" if i in slow else text, level, size) for i, (text, level, size) in enumerate(lines)) + "</a:txBody>")
+    for p in list(fragment):
+        tx_body.append(p)
+    if slow:
+        paragraphs = text_frame.paragraphs
+        for i in slow:
+            text, _level, size = lines[i]
+            paragraphs[i].text = text
+            for run in paragraphs[i].runs:
+                run.font.size = Centipoints(size)
+
+
 def build_text_summary_structure(
-    summary_audit_df: pd.DataFrame,
+    summary_audit: Union[pd.DataFrame, SummaryAuditModel, None],
 ) -> Dict[str, List[Dict[str, object]]]:
     """
-    Group SummaryAudit rows by top-level Category, keeping SubCategory/Metric/Value/ExtraInfo.
+    Group SummaryAudit rows by SubCategory, keeping SubCategory/Metric/Value/ExtraInfo plus the structured node list
+    of the shared SummaryAuditModel (ExtraInfo is not split again here).
 
     Returns:
       {
         "NR Frequency Audit": [
-            {"SubCategory": "NRCellDU", "Metric": "...", "Value": 4, "ExtraInfo": "..."},
+            {"SubCategory": "NRCellDU", "Metric": "...", "Value": 4, "ExtraInfo": "...", "Nodes": ["node1", ...]},
             ...
         ],
         "NR Frequency Inconsistencies": [
@@ -29,25 +121,28 @@ def build_text_summary_structure(
     """
     sections: Dict[str, List[Dict[str, object]]] = {}
 
-    if summary_audit_df is None or summary_audit_df.empty:
+    model = summary_audit_model_for(summary_audit)
+    if not model.rows:
         sections["Info"] = [
             {
                 "SubCategory": "Info",
                 "Metric": "No audit data available to build textual summary",
                 "Value": "",
                 "ExtraInfo": "",
+                "Nodes": [],
             }
         ]
         return sections
 
-    for _, row in summary_audit_df.iterrows():
+    for row in model.rows:
         # Group by SubCategory instead of Category
-        top_key = str(row.get("SubCategory", "") or "Info")
+        top_key = row.subcategory or "Info"
         item = {
-            "SubCategory": str(row.get("SubCategory", "") or ""),
-            "Metric": str(row.get("Metric", "") or ""),
-            "Value": row.get("Value", ""),
-            "ExtraInfo": str(row.get("ExtraInfo", "") or ""),
+            "SubCategory": row.subcategory,
+            "Metric": row.metric,
+            "Value": row.value,
+            "ExtraInfo": row.extra_info,
+            "Nodes": model.node_names(row),
         }
         sections.setdefault(top_key, []).append(item)
 
@@ -55,9 +150,10 @@ def build_text_summary_structure(
 
 
 def generate_ppt_summary(
-    summary_audit_df: pd.DataFrame,
+    summary_audit_df: Union[pd.DataFrame, SummaryAuditModel],
     excel_path: str,
     module_name: str = "",
+    max_nodes_per_metric: Optional[int] = None,  # <<< NEW: list at most N nodes per metric and link to the workbook (None -> SSB_RA_PPT_MAX_NODES_PER_METRIC, 0 = all)
 ) -> Optional[str]:
     """
     Generate a PPTX file next to the Excel with slides grouped by top-level Category.
@@ -81,6 +177,9 @@ def generate_ppt_summary(
 
         • If Category name contains 'discrep' (case-insensitive):
             - SAME behavior as inconsistencies.
+
+    If max_nodes_per_metric > 0, node lists longer than that are cut to their first N nodes and the main
+    bullet links to the workbook (SummaryAudit ExtraInfo keeps the full list).
     """
     try:
         from pptx import Presentation
@@ -89,18 +188,16 @@ def generate_ppt_summary(
         print(f"{module_name} [INFO] python-pptx is not installed. Skipping PPT summary.")
         return None
 
-    MAIN_BULLET_SIZE = Pt(10)
-    SUB_BULLET_SIZE = Pt(9)
+    MAIN_BULLET_SIZE = 1000  # 10 pt (centipoints, see _fill_text_frame)
+    SUB_BULLET_SIZE = 900  # 9 pt
+    max_nodes = _resolve_max_nodes_per_metric(max_nodes_per_metric)
 
     sections = build_text_summary_structure(summary_audit_df)
 
     base, _ = os.path.splitext(excel_path)
     ppt_path = base + ".pptx"
     ppt_path_long = to_long_path(ppt_path)
-
-    def _set_paragraph_font_size(paragraph, size: Pt) -> None:
-        for run in paragraph.runs:
-            run.font.size = size
+    workbook_name = os.path.basename(excel_path)
 
     def _value_is_positive(v: object) -> bool:
         """Return True if the given value represents a numeric value > 0."""
@@ -120,15 +217,22 @@ def generate_ppt_summary(
         base_dir=str(ROOT)
     )
     try:
-        prs = Presentation(template_path)
+        prs = Presentation(io.BytesIO(_load_template_bytes(template_path)))
         print(f"{module_name} [INFO] Using PPT template: {template_path}")
     except Exception as e:
         print(f"{module_name} [WARNING] Could not load PPT template, using default. ({e})")
         prs = Presentation()
+        template_path = None
 
     title_slide_layout = prs.slide_layouts[0]
     content_layout = prs.slide_layouts[1]
 
+    def _add_content_slide(title_text: str):
+        slide = prs.slides.add_slide(content_layout)
+        slide.shapes.title.text = title_text
+        body = slide.placeholders[1] if len(slide.placeholders) > 1 else None
+        return slide, body
+
     # --- Title slide ---
     slide = prs.slides.add_slide(title_slide_layout)
     title = slide.shapes.title
@@ -140,11 +244,8 @@ def generate_ppt_summary(
 
     # --- Category slides ---
     for category, items in sections.items():
-        cat_lower = category.lower()
-        is_audit = "audit" in cat_lower
-        is_incons = "inconsist" in cat_lower  # covers 'Inconsistences' typo as well
-        is_discrep = "discrep" in cat_lower  # covers 'Discrepancy/Discrepancies' and common variants
-        is_incons_or_discrep = is_incons or is_discrep
+        # 'inconsist' covers the 'Inconsistences' typo as well; 'discrep' covers 'Discrepancy/Discrepancies' and common variants
+        is_incons_or_discrep = SummaryKind.from_subcategory(category) in (SummaryKind.INCONSISTENCY, SummaryKind.DISCREPANCY)
 
         # ---------------------- INCONSISTENCIES / DISCREPANCIES: may need multiple slides ----------------------
         if is_incons_or_discrep:
@@ -155,15 +256,13 @@ def generate_ppt_summary(
             for item in items:
                 metric = item.get("Metric", "")
                 value = item.get("Value", "")
-                extra = item.get("ExtraInfo", "")
 
                 # Skip rows with non-positive value
                 if not _value_is_positive(value):
                     continue
 
-                # Parse node/cell list from ExtraInfo
-                cleaned_extra = str(extra).replace(";", ",") if extra else ""
-                nodes = [t.strip() for t in cleaned_extra.split(",") if t.strip()]
+                # Node/cell list of ExtraInfo (already split by the SummaryAuditModel)
+                nodes = list(item.get("Nodes") or [])
 
                 # Skip rows with empty node/cell list
                 if not nodes:
@@ -171,125 +270,63 @@ def generate_ppt_summary(
 
                 main_text = f"{metric}: {value}"
 
-                # Split the node list into chunks of 100 per slide (no truncation)
-                for chunk_start in range(0, len(nodes), 100):
-                    chunk_nodes = nodes[chunk_start:chunk_start + 100]
+                # Huge node lists: keep the first max_nodes and point to the workbook for the rest
+                hidden_nodes = 0
+                if max_nodes and len(nodes) > max_nodes:
+                    hidden_nodes = len(nodes) - max_nodes
+                    nodes = nodes[:max_nodes]
 
-                    slide = prs.slides.add_slide(content_layout)
-                    title_shape = slide.shapes.title
-                    body = slide.placeholders[1] if len(slide.placeholders) > 1 else None
+                # Split the node list into chunks of 100 per slide (no truncation)
+                for chunk_start in range(0, len(nodes), NODES_PER_SLIDE):
+                    chunk_nodes = nodes[chunk_start:chunk_start + NODES_PER_SLIDE]
 
-                    title_shape.text = category
+                    slide, body = _add_content_slide(category)
                     if body is None:
                         continue
 
-                    tf = body.text_frame
-                    tf.clear()
-
-                    # Main bullet for this metric
-                    p_main = tf.paragraphs[0]
-                    p_main.text = main_text
-                    p_main.level = 0
-                    _set_paragraph_font_size(p_main, MAIN_BULLET_SIZE)
-
                     # Decide how many nodes go in each column (max 4 columns × 25 nodes = 100)
-                    max_per_column = 25
                     space_from_top = 0.5
 
                     # If there are 25 or fewer nodes, keep old single-column behavior
-                    if len(chunk_nodes) <= max_per_column:
-                        for node in chunk_nodes:
-                            p_node = tf.add_paragraph()
-                            p_node.text = node
-                            p_node.level = 1
-                            _set_paragraph_font_size(p_node, SUB_BULLET_SIZE)
+                    if len(chunk_nodes) <= NODES_PER_COLUMN:
+                        _fill_text_frame(body.text_frame, [(main_text, 0, MAIN_BULLET_SIZE)] + [(node, 1, SUB_BULLET_SIZE) for node in chunk_nodes])
                     else:
-                        # Create chunks of up to 25 nodes per column
-                        columns = [
-                            chunk_nodes[i:i + max_per_column]
-                            for i in range(0, len(chunk_nodes), max_per_column)
-                        ]
+                        # Main bullet for this metric
+                        _fill_text_frame(body.text_frame, [(main_text, 0, MAIN_BULLET_SIZE)])
 
-                        # Limit to 4 columns max (100 nodes per slide)
-                        columns = columns[:4]
-                        num_columns = len(columns)
+                        # Create chunks of up to 25 nodes per column (4 columns max => 100 nodes per slide)
+                        columns = [chunk_nodes[i:i + NODES_PER_COLUMN] for i in range(0, len(chunk_nodes), NODES_PER_COLUMN)][:4]
 
-                        # Dynamic column width so space is equally divided
-                        column_width = body.width / num_columns
+                        # Dynamic column width so space is equally divided (body geometry resolved once per template)
+                        body_left, body_top, body_width, body_height = _cached_body_geometry(template_path, body)
+                        column_width = body_width / len(columns)
+                        col_top = body_top + Inches(space_from_top)
 
                         # Create each column dynamically
                         for idx_col, col_nodes in enumerate(columns):
-                            col_left = body.left + column_width * idx_col
-                            col_top = body.top + Inches(space_from_top)
-                            col_height = body.height
-
-                            col_box = slide.shapes.add_textbox(col_left, col_top, column_width, col_height)
-                            tf_col = col_box.text_frame
-                            tf_col.clear()
-
-                            # First node in the column
-                            p_col = tf_col.paragraphs[0]
-                            p_col.text = col_nodes[0]
-                            p_col.level = 1
-                            _set_paragraph_font_size(p_col, SUB_BULLET_SIZE)
-
-                            for node in col_nodes[1:]:
-                                p_node = tf_col.add_paragraph()
-                                p_node.text = node
-                                p_node.level = 1
-                                _set_paragraph_font_size(p_node, SUB_BULLET_SIZE)
+                            col_box = slide.shapes.add_textbox(body_left + column_width * idx_col, col_top, column_width, body_height)
+                            _fill_text_frame(col_box.text_frame, [(node, 1, SUB_BULLET_SIZE) for node in col_nodes])
+
+                    if hidden_nodes and chunk_start == 0:
+                        # Link to the workbook (relative: the PPT is saved next to it) instead of expanding the whole list;
+                        # only on the first slide of the metric, continuation slides repeat just the main bullet
+                        run = body.text_frame.paragraphs[0].add_run()
+                        run.text = f"  (first {len(nodes)} shown, +{hidden_nodes} more in SummaryAudit of '{workbook_name}')"
+                        run.font.size = Pt(MAIN_BULLET_SIZE / 100)
+                        run.hyperlink.address = workbook_name
 
         # ---------------------- AUDIT CATEGORIES: single slide per category ----------------------
         else:
-            slide = prs.slides.add_slide(content_layout)
-            title_shape = slide.shapes.title
-            body = slide.placeholders[1] if len(slide.placeholders) > 1 else None
-
-            title_shape.text = category
-
+            slide, body = _add_content_slide(category)
             if body is None:
                 continue
 
-            tf = body.text_frame
-            tf.clear()
-
             if not items:
-                p = tf.paragraphs[0]
-                p.text = "No data available for this category."
-                p.level = 0
-                _set_paragraph_font_size(p, MAIN_BULLET_SIZE)
+                _fill_text_frame(body.text_frame, [("No data available for this category.", 0, MAIN_BULLET_SIZE)])
                 continue
 
-            if is_audit:
-                # Only "Metric: Value" bullets
-                for idx, item in enumerate(items):
-                    metric = item.get("Metric", "")
-                    value = item.get("Value", "")
-                    text = f"{metric}: {value}"
-
-                    if idx == 0:
-                        p = tf.paragraphs[0]
-                    else:
-                        p = tf.add_paragraph()
-
-                    p.text = text
-                    p.level = 0
-                    _set_paragraph_font_size(p, MAIN_BULLET_SIZE)
-            else:
-                # Fallback: behave like audit
-                for idx, item in enumerate(items):
-                    metric = item.get("Metric", "")
-                    value = item.get("Value", "")
-                    text = f"{metric}: {value}"
-
-                    if idx == 0:
-                        p = tf.paragraphs[0]
-                    else:
-                        p = tf.add_paragraph()
-
-                    p.text = text
-                    p.level = 0
-                    _set_paragraph_font_size(p, MAIN_BULLET_SIZE)
+            # Audit categories (and any other category as fallback): only "Metric: Value" bullets
+            _fill_text_frame(body.text_frame, [(f"{item.get('Metric', '')}: {item.get('Value', '')}", 0, MAIN_BULLET_SIZE) for item in items])
 
     prs.save(ppt_path_long)
     return ppt_path
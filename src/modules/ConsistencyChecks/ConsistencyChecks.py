@@ -11,8 +11,10 @@ from src.utils.utils_dataframe import select_latest_by_date, normalize_df, make_
 from src.utils.utils_datetime import extract_date
 from src.utils.utils_excel import color_summary_tabs, style_headers_autofilter_and_autofit, apply_alternating_category_row_fills, style_headers_autofilter_and_autofit_xlsxwriter
 from src.utils.utils_frequency import detect_freq_column, detect_key_columns, extract_gu_freq_base, extract_nr_freq_base, enforce_gu_columns, enforce_nr_columns
-from src.utils.utils_io import read_text_lines, to_long_path, pretty_path
+from src.utils.utils_io import find_log_files, iter_log_texts, is_logs_dir, split_zip_log_path, to_long_path, pretty_path
 from src.utils.utils_parsing import find_all_subnetwork_headers, extract_mo_from_subnetwork_line, parse_table_slice_from_subnetwork
+from src.utils.utils_parquet import COLUMNAR_FORMATS, columnar_backend_available, export_frames_columnar
+from src.utils.utils_artifacts import ARTIFACTS, read_excel_sheet_cached
 from src.modules.Common.common_functions import load_nodes_names_and_id_from_summary_audit
 from src.modules.Common.correction_commands_exporter import export_relations_commands
 
@@ -134,15 +136,20 @@ class ConsistencyChecks:
                 or extract_date(dir_path)
         )
 
-        for fname in os.listdir(dir_path):
-            lower = fname.lower()
-            if not (lower.endswith(".log") or lower.endswith(".txt")):
-                continue
-            fpath = os.path.join(dir_path, fname)
-            if not os.path.isfile(fpath):
-                continue
+        if split_zip_log_path(dir_path) is not None:
+            # NEW: zip-native folder -> members are streamed from the archive
+            fpaths = [p for p in find_log_files(dir_path) if p.lower().endswith((".log", ".txt"))]
+        else:
+            fpaths = []
+            for fname in os.listdir(dir_path):
+                lower = fname.lower()
+                if not (lower.endswith(".log") or lower.endswith(".txt")):
+                    continue
+                fpath = os.path.join(dir_path, fname)
+                if os.path.isfile(fpath):
+                    fpaths.append(fpath)
 
-            lines = read_text_lines(fpath)
+        for fpath, lines, _enc in iter_log_texts(fpaths, skip_unreadable=True):
             if not lines:
                 continue
 
@@ -205,9 +212,9 @@ class ConsistencyChecks:
         else:
             # ===== Dual-input mode: explicit PRE/POST folders =====
             pre_dir = input_dir_or_pre
-            if not os.path.isdir(pre_dir):
+            if not is_logs_dir(pre_dir):
                 raise NotADirectoryError(f"Invalid PRE directory: {pre_dir}")
-            if not os.path.isdir(post_dir):
+            if not is_logs_dir(post_dir):
                 raise NotADirectoryError(f"Invalid POST directory: {post_dir}")
 
             self.pre_folder_found = True
@@ -251,7 +258,7 @@ class ConsistencyChecks:
                 p_long = to_long_path(p)
             except Exception:
                 p_long = p
-            if os.path.isfile(p_long) and str(p_long).lower().endswith(".xlsx") and os.path.getsize(p_long) > 0:
+            if str(p_long).lower().endswith(".xlsx") and (ARTIFACTS.has(p_long) or (os.path.isfile(p_long) and os.path.getsize(p_long) > 0)):
                 return p_long
             return None
 
@@ -265,11 +272,11 @@ class ConsistencyChecks:
                 x_path = to_long_path(path)
             except Exception:
                 x_path = path
-            if not os.path.isfile(x_path):
+            if not os.path.isfile(x_path) and not ARTIFACTS.has(x_path):
                 return None
             try:
                 wanted = {"Category", "SubCategory", "Metric", "Value", "ExtraInfo"}
-                return pd.read_excel(x_path, sheet_name="SummaryAudit", usecols=lambda c: c in wanted, engine="openpyxl")
+                return read_excel_sheet_cached(x_path, "SummaryAudit", usecols=lambda c: c in wanted)
             except Exception:
                 return None
 
@@ -808,13 +815,13 @@ class ConsistencyChecks:
             except Exception:
                 x_path = path
 
-            if not os.path.isfile(x_path):
+            if not os.path.isfile(x_path) and not ARTIFACTS.has(x_path):
                 print(f"{module_name} {market_tag} [WARNING] {label} SummaryAudit Excel not found: '{path}'. Skipping SummaryAuditComparisson for this side.")
                 return None
 
             try:
                 wanted = {"Category", "SubCategory", "Metric", "Value", "Tips", "Notes"}
-                df = pd.read_excel(x_path, sheet_name="SummaryAudit", usecols=lambda c: c in wanted, engine="openpyxl")
+                df = read_excel_sheet_cached(x_path, "SummaryAudit", usecols=lambda c: c in wanted)
             except Exception as e:
                 print(f"{module_name} {market_tag} [WARNING] Could not read 'SummaryAudit' sheet from {label} audit Excel '{path}': {e}.")
                 return None
@@ -942,9 +949,16 @@ class ConsistencyChecks:
         return merged
 
     # ----------------------------- OUTPUT TO EXCEL ----------------------------- #
-    def save_outputs_excel(self, output_dir: str, results: Optional[Dict[str, Dict[str, pd.DataFrame]]] = None, versioned_suffix: Optional[str] = None, module_name: str = "", market_tag: str = "GLOBAL", fast_excel_export: bool = False, fast_excel_autofit_rows: int = 200, fast_excel_autofit_max_width: int = 60) -> None:
+    def save_outputs_excel(self, output_dir: str, results: Optional[Dict[str, Dict[str, pd.DataFrame]]] = None, versioned_suffix: Optional[str] = None, module_name: str = "", market_tag: str = "GLOBAL", fast_excel_export: bool = False, fast_excel_autofit_rows: int = 200, fast_excel_autofit_max_width: int = 60, output_formats: Optional[List[str]] = None) -> None:
+        """
+        Build every CC output table and write them in the requested output_formats (default: ["xlsx"]).
+          - "xlsx": ConsistencyChecks_CellRelation.xlsx + CellRelation.xlsx (styled workbooks).
+          - "parquet" / "arrow": one columnar file per table inside <output_dir>/Columnar_CC (no XLSX styling cost).
+        Correction_Cmd_CC text files are always exported.
+        """
         import tempfile
         import shutil
+        from contextlib import nullcontext
 
         os.makedirs(output_dir, exist_ok=True)
         suf = f"_{versioned_suffix}" if versioned_suffix else ""
@@ -992,6 +1006,14 @@ class ConsistencyChecks:
 
         excel_engine = _pick_excel_engine()
 
+        # NEW: output formats (xlsx and/or columnar parquet/arrow). XLSX writers are skipped entirely when not requested.
+        output_formats = [str(f).strip().lower() for f in (output_formats or ["xlsx"]) if str(f).strip()]
+        write_xlsx = "xlsx" in output_formats
+        columnar_formats = [f for f in output_formats if f in COLUMNAR_FORMATS]
+        if columnar_formats and not write_xlsx and not columnar_backend_available():
+            print(f"{module_name} {market_tag} [WARNING] 'pyarrow' is not installed. Falling back to XLSX output.")
+            write_xlsx, columnar_formats = True, []
+
         tmp_dir_cc, tmp_excel_cc = _make_temp_xlsx_path(excel_cc_cell_relation_long)
         tmp_dir_cell, tmp_excel_cell = _make_temp_xlsx_path(excel_cell_relation_long)
 
@@ -1002,16 +1024,24 @@ class ConsistencyChecks:
             # -------------------------------------------------------------------
             #  Write ConsistencyChecks_CellRelations.xlsx (TEMP)
             # -------------------------------------------------------------------
-            print(f"{module_name} {market_tag} [INFO] Saving {pretty_path(excel_cc_cell_relation)} (engine={excel_engine}, temp -> final)...")
+            if write_xlsx:
+                print(f"{module_name} {market_tag} [INFO] Saving {pretty_path(excel_cc_cell_relation)} (engine={excel_engine}, temp -> final)...")
 
             written_sheet_dfs: Dict[str, pd.DataFrame] = {}
 
-            if excel_engine == "xlsxwriter":
+            if not write_xlsx:
+                writer_ctx = nullcontext(None)
+            elif excel_engine == "xlsxwriter":
                 writer_ctx = pd.ExcelWriter(tmp_excel_cc_long, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False, "strings_to_numbers": False}})
             else:
                 writer_ctx = pd.ExcelWriter(tmp_excel_cc_long, engine="openpyxl")
 
             with writer_ctx as writer:
+                def _emit_sheet(sheet_name: str, df: pd.DataFrame) -> None:
+                    if writer is not None:
+                        df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    written_sheet_dfs[sheet_name] = df
+
                 # Summary
                 summary_rows = []
                 if results:
@@ -1038,14 +1068,12 @@ class ConsistencyChecks:
                         })
 
                 summary_df = pd.DataFrame(summary_rows) if summary_rows else pd.DataFrame(columns=["Table", "KeyColumns", "FreqColumn", "Relations_Pre", "Relations_Post", "Parameters_Discrepancies", "Freq_Discrepancies", "Freq_Discrepancies (SSB_Unknown)", "New_Relations", "Missing_Relations", "SourceFile_Pre", "SourceFile_Post"])
-                summary_df.to_excel(writer, sheet_name="Summary", index=False)
-                written_sheet_dfs["Summary"] = summary_df
+                _emit_sheet("Summary", summary_df)
 
                 # NEW: add SummaryAuditComparisson sheet if PRE/POST ConfigurationAudit SummaryAudit are available
                 comparison_df = self.summaryaudit_comparison(module_name=module_name, market_tag=market_tag)
                 if comparison_df is not None and not comparison_df.empty:
-                    comparison_df.to_excel(writer, sheet_name="SummaryAuditComparisson", index=False)
-                    written_sheet_dfs["SummaryAuditComparisson"] = comparison_df
+                    _emit_sheet("SummaryAuditComparisson", comparison_df)
 
                 # Summary_CellRelation
                 detailed_rows = []
@@ -1115,11 +1143,10 @@ class ConsistencyChecks:
                             })
 
                 detailed_df = pd.DataFrame(detailed_rows) if detailed_rows else pd.DataFrame(columns=["Table", "KeyColumns", "FreqColumn", "Freq_Pre", "Freq_Post", "Relations_Pre", "Relations_Post", "Parameters_Discrepancies", "Freq_Discrepancies", "Freq_Discrepancies (SSB_Unknown)", "New_Relations", "Missing_Relations"])
-                detailed_df.to_excel(writer, sheet_name="Summary_CellRelation", index=False)
-                written_sheet_dfs["Summary_CellRelation"] = detailed_df
+                _emit_sheet("Summary_CellRelation", detailed_df)
 
                 # Highlight rows where Freq_Pre or Freq_Post matches old or new SSB frequency (Pre/Post) - openpyxl only
-                if excel_engine == "openpyxl":
+                if writer is not None and excel_engine == "openpyxl":
                     try:
                         from openpyxl.styles import PatternFill
 
@@ -1370,18 +1397,12 @@ class ConsistencyChecks:
                     correction_cmd_sources["GU_freq_disc"] = gu_freq_disc_cmd_df
                     correction_cmd_sources["GU_param_disc"] = gu_param_disc_cmd_df
 
-                    gu_rel_df.to_excel(writer, sheet_name="GU_relations", index=False)
-                    written_sheet_dfs["GU_relations"] = gu_rel_df
-                    gu_param_disc_cmd_df.to_excel(writer, sheet_name="GU_param_disc", index=False)
-                    written_sheet_dfs["GU_param_disc"] = gu_param_disc_cmd_df
-                    gu_freq_disc_cmd_df.to_excel(writer, sheet_name="GU_freq_disc", index=False)
-                    written_sheet_dfs["GU_freq_disc"] = gu_freq_disc_cmd_df
-                    gu_unknown_df.to_excel(writer, sheet_name="GU_freq_disc_unknown", index=False)
-                    written_sheet_dfs["GU_freq_disc_unknown"] = gu_unknown_df
-                    gu_missing_df.to_excel(writer, sheet_name="GU_missing", index=False)
-                    written_sheet_dfs["GU_missing"] = gu_missing_df
-                    gu_new_df.to_excel(writer, sheet_name="GU_new", index=False)
-                    written_sheet_dfs["GU_new"] = gu_new_df
+                    _emit_sheet("GU_relations", gu_rel_df)
+                    _emit_sheet("GU_param_disc", gu_param_disc_cmd_df)
+                    _emit_sheet("GU_freq_disc", gu_freq_disc_cmd_df)
+                    _emit_sheet("GU_freq_disc_unknown", gu_unknown_df)
+                    _emit_sheet("GU_missing", gu_missing_df)
+                    _emit_sheet("GU_new", gu_new_df)
                 else:
                     df0 = enforce_gu_columns(pd.DataFrame())
                     df1 = enforce_gu_columns(pd.DataFrame())
@@ -1400,18 +1421,12 @@ class ConsistencyChecks:
                     df4 = _ensure_and_reorder_cc_columns(df4, "GUtranCellRelation", gu_extras_map, gu_key_cols)
                     df5 = _ensure_and_reorder_cc_columns(df5, "GUtranCellRelation", gu_extras_map, gu_key_cols)
 
-                    df0.to_excel(writer, sheet_name="GU_relations", index=False)
-                    written_sheet_dfs["GU_relations"] = df0
-                    df1.to_excel(writer, sheet_name="GU_param_disc", index=False)
-                    written_sheet_dfs["GU_param_disc"] = df1
-                    df2.to_excel(writer, sheet_name="GU_freq_disc", index=False)
-                    written_sheet_dfs["GU_freq_disc"] = df2
-                    df3.to_excel(writer, sheet_name="GU_freq_disc_unknown", index=False)
-                    written_sheet_dfs["GU_freq_disc_unknown"] = df3
-                    df4.to_excel(writer, sheet_name="GU_missing", index=False)
-                    written_sheet_dfs["GU_missing"] = df4
-                    df5.to_excel(writer, sheet_name="GU_new", index=False)
-                    written_sheet_dfs["GU_new"] = df5
+                    _emit_sheet("GU_relations", df0)
+                    _emit_sheet("GU_param_disc", df1)
+                    _emit_sheet("GU_freq_disc", df2)
+                    _emit_sheet("GU_freq_disc_unknown", df3)
+                    _emit_sheet("GU_missing", df4)
+                    _emit_sheet("GU_new", df5)
 
                 # NR sheets
                 if results and "NRCellRelation" in results:
@@ -1489,18 +1504,12 @@ class ConsistencyChecks:
                     correction_cmd_sources["NR_freq_disc"] = nr_freq_disc_cmd_df
                     correction_cmd_sources["NR_param_disc"] = nr_param_disc_cmd_df
 
-                    nr_rel_df.to_excel(writer, sheet_name="NR_relations", index=False)
-                    written_sheet_dfs["NR_relations"] = nr_rel_df
-                    nr_param_disc_cmd_df.to_excel(writer, sheet_name="NR_param_disc", index=False)
-                    written_sheet_dfs["NR_param_disc"] = nr_param_disc_cmd_df
-                    nr_freq_disc_cmd_df.to_excel(writer, sheet_name="NR_freq_disc", index=False)
-                    written_sheet_dfs["NR_freq_disc"] = nr_freq_disc_cmd_df
-                    nr_unknown_df.to_excel(writer, sheet_name="NR_freq_disc_unknown", index=False)
-                    written_sheet_dfs["NR_freq_disc_unknown"] = nr_unknown_df
-                    nr_missing_df.to_excel(writer, sheet_name="NR_missing", index=False)
-                    written_sheet_dfs["NR_missing"] = nr_missing_df
-                    nr_new_df.to_excel(writer, sheet_name="NR_new", index=False)
-                    written_sheet_dfs["NR_new"] = nr_new_df
+                    _emit_sheet("NR_relations", nr_rel_df)
+                    _emit_sheet("NR_param_disc", nr_param_disc_cmd_df)
+                    _emit_sheet("NR_freq_disc", nr_freq_disc_cmd_df)
+                    _emit_sheet("NR_freq_disc_unknown", nr_unknown_df)
+                    _emit_sheet("NR_missing", nr_missing_df)
+                    _emit_sheet("NR_new", nr_new_df)
                 else:
                     df0 = enforce_nr_columns(pd.DataFrame())
                     df1 = enforce_nr_columns(pd.DataFrame())
@@ -1519,18 +1528,12 @@ class ConsistencyChecks:
                     df4 = _ensure_and_reorder_cc_columns(df4, "NRCellRelation", nr_extras_map, nr_key_cols)
                     df5 = _ensure_and_reorder_cc_columns(df5, "NRCellRelation", nr_extras_map, nr_key_cols)
 
-                    df0.to_excel(writer, sheet_name="NR_relations", index=False)
-                    written_sheet_dfs["NR_relations"] = df0
-                    df1.to_excel(writer, sheet_name="NR_param_disc", index=False)
-                    written_sheet_dfs["NR_param_disc"] = df1
-                    df2.to_excel(writer, sheet_name="NR_freq_disc", index=False)
-                    written_sheet_dfs["NR_freq_disc"] = df2
-                    df3.to_excel(writer, sheet_name="NR_freq_disc_unknown", index=False)
-                    written_sheet_dfs["NR_freq_disc_unknown"] = df3
-                    df4.to_excel(writer, sheet_name="NR_missing", index=False)
-                    written_sheet_dfs["NR_missing"] = df4
-                    df5.to_excel(writer, sheet_name="NR_new", index=False)
-                    written_sheet_dfs["NR_new"] = df5
+                    _emit_sheet("NR_relations", df0)
+                    _emit_sheet("NR_param_disc", df1)
+                    _emit_sheet("NR_freq_disc", df2)
+                    _emit_sheet("NR_freq_disc_unknown", df3)
+                    _emit_sheet("NR_missing", df4)
+                    _emit_sheet("NR_new", df5)
 
                 # Export text files (outside GU/NR blocks)
                 if correction_cmd_sources:
@@ -1539,7 +1542,9 @@ class ConsistencyChecks:
                 # -------------------------------------------------------------------
                 #  APPLY HEADER STYLING + AUTO-FIT COLUMNS FOR ALL SHEETS
                 # -------------------------------------------------------------------
-                if excel_engine == "xlsxwriter":
+                if writer is None:
+                    pass
+                elif excel_engine == "xlsxwriter":
                     style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs=written_sheet_dfs, freeze_header=True, align="left", max_autofit_rows=fast_excel_autofit_rows, max_col_width=fast_excel_autofit_max_width, enable_a1_hyperlinks=True, hyperlink_sheet="Summary_CellRelation")
 
                     # Hyperlink A1 -> Summary_CellRelation (xlsxwriter)
@@ -1553,48 +1558,67 @@ class ConsistencyChecks:
                             ws.write_url(0, 0, "internal:Summary_CellRelation!A1", link_fmt, header_text)
                     except Exception:
                         pass
+
+                    ws_comp = writer.sheets.get("SummaryAuditComparisson")
+                    if ws_comp is not None and "SummaryAuditComparisson" in written_sheet_dfs:
+                        apply_alternating_category_row_fills(ws_comp, value_header="Value_Post", df=written_sheet_dfs["SummaryAuditComparisson"], workbook=writer.book)
                 else:
                     color_summary_tabs(writer, prefix="Summary", rgb_hex="00B050")
-                    style_headers_autofilter_and_autofit(writer, freeze_header=True, align="left", enable_a1_hyperlink=True, hyperlink_sheet="Summary_CellRelation")
+                    style_headers_autofilter_and_autofit(writer, freeze_header=True, align="left", enable_a1_hyperlink=True, hyperlink_sheet="Summary_CellRelation", sheet_dfs=written_sheet_dfs)
 
                     ws_comp = writer.sheets.get("SummaryAuditComparisson")
                     if ws_comp is not None:
-                        apply_alternating_category_row_fills(ws_comp, value_header="Value_Post")
+                        apply_alternating_category_row_fills(ws_comp, value_header="Value_Post", df=written_sheet_dfs.get("SummaryAuditComparisson"))
 
-
-            _move_into_place(tmp_excel_cc_long, excel_cc_cell_relation_long)
+            if write_xlsx:
+                _move_into_place(tmp_excel_cc_long, excel_cc_cell_relation_long)
 
             # -------------------------------------------------------------------
             #  Write CellRelations.xlsx (TEMP)
             # -------------------------------------------------------------------
-            print(f"{module_name} {market_tag} [INFO] Saving {pretty_path(excel_cell_relation)} (engine={excel_engine}, temp -> final)...")
-
             written_sheet_dfs2: Dict[str, pd.DataFrame] = {}
 
-            if excel_engine == "xlsxwriter":
+            if not write_xlsx:
+                writer_ctx2 = nullcontext(None)
+            elif excel_engine == "xlsxwriter":
                 writer_ctx2 = pd.ExcelWriter(tmp_excel_cell_long, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False, "strings_to_numbers": False}})
             else:
                 writer_ctx2 = pd.ExcelWriter(tmp_excel_cell_long, engine="openpyxl")
 
+            if write_xlsx:
+                print(f"{module_name} {market_tag} [INFO] Saving {pretty_path(excel_cell_relation)} (engine={excel_engine}, temp -> final)...")
+
             with writer_ctx2 as writer:
+                def _emit_sheet2(sheet_name: str, df: pd.DataFrame) -> None:
+                    if writer is not None:
+                        df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    written_sheet_dfs2[sheet_name] = df
+
                 if "GUtranCellRelation" in self.tables:
                     df_gu = self.tables["GUtranCellRelation"]
-                    df_gu.to_excel(writer, sheet_name="GU_all", index=False)
-                    written_sheet_dfs2["GU_all"] = df_gu
+                    _emit_sheet2("GU_all", df_gu)
                 if "NRCellRelation" in self.tables:
                     df_nr = self.tables["NRCellRelation"]
-                    df_nr.to_excel(writer, sheet_name="NR_all", index=False)
-                    written_sheet_dfs2["NR_all"] = df_nr
+                    _emit_sheet2("NR_all", df_nr)
 
                 # -------------------------------------------------------------------
                 #  APPLY HEADER STYLING + AUTO-FIT COLUMNS FOR ALL SHEETS
                 # -------------------------------------------------------------------
-                if excel_engine == "xlsxwriter":
+                if writer is None:
+                    pass
+                elif excel_engine == "xlsxwriter":
                     style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs=written_sheet_dfs2, freeze_header=True, align="left", max_autofit_rows=fast_excel_autofit_rows, max_col_width=fast_excel_autofit_max_width, enable_a1_hyperlinks=False, hyperlink_sheet="")
                 else:
-                    style_headers_autofilter_and_autofit(writer, freeze_header=True, align="left")
+                    style_headers_autofilter_and_autofit(writer, freeze_header=True, align="left", sheet_dfs=written_sheet_dfs2)
+            if write_xlsx:
+                _move_into_place(tmp_excel_cell_long, excel_cell_relation_long)
 
-            _move_into_place(tmp_excel_cell_long, excel_cell_relation_long)
+            # -------------------------------------------------------------------
+            #  NEW: Columnar export (Parquet / Arrow IPC) of the same tables, without any XLSX styling
+            # -------------------------------------------------------------------
+            if columnar_formats:
+                columnar_frames = {**written_sheet_dfs, **written_sheet_dfs2}
+                export_frames_columnar(columnar_frames, os.path.join(output_dir, "Columnar_CC"), columnar_formats, module_name=module_name, market_tag=market_tag)
 
         finally:
             try:
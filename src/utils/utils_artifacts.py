@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.utils.utils_io import to_long_path, pretty_path
+from src.utils.utils_parquet import columnar_backend_available, read_frame_columnar, write_frame_columnar
+
+
+# ============================ IN-MEMORY ARTIFACT REGISTRY ============================
+# Process-wide registry of the DataFrames behind every workbook this process wrote (or already parsed once), keyed by
+# output path, so later readers (ConsistencyChecks, correction command exporters, node-id loaders...) never parse the
+# same XLSX again with openpyxl.
+# Runtime knob (set by the CLI so it is inherited by worker processes):
+#   SSB_RA_ARTIFACT_CACHE_MB = N   (default: 1024)
+# Above the cap, least recently used sheets are spilled to Parquet in a temp folder (dropped if pyarrow is missing)
+# and transparently read back on the next hit. Pinned sheets (small, read by every consumer, e.g. SummaryAudit) are
+# never evicted, so with N = 0 only they stay in memory.
+
+ARTIFACT_CACHE_MB_ENV = "SSB_RA_ARTIFACT_CACHE_MB"
+ARTIFACT_CACHE_DEFAULT_MB = 1024
+
+
+def configure_artifact_registry(max_mb: Optional[int] = None) -> None:
+    """Publish the artifact registry memory cap (MB) as an environment variable (inherited by spawned worker processes)."""
+    if max_mb is not None:
+        os.environ[ARTIFACT_CACHE_MB_ENV] = str(max(0, int(max_mb)))
+        ARTIFACTS.cap_bytes = _resolve_cap_bytes()
+
+
+def _resolve_cap_bytes() -> int:
+    try:
+        raw = os.environ.get(ARTIFACT_CACHE_MB_ENV, "").strip()
+        mb = int(raw) if raw else ARTIFACT_CACHE_DEFAULT_MB
+    except Exception:
+        mb = ARTIFACT_CACHE_DEFAULT_MB
+    return max(0, mb) * 1024 * 1024
+
+
+def _artifact_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(pretty_path(str(path))))
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(to_long_path(path))
+    except Exception:
+        return None
+
+
+def _estimate_nbytes(df: pd.DataFrame) -> int:
+    """Cheap memory estimate: shallow usage plus sampled string sizes for object columns (deep=True is O(cells))."""
+    try:
+        total = int(df.memory_usage(index=True, deep=False).sum())
+        n = len(df)
+        if n:
+            for col in df.columns[df.dtypes == object]:
+                sample = df[col].iloc[:: max(1, n // 200)].head(200)
+                if len(sample):
+                    total += int(sum(len(str(v)) + 49 for v in sample) / len(sample) * n)
+        return total
+    except Exception:
+        return 0
+
+
+class ArtifactRegistry:
+    """
+    LRU registry: {output path -> {sheet name -> DataFrame}} with a memory cap.
+
+    - register(path, sheets, pinned): frames produced by a writer (treated as read-only; always valid, even before the
+      file exists). Sheets listed in pinned are never evicted.
+    - get_sheet(path, sheet) / get_sheets(path): case-insensitive lookups; spilled sheets are read back from Parquet.
+    - Entries cached from a disk read remember the file mtime and are dropped if the file changes on disk.
+    - get_sheets() only answers for complete workbooks (writer registrations or full reads), never for single cached sheets.
+    """
+
+    def __init__(self, cap_bytes: Optional[int] = None):
+        self.cap_bytes = _resolve_cap_bytes() if cap_bytes is None else max(0, int(cap_bytes))
+        self._lock = threading.RLock()
+        self._workbooks: Dict[str, Dict[str, object]] = {}
+        self._lru: "OrderedDict[tuple, Dict[str, object]]" = OrderedDict()
+        self._bytes = 0
+        self._spill_dir: Optional[str] = None
+        self._spill_seq = 0
+
+    # ---------------------------- write side ----------------------------
+    def register(self, path: str, sheets: Dict[str, pd.DataFrame], source_mtime: Optional[float] = None, replace: bool = True, complete: bool = True, pinned: Iterable[str] = ()) -> None:
+        if not path:
+            return
+        pinned_lower = {str(p).strip().lower() for p in pinned}
+        key = _artifact_key(path)
+        with self._lock:
+            if replace or key not in self._workbooks:
+                self._forget_unlocked(key)
+                self._workbooks[key] = {"mtime": source_mtime, "sheets": [], "complete": complete}
+            book = self._workbooks[key]
+            for name, df in (sheets or {}).items():
+                if not isinstance(df, pd.DataFrame):
+                    continue
+                lkey = (key, str(name).strip().lower())
+                if lkey in self._lru:
+                    self._drop_entry_unlocked(lkey)
+                else:
+                    book["sheets"].append(str(name))
+                entry = {"name": str(name), "df": df, "spill": None, "nbytes": _estimate_nbytes(df), "pinned": lkey[1] in pinned_lower}
+                self._lru[lkey] = entry
+                self._bytes += int(entry["nbytes"])
+            self._enforce_cap_unlocked()
+
+    def register_parsed(self, path: str, sheets: Dict[str, pd.DataFrame], complete: bool = True) -> None:
+        """Cache frames parsed from the workbook on disk (validated against its mtime on every lookup)."""
+        self.register(path, sheets, source_mtime=_file_mtime(path), replace=complete or not self.has(path), complete=complete)
+
+    def forget(self, path: str) -> None:
+        with self._lock:
+            self._forget_unlocked(_artifact_key(path))
+
+    def _forget_unlocked(self, key: str) -> None:
+        self._workbooks.pop(key, None)
+        for lkey in [k for k in self._lru if k[0] == key]:
+            self._drop_entry_unlocked(lkey)
+
+    def _drop_entry_unlocked(self, lkey: tuple) -> None:
+        entry = self._lru.pop(lkey, None)
+        if entry is None:
+            return
+        if entry["df"] is not None:
+            self._bytes -= int(entry["nbytes"])
+        if entry["spill"]:
+            try:
+                os.remove(str(entry["spill"]))
+            except Exception:
+                pass
+
+    def _enforce_cap_unlocked(self) -> None:
+        if self._bytes <= self.cap_bytes:
+            return
+        for lkey, entry in list(self._lru.items()):
+            if self._bytes <= self.cap_bytes:
+                break
+            if entry["df"] is None or entry["pinned"]:
+                continue
+            entry["spill"] = self._spill_unlocked(entry["df"])
+            if entry["spill"] is None:
+                # No Parquet backend (or spill failed): drop the sheet, readers fall back to the XLSX on disk
+                self._drop_entry_unlocked(lkey)
+                book = self._workbooks.get(lkey[0])
+                if book is not None:
+                    book["sheets"] = [s for s in book["sheets"] if s.lower() != lkey[1]]
+                    book["complete"] = False
+                continue
+            entry["df"] = None
+            self._bytes -= int(entry["nbytes"])
+
+    def _spill_unlocked(self, df: pd.DataFrame) -> Optional[str]:
+        if not columnar_backend_available():
+            return None
+        try:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix="SSB_RA_artifacts_")
+                atexit.register(shutil.rmtree, self._spill_dir, True)
+            self._spill_seq += 1
+            base_path = os.path.join(self._spill_dir, f"sheet_{self._spill_seq:06d}")
+            try:
+                # Keep dtypes exactly when Arrow accepts the frame as-is; mixed object columns go through the sanitised writer
+                out = df.copy(deep=False)
+                out.columns = [str(c) for c in out.columns]
+                out.reset_index(drop=True).to_parquet(f"{base_path}.parquet", engine="pyarrow", index=False)
+                return f"{base_path}.parquet"
+            except Exception:
+                return write_frame_columnar(df, base_path, "parquet")
+        except Exception:
+            return None
+
+    # ---------------------------- read side ----------------------------
+    def _valid_book_unlocked(self, path: str) -> Optional[str]:
+        key = _artifact_key(path)
+        book = self._workbooks.get(key)
+        if book is None:
+            return None
+        if book["mtime"] is not None and _file_mtime(path) != book["mtime"]:
+            self._forget_unlocked(key)
+            return None
+        return key
+
+    def _load_entry_unlocked(self, lkey: tuple) -> Optional[pd.DataFrame]:
+        entry = self._lru.get(lkey)
+        if entry is None:
+            return None
+        self._lru.move_to_end(lkey)
+        if entry["df"] is None:
+            return read_frame_columnar(str(entry["spill"])) if entry["spill"] else None
+        return entry["df"]
+
+    def has(self, path: str) -> bool:
+        if not path:
+            return False
+        with self._lock:
+            return self._valid_book_unlocked(path) is not None
+
+    def sheet_names(self, path: str) -> Optional[List[str]]:
+        if not path:
+            return None
+        with self._lock:
+            key = self._valid_book_unlocked(path)
+            return list(self._workbooks[key]["sheets"]) if key else None
+
+    def get_sheet(self, path: str, sheet_name: str) -> Optional[pd.DataFrame]:
+        if not path:
+            return None
+        with self._lock:
+            key = self._valid_book_unlocked(path)
+            return self._load_entry_unlocked((key, str(sheet_name).strip().lower())) if key else None
+
+    def get_sheets(self, path: str) -> Optional[Dict[str, pd.DataFrame]]:
+        if not path:
+            return None
+        with self._lock:
+            key = self._valid_book_unlocked(path)
+            if not key or not self._workbooks[key]["complete"]:
+                return None
+            out: Dict[str, pd.DataFrame] = {}
+            for name in self._workbooks[key]["sheets"]:
+                df = self._load_entry_unlocked((key, name.lower()))
+                if df is None:
+                    return None  # incomplete (spill lost): let the caller read the workbook
+                out[name] = df
+            return out
+
+
+ARTIFACTS = ArtifactRegistry()
+
+
+def register_artifact(path: str, sheets: Dict[str, pd.DataFrame], pinned: Iterable[str] = ("SummaryAudit",), complete: bool = True) -> None:
+    """
+    Register the frames a writer produced for 'path' (call it once the workbook content is final).
+    Use complete=False when only some sheets of the workbook are known (e.g. a SummaryAudit received from a worker process).
+    """
+    ARTIFACTS.register(path, sheets, complete=complete, pinned=pinned)
+
+
+def _select_columns(df: pd.DataFrame, usecols: Union[None, Iterable[str], Callable[[str], bool]]) -> pd.DataFrame:
+    if usecols is None:
+        return df
+    if callable(usecols):
+        return df.loc[:, [c for c in df.columns if usecols(c)]].copy()
+    wanted = set(usecols)
+    return df.loc[:, [c for c in df.columns if c in wanted]].copy()
+
+
+# ============================ PARQUET SIDECAR OF AUDIT WORKBOOKS ============================
+# Next to every ConfigurationAudit workbook the key sheets (SummaryAudit and the other 'Summary*' sheets) are also
+# written as Parquet into '<workbook stem>_Sidecar/' with a manifest that records the workbook size and mtime. When an
+# existing audit is reused (same-version skip, or previous audit folders copied by the Consistency Checks), readers get
+# those frames in milliseconds instead of parsing the XLSX with openpyxl. A sidecar that does not match its workbook
+# (edited/rewritten XLSX) is ignored. Requires pyarrow (optional): without it no sidecar is written or read.
+
+SIDECAR_DIR_SUFFIX = "_Sidecar"
+SIDECAR_MANIFEST = "manifest.json"
+SIDECAR_SHEET_PREFIXES = ("Summary",)
+
+
+def sidecar_dir_for(path: str) -> str:
+    return f"{os.path.splitext(pretty_path(str(path)))[0]}{SIDECAR_DIR_SUFFIX}"
+
+
+def _workbook_signature(path: str) -> Optional[Tuple[int, float]]:
+    try:
+        st = os.stat(to_long_path(path))
+        return int(st.st_size), float(st.st_mtime)
+    except Exception:
+        return None
+
+
+def _json_cell(value: object) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()  # numpy scalar -> Python scalar
+    return json.dumps(value, default=str)
+
+
+def write_workbook_sidecar(path: str, sheets: Dict[str, pd.DataFrame], sheet_prefixes: Iterable[str] = SIDECAR_SHEET_PREFIXES) -> Optional[str]:
+    """
+    Write the sheets whose name starts with one of sheet_prefixes as Parquet next to the (already closed) workbook 'path'.
+    Object columns with mixed Python types (e.g. SummaryAudit 'Value') are stored JSON-encoded so ints stay ints.
+    Returns the sidecar folder or None (pyarrow missing, workbook missing or write error).
+    """
+    signature = _workbook_signature(path)
+    if signature is None or not columnar_backend_available():
+        return None
+    prefixes = tuple(sheet_prefixes)
+    selected = [(str(name), df) for name, df in (sheets or {}).items() if isinstance(df, pd.DataFrame) and str(name).startswith(prefixes)]
+    if not selected:
+        return None
+
+    sidecar_dir = sidecar_dir_for(path)
+    sidecar_dir_fs = to_long_path(sidecar_dir)
+    try:
+        shutil.rmtree(sidecar_dir_fs, ignore_errors=True)
+        os.makedirs(sidecar_dir_fs, exist_ok=True)
+        manifest: Dict[str, object] = {"workbook": os.path.basename(pretty_path(str(path))), "size": signature[0], "mtime": signature[1], "sheets": []}
+        for idx, (name, df) in enumerate(selected, start=1):
+            out = df.copy(deep=False).reset_index(drop=True)
+            out.columns = [str(c) for c in out.columns]
+            json_columns = []
+            for col in out.columns[out.dtypes == object]:
+                kinds = {type(v) for v in out[col] if v is not None and not (isinstance(v, float) and v != v)}
+                if len(kinds) > 1 or (kinds and not kinds <= {str}):
+                    out[col] = out[col].map(_json_cell)
+                    json_columns.append(col)
+            file_name = f"sheet_{idx:03d}.parquet"
+            out.to_parquet(os.path.join(sidecar_dir_fs, file_name), engine="pyarrow", index=False, compression="zstd")
+            manifest["sheets"].append({"name": name, "file": file_name, "json_columns": json_columns})
+        # Manifest last: a sidecar without manifest (interrupted write) is never used
+        with open(os.path.join(sidecar_dir_fs, SIDECAR_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return sidecar_dir
+    except Exception:
+        shutil.rmtree(sidecar_dir_fs, ignore_errors=True)
+        return None
+
+
+def _read_sidecar_manifest(path: str) -> Optional[Dict[str, object]]:
+    try:
+        with open(os.path.join(to_long_path(sidecar_dir_for(path)), SIDECAR_MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def load_workbook_sidecar(path: str) -> Optional[Dict[str, pd.DataFrame]]:
+    """Return {sheet name -> DataFrame} from the sidecar of 'path', or None if there is none or it does not match the workbook."""
+    if not path or not columnar_backend_available():
+        return None
+    manifest = _read_sidecar_manifest(path)
+    signature = _workbook_signature(path)
+    if not manifest or signature is None:
+        return None
+    # Copies made with shutil.copy2 keep the mtime; allow FAT/SMB 2s timestamp granularity
+    if int(manifest.get("size", -1)) != signature[0] or abs(float(manifest.get("mtime", 0.0)) - signature[1]) > 2.0:
+        return None
+    sidecar_dir_fs = to_long_path(sidecar_dir_for(path))
+    sheets: Dict[str, pd.DataFrame] = {}
+    try:
+        for item in manifest.get("sheets", []):
+            df = pd.read_parquet(os.path.join(sidecar_dir_fs, str(item["file"])), engine="pyarrow")
+            for col in item.get("json_columns", []):
+                if col in df.columns:
+                    df[col] = df[col].map(lambda v: json.loads(v) if isinstance(v, str) else float("nan")).astype(object)
+            sheets[str(item["name"])] = df
+    except Exception:
+        return None
+    return sheets or None
+
+
+def copy_workbook_sidecar(src_path: str, dst_path: str) -> Optional[str]:
+    """Copy the sidecar of src_path next to dst_path (call after copying the workbook with shutil.copy2). Returns the new sidecar folder."""
+    src_dir_fs = to_long_path(sidecar_dir_for(src_path))
+    if not os.path.isfile(os.path.join(src_dir_fs, SIDECAR_MANIFEST)):
+        return None
+    dst_dir = sidecar_dir_for(dst_path)
+    try:
+        shutil.rmtree(to_long_path(dst_dir), ignore_errors=True)
+        shutil.copytree(src_dir_fs, to_long_path(dst_dir))
+        return dst_dir
+    except Exception:
+        return None
+
+
+def read_excel_sheet_cached(path: str, sheet_name: str, usecols: Union[None, Iterable[str], Callable[[str], bool]] = None) -> pd.DataFrame:
+    """
+    Registry-first replacement for pd.read_excel(path, sheet_name=...). On a miss the Parquet sidecar of the workbook is
+    tried next; only then the whole sheet is parsed once (openpyxl). Both are cached with the file mtime and then
+    column-filtered, so the next reader of the same sheet is free.
+    Raises like pd.read_excel when the file/sheet cannot be read.
+    """
+    df = ARTIFACTS.get_sheet(path, sheet_name)
+    if df is None:
+        sidecar = load_workbook_sidecar(path)
+        if sidecar:
+            ARTIFACTS.register_parsed(path, sidecar, complete=False)
+            df = ARTIFACTS.get_sheet(path, sheet_name)
+    if df is None:
+        path_fs = to_long_path(path)
+        df = pd.read_excel(path_fs, sheet_name=sheet_name, engine="openpyxl")
+        ARTIFACTS.register_parsed(path, {sheet_name: df}, complete=False)
+    return _select_columns(df, usecols)
+
+
+def read_excel_all_sheets_cached(path: str) -> Dict[str, pd.DataFrame]:
+    """Registry-first replacement for pd.ExcelFile(path) + parse() of every sheet. Raises if the workbook cannot be read."""
+    sheets = ARTIFACTS.get_sheets(path)
+    if sheets is not None:
+        return sheets
+    path_fs = to_long_path(path)
+    with pd.ExcelFile(path_fs, engine="openpyxl") as xl:
+        sheets = {str(s): xl.parse(s) for s in xl.sheet_names}
+    ARTIFACTS.register_parsed(path, sheets)
+    return sheets
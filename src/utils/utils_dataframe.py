@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from typing import List, Optional, Dict
+from typing import List, Optional
 
 import pandas as pd
 
@@ -81,56 +81,83 @@ def drop_columns(df: pd.DataFrame, unwanted) -> pd.DataFrame:
     return df.drop(columns=[c for c in unwanted if c in df.columns], errors="ignore")
 
 
-def build_row_lookup(
+MATCHED_COL = "__rel_matched__"
+
+
+def lookup_relation_fields(
+    df: pd.DataFrame,
     relations_df: Optional[pd.DataFrame],
     key_cols,
+    fields,
     extra_strip_cols=None,
-) -> Dict[tuple, pd.Series]:
+) -> pd.DataFrame:
     """
-    Build a dict[(keys...)] -> row from relations_df, stripping spaces.
+    Look up the relation row of every row of df by its stripped key_cols values.
 
-    This avoids repeating the same boilerplate in each builder.
+    Left-merges the (stripped) df keys against relations_df and returns a frame aligned to df.index with:
+      - the raw relation values of `fields` (object dtype; None if the column is missing, NaN if the row has no match)
+      - MATCHED_COL: True where a relation row was found
+    Duplicated keys in relations_df resolve to the LAST row.
     """
-    lookup: Dict[tuple, pd.Series] = {}
-    if relations_df is None or relations_df.empty:
-        return lookup
+    fields = list(dict.fromkeys(fields))
+    key_cols = list(key_cols)
+    strip_cols = key_cols + [c for c in (extra_strip_cols or []) if c not in key_cols]
 
-    rel = relations_df.copy()
-    cols_to_norm = list(key_cols) + list(extra_strip_cols or [])
-    for col in cols_to_norm:
-        if col not in rel.columns:
+    left = pd.DataFrame({k: (df[k].astype(str).str.strip() if k in df.columns else "") for k in key_cols}, index=df.index)
+
+    if relations_df is None or relations_df.empty:
+        out = pd.DataFrame({f: pd.Series(None, index=df.index, dtype=object) for f in fields}, index=df.index)
+        out[MATCHED_COL] = False
+        return out
+
+    rel_cols = list(dict.fromkeys(strip_cols + [f for f in fields if f in relations_df.columns]))
+    rel = pd.DataFrame(index=relations_df.index)
+    for col in rel_cols:
+        if col in relations_df.columns:
+            rel[col] = relations_df[col].astype(str).str.strip() if col in strip_cols else relations_df[col].astype(object)
+        else:
             rel[col] = ""
-        rel[col] = rel[col].astype(str).str.strip()
+    rel = rel.drop_duplicates(subset=key_cols, keep="last")
+    rel = rel.rename(columns={c: f"{c}__rel" for c in rel_cols if c not in key_cols})
+    rel[MATCHED_COL] = True
+
+    merged = left.reset_index(drop=True).merge(rel, on=key_cols, how="left", sort=False)
+    merged.index = df.index
+
+    matched = merged[MATCHED_COL].eq(True)
+    out = pd.DataFrame(index=df.index)
+    for f in fields:
+        if f in key_cols:
+            out[f] = merged[f].astype(object).where(matched, None)
+        elif f"{f}__rel" in merged.columns:
+            out[f] = merged[f"{f}__rel"].astype(object)
+        else:
+            out[f] = pd.Series(None, index=df.index, dtype=object)
+    out[MATCHED_COL] = matched
+    return out
+
 
-    for _, r in rel.iterrows():
-        key = tuple(str(r.get(k, "")).strip() for k in key_cols)
-        lookup[key] = r
-    return lookup
+def clean_text_series(values: Optional[pd.Series], index=None) -> pd.Series:
+    """
+    Vectorised per-value cleanup used by pick_non_empty_series():
+    str(v).strip(), with None/NaN/''/'nan' mapped to ''.
+    """
+    if values is None:
+        return pd.Series("", index=index, dtype=object)
+    text = values.astype(str).str.strip()
+    invalid = values.isna() | text.eq("") | text.str.lower().eq("nan")
+    return text.mask(invalid, "").astype(object)
 
 
-def pick_non_empty_value(rel_row: Optional[pd.Series], row: pd.Series, field: str) -> str:
+def pick_non_empty_series(rel_values: Optional[pd.Series], df: pd.DataFrame, field: str) -> pd.Series:
     """
-    Prefer value from relations_df; if empty/NaN, fallback to value in df row.
-    Avoid returning literal 'nan'.
+    Prefer the relation value, fallback to df[field]; '' if both are empty (literal 'nan' counts as empty).
     """
-    candidates = []
-    if rel_row is not None:
-        candidates.append(rel_row.get(field))
-    candidates.append(row.get(field))
-
-    for v in candidates:
-        if v is None:
-            continue
-        try:
-            if pd.isna(v):
-                continue
-        except TypeError:
-            pass
-        s = str(v).strip()
-        if not s or s.lower() == "nan":
-            continue
-        return s
-    return ""
+    row_values = clean_text_series(df[field] if field in df.columns else None, index=df.index)
+    if rel_values is None:
+        return row_values
+    rel_clean = clean_text_series(rel_values, index=df.index)
+    return rel_clean.where(rel_clean.ne(""), row_values)
 
 
 def concat_or_empty(dfs: List[pd.DataFrame]) -> pd.DataFrame:
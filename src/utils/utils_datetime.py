@@ -1,65 +1,118 @@
 # -*- coding: utf-8 -*-
 # src/utils/utils_datetime.py
 
+import functools
 import re
 import time
 from datetime import datetime
 from contextlib import contextmanager
-from typing import Callable, Iterator, Iterable, Optional
+from typing import Callable, Iterator, Optional
 
 
 # --- HELPERS FOR DATE DETECTION ---
 
-def extract_date(folder_name: str) -> Optional[str]:
-    """
-    Try to find a valid date inside 'folder_name' in many human formats and return it as 'YYYYMMDD'.
-    The detection is "intelligent": it validates year, month and day using datetime.strptime.
+# NEW: the candidate grammar (token splitter, date-ish slices and one fullmatch regex per strptime format) is compiled once at
+# import time. Each format regex uses the same field patterns as datetime.strptime (month names as any letters), so it accepts
+# a superset of what strptime accepts: strptime only runs for the formats whose regex matches the candidate (instead of
+# raising ValueError for ~90 formats per candidate) and still has the final word (day-of-month ranges, month names).
+_DATE_SEPS = ["-", "_", ".", "/", " "]
+_DATE_TOKEN_SPLIT_RE = re.compile(r"[^A-Za-z0-9]+")
+_MONTHS_RX = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)"
+_DATEISH_RES = [re.compile(rx, flags=re.IGNORECASE) for rx in (
+    r"\b\d{8}\b",                               # 20250103 / 01032025
+    r"\b\d{6}\b",                               # 250103 / 111125
+    r"\b\d{4}[-_/.\s]\d{1,2}[-_/.\s]\d{1,2}\b",
+    r"\b\d{1,2}[-_/.\s]\d{1,2}[-_/.\s]\d{2,4}\b",
+    rf"\b{_MONTHS_RX}[a-z]*[-_/.\s]?\d{{1,2}}[-_/.\s]?\d{{2,4}}\b",
+    rf"\b\d{{1,2}}[-_/.\s]?{_MONTHS_RX}[a-z]*[-_/.\s]?\d{{2,4}}\b",
+    rf"\b\d{{4}}[-_/.\s]?{_MONTHS_RX}[a-z]*[-_/.\s]?\d{{1,2}}\b",
+    rf"\b{_MONTHS_RX}[a-z]*\d{{1,2}}\d{{4}}\b",  # Jan032025
+    rf"\b\d{{1,2}}{_MONTHS_RX}[a-z]*\d{{4}}\b",  # 03Jan2025
+)]
+
+# Keep a broad set; scoring will decide which parse wins.
+_NUMERIC_YMD = [
+    "%Y%m%d", "%Y-%m-%d", "%Y_%m_%d", "%Y.%m.%d", "%Y/%m/%d", "%Y %m %d",
+    "%y%m%d", "%y-%m-%d", "%y_%m_%d", "%y.%m.%d", "%y/%m/%d", "%y %m %d",
+]
+_NUMERIC_MDY = [
+    "%m%d%Y", "%m-%d-%Y", "%m_%d_%Y", "%m.%d.%Y", "%m/%d/%Y", "%m %d %Y",
+    "%m%d%y", "%m-%d-%y", "%m_%d_%y", "%m.%d.%y", "%m/%d/%y", "%m %d %y",
+]
+_NUMERIC_DMY = [
+    "%d%m%Y", "%d-%m-%Y", "%d_%m_%Y", "%d.%m.%Y", "%d/%m/%Y", "%d %m %Y",
+    "%d%m%y", "%d-%m-%y", "%d_%m_%y", "%d.%m.%y", "%d/%m/%y", "%d %m %y",
+]
+_MONTH_NAME_VARIANTS = [
+    # Day Month Year
+    "%d-%b-%Y", "%d %b %Y", "%d_%b_%Y", "%d.%b.%Y", "%d/%b/%Y",
+    "%d-%B-%Y", "%d %B %Y", "%d_%B_%Y", "%d.%B.%Y", "%d/%B/%Y",
+    # Month Day Year
+    "%b-%d-%Y", "%b %d %Y", "%b_%d_%Y", "%b.%d.%Y", "%b/%d/%Y",
+    "%B-%d-%Y", "%B %d %Y", "%B_%d_%Y", "%B.%d.%Y", "%B/%d/%Y",
+    # Year Month Day
+    "%Y-%b-%d", "%Y %b %d", "%Y_%b_%d", "%Y.%b.%d", "%Y/%b/%d",
+    "%Y-%B-%d", "%Y %B %d", "%Y_%B_%d", "%Y.%B.%d", "%Y/%B/%d",
+    # Compact without separators like 03Jan2025 / Jan032025 / 2025Jan03
+    "%d%b%Y", "%b%d%Y", "%Y%b%d",
+    "%d%B%Y", "%B%d%Y", "%Y%B%d",
+    # Two-digit year with names
+    "%d-%b-%y", "%d %b %y", "%b %d %y", "%y %b %d", "%b%d%y", "%d%b%y",
+    "%d-%B-%y", "%d %B %y", "%B %d %y", "%y %B %d", "%B%d%y", "%d%B%y",
+]
+_DATE_FORMATS: list[str] = _NUMERIC_YMD + _NUMERIC_MDY + _NUMERIC_DMY + _MONTH_NAME_VARIANTS
+
+# Field patterns of datetime.strptime (_strptime.TimeRE); month names accept any letters (locale independent superset)
+_STRPTIME_FIELD_RX = {
+    "Y": r"\d\d\d\d",
+    "y": r"\d\d",
+    "m": r"1[0-2]|0[1-9]|[1-9]",
+    "d": r"3[01]|[12]\d|0[1-9]|[1-9]| [1-9]",
+    "b": r"[^\W\d_]+",
+    "B": r"[^\W\d_]+",
+}
+
+
+def _format_to_regex(fmt: str) -> "re.Pattern[str]":
+    """Compile a strptime format of _DATE_FORMATS into a fullmatch pre-filter (whitespace -> \\s+, like strptime)."""
+    parts: list[str] = []
+    i = 0
+    while i < len(fmt):
+        ch = fmt[i]
+        if ch == "%" and i + 1 < len(fmt):
+            parts.append(f"(?:{_STRPTIME_FIELD_RX[fmt[i + 1]]})")
+            i += 2
+            continue
+        parts.append(r"\s+" if ch.isspace() else re.escape(ch))
+        i += 1
+    return re.compile("".join(parts), flags=re.IGNORECASE)
 
-    Priority rules for ambiguities:
-      1) Prefer interpretations that yield the current year.
-      2) Prefer formats with 4-digit years (%Y) over 2-digit years (%y).
-      3) Prefer candidates containing separators over compact blobs.
 
-    Supported examples (non exhaustive):
-      - 20250103, 2025-01-03, 2025_1_3, 2025.01.03
-      - 01-03-2025, 1_3_25, 01.03.25
-      - 03/01/2025 (both D/M/Y and M/D/Y are attempted)
-      - Jan-03-2025, 03-Jan-25, January 3 2025, 3 January 25
-      - 2025Jan03, 03Jan2025, 3January2025
-      - With or without separators: '-', '_', '.', '/', ' '
+_DATE_FORMAT_RES: list[tuple[str, "re.Pattern[str]"]] = [(fmt, _format_to_regex(fmt)) for fmt in _DATE_FORMATS]
 
-    Two-digit years are mapped with a century window [1970..2069].
-    Returns 'YYYYMMDD' on success, otherwise None.
-    """
 
-    # ------------------------- helpers -------------------------
-    def try_parse_with_formats(candidate: str, fmts: Iterable[str]) -> list[tuple[datetime, str]]:
-        """Return all successful parses as (datetime, format) to allow scoring selection."""
-        results: list[tuple[datetime, str]] = []
-        for fmt in fmts:
-            try:
-                dt = datetime.strptime(candidate, fmt)
-                if 1900 <= dt.year <= 2100:
-                    # Enforce 2-digit year window [1970..2069]
-                    if "%y" in fmt and not (1970 <= dt.year <= 2069):
-                        continue
-                    results.append((dt, fmt))
-            except ValueError:
+def _try_parse_date_candidate(candidate: str) -> list[tuple[datetime, str]]:
+    """Return all successful parses of a candidate as (datetime, format) to allow scoring selection."""
+    results: list[tuple[datetime, str]] = []
+    for fmt, rx in _DATE_FORMAT_RES:
+        if rx.fullmatch(candidate) is None:
+            continue
+        try:
+            dt = datetime.strptime(candidate, fmt)
+        except ValueError:
+            continue
+        if 1900 <= dt.year <= 2100:
+            # Enforce 2-digit year window [1970..2069]
+            if "%y" in fmt and not (1970 <= dt.year <= 2069):
                 continue
-        return results
-
-    def normalize_output(dt: datetime) -> str:
-        """Return canonical YYYY-MM-DD string."""
-        return dt.strftime("%Y-%m-%d")
+            results.append((dt, fmt))
+    return results
 
-    # -------------------- candidate generation --------------------
-    text = folder_name
-    current_year = datetime.now().year
-    current_year_str = str(current_year)
-    current_year_2d = f"{current_year % 100:02d}"  # kept exactly as in original code, even if unused
 
+def _date_candidates(text: str) -> set[str]:
+    """Substrings of 'text' that may hold a date: alnum tokens, joined token windows and date-ish regex slices."""
     # Tokenize by non-alnum; keep alnum tokens
-    tokens = [t for t in re.split(r"[^A-Za-z0-9]+", text) if t]
+    tokens = [t for t in _DATE_TOKEN_SPLIT_RE.split(text) if t]
 
     candidates: set[str] = set()
 
@@ -71,69 +124,70 @@ def extract_date(folder_name: str) -> Optional[str]:
             candidates.add(t)
 
     # 2) Windows joined with/without separators
-    seps = ["-", "_", ".", "/", " "]
     for win_size in (2, 3, 4):
         for i in range(0, len(tokens) - win_size + 1):
             window = tokens[i:i + win_size]
             joined_no_sep = "".join(window)
             if 4 <= len(joined_no_sep) <= 16:
                 candidates.add(joined_no_sep)
-            for sep in seps:
+            for sep in _DATE_SEPS:
                 joined = sep.join(window)
                 if 4 <= len(joined) <= 20:
                     candidates.add(joined)
 
     # 3) Regex slices that look date-ish
-    dateish_regexes = [
-        r"\b\d{8}\b",                               # 20250103 / 01032025
-        r"\b\d{6}\b",                               # 250103 / 111125
-        r"\b\d{4}[-_/.\s]\d{1,2}[-_/.\s]\d{1,2}\b",
-        r"\b\d{1,2}[-_/.\s]\d{1,2}[-_/.\s]\d{2,4}\b",
-        r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[-_/.\s]?\d{1,2}[-_/.\s]?\d{2,4}\b",
-        r"\b\d{1,2}[-_/.\s]?(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[-_/.\s]?\d{2,4}\b",
-        r"\b\d{4}[-_/.\s]?(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[-_/.\s]?\d{1,2}\b",
-        r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\d{1,2}\d{4}\b",  # Jan032025
-        r"\b\d{1,2}(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\d{4}\b",  # 03Jan2025
-    ]
-    for rx in dateish_regexes:
-        for m in re.finditer(rx, text, flags=re.IGNORECASE):
+    for rx in _DATEISH_RES:
+        for m in rx.finditer(text):
             candidates.add(m.group(0))
 
+    return candidates
+
+
+def extract_date(folder_name: str) -> Optional[str]:
+    """
+    Try to find a valid date inside 'folder_name' in many human formats and return it as 'YYYY-MM-DD'.
+    The detection is "intelligent": it validates year, month and day using datetime.strptime.
+
+    Priority rules for ambiguities:
+      1) Prefer interpretations that yield the current year.
+      2) Prefer formats with 4-digit years (%Y) over 2-digit years (%y).
+      3) Prefer candidates containing separators over compact blobs.
+
+    Supported examples (non exhaustive):
+      - 20250103, 2025-01-03, 2025_1_3, 2025.01.03
+      - 01-03-2025, 1_3_25, 01.03.25
+      - 03/01/2025 (both D/M/Y and M/D/Y are attempted)
+      - Jan-03-2025, 03-Jan-25, January 3 2025, 3 January 25
+      - 2025Jan03, 03Jan2025, 3January2025
+      - With or without separators: '-', '_', '.', '/', ' '
+
+    Two-digit years are mapped with a century window [1970..2069].
+    Returns 'YYYY-MM-DD' on success, otherwise None.
+
+    NEW: results are memoised per (folder_name, current year), since the same folder names are parsed for every folder level
+    of every market. Examples (unambiguous, independent of the current year):
+
+        >>> extract_date("20250103_0900_Step0")
+        '2025-01-03'
+        >>> extract_date("Step0_2025.1.3")
+        '2025-01-03'
+        >>> extract_date("logs_Jan-03-2025")
+        '2025-01-03'
+        >>> extract_date("03Jan2025_Indiana")
+        '2025-01-03'
+        >>> extract_date("Indiana") is None
+        True
+    """
+    return _extract_date_cached(folder_name, datetime.now().year)
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_date_cached(folder_name: str, current_year: int) -> Optional[str]:
+    candidates = _date_candidates(folder_name)
     if not candidates:
         return None
 
-    # -------------------- formats to attempt --------------------
-    # Keep a broad set; scoring will decide which parse wins.
-    numeric_YMD = [
-        "%Y%m%d", "%Y-%m-%d", "%Y_%m_%d", "%Y.%m.%d", "%Y/%m/%d", "%Y %m %d",
-        "%y%m%d", "%y-%m-%d", "%y_%m_%d", "%y.%m.%d", "%y/%m/%d", "%y %m %d",
-    ]
-    numeric_MDY = [
-        "%m%d%Y", "%m-%d-%Y", "%m_%d_%Y", "%m.%d.%Y", "%m/%d/%Y", "%m %d %Y",
-        "%m%d%y", "%m-%d-%y", "%m_%d_%y", "%m.%d.%y", "%m/%d/%y", "%m %d %y",
-    ]
-    numeric_DMY = [
-        "%d%m%Y", "%d-%m-%Y", "%d_%m_%Y", "%d.%m.%Y", "%d/%m/%Y", "%d %m %Y",
-        "%d%m%y", "%d-%m-%y", "%d_%m_%y", "%d.%m.%y", "%d/%m/%y", "%d %m %y",
-    ]
-    month_name_variants = [
-        # Day Month Year
-        "%d-%b-%Y", "%d %b %Y", "%d_%b_%Y", "%d.%b.%Y", "%d/%b/%Y",
-        "%d-%B-%Y", "%d %B %Y", "%d_%B_%Y", "%d.%B.%Y", "%d/%B/%Y",
-        # Month Day Year
-        "%b-%d-%Y", "%b %d %Y", "%b_%d_%Y", "%b.%d.%Y", "%b/%d/%Y",
-        "%B-%d-%Y", "%B %d %Y", "%B_%d_%Y", "%B.%d.%Y", "%B/%d/%Y",
-        # Year Month Day
-        "%Y-%b-%d", "%Y %b %d", "%Y_%b_%d", "%Y.%b.%d", "%Y/%b/%d",
-        "%Y-%B-%d", "%Y %B %d", "%Y_%B_%d", "%Y.%B.%d", "%Y/%B/%d",
-        # Compact without separators like 03Jan2025 / Jan032025 / 2025Jan03
-        "%d%b%Y", "%b%d%Y", "%Y%b%d",
-        "%d%B%Y", "%B%d%Y", "%Y%B%d",
-        # Two-digit year with names
-        "%d-%b-%y", "%d %b %y", "%b %d %y", "%y %b %d", "%b%d%y", "%d%b%y",
-        "%d-%B-%y", "%d %B %y", "%B %d %y", "%y %B %d", "%B%d%y", "%d%B%y",
-    ]
-    all_formats: list[str] = numeric_YMD + numeric_MDY + numeric_DMY + month_name_variants
+    current_year_str = str(current_year)
 
     # -------------------- parsing with scoring --------------------
     # We will evaluate all successful parses per candidate and select the best by a score tuple.
@@ -142,7 +196,7 @@ def extract_date(folder_name: str) -> Optional[str]:
         """Build a priority score: (year_match, four_digit_year, has_separators, candidate_len)."""
         year_match = 0 if dt.year == current_year else 1
         four_digit = 0 if "%Y" in fmt else 1
-        has_seps = 0 if any(sep in candidate for sep in seps) else 1
+        has_seps = 0 if any(sep in candidate for sep in _DATE_SEPS) else 1
         # Slight bias towards shorter candidates to avoid over-greedy matches
         return (year_match, four_digit, has_seps, len(candidate))
 
@@ -151,13 +205,15 @@ def extract_date(folder_name: str) -> Optional[str]:
 
     # Try candidates that contain the current year first (fast path).
     # This improves cases like "...2025-11-11..." where we clearly want 2025.
+    # NEW: candidates of the same priority and length are pre-sorted by their text in descending order (later dates first for
+    # year-first blobs), so ties no longer depend on set iteration order while keeping the order the original loop used.
     prioritized_candidates = sorted(
-        candidates,
+        sorted(candidates, reverse=True),
         key=lambda c: (current_year_str not in c, len(c))
     )
 
     for candidate in prioritized_candidates:
-        parses = try_parse_with_formats(candidate, all_formats)
+        parses = _try_parse_date_candidate(candidate)
         if not parses:
             continue
 
@@ -182,9 +238,9 @@ def extract_date(folder_name: str) -> Optional[str]:
 
             # Early exit if perfect score (current year + 4-digit + separators)
             if sc[:3] == (0, 0, 0):
-                return normalize_output(dt)
+                return dt.strftime("%Y-%m-%d")
 
-    return normalize_output(best_dt) if best_dt else None
+    return best_dt.strftime("%Y-%m-%d") if best_dt else None
 
 
 def format_duration_hms(seconds: float) -> str:
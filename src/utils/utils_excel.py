@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import os
 import re
-from typing import Set
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.styles import Alignment, PatternFill, Font
+from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.hyperlink import Hyperlink
 
 
 # ============================ EXCEL HELPERS ============================
@@ -30,8 +31,58 @@ def unique_sheet_name(base: str, used: Set[str]) -> str:
         i += 1
     return cand
 
+def add_conditional_formats(ws, rules: List[dict], workbook=None) -> int:
+    """
+    Add formula-based conditional formatting rules with the same look on openpyxl and xlsxwriter worksheets.
+
+    Each rule is a dict:
+      - "range": "B2:B40" (several ranges may be given separated by spaces: "A2:H5 A9:H12")
+      - "formula": Excel formula, relative to the top-left cell of the first range (e.g. "=$B2=$C2")
+      - "bg_color" / "font_color": optional hex colors ("FFC7CE" or "#FFC7CE")
+    openpyxl worksheets are detected by their conditional_formatting attribute; xlsxwriter worksheets need the
+    workbook (writer.book) to create the formats. Rules never stop evaluation, so fill and font rules combine.
+    Returns the number of rules added.
+    """
+    added = 0
+    is_openpyxl = hasattr(ws, "conditional_formatting")
+    if is_openpyxl:
+        from openpyxl.formatting.rule import FormulaRule
+    xlsx_formats: dict = {}
+
+    for rule in rules or []:
+        cell_range = str(rule.get("range", "")).strip()
+        formula = str(rule.get("formula", "")).strip()
+        if not cell_range or not formula:
+            continue
+        bg_color = str(rule.get("bg_color") or "").lstrip("#")
+        font_color = str(rule.get("font_color") or "").lstrip("#")
+
+        if is_openpyxl:
+            fill = PatternFill(start_color=bg_color, end_color=bg_color, fill_type="solid") if bg_color else None
+            font = Font(color=font_color) if font_color else None
+            ws.conditional_formatting.add(cell_range, FormulaRule(formula=[formula.lstrip("=")], stopIfTrue=False, fill=fill, font=font))
+        else:
+            if workbook is None:
+                continue
+            key = (bg_color, font_color)
+            if key not in xlsx_formats:
+                props = {}
+                if bg_color:
+                    props["bg_color"] = f"#{bg_color}"
+                if font_color:
+                    props["font_color"] = f"#{font_color}"
+                xlsx_formats[key] = workbook.add_format(props)
+            ranges = cell_range.split()
+            options = {"type": "formula", "criteria": formula if formula.startswith("=") else f"={formula}", "format": xlsx_formats[key]}
+            if len(ranges) > 1:
+                options["multi_range"] = cell_range
+            ws.conditional_format(ranges[0], options)
+        added += 1
+    return added
+
+
 def apply_alternating_category_row_fills(
-    ws: Worksheet,
+    ws,
     category_header: str = "Category",
     header_row: int = 1,
     start_row: int | None = None,
@@ -39,6 +90,9 @@ def apply_alternating_category_row_fills(
     fill_color_1: str = "E0F7FA",
     fill_color_2: str = "B2EBF2",
     value_header: str = "Value",
+    df=None,
+    workbook=None,
+    max_ranges_per_rule: int = 100,
 ) -> None:
     """
     Apply alternating background fills to row blocks based on Category changes.
@@ -51,99 +105,73 @@ def apply_alternating_category_row_fills(
     - Any row whose SubCategory contains the string "inconsist" (case-insensitive)
       will have its font colored red if Value > 0, or dark gray otherwise.
     - Any row with Value == 0 will have its font colored dark gray.
+
+    Everything is expressed as conditional formatting ranges (add_conditional_formats), so the cost depends on the
+    number of rules, not on the number of cells, and openpyxl and xlsxwriter sheets look the same:
+    - two fill rules whose ranges are the Category blocks of each color,
+    - three formula rules for the red/gray fonts.
+    For xlsxwriter worksheets (write-only), pass the written DataFrame (df) and writer.book (workbook).
     """
+    if df is not None:
+        headers = ["" if c is None else str(c).strip() for c in df.columns]
+    else:
+        headers = [str(cell.value).strip() if cell.value is not None else "" for cell in ws[header_row]]
+    headers_lower = [h.lower() for h in headers]
 
     # Find the Category column index based on the header name
-    category_col_idx: int | None = None
-    subcategory_col_idx: int | None = None
-    value_col_idx: int | None = None
-
-    value_header_norm = str(value_header).strip().lower()
-
-    for cell in ws[header_row]:
-        header_value = str(cell.value).strip() if cell.value is not None else ""
-        header_lower = header_value.lower()
-
-        if header_value == category_header:
-            category_col_idx = cell.column
-        elif header_lower == "subcategory":
-            subcategory_col_idx = cell.column
-        elif header_lower == value_header_norm:
-            value_col_idx = cell.column
-
-    if category_col_idx is None:
+    if category_header not in headers:
         # Category column not found, nothing to do
         return
+    category_col_idx = headers.index(category_header) + 1
+    subcategory_col_idx = headers_lower.index("subcategory") + 1 if "subcategory" in headers_lower else None
+    value_header_norm = str(value_header).strip().lower()
+    value_col_idx = headers_lower.index(value_header_norm) + 1 if value_header_norm in headers_lower else None
 
     if start_row is None:
         start_row = header_row + 1
     if end_row is None:
-        end_row = ws.max_row
-
-    fill1 = PatternFill(fill_type="solid", fgColor=fill_color_1)
-    fill2 = PatternFill(fill_type="solid", fgColor=fill_color_2)
-
-    # Fonts for inconsistency rows
-    red_font = Font(color="FF0000")      # Value > 0
-    gray_font = Font(color="A6A6A6")     # Value <= 0 or non-numeric
-
-    last_category = None
-    use_first = True
-    current_fill = fill1
-
-    for row_idx in range(start_row, end_row + 1):
-
-        # Read the Category value in the current row
-        cell_category = ws.cell(row=row_idx, column=category_col_idx).value
-
-        # Detect category changes → toggle background color
-        if cell_category != last_category:
-            if last_category is None:
-                use_first = True
-            else:
-                use_first = not use_first
-            current_fill = fill1 if use_first else fill2
-            last_category = cell_category
-
-        # Detect whether this row is an "Inconsistencies" or "Discrepancy" row
-        is_inconsistency_or_discrepancy_row = False
-        if subcategory_col_idx is not None:
-            sub_val = ws.cell(row=row_idx, column=subcategory_col_idx).value
-            if sub_val is not None:
-                sub_norm = str(sub_val).strip().lower()
-                if "inconsist" in sub_norm or "discrep" in sub_norm:
-                    is_inconsistency_or_discrepancy_row = True
-
-        # Parse Value once (if present)
-        num_val = None
-        if value_col_idx is not None:
-            value_cell = ws.cell(row=row_idx, column=value_col_idx).value
-            if isinstance(value_cell, (int, float)):
-                num_val = float(value_cell)
-            else:
-                try:
-                    if value_cell is not None:
-                        num_val = float(str(value_cell).strip())
-                except Exception:
-                    num_val = None
-
-        # Determine if the inconsistency or discrepancy has Value > 0
-        is_positive_inconsistency_or_discrepancy = (
-            is_inconsistency_or_discrepancy_row and num_val is not None and num_val > 0
-        )
-
-        # Generic zero-value gray rule for all SummaryAudit rows
-        is_zero_value_row = (num_val is not None and num_val == 0)
-
-        # Apply background color and (optionally) red/gray font to the entire row
-        for col_idx in range(1, ws.max_column + 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            cell.fill = current_fill
-            if is_inconsistency_or_discrepancy_row:
-                cell.font = red_font if is_positive_inconsistency_or_discrepancy else gray_font
-            elif is_zero_value_row:
-                cell.font = gray_font
+        end_row = (header_row + len(df)) if df is not None else ws.max_row
+    if end_row < start_row:
+        return
 
+    if df is not None:
+        offset = start_row - header_row - 1
+        categories = df.iloc[offset:offset + end_row - start_row + 1, category_col_idx - 1].tolist()
+    else:
+        categories = [ws.cell(row=r, column=category_col_idx).value for r in range(start_row, end_row + 1)]
+    categories = [None if (c is None or (isinstance(c, float) and c != c)) else c for c in categories]  # NaN == empty cell
+
+    last_col = get_column_letter(len(headers))
+
+    # Category blocks -> ranges of each color (toggle on every Category change)
+    block_ranges: List[List[str]] = [[], []]
+    block_start = start_row
+    color_idx = 0
+    for pos in range(1, len(categories) + 1):
+        if pos == len(categories) or categories[pos] != categories[pos - 1]:
+            block_end = start_row + pos - 1
+            block_ranges[color_idx].append(f"A{block_start}:{last_col}{block_end}")
+            block_start = block_end + 1
+            color_idx = 1 - color_idx
+
+    rules: List[dict] = []
+    for ranges, color in ((block_ranges[0], fill_color_1), (block_ranges[1], fill_color_2)):
+        for k in range(0, len(ranges), max(1, int(max_ranges_per_rule))):
+            rules.append({"range": " ".join(ranges[k:k + max_ranges_per_rule]), "formula": "=TRUE", "bg_color": color})
+
+    # Fonts: red for inconsistency/discrepancy rows with Value > 0, dark gray for the other ones and for Value == 0
+    full_range = f"A{start_row}:{last_col}{end_row}"
+    val = f"${get_column_letter(value_col_idx)}{start_row}" if value_col_idx else None
+    is_positive = f'AND({val}<>"",IFERROR(--{val},0)>0)' if val else "FALSE"
+    if subcategory_col_idx:
+        sub = f"${get_column_letter(subcategory_col_idx)}{start_row}"
+        is_inconsistency = f'OR(ISNUMBER(SEARCH("inconsist",{sub})),ISNUMBER(SEARCH("discrep",{sub})))'
+        rules.append({"range": full_range, "formula": f"=AND({is_inconsistency},{is_positive})", "font_color": "FF0000"})
+        rules.append({"range": full_range, "formula": f"=AND({is_inconsistency},NOT({is_positive}))", "font_color": "A6A6A6"})
+    if val:
+        rules.append({"range": full_range, "formula": f'=AND({val}<>"",IFERROR(--{val},1)=0)', "font_color": "A6A6A6"})
+
+    add_conditional_formats(ws, rules, workbook=workbook)
 
 
 def color_summary_tabs(writer, prefix: str = "Summary", rgb_hex: str = "00B050") -> None:
@@ -198,7 +226,7 @@ def enable_header_filters(writer, freeze_header: bool = True, align_left: bool =
         pass
 
 
-def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, align: str = "left", header_color: str = "CCE5FF", max_width: int = 100, autofit_rows: object = 50, enable_a1_hyperlink: bool = False, hyperlink_sheet: str = "SummaryAudit", category_sheet_map: dict | None = None, summary_category_header: str = "Category", max_summary_category_links: int = 800) -> None:
+def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, align: str = "left", header_color: str = "CCE5FF", max_width: int = 100, autofit_rows: object = 50, enable_a1_hyperlink: bool = False, hyperlink_sheet: str = "SummaryAudit", category_sheet_map: dict | None = None, summary_category_header: str = "Category", max_summary_category_links: int = 800, skip_sheets: Optional[Set[str]] = None, external_sheet_map: Optional[dict] = None, sheet_dfs: Optional[dict] = None) -> None:
     """
     Apply header styling (with configurable color), enable auto-filter on the first row,
     freeze header optionally, and auto-fit all column widths.
@@ -222,8 +250,15 @@ def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, ali
         category_sheet_map: optional mapping to resolve Category values to actual sheet names
         summary_category_header: header name to use for hyperlinking rows in the summary sheet (default="Category")
         max_summary_category_links: safety limit for how many summary rows will be hyperlinked (default=800)
+        skip_sheets: sheets already styled at write time (e.g. by write_df_streaming); their cells are not revisited
+        external_sheet_map: sheet name -> relative path of the companion workbook holding it (summary links point there)
+        sheet_dfs: optional sheet name -> DataFrame written with to_excel(index=False); column widths are then computed
+                   from the DataFrame (compute_autofit_widths) instead of reading back the worksheet cells
     """
     workbook = writer.book
+    skip_sheets = set(skip_sheets or ())
+    external_sheet_map = dict(external_sheet_map or {})
+    sheet_dfs = dict(sheet_dfs or {})
 
     # Normalize autofit_rows
     use_all_rows = False
@@ -253,6 +288,9 @@ def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, ali
     has_summary_sheet = bool(hyperlink_sheet) and (hyperlink_sheet in sheetnames)
 
     for ws in getattr(workbook, "worksheets", []):
+        if getattr(ws, "title", "") in skip_sheets:
+            continue
+
         # Skip sheets without content
         try:
             if ws.max_row < 1 or ws.max_column < 1:
@@ -297,6 +335,18 @@ def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, ali
         # --------------------------------------------------------------
         # 4) Auto-fit column widths (sample first N rows by default)
         # --------------------------------------------------------------
+        # NEW: when the source DataFrame is known (and matches the sheet shape), measure it instead of the cells
+        df_src = sheet_dfs.get(getattr(ws, "title", ""))
+        if df_src is not None and tuple(getattr(df_src, "shape", (-1, -1))) == (ws.max_row - 1, ws.max_column):
+            try:
+                df_widths = compute_autofit_widths(df_src, "All" if use_all_rows else rows_to_scan, max_width)
+            except Exception:
+                df_widths = None
+            if df_widths is not None:
+                for col_idx, width in enumerate(df_widths, start=1):
+                    ws.column_dimensions[get_column_letter(col_idx)].width = width
+                continue
+
         try:
             if use_all_rows:
                 row_end = ws.max_row
@@ -327,7 +377,7 @@ def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, ali
     if enable_a1_hyperlink and has_summary_sheet:
         for ws in getattr(workbook, "worksheets", []):
             try:
-                if getattr(ws, "title", "") == hyperlink_sheet:
+                if getattr(ws, "title", "") == hyperlink_sheet or getattr(ws, "title", "") in skip_sheets:
                     continue
                 cell = ws.cell(row=1, column=1)
                 cell.hyperlink = f"#'{hyperlink_sheet}'!A1"
@@ -381,8 +431,11 @@ def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, ali
                             if category_sheet_map and target_sheet and target_sheet not in sheetnames:
                                 target_sheet = str(category_sheet_map.get(raw, raw))
 
-                            if target_sheet and target_sheet in sheetnames:
-                                cell.hyperlink = f"#'{target_sheet}'!A1"
+                            if target_sheet and (target_sheet in sheetnames or target_sheet in external_sheet_map):
+                                if target_sheet in sheetnames:
+                                    cell.hyperlink = f"#'{target_sheet}'!A1"
+                                else:
+                                    cell.hyperlink = Hyperlink(ref=cell.coordinate, target=external_sheet_map[target_sheet], location=f"'{target_sheet}'!A1")
                                 try:
                                     cell.font = cell.font.copy(color="0563C1", underline="single")
                                 except Exception:
@@ -394,7 +447,7 @@ def style_headers_autofilter_and_autofit(writer, freeze_header: bool = True, ali
 
 
 
-def style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs: dict, freeze_header: bool = True, align: str = "left", max_autofit_rows: int = 50, max_col_width: int = 100, enable_a1_hyperlinks: bool = True, hyperlink_sheet: str = "SummaryAudit", category_sheet_map: dict | None = None) -> None:
+def style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs: dict, freeze_header: bool = True, align: str = "left", max_autofit_rows: int = 50, max_col_width: int = 100, enable_a1_hyperlinks: bool = True, hyperlink_sheet: str = "SummaryAudit", category_sheet_map: dict | None = None, skip_sheets: Optional[Set[str]] = None, external_sheet_map: Optional[dict] = None) -> None:
     """
     Fast styling for XLSX generated with xlsxwriter engine:
       - Freeze header row
@@ -404,11 +457,11 @@ def style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs: dict, fre
       - Color Summary* tabs in green
       - Optional A1 hyperlink to SummaryAudit (keeps same header text)
       - Optional hyperlinks from SummaryAudit.Category to target sheets (only for small SummaryAudit)
+    Sheets in skip_sheets were already styled at write time (write_df_streaming) and are left untouched.
+    Categories found in external_sheet_map (sheet -> companion workbook path) are linked to that workbook.
     """
-    try:
-        import pandas as pd
-    except Exception:
-        pd = None
+    skip_sheets = set(skip_sheets or ())
+    external_sheet_map = dict(external_sheet_map or {})
 
     try:
         workbook = writer.book
@@ -422,6 +475,8 @@ def style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs: dict, fre
     has_summaryaudit = bool(hyperlink_sheet) and (hyperlink_sheet in writer.sheets)
 
     for sheet_name, df in (sheet_dfs or {}).items():
+        if sheet_name in skip_sheets:
+            continue
         ws = writer.sheets.get(sheet_name)
         if ws is None:
             continue
@@ -458,24 +513,8 @@ def style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs: dict, fre
         # Column widths (sampled)
         try:
             if df is not None and hasattr(df, "columns"):
-                if pd is not None and isinstance(df, pd.DataFrame) and not df.empty:
-                    sample_df = df.head(int(max_autofit_rows)) if max_autofit_rows and max_autofit_rows > 0 else df
-                    for col_idx, col_name in enumerate(list(df.columns)):
-                        header_len = len(str(col_name)) if col_name is not None else 0
-                        try:
-                            ser = sample_df.iloc[:, col_idx]
-                            max_val_len = int(ser.astype(str).map(len).max()) if not ser.empty else 0
-                        except Exception:
-                            max_val_len = 0
-                        width = min(max(header_len, max_val_len) + 2, int(max_col_width))
-                        width = max(width, 8)
-                        ws.set_column(col_idx, col_idx, width)
-                else:
-                    # If df isn't a DataFrame, at least set widths based on headers if possible
-                    cols = list(getattr(df, "columns", [])) if df is not None else []
-                    for col_idx, col_name in enumerate(cols):
-                        width = min(max(len(str(col_name)) + 2, 8), int(max_col_width))
-                        ws.set_column(col_idx, col_idx, width)
+                for col_idx, width in enumerate(_xlsxwriter_autofit_widths(df, max_autofit_rows, max_col_width)):
+                    ws.set_column(col_idx, col_idx, width)
         except Exception:
             pass
 
@@ -508,6 +547,327 @@ def style_headers_autofilter_and_autofit_xlsxwriter(writer, sheet_dfs: dict, fre
                         if target and target in writer.sheets:
                             # +1 because row 0 is header in Excel; data starts row 1
                             ws_sa.write_url(i + 1, cat_idx, f"internal:{target}!A1", hyperlink_format, raw)
+                        elif target and target in external_sheet_map:
+                            ws_sa.write_url(i + 1, cat_idx, f"external:{external_sheet_map[target]}#'{target}'!A1", hyperlink_format, raw)
         except Exception:
             pass
 
+
+def compute_autofit_widths(df, autofit_rows: object = 50, max_width: int = 100, min_width: int = 0) -> List[int]:
+    """
+    Column widths computed from the source DataFrame (no worksheet cell access), shared by the openpyxl and xlsxwriter paths.
+
+    - autofit_rows: content rows sampled after the header (default 50); "All" or None scans every row, ints <= 0 = header only.
+    - width = max(min(max_len + 2, max_width), min_width), where max_len covers the header and the sampled values
+      (NaN/None count as empty, newlines are flattened to a space and the text is stripped, as in the Excel view).
+    Lengths are measured with vectorised str.len() on the distinct values of each column (integer columns only need
+    their min/max), so the cost stays flat with the default sampling and grows with cardinality, not row count, on "All".
+    """
+    import pandas as pd
+
+    if autofit_rows is None or (isinstance(autofit_rows, str) and autofit_rows.strip().lower() == "all"):
+        sample_df = df
+    else:
+        try:
+            rows_to_scan = max(0, int(autofit_rows))
+        except Exception:
+            rows_to_scan = 50
+        sample_df = df.iloc[:rows_to_scan]
+
+    def _clean_len(text: pd.Series) -> int:
+        if text.empty:
+            return 0
+        text = text.str.replace("\r\n", " ", regex=False).str.replace("\n", " ", regex=False).str.strip()
+        return int(text.str.len().max())
+
+    widths: List[int] = []
+    for col_idx, col_name in enumerate(list(df.columns)):
+        max_len = _clean_len(pd.Series(["" if col_name is None else str(col_name)], dtype=object))
+        try:
+            ser = sample_df.iloc[:, col_idx]
+            if pd.api.types.is_integer_dtype(ser.dtype) and not pd.api.types.is_bool_dtype(ser.dtype):
+                values = ser.dropna()
+                if not values.empty:
+                    max_len = max(max_len, len(str(values.min())), len(str(values.max())))
+            else:
+                values = ser.dropna()
+                try:
+                    values = pd.Series(values.unique(), dtype=object)
+                except TypeError:
+                    pass  # unhashable values (lists, dicts): measure them all
+                max_len = max(max_len, _clean_len(values.astype(str)))
+        except Exception:
+            pass
+        widths.append(max(min(max_len + 2, int(max_width)), int(min_width)))
+    return widths
+
+
+def _xlsxwriter_autofit_widths(df, max_autofit_rows: int = 50, max_col_width: int = 100) -> List[int]:
+    """
+    Column widths used by the xlsxwriter styling: header + sampled rows (max_autofit_rows, <= 0 = all rows), at least 8 wide.
+    """
+    try:
+        import pandas as pd
+    except Exception:
+        pd = None
+
+    if pd is not None and isinstance(df, pd.DataFrame) and not df.empty:
+        rows = max_autofit_rows
+        if not isinstance(rows, str):
+            try:
+                rows = int(rows) if rows and int(rows) > 0 else "All"
+            except Exception:
+                rows = 50
+        return compute_autofit_widths(df, rows, max_col_width, min_width=8)
+    # If df isn't a DataFrame (or is empty), at least set widths based on headers if possible
+    cols = list(getattr(df, "columns", [])) if df is not None else []
+    return [min(max(len(str(col_name)) + 2, 8), int(max_col_width)) for col_name in cols]
+
+
+def _openpyxl_autofit_widths(df, autofit_rows: object = 50, max_width: int = 100) -> List[int]:
+    """
+    Column widths used by the openpyxl styling: header + first N rows ("All" = every row), width = min(max_len + 2, max_width).
+    """
+    return compute_autofit_widths(df, autofit_rows, max_width)
+
+
+def _iter_df_rows(df, chunk_rows: int = 10000) -> Iterator[tuple]:
+    """
+    Yield DataFrame rows as tuples of plain Python values (NaN/None -> None), in row order.
+    Rows are materialized from the column numpy arrays in chunks, so the extra memory is bounded by chunk_rows.
+    """
+    import pandas as pd
+
+    n_rows, n_cols = df.shape
+    if n_cols == 0:
+        return
+    for start in range(0, n_rows, max(1, int(chunk_rows))):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = []
+        for col_idx in range(n_cols):
+            ser = chunk.iloc[:, col_idx]
+            values = ser.to_numpy(dtype=object, copy=True)
+            null_mask = ser.isna().to_numpy()
+            if null_mask.any():
+                values[null_mask] = None
+            # Anything that is not a plain scalar (Timestamps, lists, ...) is written as text, like in the Excel view
+            if pd.api.types.infer_dtype(ser, skipna=True) not in ("string", "empty", "integer", "floating", "boolean", "mixed-integer-float"):
+                values = [v if (v is None or isinstance(v, (str, int, float, bool))) else str(v) for v in values]
+            columns.append(values)
+        yield from zip(*columns)
+
+
+def write_df_streaming(writer, df, sheet_name: str, freeze_header: bool = True, align: str = "left", autofit_rows: object = 50, max_col_width: int = 100, a1_hyperlink_sheet: Optional[str] = None, constant_memory: bool = True, chunk_rows: int = 10000, a1_hyperlink_workbook: Optional[str] = None):
+    """
+    Row-ordered replacement for df.to_excel(writer, sheet_name=..., index=False) for large raw tables.
+
+    Rows are emitted strictly in order straight from the DataFrame column arrays, and the sheet is fully styled
+    at write time (header format, autofilter, frozen header, column widths, optional A1 hyperlink to a summary sheet),
+    so the post-write styling pass can skip it (see skip_sheets in the style_* helpers).
+    If a1_hyperlink_workbook is given (relative path of another .xlsx), the A1 link points to that workbook's sheet.
+
+      - xlsxwriter engine: the worksheet is created in constant_memory mode (rows are flushed to disk as they are written),
+        so peak memory does not grow with the sheet size. Only this sheet is affected; other sheets keep random access.
+      - openpyxl engine: rows are appended in order with ws.append(); a regular (editable) workbook cannot host
+        write-only sheets, so memory still grows with the sheet, but the slow per-cell to_excel path and
+        the later re-scan of every cell for styling are avoided.
+
+    Returns the created worksheet.
+    """
+    engine = str(getattr(writer, "engine", "") or "").lower()
+    headers = ["" if c is None else c for c in list(df.columns)]
+    n_rows, n_cols = df.shape
+    if a1_hyperlink_workbook:
+        link_a1 = bool(a1_hyperlink_sheet)
+    else:
+        link_a1 = bool(a1_hyperlink_sheet) and a1_hyperlink_sheet != sheet_name and a1_hyperlink_sheet in writer.sheets
+
+    if engine == "xlsxwriter":
+        book = writer.book
+        # Workbook.constant_memory (the 'constant_memory' workbook option) is read by add_worksheet() for each new sheet,
+        # so switching it around this call affects only this sheet (xlsxwriter >= 3.0, see requirements.txt)
+        previous_mode = getattr(book, "constant_memory", False)
+        try:
+            book.constant_memory = bool(constant_memory) and not getattr(book, "in_memory", False)
+            ws = book.add_worksheet(sheet_name)
+        finally:
+            book.constant_memory = previous_mode
+
+        header_format = book.add_format({"bold": True, "bg_color": "#D9E1F2", "border": 1, "text_wrap": True, "valign": "vcenter", "align": align})
+        header_hlink_format = book.add_format({"bold": True, "bg_color": "#D9E1F2", "border": 1, "text_wrap": True, "valign": "vcenter", "align": align, "font_color": "#0563C1", "underline": 1})
+
+        # Sheet-level settings first (they are stored apart from cell data, so they are safe in constant_memory mode)
+        for col_idx, width in enumerate(_xlsxwriter_autofit_widths(df, autofit_rows, max_col_width)):
+            ws.set_column(col_idx, col_idx, width)
+        if freeze_header:
+            ws.freeze_panes(1, 0)
+        if n_cols > 0:
+            ws.autofilter(0, 0, max(0, n_rows), n_cols - 1)
+
+        if n_cols > 0:
+            ws.write_row(0, 0, [str(h) for h in headers], header_format)
+            if link_a1:
+                url = f"external:{a1_hyperlink_workbook}#'{a1_hyperlink_sheet}'!A1" if a1_hyperlink_workbook else f"internal:{a1_hyperlink_sheet}!A1"
+                ws.write_url(0, 0, url, header_hlink_format, str(headers[0]))
+
+        write_row = ws.write_row
+        for row_idx, row in enumerate(_iter_df_rows(df, chunk_rows), start=1):
+            write_row(row_idx, 0, row)
+        return ws
+
+    # openpyxl engine
+    ws = writer.book.create_sheet(title=sheet_name)
+    if n_cols == 0:
+        return ws
+
+    ws.append(headers)
+    header_fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
+    header_alignment = Alignment(horizontal=align, vertical="center", wrap_text=True)
+    thin = Side(style="thin")
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = Font(bold=True, color="000000")
+        cell.alignment = header_alignment
+        cell.border = header_border
+    if link_a1:
+        cell = ws.cell(row=1, column=1)
+        if a1_hyperlink_workbook:
+            cell.hyperlink = Hyperlink(ref=cell.coordinate, target=a1_hyperlink_workbook, location=f"'{a1_hyperlink_sheet}'!A1")
+        else:
+            cell.hyperlink = f"#'{a1_hyperlink_sheet}'!A1"
+        cell.font = Font(bold=True, color="0563C1", underline="single")
+
+    append = ws.append
+    for row in _iter_df_rows(df, chunk_rows):
+        append(row)
+
+    ws.auto_filter.ref = f"A1:{get_column_letter(n_cols)}{n_rows + 1}"
+    if freeze_header:
+        ws.freeze_panes = "A2"
+    for col_idx, width in enumerate(_openpyxl_autofit_widths(df, autofit_rows, max_col_width), start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    return ws
+
+
+# ============================ SHEET SPILL (oversized tables) ============================
+# Runtime knobs (set by the CLI so they are inherited by worker processes):
+#   SSB_RA_SPILL_POLICY = sheets | csv | parquet   (default: sheets)
+#   SSB_RA_SPILL_ROWS   = max data rows per sheet  (default / upper bound: Excel limit minus header)
+
+EXCEL_MAX_DATA_ROWS = 1_048_575
+SPILL_POLICY_ENV = "SSB_RA_SPILL_POLICY"
+SPILL_ROWS_ENV = "SSB_RA_SPILL_ROWS"
+SPILL_POLICIES = ("sheets", "csv", "parquet")
+
+
+def configure_sheet_spill(policy: Optional[str] = None, max_rows: Optional[int] = None) -> None:
+    """Publish sheet spill options as environment variables (inherited by spawned worker processes)."""
+    if policy:
+        os.environ[SPILL_POLICY_ENV] = str(policy).strip().lower()
+    if max_rows is not None:
+        os.environ[SPILL_ROWS_ENV] = str(int(max_rows))
+
+
+def resolve_sheet_spill(policy: Optional[str] = None, max_rows: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Resolve (spill policy, max data rows per sheet) from explicit arguments or SSB_RA_SPILL_* env vars.
+    Unknown policies fall back to "sheets"; the row threshold is clamped to [1, EXCEL_MAX_DATA_ROWS].
+    """
+    pol = str(policy or os.environ.get(SPILL_POLICY_ENV, "") or "sheets").strip().lower()
+    if pol not in SPILL_POLICIES:
+        pol = "sheets"
+
+    rows = max_rows
+    if rows is None:
+        try:
+            raw = os.environ.get(SPILL_ROWS_ENV, "").strip()
+            rows = int(raw) if raw else None
+        except Exception:
+            rows = None
+    if rows is None or int(rows) <= 0:
+        rows = EXCEL_MAX_DATA_ROWS
+    return pol, min(int(rows), EXCEL_MAX_DATA_ROWS)
+
+
+def _spill_table_to_file(df, file_path_no_ext: str, policy: str) -> Tuple[str, str]:
+    """
+    Write df as <file>.parquet or <file>.csv.gz (temp file + replace). Falls back to CSV when Parquet cannot be written
+    (pyarrow missing or mixed-type columns). Returns (written_path, format).
+    """
+    if policy == "parquet":
+        target = f"{file_path_no_ext}.parquet"
+        try:
+            df.to_parquet(f"{target}.tmp", index=False)
+            os.replace(f"{target}.tmp", target)
+            return target, "parquet"
+        except Exception:
+            try:
+                os.remove(f"{target}.tmp")
+            except Exception:
+                pass
+    target = f"{file_path_no_ext}.csv.gz"
+    df.to_csv(f"{target}.tmp", index=False, compression="gzip")
+    os.replace(f"{target}.tmp", target)
+    return target, "csv"
+
+
+def write_df_with_spill(writer, df, sheet_name: str, used_sheet_names: Set[str], spill_dir: str, spill_file_stem: str, spill_policy: Optional[str] = None, spill_rows: Optional[int] = None, **stream_kwargs) -> Dict[str, object]:
+    """
+    write_df_streaming() with a size guardrail: tables above the spill threshold are never truncated.
+
+      - "sheets":  rows are paged into <sheet>, <sheet> (2), <sheet> (3), ... (each page with its own header).
+      - "csv" / "parquet": the full table is exported to <spill_dir>/<spill_file_stem>.csv.gz|.parquet and <sheet>
+        becomes a small stub (Field/Value) with a hyperlink to that file (relative to the workbook folder = spill_dir).
+    used_sheet_names is updated with every sheet created. stream_kwargs are forwarded to write_df_streaming().
+    Returns {"sheets": [sheet names], "file": spilled file path or None, "policy": applied policy, "rows_per_sheet": threshold}.
+    """
+    import pandas as pd
+
+    policy, limit = resolve_sheet_spill(spill_policy, spill_rows)
+    n_rows = int(len(df))
+    used_sheet_names.add(sheet_name)
+    result: Dict[str, object] = {"sheets": [sheet_name], "file": None, "policy": None, "rows_per_sheet": limit}
+
+    if n_rows <= limit:
+        write_df_streaming(writer, df, sheet_name, **stream_kwargs)
+        return result
+
+    if policy == "sheets":
+        n_pages = -(-n_rows // limit)
+        for page in range(2, n_pages + 1):
+            suffix = f" ({page})"
+            page_name = unique_sheet_name(f"{sheet_name[: 31 - len(suffix)]}{suffix}", used_sheet_names)
+            used_sheet_names.add(page_name)
+            result["sheets"].append(page_name)
+        for page_name, start in zip(result["sheets"], range(0, n_rows, limit)):
+            write_df_streaming(writer, df.iloc[start:start + limit], page_name, **stream_kwargs)
+        result["policy"] = "sheets"
+        return result
+
+    os.makedirs(spill_dir, exist_ok=True)
+    spill_file_stem = re.sub(r'[<>:"/\\|?*\s]+', "_", str(spill_file_stem)).strip("_") or "RawMO"
+    file_path, file_format = _spill_table_to_file(df, os.path.join(spill_dir, spill_file_stem), policy)
+    file_name = os.path.basename(file_path)
+    result["file"] = file_path
+    result["policy"] = file_format
+
+    stub_df = pd.DataFrame({
+        "Field": ["Sheet", "Rows", "Columns", "Rows per sheet (spill threshold)", "Spill format", "File"],
+        "Value": [sheet_name, n_rows, int(df.shape[1]), limit, file_format, file_name],
+    })
+    stub_kwargs = dict(stream_kwargs)
+    stub_kwargs["constant_memory"] = False  # tiny sheet: keep random access to add the file hyperlink afterwards
+    ws = write_df_streaming(writer, stub_df, sheet_name, **stub_kwargs)
+    file_row = len(stub_df)  # last data row (1-based in openpyxl, 0-based + header in xlsxwriter)
+    try:
+        if str(getattr(writer, "engine", "") or "").lower() == "xlsxwriter":
+            ws.write_url(file_row, 1, f"external:{file_name}", writer.book.add_format({"font_color": "#0563C1", "underline": 1}), file_name)
+        else:
+            cell = ws.cell(row=file_row + 1, column=2)
+            cell.hyperlink = file_name
+            cell.font = Font(color="0563C1", underline="single")
+    except Exception:
+        pass
+    return result
+
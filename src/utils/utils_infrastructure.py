@@ -1,5 +1,6 @@
 import os, sys
 import platform
+import threading
 import zipfile
 from typing import Optional, Union
 
@@ -190,6 +191,7 @@ class LoggerDual:
     Enhancements:
       - Optional extra mirror log files (e.g., also write the same log inside the output folder).
       - Optional auto-flush so the log is updated during execution and not only at program end.
+      - Thread-safe writes (background output stages print while the main thread keeps running).
     """
 
     def __init__(self, log_file_path: str, timestamp_format: str = "%Y-%m-%d %H:%M:%S", tee_to_console: bool = True, enable_color: bool = True, auto_flush: bool = True, mirror_file_paths: list[str] | None = None):
@@ -201,6 +203,7 @@ class LoggerDual:
         self.enable_color = enable_color
         self.auto_flush = auto_flush
         self._at_line_start = True  # True when next write begins a new log line
+        self._lock = threading.RLock()
 
         self._mirror_logs: list[tuple[str, object]] = []  # list[(path, file_handle)]
         for p in (mirror_file_paths or []):
@@ -223,22 +226,24 @@ class LoggerDual:
 
         try:
             fh = open(norm, "a", encoding="utf-8")
-            self._mirror_logs.append((norm, fh))
+            with self._lock:
+                self._mirror_logs.append((norm, fh))
             return True
         except Exception:
             return False
 
     def clear_mirror_files(self) -> None:
         """Close and remove all mirror log files (best-effort)."""
-        try:
-            for _p, fh in self._mirror_logs:
-                try:
-                    fh.close()
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        self._mirror_logs = []
+        with self._lock:
+            try:
+                for _p, fh in self._mirror_logs:
+                    try:
+                        fh.close()
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+            self._mirror_logs = []
 
     def _now_prefix(self) -> str:
         """Build a timestamp prefix for the log file."""
@@ -249,6 +254,10 @@ class LoggerDual:
         return strip_ansi(s)
 
     def write(self, message: str):
+        with self._lock:
+            self._write_unlocked(message)
+
+    def _write_unlocked(self, message: str):
         # Always write raw message to terminal
         if self.tee_to_console and self.terminal is not None:
             self.terminal.write(message)
@@ -300,6 +309,30 @@ class LoggerDual:
             except Exception:
                 pass
 
+    def append_log_file(self, other_log_path: str, header: Optional[str] = None) -> bool:
+        """
+        Append the content of another log file (e.g. a worker process log) into the log file and active mirrors (not console).
+        Lines are copied as-is because they already carry their own timestamp prefix. Returns True if appended.
+        """
+        with self._lock:
+            targets = ([self.log] if self.log is not None else []) + [fh for _p, fh in self._mirror_logs]
+            if not targets or not other_log_path:
+                return False
+            try:
+                if not os.path.isfile(other_log_path):
+                    return False
+                if header:
+                    for fh in targets:
+                        fh.write(f"{self._now_prefix()}{header}\n")
+                with open(other_log_path, "r", encoding="utf-8", errors="ignore") as src_fh:
+                    for line in src_fh:
+                        for fh in targets:
+                            fh.write(line)
+                self.flush()
+                return True
+            except Exception:
+                return False
+
     def close(self):
         """Close file handles (best-effort)."""
         try:
@@ -315,9 +348,36 @@ class LoggerDual:
                 pass
 
 
-def attach_output_log_mirror(output_dir: str, copy_existing_log: bool = True, start_marker: Optional[str] = None, end_marker: Optional[str] = None) -> None:
+def derive_log_path(base_log_path: str, tag: str) -> str:
+    """
+    Build a sibling log path tagged for a worker process: '<base_stem>_<tag>.log'.
+    Returns "" if base_log_path is empty (no log file configured).
+    """
+    if not base_log_path:
+        return ""
+    stem, ext = os.path.splitext(str(base_log_path))
+    safe_tag = re.sub(r"[^\w\-]+", "_", str(tag)).strip("_") or "worker"
+    return f"{stem}_{safe_tag}{ext or '.log'}"
+
+
+def install_process_logger(log_file_path: str, tee_to_console: bool = True) -> LoggerDual:
+    """
+    Install a fresh LoggerDual as sys.stdout/sys.stderr for the current (worker) process.
+
+    - Used by worker processes (e.g. Consistency Checks market scheduler) so each process writes its own log file.
+    - The console is taken from sys.__stdout__ so a forked worker never writes into the parent LoggerDual log file.
+    """
+    sys.stdout = sys.__stdout__
+    logger = LoggerDual(log_file_path, tee_to_console=tee_to_console)
+    sys.stdout = logger
+    sys.stderr = logger
+    return logger
+
+
+def attach_output_log_mirror(output_dir: str, copy_existing_log: bool = True, start_marker: Optional[str] = None, end_marker: Optional[str] = None, logger_obj: Optional[object] = None) -> None:
     """
     If sys.stdout is LoggerDual, mirror the current log file into the given output folder.
+    If logger_obj is provided (e.g. a per-process/per-market LoggerDual), it is used instead of sys.stdout.
 
     IMPORTANT:
     - In batch mode we want ONE mirror per execution folder (not accumulating mirrors).
@@ -332,7 +392,8 @@ def attach_output_log_mirror(output_dir: str, copy_existing_log: bool = True, st
         if not out_dir_fs:
             return
 
-        logger_obj = sys.stdout
+        if logger_obj is None:
+            logger_obj = sys.stdout
         add_fn = getattr(logger_obj, "add_mirror_file", None)
         clear_fn = getattr(logger_obj, "clear_mirror_files", None)
         log_path = getattr(logger_obj, "log_path", "")
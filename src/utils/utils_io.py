@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 import configparser
+import functools
+import io
 import os
 import re
 import shutil
+import time
 import traceback
 import zipfile
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Iterable, Iterator
 
 from src.utils.utils_parsing import normalize_csv_list
 
@@ -42,12 +45,27 @@ class LogsExtractionResult:
     extracted_root: Optional[str] = None
     is_extracted: bool = False
     zip_path: Optional[str] = None
+    cache_lease: Optional[str] = None  # NEW: lease on the extraction cache entry (or local ZIP copy) in use
+    cache_entry: bool = False  # NEW: extracted_root is a shared entry of the extraction cache; cleanup() never deletes it
 
     def cleanup(self, extraction_parent_dirname: str = "__unzipped_logs__") -> None:
         """
         Delete extracted logs folder (if any) without touching the original ZIP.
         Safety: only deletes if the path contains the extraction_parent_dirname segment.
+
+        NEW: Extractions of the content-addressed cache (see utils_zip_cache) are kept for later runs: the lease is released
+        and LRU eviction deletes them once the cache exceeds SSB_RA_ZIP_CACHE_QUOTA_MB (quota 0 = delete right away).
         """
+        if self.cache_lease or self.cache_entry:
+            # Without a lease (lease file could not be written) other executions may still be reading the shared entry:
+            # leave it to eviction, which skips leased entries
+            from src.utils.utils_zip_cache import release_zip_cache_lease, evict_zip_cache
+
+            release_zip_cache_lease(self.cache_lease)
+            self.cache_lease = None
+            evict_zip_cache(parent_dirname=extraction_parent_dirname)
+            return
+
         if not self.is_extracted or not self.extracted_root:
             return
 
@@ -210,10 +228,13 @@ def detect_pre_post_subfolders(base_folder: str, BLACKLIST: tuple) -> Tuple[Opti
         where market_pairs is a dict:
             { market_label -> (pre_market_dir, post_market_dir) }
     """
-    try:
-        entries = [e for e in os.scandir(base_folder) if e.is_dir()]
-    except FileNotFoundError:
+    # NEW: folder listings, Step0 name parsing, market tokens and log-validity flags come from the cached tree index
+    # (one parallel scan per base folder, shared with the bulk fallback and the existing-audit lookups)
+    from src.utils.utils_tree_index import get_step0_tree_index
+    index = get_step0_tree_index(base_folder)
+    if index.node(base_folder) is None:
         return None, None, {}
+    entries = index.subdirs(base_folder)
 
     # ---------------- STEP0 RUN DETECTION ---------------- #
     runs: List[Step0RunInfo] = []
@@ -223,16 +244,15 @@ def detect_pre_post_subfolders(base_folder: str, BLACKLIST: tuple) -> Tuple[Opti
         if any(tok in name_low for tok in BLACKLIST):
             continue
 
-        step0_folder_parsed = detect_step0_folders(entry.name, base_folder)
-        if step0_folder_parsed:
-            runs.append(step0_folder_parsed)
+        if entry.step0:
+            runs.append(entry.step0)
             continue
 
         # Fallback: accept folders that contain "Step0" even if the name doesn't match the strict yyyymmdd_<time> pattern,
         # as long as they contain valid logs (plain or inside ZIP files).
         if "step0" not in name_low:
             continue
-        if not folder_or_zip_has_valid_logs(entry.path):
+        if not index.has_valid_logs(entry.path):
             continue
 
         try:
@@ -240,7 +260,7 @@ def detect_pre_post_subfolders(base_folder: str, BLACKLIST: tuple) -> Tuple[Opti
             m = re.match(r"^(?P<date>\d{8})", entry.name, flags=re.IGNORECASE)
 
             try:
-                mtime_dt = datetime.fromtimestamp(os.path.getmtime(entry.path))
+                mtime_dt = datetime.fromtimestamp(entry.mtime_ns / 1e9)
             except Exception:
                 mtime_dt = datetime.now()
 
@@ -282,10 +302,7 @@ def detect_pre_post_subfolders(base_folder: str, BLACKLIST: tuple) -> Tuple[Opti
     def scan_side(root: str) -> Dict[str, List[str]]:
         mapping: Dict[str, List[str]] = {}
         try:
-            for e in os.scandir(root):
-                if not e.is_dir():
-                    continue
-
+            for e in index.subdirs(root):
                 # Skip tool output folders and other non-market folders
                 name_low = e.name.lower()
                 if any(tok in name_low for tok in BLACKLIST):
@@ -295,8 +312,7 @@ def detect_pre_post_subfolders(base_folder: str, BLACKLIST: tuple) -> Tuple[Opti
                 if name_low in ("__pycache__",):
                     continue
 
-                tokens = extract_tokens_dynamic(e.name)
-                for tok in tokens:
+                for tok in e.market_tokens:
                     mapping.setdefault(tok, []).append(e.path)
         except FileNotFoundError:
             pass
@@ -374,6 +390,12 @@ def materialize_step0_zip_runs_as_folders(base_folder: str, zip_filenames: List[
 
 
 def read_text_with_encoding(path: str) -> Tuple[List[str], Optional[str]]:
+    # NEW: zip-native member path ("<archive>.zip/<member>") -> decode the member straight from the archive
+    zip_ref = split_zip_log_path(path)
+    if zip_ref is not None:
+        text, enc = _read_zip_member_text(zip_ref[0], zip_ref[1])
+        return _split_text_lines(text), enc
+
     # <<< Ensure Windows long path compatibility >>>
     path_long = to_long_path(path)
 
@@ -418,6 +440,11 @@ def find_log_files(folder: str, recursive: bool = False) -> List[str]:
     """
     files: List[str] = []
 
+    # NEW: zip-native folder ("<archive>.zip[/<dir>]") -> list the archive members instead of the filesystem
+    zip_ref = split_zip_log_path(folder)
+    if zip_ref is not None:
+        return find_zip_log_files(zip_ref[0], zip_ref[1], recursive=recursive)
+
     # <<< Ensure Windows long path compatibility >>>
     folder_long = to_long_path(folder)
 
@@ -443,6 +470,388 @@ def find_log_files(folder: str, recursive: bool = False) -> List[str]:
     return files
 
 
+# ============================ ZIP-NATIVE LOG SOURCES ============================
+# Zip-native mode parses Step0 ZIP logs straight from the archive instead of extracting them to a temp folder first.
+# A zip-native path is "<archive>.zip[/<member path>]": find_log_files / read_text_file / has_valid_plain_logs accept it
+# like a regular folder / file, so modules keep passing plain strings around.
+# Runtime knobs (set by the CLI so they are inherited by worker processes):
+#   SSB_RA_ZIP_NATIVE         = 1 -> ensure_logs_available() returns a zip-native folder instead of extracting
+#   SSB_RA_ZIP_NATIVE_WORKERS = N decompression worker processes for iter_log_texts (default: min(8, cpu_count))
+
+ZIP_NATIVE_ENV = "SSB_RA_ZIP_NATIVE"
+ZIP_NATIVE_WORKERS_ENV = "SSB_RA_ZIP_NATIVE_WORKERS"
+
+LOG_FILE_SUFFIXES = (".log", ".logs", ".txt")
+
+_ZIP_IN_PATH_RE = re.compile(r"\.zip(?=[\\/]|$)", re.IGNORECASE)
+
+
+def configure_zip_native(enabled: Optional[bool] = None, workers: Optional[int] = None) -> None:
+    """Publish zip-native options as environment variables (inherited by spawned worker processes)."""
+    if enabled is not None:
+        os.environ[ZIP_NATIVE_ENV] = "1" if enabled else "0"
+    if workers is not None:
+        os.environ[ZIP_NATIVE_WORKERS_ENV] = str(int(workers))
+
+
+def zip_native_enabled() -> bool:
+    return str(os.environ.get(ZIP_NATIVE_ENV, "")).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _resolve_zip_native_workers(workers: Optional[int] = None) -> int:
+    if workers is None:
+        try:
+            raw = os.environ.get(ZIP_NATIVE_WORKERS_ENV, "").strip()
+            workers = int(raw) if raw else None
+        except Exception:
+            workers = None
+    if workers is None:
+        workers = min(8, os.cpu_count() or 1)
+    return max(1, int(workers))
+
+
+def split_zip_log_path(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a zip-native path "<archive>.zip[/<member path>]" into (archive path, member path with '/' separators).
+    Returns None for regular filesystem paths (the '.zip' component must be an existing file).
+    """
+    if not path or ".zip" not in str(path).lower():
+        return None
+    for m in _ZIP_IN_PATH_RE.finditer(path):
+        archive = path[:m.end()]
+        if os.path.isfile(to_long_path(archive)):
+            return archive, path[m.end():].replace("\\", "/").strip("/")
+    return None
+
+
+def zip_log_path(zip_path: str, member: str = "") -> str:
+    """Zip-native path of an archive member (or member folder), as accepted by find_log_files / read_text_file."""
+    parts = [p for p in str(member or "").split("/") if p]
+    return os.path.join(zip_path, *parts) if parts else zip_path
+
+
+def is_logs_dir(path: str) -> bool:
+    """os.path.isdir() that also accepts zip-native folders ("<archive>.zip[/<member dir>]")."""
+    if not path:
+        return False
+    return os.path.isdir(to_long_path(path)) or split_zip_log_path(path) is not None
+
+
+@functools.lru_cache(maxsize=32)
+def _zip_log_members_cached(zip_path: str, size: int, mtime_ns: int) -> Tuple[str, ...]:
+    with zipfile.ZipFile(to_long_path(zip_path), "r") as zf:
+        return tuple(info.filename for info in zf.infolist() if info.filename and not info.filename.endswith("/") and info.filename.lower().endswith(LOG_FILE_SUFFIXES))
+
+
+def _zip_log_members(zip_path: str) -> Tuple[str, ...]:
+    """Names of the .log/.logs/.txt members (central directory is read once per archive version)."""
+    st = os.stat(to_long_path(zip_path))
+    return _zip_log_members_cached(zip_path, st.st_size, st.st_mtime_ns)
+
+
+def find_zip_log_files(zip_path: str, member_dir: str = "", recursive: bool = False) -> List[str]:
+    """find_log_files() for a folder inside a ZIP: sorted zip-native paths of the log members under member_dir."""
+    prefix = f"{member_dir.strip('/')}/" if member_dir.strip("/") else ""
+    files: List[str] = []
+    for name in _zip_log_members(zip_path):
+        if not name.startswith(prefix):
+            continue
+        if not recursive and "/" in name[len(prefix):]:
+            continue
+        files.append(zip_log_path(zip_path, name))
+    files.sort()
+    return files
+
+
+def _find_first_zip_dir_with_valid_logs(zip_path: str) -> Optional[str]:
+    """_find_first_dir_with_valid_logs() for an archive: zip-native path of the first member folder (root first, then depth-first) with valid logs."""
+    try:
+        dirs = {()}
+        for name in _zip_log_members(zip_path):
+            parts = tuple(name.split("/")[:-1])
+            for i in range(1, len(parts) + 1):
+                dirs.add(parts[:i])
+    except Exception:
+        return None
+
+    for parts in sorted(dirs):
+        candidate = zip_log_path(zip_path, "/".join(parts))
+        if has_valid_plain_logs(candidate, recursive=False):
+            return candidate
+    return None
+
+
+def _zip_member_has_subnetwork(zip_path: str, member: str) -> bool:
+    with zipfile.ZipFile(to_long_path(zip_path), "r") as zf, zf.open(member, "r") as raw:
+        return _stream_has_subnetwork_line(raw)
+
+
+def _decode_log_bytes(raw: bytes) -> Tuple[str, Optional[str]]:
+    """Decode exactly like read_text_with_encoding() reads files: first strict match in ENCODINGS_TRY, else utf-8 'replace' (encoding None)."""
+    for enc in ENCODINGS_TRY:
+        try:
+            return io.TextIOWrapper(io.BytesIO(raw), encoding=enc, errors="strict").read(), enc
+        except Exception:
+            continue
+    return io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8", errors="replace").read(), None
+
+
+def _split_text_lines(text: str) -> List[str]:
+    """Same lines as iterating a text-mode file and stripping the trailing newline."""
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _read_zip_member_text(zip_path: str, member: str, zf: Optional[zipfile.ZipFile] = None) -> Tuple[str, Optional[str]]:
+    if zf is not None:
+        return _decode_log_bytes(zf.read(member))
+    with zipfile.ZipFile(to_long_path(zip_path), "r") as own_zf:
+        return _decode_log_bytes(own_zf.read(member))
+
+
+# Archives opened by a decompression worker process (kept open for the lifetime of the pool)
+_WORKER_ZIP_HANDLES: Dict[str, zipfile.ZipFile] = {}
+
+
+def _read_zip_log_text_worker(path: str) -> Tuple[str, Optional[str]]:
+    """Process-pool task: decompress + decode one zip-native member and return (text, encoding_used)."""
+    zip_path, member = split_zip_log_path(path)
+    zf = _WORKER_ZIP_HANDLES.get(zip_path)
+    if zf is None:
+        zf = zipfile.ZipFile(to_long_path(zip_path), "r")
+        _WORKER_ZIP_HANDLES[zip_path] = zf
+    return _read_zip_member_text(zip_path, member, zf)
+
+
+def iter_log_texts(paths: Iterable[str], workers: Optional[int] = None, skip_unreadable: bool = False) -> Iterator[Tuple[str, Optional[List[str]], Optional[str]]]:
+    """
+    Yield (path, lines, encoding_used) for each log path, in input order (same result as read_text_file(path)).
+
+    - Plain files are read in-process, one by one.
+    - Zip-native members are decompressed + decoded in worker processes (SSB_RA_ZIP_NATIVE_WORKERS) while the caller parses
+      the previous ones. In-flight members are bounded, so memory stays proportional to workers, not to member count.
+    - With skip_unreadable=True an unreadable file yields (path, None, None) instead of raising.
+    """
+    paths = list(paths)
+    n_workers = min(_resolve_zip_native_workers(workers), len(paths))
+    use_pool = n_workers > 1 and all(split_zip_log_path(p) is not None for p in paths)
+
+    if not use_pool:
+        zip_handles: Dict[str, zipfile.ZipFile] = {}
+        try:
+            for path in paths:
+                try:
+                    zip_ref = split_zip_log_path(path)
+                    if zip_ref is None:
+                        lines, enc = read_text_with_encoding(path)
+                    else:
+                        zf = zip_handles.get(zip_ref[0])
+                        if zf is None:
+                            zf = zipfile.ZipFile(to_long_path(zip_ref[0]), "r")
+                            zip_handles[zip_ref[0]] = zf
+                        text, enc = _read_zip_member_text(zip_ref[0], zip_ref[1], zf)
+                        lines = _split_text_lines(text)
+                except Exception:
+                    if not skip_unreadable:
+                        raise
+                    yield path, None, None
+                    continue
+                yield path, lines, enc
+        finally:
+            for zf in zip_handles.values():
+                try:
+                    zf.close()
+                except Exception:
+                    pass
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    pending_iter = iter(paths)
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque((p, pool.submit(_read_zip_log_text_worker, p)) for p in islice(pending_iter, n_workers * 2))
+        while pending:
+            path, future = pending.popleft()
+            nxt = next(pending_iter, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(_read_zip_log_text_worker, nxt)))
+            try:
+                try:
+                    text, enc = future.result()
+                except Exception:
+                    # Broken pool / worker failure: retry in-process before giving up on this member
+                    text, enc = _read_zip_member_text(*split_zip_log_path(path))
+            except Exception:
+                if not skip_unreadable:
+                    raise
+                yield path, None, None
+                continue
+            yield path, _split_text_lines(text), enc
+
+
+# ============================ PARALLEL ZIP EXTRACTION ============================
+# When logs must be extracted (zip-native mode disabled), large archives are inflated by several threads instead of a
+# single-threaded ZipFile.extractall (zlib releases the GIL while inflating).
+# Runtime knobs (set by the CLI so they are inherited by worker processes):
+#   SSB_RA_ZIP_EXTRACT_WORKERS = N extraction threads (default: min(8, cpu_count); 1 = serial extractall)
+#   SSB_RA_ZIP_EXTRACT_MIN_MB  = archives below this size are extracted serially (default: 64)
+
+ZIP_EXTRACT_WORKERS_ENV = "SSB_RA_ZIP_EXTRACT_WORKERS"
+ZIP_EXTRACT_MIN_MB_ENV = "SSB_RA_ZIP_EXTRACT_MIN_MB"
+ZIP_EXTRACT_MIN_MB_DEFAULT = 64
+
+
+def configure_zip_extraction(workers: Optional[int] = None, min_mb: Optional[int] = None) -> None:
+    """Publish ZIP extraction options as environment variables (inherited by spawned worker processes)."""
+    if workers is not None:
+        os.environ[ZIP_EXTRACT_WORKERS_ENV] = str(int(workers))
+    if min_mb is not None:
+        os.environ[ZIP_EXTRACT_MIN_MB_ENV] = str(int(min_mb))
+
+
+def _resolve_zip_extract_settings(workers: Optional[int] = None, min_mb: Optional[int] = None) -> Tuple[int, int]:
+    """Return (extraction threads, minimum archive size in bytes for parallel extraction) from arguments or SSB_RA_ZIP_EXTRACT_* env vars."""
+    if workers is None:
+        try:
+            raw = os.environ.get(ZIP_EXTRACT_WORKERS_ENV, "").strip()
+            workers = int(raw) if raw else None
+        except Exception:
+            workers = None
+    if workers is None:
+        workers = min(8, os.cpu_count() or 1)
+
+    if min_mb is None:
+        try:
+            raw = os.environ.get(ZIP_EXTRACT_MIN_MB_ENV, "").strip()
+            min_mb = int(raw) if raw else None
+        except Exception:
+            min_mb = None
+    if min_mb is None or min_mb < 0:
+        min_mb = ZIP_EXTRACT_MIN_MB_DEFAULT
+    return max(1, int(workers)), int(min_mb) * 1024 * 1024
+
+
+def _partition_zip_members(infos: List[zipfile.ZipInfo], parts: int) -> List[List[zipfile.ZipInfo]]:
+    """Largest-first greedy split by compressed size, so every worker gets a similar amount of inflate work."""
+    import heapq
+
+    buckets: List[List[zipfile.ZipInfo]] = [[] for _ in range(max(1, parts))]
+    loads = [(0, i) for i in range(len(buckets))]
+    for info in sorted(infos, key=lambda x: x.compress_size, reverse=True):
+        load, idx = heapq.heappop(loads)
+        buckets[idx].append(info)
+        heapq.heappush(loads, (load + max(1, info.compress_size), idx))
+    return [b for b in buckets if b]
+
+
+def _set_zip_member_mtime(path: str, info: zipfile.ZipInfo) -> None:
+    try:
+        ts = time.mktime(info.date_time + (0, 0, -1))
+        os.utime(path, (ts, ts))
+    except Exception:
+        pass
+
+
+def _extract_zip_partition(zip_path: str, dest_dir: str, infos: List[zipfile.ZipInfo]) -> int:
+    """Worker task: extract one partition through its own ZipFile handle (ZipFile.extract keeps extractall's path sanitising)."""
+    with zipfile.ZipFile(to_long_path(zip_path), "r") as zf:
+        for info in infos:
+            try:
+                target = zf.extract(info, dest_dir)
+            except FileExistsError:
+                # Another worker created the same parent folder between extract()'s exists() check and makedirs(): retry once
+                target = zf.extract(info, dest_dir)
+            _set_zip_member_mtime(target, info)
+    return len(infos)
+
+
+def extract_zip_parallel(zip_path: str, dest_dir: str, workers: Optional[int] = None, min_mb: Optional[int] = None) -> int:
+    """
+    Extract zip_path into dest_dir with the same tree layout as ZipFile.extractall (what _find_first_dir_with_valid_logs expects).
+
+    - Archives of at least SSB_RA_ZIP_EXTRACT_MIN_MB with several file members are partitioned by compressed size across
+      SSB_RA_ZIP_EXTRACT_WORKERS threads, each with its own ZipFile handle; member timestamps are preserved.
+    - Smaller archives, or a single worker, are extracted serially (member by member, like ZipFile.extractall), also
+      preserving member timestamps.
+    Returns the number of workers used.
+    """
+    n_workers, min_bytes = _resolve_zip_extract_settings(workers, min_mb)
+    zip_fs = to_long_path(zip_path)
+    dest_fs = to_long_path(dest_dir)
+
+    with zipfile.ZipFile(zip_fs, "r") as zf:
+        infos = zf.infolist()
+        file_infos = [i for i in infos if not i.is_dir()]
+        n_workers = min(n_workers, len(file_infos))
+        if n_workers <= 1 or os.path.getsize(zip_fs) < min_bytes:
+            # Same member-by-member extract as extractall, so the member timestamps are restored on this path too
+            targets = [(zf.extract(info, dest_fs), info) for info in infos]
+            for target, info in sorted(targets, key=lambda t: t[1].is_dir()):
+                _set_zip_member_mtime(target, info)
+            return 1
+
+        # Folder entries first (single thread), so workers mostly find their parent folders already created
+        dir_targets = [(zf.extract(info, dest_fs), info) for info in infos if info.is_dir()]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    partitions = _partition_zip_members(file_infos, n_workers)
+    with ThreadPoolExecutor(max_workers=len(partitions)) as pool:
+        for future in [pool.submit(_extract_zip_partition, zip_fs, dest_fs, part) for part in partitions]:
+            future.result()
+
+    # Folder timestamps last (creating their files touched them)
+    for target, info in dir_targets:
+        _set_zip_member_mtime(target, info)
+    return len(partitions)
+
+
+# Byte-level 'SubNetwork' probe shared by the ZIP / plain-file validators (no decoding, no line splitting)
+SUBNETWORK_TOKEN = b"SubNetwork"
+_PROBE_CHUNK_BYTES = 64 * 1024
+_PROBE_TAIL_BYTES = 256
+_LINE_PAD_BYTES = b" \t\x0b\x0c\x1c\x1d\x1e\x1f"
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _is_subnetwork_line_start(buf: bytes, pos: int) -> bool:
+    """True if the token at buf[pos] starts a line, ignoring leading whitespace and BOMs (like line.lstrip('\\ufeff').lstrip())."""
+    j = pos
+    while j > 0 and buf[j - 1] in _LINE_PAD_BYTES:
+        j -= 1
+    while j >= 3 and buf[j - 3:j] == _UTF8_BOM:
+        j -= 3
+    return j == 0 or buf[j - 1] in b"\r\n"
+
+
+def _stream_has_subnetwork_line(stream, max_bytes: Optional[int] = None) -> bool:
+    """Read a binary stream in 64 KB chunks (up to max_bytes) and stop at the first line starting with 'SubNetwork'."""
+    tail = b""
+    read_total = 0
+    while max_bytes is None or read_total < max_bytes:
+        chunk = stream.read(_PROBE_CHUNK_BYTES if max_bytes is None else min(_PROBE_CHUNK_BYTES, max_bytes - read_total))
+        if not chunk:
+            return False
+        read_total += len(chunk)
+        buf = tail + chunk
+        # Only tokens ending inside the new chunk: the ones fully inside the tail were already rejected with more context
+        pos = buf.find(SUBNETWORK_TOKEN, max(0, len(tail) - len(SUBNETWORK_TOKEN) + 1))
+        while pos != -1:
+            if _is_subnetwork_line_start(buf, pos):
+                return True
+            pos = buf.find(SUBNETWORK_TOKEN, pos + 1)
+        tail = buf[-_PROBE_TAIL_BYTES:]
+    return False
+
+
+# Probe results per (zip path, size, mtime_ns, bounds) for the process lifetime (bulk auto-detection probes the same ZIPs repeatedly)
+_ZIP_PROBE_CACHE: Dict[Tuple[str, int, int, int, int], bool] = {}
+
+
 def zip_has_subnetwork_logs(zip_path: str, max_members_to_check: int = 200, max_bytes_per_member: int = 2_000_000) -> bool:
     """
     Internal ZIP validator: True if ZIP contains at least one .log/.logs/.txt member with a line starting with 'SubNetwork'.
@@ -451,47 +860,44 @@ def zip_has_subnetwork_logs(zip_path: str, max_members_to_check: int = 200, max_
     - Avoids extraction.
     - Uses a bounded content scan: only a limited number of members and bytes.
     - Uses infolist() to avoid building a huge namelist() in memory for very large ZIPs.
+    - NEW: Members are streamed in 64 KB chunks and searched at byte level (stops at the first hit), and the result is cached
+      per (zip path, size, mtime) for the process lifetime.
     """
     zip_path_fs = to_long_path(zip_path)
+    try:
+        st = os.stat(zip_path_fs)
+    except Exception:
+        return False
+    cache_key = (os.path.abspath(zip_path_fs), st.st_size, st.st_mtime_ns, int(max_members_to_check), int(max_bytes_per_member))
+    cached = _ZIP_PROBE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = False
     try:
         with zipfile.ZipFile(zip_path_fs, "r") as zf:
-            members: List[str] = []
+            checked = 0
             for info in zf.infolist():
                 name = info.filename
-                if not name or name.endswith("/"):
+                if not name or name.endswith("/") or not name.lower().endswith(LOG_FILE_SUFFIXES):
+                    continue
+                if checked >= max_members_to_check:
+                    break
+                checked += 1
+                if info.file_size == 0:
                     continue
-                if name.lower().endswith((".log", ".logs", ".txt")):
-                    members.append(name)
-
-            if not members:
-                return False
-
-            for member in members[:max_members_to_check]:
                 try:
-                    with zf.open(member, "r") as f:
-                        raw = f.read(max_bytes_per_member)
-
-                    text = ""
-                    for enc in ENCODINGS_TRY:
-                        try:
-                            text = raw.decode(enc, errors="ignore")
+                    with zf.open(info, "r") as f:
+                        if _stream_has_subnetwork_line(f, max_bytes_per_member):
+                            result = True
                             break
-                        except Exception:
-                            text = ""
-
-                    if not text:
-                        continue
-
-                    for line in text.splitlines():
-                        stripped = line.lstrip("\ufeff").lstrip()
-                        if stripped.startswith("SubNetwork"):
-                            return True
                 except Exception:
                     continue
     except Exception:
-        return False
+        result = False
 
-    return False
+    _ZIP_PROBE_CACHE[cache_key] = result
+    return result
 
 
 def has_valid_plain_logs(folder_fs: str, recursive: bool = False) -> bool:
@@ -506,12 +912,15 @@ def has_valid_plain_logs(folder_fs: str, recursive: bool = False) -> bool:
 
     for fpath in log_files:
         try:
+            zip_ref = split_zip_log_path(fpath)
+            if zip_ref is not None:
+                if _zip_member_has_subnetwork(zip_ref[0], zip_ref[1]):
+                    return True
+                continue
             fpath_fs = to_long_path(fpath)
-            with open(fpath_fs, "r", encoding="utf-8", errors="ignore") as fh:
-                for line in fh:
-                    stripped = line.lstrip("\ufeff").lstrip()
-                    if stripped.startswith("SubNetwork"):
-                        return True
+            with open(fpath_fs, "rb") as fh:
+                if _stream_has_subnetwork_line(fh):
+                    return True
         except Exception:
             # If a file cannot be opened or read, skip and continue
             continue
@@ -533,6 +942,8 @@ def folder_or_zip_has_valid_logs(folder: str) -> bool:
       (ZIP content is inspected without extracting.)
     """
     folder_fs = to_long_path(folder) if folder else folder
+    if folder_fs and split_zip_log_path(folder_fs) is not None:
+        return has_valid_plain_logs(folder_fs, recursive=False)
     if not folder_fs or not os.path.isdir(folder_fs):
         return False
 
@@ -741,9 +1152,12 @@ def ensure_logs_available(folder: str, extraction_parent_dirname: str = "__unzip
         * Extract it into: <SYSTEM_TMP>/<extraction_parent_dirname>/<zip_stem>_<hash8>/
         * Return LogsExtractionResult(process_dir=<dir_with_logs>, extracted_root=<extract_root>, is_extracted=True, zip_path=<zip>).
     - If nothing is found, return LogsExtractionResult(process_dir=folder, is_extracted=False).
+    - NEW: <extract_root> is a content-addressed cache entry (<zip_stem>_<content key>, see utils_zip_cache): it is reused only when
+      its completion marker matches the ZIP content, and the returned result holds a lease on it until cleanup().
+    - NEW: In zip-native mode (--zip-native / SSB_RA_ZIP_NATIVE) nothing is extracted: process_dir is the virtual folder
+      "<zip>[/<dir_with_logs>]" and every reader (find_log_files / read_text_file / iter_log_texts) streams the members from the archive.
     """
-    import tempfile
-    import hashlib
+    from src.utils.utils_zip_cache import zip_content_key, extraction_entry_dir, zip_copy_path, copy_zip_to_cache, is_extraction_complete, publish_extraction, acquire_zip_cache_lease, release_zip_cache_lease, evict_zip_cache
 
     # ----------------------------- LOCAL HELPERS ----------------------------- #
     def _looks_like_onedrive_path(p: str) -> bool:
@@ -790,30 +1204,21 @@ def ensure_logs_available(folder: str, extraction_parent_dirname: str = "__unzip
 
         return False
 
-    def _copy_zip_to_local_tmp(src_zip: str, zip_hash8: str) -> Optional[str]:
+    def _copy_zip_to_local_tmp(src_zip: str, zip_key: str) -> Tuple[Optional[str], Optional[str]]:
         """
-        Copy ZIP to local temp folder and return local ZIP path.
-        Returns None on failure (caller can fallback to using original ZIP).
+        Copy ZIP to local temp folder (<extraction_parent_dirname>/_zip_cache_/<stem>_<content key>.zip) and return
+        (local ZIP path, cache lease). The copy is leased before it is looked up, so eviction cannot delete it meanwhile.
+        Returns (None, None) on failure (caller can fallback to using original ZIP).
         """
+        lease = None
         try:
-            tmp_root = tempfile.gettempdir()
-            local_dir = os.path.join(tmp_root, extraction_parent_dirname, "_zip_cache_")
-            local_dir_fs = to_long_path(local_dir)
-            os.makedirs(local_dir_fs, exist_ok=True)
-
-            base = os.path.basename(src_zip)
-            stem, ext = os.path.splitext(base)
-            local_zip = os.path.join(local_dir_fs, f"{stem}_{zip_hash8}{ext}")
-            local_zip_fs = to_long_path(local_zip)
-
-            # If already cached, reuse
-            if os.path.isfile(local_zip_fs):
-                return local_zip_fs
-
-            shutil.copy2(to_long_path(src_zip), local_zip_fs)
-            return local_zip_fs
+            copy_path = zip_copy_path(src_zip, zip_key, extraction_parent_dirname)
+            lease = acquire_zip_cache_lease(copy_path, extraction_parent_dirname)
+            # If already cached, reuse (same content key = same ZIP content)
+            return copy_zip_to_cache(src_zip, copy_path), lease
         except Exception:
-            return None
+            release_zip_cache_lease(lease)
+            return None, None
 
     # ------------------------------------------------------------------------ #
 
@@ -821,7 +1226,8 @@ def ensure_logs_available(folder: str, extraction_parent_dirname: str = "__unzip
 
     # 1) Direct logs
     if has_valid_plain_logs(folder_fs, recursive=False):
-        return LogsExtractionResult(process_dir=folder_fs, is_extracted=False)
+        zip_ref = split_zip_log_path(folder_fs)
+        return LogsExtractionResult(process_dir=folder_fs, is_extracted=False, zip_path=(zip_ref[0] if zip_ref else None))
 
     # 2) ZIP logs (do NOT extract unless the ZIP is confirmed as relevant)
     zip_files: List[str] = []
@@ -848,39 +1254,60 @@ def ensure_logs_available(folder: str, extraction_parent_dirname: str = "__unzip
     if not chosen_zip:
         return LogsExtractionResult(process_dir=folder_fs, is_extracted=False)
 
-    zip_stem = os.path.splitext(os.path.basename(chosen_zip))[0]
-
     # Extract to SYSTEM temp folder to avoid huge extractions inside the user-selected logs folder
-    chosen_zip_abs = os.path.abspath(pretty_path(to_long_path(chosen_zip)))
-    zip_hash8 = hashlib.sha1(chosen_zip_abs.encode("utf-8", errors="ignore")).hexdigest()[:8]
-    tmp_root = tempfile.gettempdir()
-    extract_root = os.path.join(tmp_root, extraction_parent_dirname, f"{zip_stem}_{zip_hash8}")
-    extract_root_fs = to_long_path(extract_root)
-
-    # Reuse previous extraction if present and looks valid
-    if prefer_existing_extract and os.path.isdir(extract_root_fs):
+    # NEW: cache entry keyed on the ZIP content (size + central directory CRCs) instead of the ZIP path:
+    # a ZIP replaced in place gets a new entry and identical ZIPs at different paths share one extraction
+    try:
+        zip_key = zip_content_key(chosen_zip)
+    except Exception:
+        return LogsExtractionResult(process_dir=folder_fs, is_extracted=False)
+    extract_root_fs = to_long_path(extraction_entry_dir(chosen_zip, zip_key, extraction_parent_dirname))
+
+    # NEW: zip-native mode -> stream the members from the archive (no extraction, no temp folder tree)
+    if zip_native_enabled():
+        zip_to_stream = chosen_zip
+        copy_lease = None
+        if _should_copy_zip_to_tmp(chosen_zip):
+            local_zip, copy_lease = _copy_zip_to_local_tmp(chosen_zip, zip_key)
+            if local_zip:
+                zip_to_stream = local_zip
+        found = _find_first_zip_dir_with_valid_logs(zip_to_stream)
+        if found:
+            return LogsExtractionResult(process_dir=found, is_extracted=False, zip_path=chosen_zip, cache_lease=copy_lease)
+        release_zip_cache_lease(copy_lease)
+
+    # NEW: lease the entry before checking or publishing it, so a concurrent eviction can never delete it in between
+    lease = acquire_zip_cache_lease(extract_root_fs, extraction_parent_dirname)
+
+    # Reuse previous extraction only if it was completed (completion marker matching the ZIP content key)
+    if prefer_existing_extract and is_extraction_complete(extract_root_fs, zip_key):
         found = _find_first_dir_with_valid_logs(extract_root_fs)
         if found:
-            return LogsExtractionResult(process_dir=found, extracted_root=extract_root_fs, is_extracted=True, zip_path=chosen_zip)
+            return LogsExtractionResult(process_dir=found, extracted_root=extract_root_fs, is_extracted=True, zip_path=chosen_zip, cache_lease=lease, cache_entry=True)
 
     # Extract
+    copy_lease = None
     try:
-        os.makedirs(extract_root_fs, exist_ok=True)
-
         # NEW: If ZIP is on OneDrive (or very large), copy it to local temp first and extract from there.
         zip_to_extract = chosen_zip
         if _should_copy_zip_to_tmp(chosen_zip):
-            local_zip = _copy_zip_to_local_tmp(chosen_zip, zip_hash8)
+            local_zip, copy_lease = _copy_zip_to_local_tmp(chosen_zip, zip_key)
             if local_zip:
                 zip_to_extract = local_zip
 
-        with zipfile.ZipFile(to_long_path(zip_to_extract), "r") as zf:
-            zf.extractall(path=extract_root_fs)
+        # NEW: extract into '<entry>.partial-<pid>', write the completion marker, then rename into place.
+        # Large archives are inflated by several threads (SSB_RA_ZIP_EXTRACT_WORKERS / SSB_RA_ZIP_EXTRACT_MIN_MB)
+        publish_extraction(zip_to_extract, extract_root_fs, zip_key, extract_fn=extract_zip_parallel, source_zip=chosen_zip)
     except Exception:
+        release_zip_cache_lease(lease)
         return LogsExtractionResult(process_dir=folder_fs, is_extracted=False)
+    finally:
+        release_zip_cache_lease(copy_lease)
+
+    evict_zip_cache(parent_dirname=extraction_parent_dirname)
 
     found = _find_first_dir_with_valid_logs(extract_root_fs)
-    return LogsExtractionResult(process_dir=(found or extract_root_fs), extracted_root=extract_root_fs, is_extracted=True, zip_path=chosen_zip)
+    return LogsExtractionResult(process_dir=(found or extract_root_fs), extracted_root=extract_root_fs, is_extracted=True, zip_path=chosen_zip, cache_lease=lease, cache_entry=True)
 
 
 
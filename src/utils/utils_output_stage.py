@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.utils.utils_io import pretty_path
+from src.utils.utils_datetime import format_duration_hms
+
+
+# ============================ BACKGROUND OUTPUT STAGE ============================
+# Runtime knob (set by the CLI so it is inherited by worker processes):
+#   SSB_RA_BACKGROUND_OUTPUT = 1 | 0   (default: 1)
+# When enabled, batch ConfigurationAudits (one per folder) and sequential Consistency Checks queue the Excel close,
+# Correction Commands ZIPs and PPT of every audit to a background worker and continue with the next folder/audit.
+
+BACKGROUND_OUTPUT_ENV = "SSB_RA_BACKGROUND_OUTPUT"
+
+
+def configure_background_output(enabled: Optional[bool] = None) -> None:
+    """Publish the background output stage switch as an environment variable (inherited by spawned worker processes)."""
+    if enabled is not None:
+        os.environ[BACKGROUND_OUTPUT_ENV] = "1" if enabled else "0"
+
+
+def _print_line(message: str) -> None:
+    # One write per line so lines printed by the stage thread and the main thread never interleave mid-line
+    print(f"{message}\n", end="")
+
+
+def background_output_enabled() -> bool:
+    return str(os.environ.get(BACKGROUND_OUTPUT_ENV, "1")).strip().lower() not in ("0", "false", "no", "off")
+
+
+class BackgroundOutputStage:
+    """
+    Serialise output artifacts (Excel close/move, Correction Commands ZIPs, PPT) in a background thread while the
+    caller keeps parsing the next folder/audit.
+
+    - submit(label, fn): queue fn() (must return the list of written artifact paths). Jobs run one at a time in
+      submission order. If max_pending jobs are already queued, submit() waits for the oldest one (bounded memory:
+      every queued job keeps its populated workbook and in-memory frames alive).
+    - drain(): wait for every job queued so far without closing the stage (records are still reported by wait()).
+    - wait(): barrier; logs every job (artifacts + timings) and returns the job records. Idempotent.
+    Job failures are logged and never raised, so one broken audit does not hide the artifacts of the others.
+    """
+
+    def __init__(self, module_name: str = "", max_pending: int = 2, log_fn: Callable[[str], None] = _print_line):
+        self.module_name = module_name
+        self.max_pending = max(1, int(max_pending or 1))
+        self.log_fn = log_fn
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: deque = deque()
+        self._records: List[Dict[str, object]] = []
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    def _prefix(self) -> str:
+        return f"{self.module_name} " if self.module_name else ""
+
+    @staticmethod
+    def _run_job(label: str, fn: Callable[[], Optional[List[str]]], t_queued: float) -> Dict[str, object]:
+        t_start = time.perf_counter()
+        record: Dict[str, object] = {"label": label, "status": "OK", "artifacts": [], "queued": t_start - t_queued, "seconds": 0.0, "error": ""}
+        try:
+            record["artifacts"] = [p for p in (fn() or []) if p]
+        except Exception as ex:
+            record["status"] = "FAILED"
+            record["error"] = f"{type(ex).__name__}: {ex}"
+        record["seconds"] = time.perf_counter() - t_start
+        return record
+
+    def _collect_oldest(self) -> None:
+        label, future = self._pending.popleft()
+        record = future.result()
+        with self._lock:
+            self._records.append(record)
+        if record["status"] != "OK":
+            self.log_fn(f"{self._prefix()}[WARNING] Background output '{label}' failed: {record['error']}")
+
+    def submit(self, label: str, fn: Callable[[], Optional[List[str]]]) -> None:
+        while len(self._pending) >= self.max_pending:
+            self._collect_oldest()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output_stage")
+        self._pending.append((label, self._executor.submit(self._run_job, label, fn, time.perf_counter())))
+        self.log_fn(f"{self._prefix()}[INFO] Output artifacts for '{label}' queued to the background output stage ({len(self._pending)} pending).")
+
+    def drain(self) -> None:
+        while self._pending:
+            self._collect_oldest()
+
+    def wait(self) -> List[Dict[str, object]]:
+        if not self._pending and self._executor is None:
+            return list(self._records)
+        t_wait0 = time.perf_counter()
+        self.drain()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        if self._records:
+            self.log_fn(f"{self._prefix()}[INFO] Background output stage finished {len(self._records)} job(s) (barrier waited {format_duration_hms(time.perf_counter() - t_wait0)}, stage open for {format_duration_hms(time.perf_counter() - self._t0)}):")
+            for record in self._records:
+                self.log_fn(f"{self._prefix()}[INFO]   - {record['label']}: {record['status']} in {format_duration_hms(float(record['seconds']))} ({float(record['seconds']):.3f}s, queued {float(record['queued']):.3f}s)")
+                for path in record["artifacts"]:
+                    self.log_fn(f"{self._prefix()}[INFO]       '{pretty_path(str(path))}'")
+        return list(self._records)
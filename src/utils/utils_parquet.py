@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.utils.utils_io import to_long_path, pretty_path
+
+
+# ============================ COLUMNAR (PARQUET / ARROW IPC) UTILS ============================
+# pyarrow is an OPTIONAL dependency: every helper degrades gracefully (returns None / empty list) when it is missing.
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+COLUMNAR_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def columnar_backend_available() -> bool:
+    """Return True if pyarrow is installed (needed for both Parquet and Arrow IPC exports)."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def sanitize_df_for_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make a DataFrame safe for Arrow conversion without changing its visible values:
+      - Column names are forced to unique strings.
+      - Object columns with mixed Python types are converted to strings (NaN/None kept as nulls).
+    """
+    out = df.copy(deep=False)
+    out.columns = [str(c) for c in out.columns]
+    if out.columns.has_duplicates:
+        seen: Dict[str, int] = {}
+        cols = []
+        for c in out.columns:
+            n = seen.get(c, 0)
+            cols.append(c if n == 0 else f"{c}.{n}")
+            seen[c] = n + 1
+        out.columns = cols
+    for c in out.columns:
+        if out[c].dtype == object:
+            col = out[c]
+            out[c] = col.where(col.isna(), col.astype(str))
+    return out
+
+
+def write_frame_columnar(df: pd.DataFrame, base_path: str, fmt: str = "parquet") -> Optional[str]:
+    """
+    Write one DataFrame as Parquet (zstd) or Arrow IPC (feather v2, uncompressed => memory-mappable, zero-copy reads).
+    base_path is the target path WITHOUT extension. Returns the written path or None.
+    """
+    fmt = (fmt or "").strip().lower()
+    if df is None or fmt not in COLUMNAR_FORMATS or not columnar_backend_available():
+        return None
+
+    out_path = to_long_path(f"{base_path}{COLUMNAR_EXTENSIONS[fmt]}")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    safe_df = sanitize_df_for_columnar(df).reset_index(drop=True)
+
+    if fmt == "parquet":
+        safe_df.to_parquet(out_path, engine="pyarrow", index=False, compression="zstd")
+    else:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        feather.write_feather(pa.Table.from_pandas(safe_df, preserve_index=False), out_path, compression="uncompressed")
+    return out_path
+
+
+def read_frame_columnar(path: str) -> Optional[pd.DataFrame]:
+    """Read a Parquet / Arrow IPC file written by write_frame_columnar (Arrow IPC is memory-mapped)."""
+    if not path or not columnar_backend_available():
+        return None
+    path_fs = to_long_path(path)
+    if not os.path.isfile(path_fs):
+        return None
+    try:
+        if path_fs.lower().endswith(".parquet"):
+            return pd.read_parquet(path_fs, engine="pyarrow")
+        import pyarrow.feather as feather
+        return feather.read_table(path_fs, memory_map=True).to_pandas()
+    except Exception:
+        return None
+
+
+def export_frames_columnar(frames: Dict[str, pd.DataFrame], output_dir: str, formats: List[str], module_name: str = "", market_tag: str = "") -> List[str]:
+    """
+    Export several named DataFrames into output_dir as '<name>.parquet' and/or '<name>.arrow'.
+    Empty frames are exported too (schema only) so downstream jobs always find the same file set.
+    Returns the list of written files.
+    """
+    fmts = [f for f in (formats or []) if f in COLUMNAR_FORMATS]
+    if not fmts or not frames:
+        return []
+
+    if not columnar_backend_available():
+        print(f"{module_name} {market_tag} [WARNING] Columnar export ({', '.join(fmts)}) requested but 'pyarrow' is not installed. Skipping it.")
+        return []
+
+    written: List[str] = []
+    for name, df in frames.items():
+        if not isinstance(df, pd.DataFrame):
+            continue
+        for fmt in fmts:
+            try:
+                p = write_frame_columnar(df, os.path.join(output_dir, name), fmt)
+                if p:
+                    written.append(p)
+            except Exception as ex:
+                print(f"{module_name} {market_tag} [WARNING] Could not export '{name}' as {fmt}: {ex}")
+
+    if written:
+        print(f"{module_name} {market_tag} [INFO] Exported {len(written)} columnar file(s) ({', '.join(fmts)}) to: '{pretty_path(output_dir)}'")
+    return written
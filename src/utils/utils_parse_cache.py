@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import zipfile
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.utils_io import to_long_path, pretty_path, split_zip_log_path, find_zip_log_files, iter_log_texts, zip_has_subnetwork_logs, LOG_FILE_SUFFIXES
+from src.utils.utils_parsing import parse_log_tables
+
+
+# ============================ PARSED LOG TABLES CACHE ============================
+# ConfigurationAudit PHASE 1 (text decoding + table parsing of every log) is the slowest phase of an audit and is repeated
+# for the same Step0 logs by every audit / consistency check that reads them. The parse cache stores the tables of each log
+# file as Parquet, keyed by the log CONTENT (file name + size + CRC-32), so a log is parsed once whatever its location:
+#   - zip-native members take size / CRC-32 from the ZIP central directory (no decompression needed to build the key),
+#   - plain files are CRC-32'd by streaming their bytes (the same key as the member they were extracted from).
+# Entries live in '<cache dir>/<key[:2]>/<key>/' (t<N>.parquet + manifest.json written last) and are published with an
+# atomic rename, so readers never see half written entries. Least recently used entries are evicted above the quota.
+# The web interface warms the cache right after an upload (--parse-cache-warm) so the first audit of that input skips
+# most of PHASE 1.
+# Runtime knobs (set by the CLI so they are inherited by worker processes):
+#   SSB_RA_PARSE_CACHE_DIR      = cache folder (unset/empty = cache disabled, default)
+#   SSB_RA_PARSE_CACHE_QUOTA_MB = max MB kept in the cache (default: 10240)
+
+PARSE_CACHE_DIR_ENV = "SSB_RA_PARSE_CACHE_DIR"
+PARSE_CACHE_QUOTA_MB_ENV = "SSB_RA_PARSE_CACHE_QUOTA_MB"
+PARSE_CACHE_QUOTA_MB_DEFAULT = 10240
+
+PARSE_CACHE_VERSION = 1  # bump when parse_log_tables() output changes
+MANIFEST_NAME = "manifest.json"
+_TMP_TAG = ".tmp-"
+_CRC_CHUNK_BYTES = 1024 * 1024
+
+
+def configure_parse_cache(cache_dir: Optional[str] = None, quota_mb: Optional[int] = None) -> None:
+    """Publish the parse cache folder / quota as environment variables (inherited by spawned worker processes)."""
+    if cache_dir is not None:
+        raw = str(cache_dir).strip()
+        os.environ[PARSE_CACHE_DIR_ENV] = os.path.abspath(raw) if raw else ""
+    if quota_mb is not None:
+        os.environ[PARSE_CACHE_QUOTA_MB_ENV] = str(int(quota_mb))
+
+
+def parse_cache_dir() -> Optional[str]:
+    """Configured cache folder, or None when the parse cache is disabled."""
+    raw = os.environ.get(PARSE_CACHE_DIR_ENV, "").strip()
+    return raw or None
+
+
+def parse_cache_quota_bytes() -> int:
+    try:
+        raw = os.environ.get(PARSE_CACHE_QUOTA_MB_ENV, "").strip()
+        quota_mb = int(raw) if raw else PARSE_CACHE_QUOTA_MB_DEFAULT
+    except Exception:
+        quota_mb = PARSE_CACHE_QUOTA_MB_DEFAULT
+    return max(0, quota_mb) * 1024 * 1024
+
+
+# ----------------------------- CONTENT KEYS ----------------------------- #
+@functools.lru_cache(maxsize=32)
+def _zip_member_crcs_cached(zip_path: str, size: int, mtime_ns: int) -> Dict[str, Tuple[int, int]]:
+    with zipfile.ZipFile(to_long_path(zip_path), "r") as zf:
+        return {info.filename: (info.file_size, info.CRC) for info in zf.infolist() if not info.filename.endswith("/")}
+
+
+def _zip_member_crcs(zip_path: str) -> Dict[str, Tuple[int, int]]:
+    st = os.stat(to_long_path(zip_path))
+    return _zip_member_crcs_cached(zip_path, st.st_size, st.st_mtime_ns)
+
+
+def _file_size_crc(path: str) -> Tuple[int, int]:
+    crc = 0
+    size = 0
+    with open(to_long_path(path), "rb") as f:
+        while True:
+            chunk = f.read(_CRC_CHUNK_BYTES)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+    return size, crc & 0xFFFFFFFF
+
+
+def log_content_key(path: str) -> Optional[str]:
+    """Cache key of a log file (plain or zip-native path), or None if it cannot be read."""
+    try:
+        zip_ref = split_zip_log_path(path)
+        if zip_ref is None:
+            size, crc = _file_size_crc(path)
+        else:
+            size, crc = _zip_member_crcs(zip_ref[0])[zip_ref[1]]
+    except Exception:
+        return None
+    name = os.path.basename(str(path).replace("\\", "/").rstrip("/"))
+    return hashlib.sha1(f"{PARSE_CACHE_VERSION}\0{name}\0{size}\0{crc:08x}".encode("utf-8", errors="surrogateescape")).hexdigest()
+
+
+# ----------------------------- ENTRIES ----------------------------- #
+def _entry_dir(root: str, key: str) -> str:
+    return os.path.join(root, key[:2], key)
+
+
+def has_parsed_tables(key: Optional[str]) -> bool:
+    """True if a complete entry is stored for 'key' (cheap check: the manifest is written last)."""
+    root = parse_cache_dir()
+    return bool(root and key) and os.path.isfile(to_long_path(os.path.join(_entry_dir(root, key), MANIFEST_NAME)))
+
+
+def load_parsed_tables(key: Optional[str]) -> Optional[List[Dict[str, object]]]:
+    """Tables stored for 'key' (same dicts as parse_log_tables(), elapsed = load time), or None on a miss."""
+    root = parse_cache_dir()
+    if not root or not key:
+        return None
+    entry = to_long_path(_entry_dir(root, key))
+    try:
+        import pyarrow.parquet as pq
+        start = time.perf_counter()
+        with open(os.path.join(entry, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if int(manifest.get("version", 0)) != PARSE_CACHE_VERSION:
+            return None
+        tables: List[Dict[str, object]] = []
+        for t in manifest.get("tables", []):
+            columns = list(t.get("columns", []))
+            if columns:
+                df = pq.read_table(os.path.join(entry, t["file"])).to_pandas()
+                df.columns = columns
+            else:
+                df = pd.DataFrame()
+            tables.append({"df": df, "sheet_candidate": t.get("sheet_candidate", ""), "tables_in_log": int(t.get("tables_in_log", 1)), "sliced": bool(t.get("sliced", False)), "note": t.get("note", ""), "elapsed": 0.0})
+        elapsed = time.perf_counter() - start
+        for t in tables:
+            t["elapsed"] = elapsed / max(1, len(tables))
+        try:
+            os.utime(os.path.join(entry, MANIFEST_NAME), None)  # LRU stamp
+        except OSError:
+            pass
+        return tables
+    except Exception:
+        return None
+
+
+def store_parsed_tables(key: Optional[str], tables: List[Dict[str, object]]) -> bool:
+    """Store the parse_log_tables() result of a log. Returns True if the entry exists afterwards."""
+    root = parse_cache_dir()
+    if not root or not key:
+        return False
+    entry = to_long_path(_entry_dir(root, key))
+    if os.path.isfile(os.path.join(entry, MANIFEST_NAME)):
+        return True
+    tmp = f"{entry}{_TMP_TAG}{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        os.makedirs(tmp, exist_ok=True)
+        manifest_tables = []
+        for i, t in enumerate(tables):
+            df = t["df"]
+            columns = [str(c) for c in df.columns]
+            file_name = f"t{i}.parquet"
+            if columns:
+                # Positional column names: parsed headers may repeat or not be valid Parquet field names
+                arrays = [pa.array(df.iloc[:, j].astype(str).tolist(), type=pa.string()) for j in range(len(columns))]
+                pq.write_table(pa.Table.from_arrays(arrays, names=[f"c{j}" for j in range(len(columns))]), os.path.join(tmp, file_name), compression="zstd")
+            manifest_tables.append({"file": file_name, "columns": columns, "sheet_candidate": str(t.get("sheet_candidate", "")), "tables_in_log": int(t.get("tables_in_log", 1)), "sliced": bool(t.get("sliced", False)), "note": str(t.get("note", ""))})
+        with open(os.path.join(tmp, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump({"version": PARSE_CACHE_VERSION, "created": time.time(), "tables": manifest_tables}, f)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            pass  # published concurrently by another process
+        return os.path.isfile(os.path.join(entry, MANIFEST_NAME))
+    except Exception:
+        return False
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _dir_bytes(path: str) -> int:
+    total = 0
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    total += e.stat().st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
+
+
+def list_parse_cache_entries() -> List[Tuple[str, int, float]]:
+    """(entry path, bytes, last used) of every complete entry."""
+    root = parse_cache_dir()
+    out: List[Tuple[str, int, float]] = []
+    if not root or not os.path.isdir(to_long_path(root)):
+        return out
+    with os.scandir(to_long_path(root)) as shards:
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as entries:
+                for e in entries:
+                    if not e.is_dir() or _TMP_TAG in e.name:
+                        continue
+                    try:
+                        last_used = os.stat(os.path.join(e.path, MANIFEST_NAME)).st_mtime
+                    except OSError:
+                        continue
+                    out.append((e.path, _dir_bytes(e.path), last_used))
+    return out
+
+
+def evict_parse_cache(quota_bytes: Optional[int] = None) -> Tuple[int, int]:
+    """Delete least recently used entries until the cache fits the quota. Returns (removed entries, freed bytes)."""
+    quota = parse_cache_quota_bytes() if quota_bytes is None else max(0, int(quota_bytes))
+    entries = sorted(list_parse_cache_entries(), key=lambda e: e[2])
+    total = sum(e[1] for e in entries)
+    removed = freed = 0
+    for path, size, _last_used in entries:
+        if total <= quota:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        freed += size
+        removed += 1
+    return removed, freed
+
+
+# ----------------------------- WARM JOB ----------------------------- #
+_WARM_SKIP_DIRS = ("__unzipped_logs__", "__pycache__")
+
+
+def _warm_candidates(input_path: str) -> List[str]:
+    """Log files (plain and zip-native members) under an input folder / ZIP. ZIPs nested inside ZIPs are not opened."""
+    input_fs = to_long_path(input_path)
+    if os.path.isfile(input_fs):
+        return find_zip_log_files(input_path, recursive=True) if input_fs.lower().endswith(".zip") else ([input_path] if input_fs.lower().endswith(LOG_FILE_SUFFIXES) else [])
+    files: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(input_fs):
+        dirnames[:] = sorted(d for d in dirnames if d not in _WARM_SKIP_DIRS)
+        for fn in sorted(filenames):
+            lower = fn.lower()
+            if lower.endswith(LOG_FILE_SUFFIXES):
+                files.append(os.path.join(dirpath, fn))
+            elif lower.endswith(".zip"):
+                try:
+                    files.extend(find_zip_log_files(os.path.join(dirpath, fn), recursive=True))
+                except Exception:
+                    continue
+    return files
+
+
+def run_parse_cache_warm(input_path: str, module_name: str = "[Parse Cache]") -> int:
+    """
+    CLI entry point (--parse-cache-warm): validate the input ZIP(s), parse every log of 'input_path' and store the tables
+    in the parse cache. Progress lines end with '(<done>/<total>)'. Returns the process exit code.
+    """
+    root = parse_cache_dir()
+    if not root:
+        print(f"{module_name} [ERROR] Parse cache disabled: use --parse-cache-dir (or {PARSE_CACHE_DIR_ENV}).")
+        return 2
+    if not input_path or not os.path.exists(to_long_path(input_path)):
+        print(f"{module_name} [ERROR] Input not found: '{pretty_path(input_path)}'")
+        return 2
+
+    # Validate archives first: unreadable ZIPs fail the warm job before any parsing
+    zips: List[str] = []
+    input_fs = to_long_path(input_path)
+    if os.path.isfile(input_fs):
+        if input_fs.lower().endswith(".zip"):
+            zips.append(input_path)
+    else:
+        for dirpath, dirnames, filenames in os.walk(input_fs):
+            dirnames[:] = sorted(d for d in dirnames if d not in _WARM_SKIP_DIRS)
+            zips.extend(os.path.join(dirpath, fn) for fn in sorted(filenames) if fn.lower().endswith(".zip"))
+    for zip_path in zips:
+        if not zipfile.is_zipfile(to_long_path(zip_path)):
+            print(f"{module_name} [ERROR] Invalid ZIP archive: '{pretty_path(zip_path)}'")
+            return 1
+        if not zip_has_subnetwork_logs(zip_path):
+            print(f"{module_name} [WARNING] No SubNetwork logs found at the top of '{pretty_path(zip_path)}' (nested ZIPs are parsed by the first run).")
+
+    candidates = _warm_candidates(input_path)
+    keys = {p: log_content_key(p) for p in candidates}
+    pending = [p for p in candidates if keys.get(p) and not has_parsed_tables(keys[p])]
+    total = len(candidates)
+    done = total - len(pending)
+    print(f"{module_name} [INFO] Warming '{pretty_path(root)}' for '{pretty_path(input_path)}': {total} log files, {done} already cached ({done}/{total})")
+
+    start = time.perf_counter()
+    stored = failed = 0
+    for path, lines, encoding_used in iter_log_texts(pending, skip_unreadable=True):
+        done += 1
+        base_filename = os.path.basename(str(path).replace("\\", "/").rstrip("/"))
+        if lines is None:
+            failed += 1
+            print(f"{module_name} [WARNING] Unreadable log skipped: '{base_filename}' ({done}/{total})")
+            continue
+        tables = parse_log_tables(lines, encoding_used, base_filename)
+        if store_parsed_tables(keys[path], tables):
+            stored += 1
+        else:
+            failed += 1
+        print(f"{module_name} [INFO] Parsed '{base_filename}' ({len(tables)} tables) ({done}/{total})")
+
+    removed, _freed = evict_parse_cache()
+    print(f"{module_name} [INFO] Warm finished in {time.perf_counter() - start:.1f}s: {stored} stored, {failed} failed, {removed} old entries evicted ({total}/{total})")
+    return 0
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import os
 import re
+import time
 from typing import List, Optional, Tuple, Dict, Iterable
 
 import pandas as pd
@@ -235,70 +237,45 @@ def extract_mo_name_from_previous_line(
     return toks[-1].strip() if toks else None
 
 
-def cap_rows(
-    df: pd.DataFrame,
-    note: str,
-    max_rows_excel: int = 1_048_576,
-) -> Tuple[pd.DataFrame, str]:
+def parse_log_tables(lines: List[str], encoding_used: Optional[str], base_filename: str) -> List[Dict[str, object]]:
     """
-    Cap the number of rows to Excel's maximum and append a note if trimming occurs.
+    Parse every MO table of one log file (ConfigurationAudit PHASE 1 per-file step, shared with the parse cache warm job).
+
+    Returns one dict per table, in file order, with keys: df, sheet_candidate, tables_in_log, sliced, note, elapsed (seconds).
+    - Files with 'SubNetwork' lines are split into one table per SubNetwork block (MO name taken from that line).
+    - Otherwise the whole file is parsed as a single table (MO name taken from the line before the header).
     """
-    if len(df) > max_rows_excel:
-        df = df.iloc[:max_rows_excel, :].copy()
-        note = (note + " | " if note else "") + f"Trimmed to {max_rows_excel} rows"
-    return df, note
+    header_indices = find_all_subnetwork_headers(lines)
+
+    if not header_indices:
+        table_start = time.perf_counter()
+        header_idx = find_subnetwork_header_index(lines, SUMMARY_RE)
+        df, note = parse_log_lines(lines, SUMMARY_RE, forced_header_idx=header_idx)
+        mo_name_prev = extract_mo_name_from_previous_line(lines, header_idx)
+        if encoding_used:
+            note = (note + " | " if note else "") + f"encoding={encoding_used}"
+        return [{"df": df, "sheet_candidate": mo_name_prev or "MO NOT FOUND", "tables_in_log": 1, "sliced": False, "note": note or "", "elapsed": time.perf_counter() - table_start}]
+
+    tables_in_log = len(header_indices)
+    bounds = header_indices + [len(lines)]  # sentinel index
+    tables: List[Dict[str, object]] = []
+    for ix in range(tables_in_log):
+        h = bounds[ix]
+        table_start = time.perf_counter()
+        mo_name_from_line = extract_mo_from_subnetwork_line(lines[h])
+        desired_sheet = mo_name_from_line if mo_name_from_line else os.path.splitext(base_filename)[0]
+        df = parse_table_slice_from_subnetwork(lines, h, bounds[ix + 1])
+        note = "Slice parsed"
+        if encoding_used:
+            note += f" | encoding={encoding_used}"
+        tables.append({"df": df, "sheet_candidate": desired_sheet, "tables_in_log": tables_in_log, "sliced": True, "note": note, "elapsed": time.perf_counter() - table_start})
+    return tables
 
 
 def normalize_ref(s: str) -> str:
     return str(s).replace(" ", "").strip()
 
 
-def extract_gnbcucp_segment(nrcell_ref: str) -> str:
-    """
-    Extract GNBCUCPFunction segment from a full nRCellRef string.
-
-    Example:
-      '...,GNBCUCPFunction=1,NRNetwork=1,ExternalGNBCUCPFunction=auto311_480_3_2509535,ExternalNRCellCU=auto41116222186'
-      -> 'GNBCUCPFunction=1,NRNetwork=1,ExternalGNBCUCPFunction=auto311_480_3_2509535,ExternalNRCellCU=auto41116222186'
-    """
-    if not isinstance(nrcell_ref, str):
-        return ""
-    pos = nrcell_ref.find("GNBCUCPFunction=")
-    if pos == -1:
-        return ""
-    return nrcell_ref[pos:].strip()
-
-
-def resolve_nrcell_ref(row: pd.Series, relations_lookup: Dict[tuple, pd.Series]) -> str:
-    """
-    Prefer nRCellRef from relations_df; if empty, fallback to value in disc row.
-    """
-    key = (
-        str(row.get("NodeId", "")).strip(),
-        str(row.get("NRCellCUId", "")).strip(),
-        str(row.get("NRCellRelationId", "")).strip(),
-    )
-    rel_row = relations_lookup.get(key)
-    candidates = []
-    if rel_row is not None:
-        candidates.append(rel_row.get("nRCellRef"))
-    candidates.append(row.get("nRCellRef"))
-
-    for v in candidates:
-        if v is None:
-            continue
-        try:
-            if pd.isna(v):
-                continue
-        except TypeError:
-            pass
-        s = str(v).strip()
-        if not s or s.lower() == "nan":
-            continue
-        return s
-    return ""
-
-
 def normalize_market_name(name: str) -> str:
     """
     Normalize a market folder name so that, for example,
@@ -321,6 +298,28 @@ def normalize_csv_list(text: str) -> str:
     return ",".join(items)
 
 
+def parse_output_formats(csv_text: Optional[str], default: str = "xlsx") -> List[str]:
+    """
+    Parse an output-format CSV (e.g. 'parquet,xlsx') into an ordered, de-duplicated list.
+
+    - Accepted values: 'xlsx', 'parquet', 'arrow' (aliases: 'excel' -> xlsx, 'feather'/'ipc' -> arrow).
+    - Unknown tokens are ignored with a warning. Falls back to [default] if nothing valid remains.
+    """
+    aliases = {"excel": "xlsx", "xlsx": "xlsx", "parquet": "parquet", "pq": "parquet", "arrow": "arrow", "feather": "arrow", "ipc": "arrow"}
+    formats: List[str] = []
+    for token in (csv_text or "").split(","):
+        tok = token.strip().lower()
+        if not tok:
+            continue
+        fmt = aliases.get(tok)
+        if not fmt:
+            print(f"[WARNING] Ignoring unknown output format '{tok}' (valid: xlsx, parquet, arrow).")
+            continue
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats or [default]
+
+
 def parse_arfcn_csv_to_set(
     csv_text: Optional[str],
     default_values: List[int],
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.utils_io import Step0RunInfo, to_long_path, detect_step0_folders, extract_tokens_dynamic, folder_or_zip_has_valid_logs
+
+
+# ============================ STEP0 FOLDER TREE INDEX ============================
+# Bulk auto-detection (detect_pre_post_subfolders + one-level fallback), existing-audit lookups and CA re-run detection used
+# to re-walk the same trees with os.scandir / os.listdir and re-open log files. The index scans a base folder ONCE, level by
+# level with a thread pool (directory listings are I/O bound, mostly on network shares), and records per folder:
+#   - sub-folders and files (size / mtime),
+#   - the Step0 run parsed from the folder name (detect_step0_folders) and its market tokens (extract_tokens_dynamic),
+#   - the log-validity flag (folder_or_zip_has_valid_logs), computed lazily and memoised,
+#   - ConfigurationAudit_* output folders with their non-empty ConfigurationAudit_*.xlsx files.
+# Indexes are cached per base folder for the process lifetime. A folder whose mtime changed (e.g. a new audit output folder
+# or Step0 ZIPs materialised as run folders) is re-listed on its next query, so the index never serves stale listings.
+
+TREE_INDEX_MAX_DEPTH = 4  # base -> [cluster] -> Step0 run -> market -> ConfigurationAudit_* folder
+TREE_INDEX_MAX_WORKERS = 16
+
+_OUTPUT_FOLDER_PREFIXES = ("configurationaudit_", "profilesaudit_", "consistencychecks_", "retuningautomation_", "cleanup_")
+_SKIP_FOLDER_NAMES = ("__pycache__", "__unzipped_logs__")
+
+
+@dataclass
+class AuditFolderInfo:
+    path: str
+    name: str
+    mtime: float
+    excel_files: List[str]  # non-empty ConfigurationAudit_*.xlsx, sorted
+
+
+@dataclass
+class TreeNode:
+    path: str
+    name: str
+    mtime_ns: int
+    dirs: List[str] = field(default_factory=list)  # child folder names (os.scandir order)
+    files: Dict[str, Tuple[int, float]] = field(default_factory=dict)  # file name -> (size, mtime)
+    step0: Optional[Step0RunInfo] = None
+    market_tokens: List[str] = field(default_factory=list)
+    valid_logs: Optional[bool] = None
+
+
+def _norm_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(to_long_path(path)))
+
+
+def _scan_dir(path: str) -> Optional[TreeNode]:
+    """List one folder (no recursion). Returns None if it cannot be listed."""
+    path_fs = to_long_path(path)
+    try:
+        st = os.stat(path_fs)
+        dirs: List[str] = []
+        files: Dict[str, Tuple[int, float]] = {}
+        with os.scandir(path_fs) as it:
+            for e in it:
+                try:
+                    if e.is_dir():
+                        dirs.append(e.name)
+                    elif e.is_file():
+                        est = e.stat()
+                        files[e.name] = (est.st_size, est.st_mtime)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    name = os.path.basename(os.path.normpath(path_fs))
+    parent = os.path.dirname(os.path.normpath(path_fs))
+    node = TreeNode(path=path_fs, name=name, mtime_ns=st.st_mtime_ns, dirs=dirs, files=files)
+    try:
+        node.step0 = detect_step0_folders(name, parent)
+    except Exception:
+        node.step0 = None
+    try:
+        node.market_tokens = extract_tokens_dynamic(name)
+    except Exception:
+        node.market_tokens = []
+    return node
+
+
+def _default_workers() -> int:
+    return max(1, min(TREE_INDEX_MAX_WORKERS, (os.cpu_count() or 1) * 4))
+
+
+class Step0TreeIndex:
+    """Cached listing of a base folder tree (see module header). All queries accept any folder under the root."""
+
+    def __init__(self, root: str, max_depth: int = TREE_INDEX_MAX_DEPTH, workers: Optional[int] = None) -> None:
+        self.root = to_long_path(root)
+        self.max_depth = max(0, int(max_depth))
+        self.workers = int(workers) if workers else _default_workers()
+        self._nodes: Dict[str, TreeNode] = {}
+        self._build()
+
+    # ---------------------------- building ----------------------------
+    def _build(self) -> None:
+        level = [self.root]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for depth in range(self.max_depth + 1):
+                if not level:
+                    break
+                next_level: List[str] = []
+                for node in pool.map(_scan_dir, level):
+                    if node is None:
+                        continue
+                    self._nodes[_norm_key(node.path)] = node
+                    if depth >= self.max_depth or node.name.lower().startswith(_OUTPUT_FOLDER_PREFIXES):
+                        continue  # tool output folders only need their own file listing
+                    next_level.extend(os.path.join(node.path, d) for d in node.dirs if d.lower() not in _SKIP_FOLDER_NAMES)
+                level = next_level
+
+            # Log validity is only needed up-front for Step0-named folders that do not match the strict name pattern
+            # (detect_pre_post_subfolders fallback); probe them in parallel as well.
+            pending = [n for n in self._nodes.values() if n.step0 is None and "step0" in n.name.lower()]
+            for node, ok in zip(pending, pool.map(lambda n: folder_or_zip_has_valid_logs(n.path), pending)):
+                node.valid_logs = bool(ok)
+
+    def covers(self, path: str) -> bool:
+        root_key = _norm_key(self.root)
+        key = _norm_key(path)
+        return key == root_key or key.startswith(root_key.rstrip(os.sep) + os.sep)
+
+    # ---------------------------- queries ----------------------------
+    def node(self, path: str) -> Optional[TreeNode]:
+        """Indexed node of 'path', re-listed if the folder changed since it was indexed (or scanned now if never indexed)."""
+        key = _norm_key(path)
+        node = self._nodes.get(key)
+        if node is not None:
+            try:
+                if os.stat(node.path).st_mtime_ns == node.mtime_ns:
+                    return node
+            except OSError:
+                self._nodes.pop(key, None)
+                return None
+        node = _scan_dir(path)
+        if node is None:
+            self._nodes.pop(key, None)
+            return None
+        self._nodes[key] = node
+        return node
+
+    def subdirs(self, path: str) -> List[TreeNode]:
+        """Child folders of 'path' (os.scandir order)."""
+        parent = self.node(path)
+        if parent is None:
+            return []
+        out: List[TreeNode] = []
+        for d in parent.dirs:
+            child = self.node(os.path.join(parent.path, d))
+            if child is not None:
+                out.append(child)
+        return out
+
+    def has_subdirs(self, path: str) -> bool:
+        parent = self.node(path)
+        return bool(parent and parent.dirs)
+
+    def has_valid_logs(self, path: str) -> bool:
+        """Memoised folder_or_zip_has_valid_logs()."""
+        node = self.node(path)
+        if node is None:
+            return False
+        if node.valid_logs is None:
+            node.valid_logs = bool(folder_or_zip_has_valid_logs(node.path))
+        return node.valid_logs
+
+    def audit_folders(self, path: str) -> List[AuditFolderInfo]:
+        """ConfigurationAudit_* folders directly under 'path' with their non-empty ConfigurationAudit_*.xlsx files."""
+        out: List[AuditFolderInfo] = []
+        for child in self.subdirs(path):
+            if not child.name.startswith("ConfigurationAudit_"):
+                continue
+            excel_files = sorted(os.path.join(child.path, fn) for fn, (size, _mt) in child.files.items() if fn.startswith("ConfigurationAudit_") and fn.lower().endswith(".xlsx") and size > 0)
+            out.append(AuditFolderInfo(path=child.path, name=child.name, mtime=child.mtime_ns / 1e9, excel_files=excel_files))
+        return out
+
+
+# Indexes per base folder for the process lifetime
+_TREE_INDEXES: Dict[str, Step0TreeIndex] = {}
+
+
+def get_step0_tree_index(base_folder: str, max_depth: int = TREE_INDEX_MAX_DEPTH) -> Step0TreeIndex:
+    """Return the cached index covering 'base_folder' (an index of one of its parents is reused), building it on first use."""
+    key = _norm_key(base_folder)
+    index = _TREE_INDEXES.get(key)
+    if index is not None:
+        return index
+    for candidate in _TREE_INDEXES.values():
+        if candidate.covers(base_folder):
+            return candidate
+    index = Step0TreeIndex(base_folder, max_depth=max_depth)
+    _TREE_INDEXES[key] = index
+    return index
+
+
+def clear_step0_tree_indexes() -> None:
+    _TREE_INDEXES.clear()
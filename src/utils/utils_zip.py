@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+
+# ============================ ZIP WRITING UTILS ============================
+# Runtime knobs (set by the CLI so they are inherited by worker processes):
+#   SSB_RA_ZIP_COMPRESSION = deflated | stored     (default: deflated)
+#   SSB_RA_ZIP_LEVEL       = 0..9                  (default: zlib default level)
+
+ZIP_COMPRESSION_ENV = "SSB_RA_ZIP_COMPRESSION"
+ZIP_LEVEL_ENV = "SSB_RA_ZIP_LEVEL"
+
+ZIP_COMPRESSION_CHOICES = {"deflated": zipfile.ZIP_DEFLATED, "stored": zipfile.ZIP_STORED}
+
+
+def configure_zip_export(compression: Optional[str] = None, level: Optional[int] = None) -> None:
+    """Publish ZIP export options as environment variables (inherited by spawned worker processes)."""
+    if compression:
+        os.environ[ZIP_COMPRESSION_ENV] = str(compression).strip().lower()
+    if level is not None:
+        os.environ[ZIP_LEVEL_ENV] = str(int(level))
+
+
+def resolve_zip_compression(compression: Optional[str] = None, level: Optional[int] = None) -> Tuple[int, Optional[int]]:
+    """
+    Resolve (zipfile compression constant, compresslevel) from explicit arguments or SSB_RA_ZIP_* env vars.
+    Unknown values fall back to ZIP_DEFLATED with the default zlib level.
+    """
+    comp_txt = str(compression or os.environ.get(ZIP_COMPRESSION_ENV, "") or "deflated").strip().lower()
+    comp = ZIP_COMPRESSION_CHOICES.get(comp_txt, zipfile.ZIP_DEFLATED)
+
+    lvl = level
+    if lvl is None:
+        try:
+            raw = os.environ.get(ZIP_LEVEL_ENV, "").strip()
+            lvl = int(raw) if raw else None
+        except Exception:
+            lvl = None
+    if lvl is not None and not (0 <= int(lvl) <= 9):
+        lvl = None
+    if comp == zipfile.ZIP_STORED:
+        lvl = None
+    return comp, lvl
+
+
+class BackgroundZipWriter:
+    """
+    Drop-in replacement for zipfile.ZipFile(path, "w").writestr() when writing many small text members.
+
+    - Members are compressed and written by one background thread through the public ZipFile.writestr() API while the
+      caller keeps producing the next ones (zlib releases the GIL, so compression overlaps the caller's work).
+    - Members are written strictly in submission order (same layout as a serial writestr loop).
+    - Members are handed over in batches of about batch_bytes and at most max_pending batches are queued, so memory
+      stays flat regardless of the member count.
+    - With ZIP_STORED there is nothing to compress and it simply delegates to ZipFile.writestr() in the caller thread.
+    """
+
+    def __init__(self, zip_path: str, compression: Optional[str] = None, compresslevel: Optional[int] = None, max_pending: int = 4, batch_bytes: int = 1 << 20):
+        self.compression, self.compresslevel = resolve_zip_compression(compression, compresslevel)
+        self.zip_file = zipfile.ZipFile(zip_path, "w", compression=self.compression, compresslevel=self.compresslevel)
+        self.max_pending = max(1, int(max_pending or 1))
+        self.batch_bytes = max(1, int(batch_bytes or 1))
+        self._batch: List[Tuple[str, bytes]] = []
+        self._batch_size = 0
+        self._pending: deque = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.compression == zipfile.ZIP_DEFLATED:
+            # A single writer thread keeps the member order and the one-writer-at-a-time rule of ZipFile
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zipwriter")
+
+    def __enter__(self) -> "BackgroundZipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _write_batch(self, batch: List[Tuple[str, bytes]]) -> None:
+        for arcname, data in batch:
+            self.zip_file.writestr(arcname, data)
+
+    def _submit_batch(self) -> None:
+        # Small members would otherwise pay one thread hand-off each
+        if not self._batch:
+            return
+        self._pending.append(self._executor.submit(self._write_batch, self._batch))
+        self._batch = []
+        self._batch_size = 0
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft().result()
+
+    def writestr(self, arcname: str, text) -> None:
+        data = text.encode("utf-8") if isinstance(text, str) else bytes(text)
+        if self._executor is None:
+            self.zip_file.writestr(arcname, data)
+            return
+        self._batch.append((arcname, data))
+        self._batch_size += len(data)
+        if self._batch_size >= self.batch_bytes:
+            self._submit_batch()
+
+    def close(self) -> None:
+        try:
+            if self._executor is not None:
+                self._submit_batch()
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self.zip_file.close()
@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.utils_io import to_long_path, pretty_path
+
+
+# ============================ STEP0 ZIP EXTRACTION CACHE ============================
+# <TEMP>/__unzipped_logs__ is a content-addressed cache of extracted Step0 ZIPs (plus the local ZIP copies in _zip_cache_):
+#   - Entries are named '<zip stem>_<content key>'. The key hashes the ZIP size and its central directory (member names,
+#     CRC-32s, sizes): a ZIP replaced in place gets a new entry, identical ZIPs at different paths share one extraction.
+#     A complete entry of the same key under another stem (the same ZIP uploaded under another name) is reused as well.
+#   - Extraction goes to '<entry>.partial-<pid>'; the completion marker is written last and the folder is then renamed into
+#     place, so a partially extracted folder is never reused.
+#   - Entries in use hold a lease file (_leases_/); LRU eviction skips them and keeps the cache under the quota. Leases are
+#     written and re-checked under a cache-wide lock file (_leases_/.lock): eviction renames an entry to a tombstone only
+#     while no lease exists for it, so an entry leased after the listing is never deleted.
+# Runtime knob (set by the CLI so it is inherited by worker processes):
+#   SSB_RA_ZIP_CACHE_QUOTA_MB = max MB kept in the cache once entries are released (default: 10240; 0 = delete after use)
+
+ZIP_CACHE_QUOTA_MB_ENV = "SSB_RA_ZIP_CACHE_QUOTA_MB"
+ZIP_CACHE_QUOTA_MB_DEFAULT = 10240
+
+ZIP_CACHE_DIRNAME = "__unzipped_logs__"
+ZIP_COPY_DIRNAME = "_zip_cache_"
+LEASES_DIRNAME = "_leases_"
+COMPLETE_MARKER = ".ssb_ra_extract_complete.json"
+PARTIAL_TAG = ".partial-"
+TOMBSTONE_TAG = ".evicted-"
+LOCK_NAME = ".lock"
+
+LEASE_STALE_SECONDS = 24 * 3600  # leases of crashed runs stop protecting their entry after this
+INCOMPLETE_STALE_SECONDS = 3600  # extraction folders without completion marker (older versions / crashes) are garbage after this
+LOCK_STALE_SECONDS = 60  # the cache lock is only held for a few file operations; an older lock file belongs to a crashed run
+LOCK_TIMEOUT_SECONDS = 30
+
+
+def configure_zip_cache(quota_mb: Optional[int] = None) -> None:
+    """Publish the extraction cache quota as environment variable (inherited by spawned worker processes)."""
+    if quota_mb is not None:
+        os.environ[ZIP_CACHE_QUOTA_MB_ENV] = str(int(quota_mb))
+
+
+def zip_cache_quota_bytes(quota_mb: Optional[int] = None) -> int:
+    if quota_mb is None:
+        try:
+            raw = os.environ.get(ZIP_CACHE_QUOTA_MB_ENV, "").strip()
+            quota_mb = int(raw) if raw else None
+        except Exception:
+            quota_mb = None
+    if quota_mb is None or quota_mb < 0:
+        quota_mb = ZIP_CACHE_QUOTA_MB_DEFAULT
+    return int(quota_mb) * 1024 * 1024
+
+
+def zip_cache_root(parent_dirname: str = ZIP_CACHE_DIRNAME) -> str:
+    return os.path.join(tempfile.gettempdir(), parent_dirname)
+
+
+# ----------------------------- CONTENT KEYS ----------------------------- #
+# Memo {(abs path, size, mtime_ns) -> key}: the central directory is read once per ZIP version and process
+_KEY_MEMO: Dict[Tuple[str, int, int], str] = {}
+
+
+def zip_content_key(zip_path: str) -> str:
+    """16-hex key of a ZIP content: size + central directory (member names, CRC-32s, uncompressed sizes)."""
+    zip_fs = to_long_path(zip_path)
+    st = os.stat(zip_fs)
+    memo_key = (os.path.abspath(zip_fs), st.st_size, st.st_mtime_ns)
+    key = _KEY_MEMO.get(memo_key)
+    if key is None:
+        digest = hashlib.sha1(str(st.st_size).encode("ascii"))
+        with zipfile.ZipFile(zip_fs, "r") as zf:
+            for info in zf.infolist():
+                digest.update(f"\0{info.filename}\0{info.CRC:08x}\0{info.file_size}".encode("utf-8", errors="surrogateescape"))
+        key = digest.hexdigest()[:16]
+        _KEY_MEMO[memo_key] = key
+    return key
+
+
+def _find_entry_by_key(folder: str, key: str, suffix: str = "") -> Optional[str]:
+    """Existing '<any stem>_<key><suffix>' entry of a cache folder (identical ZIPs uploaded under different names)."""
+    tail = f"_{key}{suffix}"
+    try:
+        names = sorted(os.listdir(to_long_path(folder)))
+    except OSError:
+        return None
+    for name in names:
+        if name.endswith(tail) and PARTIAL_TAG not in name:
+            return os.path.join(folder, name)
+    return None
+
+
+def extraction_entry_dir(zip_path: str, key: str, parent_dirname: str = ZIP_CACHE_DIRNAME) -> str:
+    """Entry folder of a ZIP: '<zip stem>_<key>', or the complete extraction of the same content under another stem."""
+    stem = os.path.splitext(os.path.basename(zip_path))[0]
+    root = zip_cache_root(parent_dirname)
+    own = os.path.join(root, f"{stem}_{key}")
+    if not is_extraction_complete(own, key):
+        shared = _find_entry_by_key(root, key)
+        if shared and is_extraction_complete(shared, key):
+            return shared
+    return own
+
+
+def zip_copy_path(zip_path: str, key: str, parent_dirname: str = ZIP_CACHE_DIRNAME) -> str:
+    """Local copy of a ZIP: '_zip_cache_/<zip stem>_<key>.zip', or an existing copy of the same content under another stem."""
+    stem, ext = os.path.splitext(os.path.basename(zip_path))
+    copies = os.path.join(zip_cache_root(parent_dirname), ZIP_COPY_DIRNAME)
+    own = os.path.join(copies, f"{stem}_{key}{ext}")
+    if not os.path.isfile(to_long_path(own)):
+        shared = _find_entry_by_key(copies, key, ext)
+        if shared and os.path.isfile(to_long_path(shared)):
+            return shared
+    return own
+
+
+# ----------------------------- ENTRIES ----------------------------- #
+def read_extraction_marker(entry_dir: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(to_long_path(entry_dir), COMPLETE_MARKER), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def is_extraction_complete(entry_dir: str, key: Optional[str] = None) -> bool:
+    marker = read_extraction_marker(entry_dir)
+    return bool(marker) and (key is None or marker.get("key") == key)
+
+
+def _tree_bytes(path: str) -> int:
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(to_long_path(path)):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except Exception:
+                pass
+    return total
+
+
+def publish_extraction(zip_path: str, entry_dir: str, key: str, extract_fn: Callable[[str, str], object], source_zip: Optional[str] = None) -> str:
+    """
+    Extract zip_path with extract_fn(zip_path, dest) into '<entry_dir>.partial-<pid>', write the completion marker and rename
+    the folder into place. If another process published the same entry meanwhile, its extraction is kept and ours discarded.
+    """
+    entry_fs = to_long_path(entry_dir)
+    partial_fs = f"{entry_fs}{PARTIAL_TAG}{os.getpid()}"
+    shutil.rmtree(partial_fs, ignore_errors=True)
+    os.makedirs(partial_fs, exist_ok=True)
+    try:
+        extract_fn(zip_path, partial_fs)
+        src = source_zip or zip_path
+        src_stat = os.stat(to_long_path(src))
+        marker = {"key": key, "source_zip": pretty_path(to_long_path(src)), "zip_size": src_stat.st_size, "zip_mtime": src_stat.st_mtime, "bytes": _tree_bytes(partial_fs), "created": datetime.now().isoformat(timespec="seconds")}
+        with open(os.path.join(partial_fs, COMPLETE_MARKER), "w", encoding="utf-8") as f:
+            json.dump(marker, f, indent=2)
+
+        if os.path.isdir(entry_fs) and not is_extraction_complete(entry_fs):
+            shutil.rmtree(entry_fs, ignore_errors=True)  # leftover without marker (interrupted run / older version)
+        try:
+            os.rename(partial_fs, entry_fs)
+        except OSError:
+            if not is_extraction_complete(entry_fs, key):
+                raise
+            shutil.rmtree(partial_fs, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(partial_fs, ignore_errors=True)
+        raise
+    return entry_dir
+
+
+def copy_zip_to_cache(src_zip: str, dst_zip: str) -> str:
+    """Copy a ZIP into _zip_cache_ (atomic rename of a partial copy). An existing copy is reused and marked as recently used."""
+    dst_fs = to_long_path(dst_zip)
+    if not os.path.isfile(dst_fs):
+        os.makedirs(os.path.dirname(dst_fs), exist_ok=True)
+        partial_fs = f"{dst_fs}{PARTIAL_TAG}{os.getpid()}"
+        try:
+            shutil.copy2(to_long_path(src_zip), partial_fs)
+            os.replace(partial_fs, dst_fs)
+        finally:
+            if os.path.exists(partial_fs):
+                os.remove(partial_fs)
+    _touch(dst_fs)
+    return dst_fs
+
+
+def _touch(path: str) -> None:
+    try:
+        now = time.time()
+        os.utime(path, (now, now))
+    except Exception:
+        pass
+
+
+# ----------------------------- LEASES ----------------------------- #
+@contextmanager
+def _cache_lock(root_fs: str) -> Iterator[bool]:
+    """
+    Cross-process lock of the cache (exclusive creation of _leases_/.lock). Yields False if it could not be taken within
+    LOCK_TIMEOUT_SECONDS; callers then proceed unlocked (a stuck lock must never block an execution).
+    """
+    leases_dir = os.path.join(root_fs, LEASES_DIRNAME)
+    lock_path = os.path.join(leases_dir, LOCK_NAME)
+    deadline = time.time() + LOCK_TIMEOUT_SECONDS
+    locked = False
+    while True:
+        try:
+            os.makedirs(leases_dir, exist_ok=True)
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            locked = True
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+        except OSError:
+            break
+        if time.time() >= deadline:
+            break
+        time.sleep(0.05)
+    try:
+        yield locked
+    finally:
+        if locked:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+
+def acquire_zip_cache_lease(entry_path: str, parent_dirname: str = ZIP_CACHE_DIRNAME) -> Optional[str]:
+    """Mark a cache entry (extraction folder or ZIP copy) as in use and recently used. Returns the lease path (None on failure)."""
+    entry_fs = to_long_path(entry_path)
+    _touch(os.path.join(entry_fs, COMPLETE_MARKER) if os.path.isdir(entry_fs) else entry_fs)
+    try:
+        root_fs = to_long_path(zip_cache_root(parent_dirname))
+        lease = os.path.join(root_fs, LEASES_DIRNAME, f"{os.path.basename(entry_fs.rstrip(os.sep))}@{os.getpid()}_{uuid.uuid4().hex[:8]}")
+        with _cache_lock(root_fs):
+            with open(lease, "w", encoding="utf-8") as f:
+                f.write(entry_fs)
+        return lease
+    except Exception:
+        return None
+
+
+def release_zip_cache_lease(lease: Optional[str]) -> None:
+    if not lease:
+        return
+    try:
+        os.remove(to_long_path(lease))
+    except Exception:
+        pass
+
+
+def _active_leases(root_fs: str) -> Dict[str, int]:
+    """{entry name -> active lease count}. Leases older than LEASE_STALE_SECONDS (crashed runs) are removed."""
+    active: Dict[str, int] = {}
+    leases_dir = os.path.join(root_fs, LEASES_DIRNAME)
+    try:
+        names = os.listdir(leases_dir)
+    except Exception:
+        return active
+    now = time.time()
+    for name in names:
+        path = os.path.join(leases_dir, name)
+        try:
+            if now - os.path.getmtime(path) > LEASE_STALE_SECONDS:
+                os.remove(path)
+                continue
+        except Exception:
+            continue
+        if "@" not in name:
+            continue  # lock file
+        entry = name.rsplit("@", 1)[0]
+        active[entry] = active.get(entry, 0) + 1
+    return active
+
+
+# ----------------------------- LISTING / EVICTION ----------------------------- #
+@dataclass
+class ZipCacheEntry:
+    path: str
+    kind: str  # "extract" | "zip-copy" | "partial" | "incomplete"
+    bytes: int
+    last_used: float
+    leased: bool
+    source_zip: str = ""
+
+
+def list_zip_cache_entries(parent_dirname: str = ZIP_CACHE_DIRNAME) -> List[ZipCacheEntry]:
+    root_fs = to_long_path(zip_cache_root(parent_dirname))
+    if not os.path.isdir(root_fs):
+        return []
+    leases = _active_leases(root_fs)
+    entries: List[ZipCacheEntry] = []
+
+    for name in sorted(os.listdir(root_fs)):
+        path = os.path.join(root_fs, name)
+        if name in (LEASES_DIRNAME, ZIP_COPY_DIRNAME) or not os.path.isdir(path):
+            continue
+        marker = read_extraction_marker(path) if TOMBSTONE_TAG not in name else None
+        if marker:
+            marker_path = os.path.join(path, COMPLETE_MARKER)
+            entries.append(ZipCacheEntry(path=path, kind="extract", bytes=int(marker.get("bytes") or 0), last_used=os.path.getmtime(marker_path), leased=name in leases, source_zip=str(marker.get("source_zip") or "")))
+        else:
+            kind = "partial" if PARTIAL_TAG in name or TOMBSTONE_TAG in name else "incomplete"
+            entries.append(ZipCacheEntry(path=path, kind=kind, bytes=_tree_bytes(path), last_used=os.path.getmtime(path), leased=name in leases))
+
+    copies_dir = os.path.join(root_fs, ZIP_COPY_DIRNAME)
+    if os.path.isdir(copies_dir):
+        for name in sorted(os.listdir(copies_dir)):
+            path = os.path.join(copies_dir, name)
+            if not os.path.isfile(path):
+                continue
+            kind = "partial" if PARTIAL_TAG in name or TOMBSTONE_TAG in name else "zip-copy"
+            entries.append(ZipCacheEntry(path=path, kind=kind, bytes=os.path.getsize(path), last_used=os.path.getmtime(path), leased=name in leases))
+    return entries
+
+
+def _remove_entry(entry: ZipCacheEntry, root_fs: str) -> bool:
+    """
+    Delete an entry unless it is leased. The lease check and the rename to a tombstone happen under the cache lock, so a
+    lease taken after the entries were listed still protects the entry; the tombstone is then deleted outside the lock.
+    """
+    name = os.path.basename(entry.path)
+    tombstone = f"{entry.path}{TOMBSTONE_TAG}{os.getpid()}_{uuid.uuid4().hex[:8]}"
+    try:
+        with _cache_lock(root_fs):
+            if _active_leases(root_fs).get(name):
+                return False
+            os.rename(entry.path, tombstone)
+    except Exception:
+        return False
+    try:
+        if os.path.isdir(tombstone):
+            # Drop the marker first: a folder that fails to delete completely is never reused as a complete extraction
+            marker = os.path.join(tombstone, COMPLETE_MARKER)
+            if os.path.exists(marker):
+                os.remove(marker)
+            shutil.rmtree(tombstone, ignore_errors=True)
+        else:
+            os.remove(tombstone)
+    except Exception:
+        pass
+    return True
+
+
+def evict_zip_cache(quota_bytes: Optional[int] = None, parent_dirname: str = ZIP_CACHE_DIRNAME) -> Tuple[int, int]:
+    """
+    Enforce the cache quota: delete stale partial/incomplete folders, then least recently used entries that are not leased
+    until the cache fits in quota_bytes (None = SSB_RA_ZIP_CACHE_QUOTA_MB). Returns (entries removed, bytes freed).
+    """
+    quota = zip_cache_quota_bytes() if quota_bytes is None else max(0, int(quota_bytes))
+    removed = 0
+    freed = 0
+    now = time.time()
+    kept: List[ZipCacheEntry] = []
+    root_fs = to_long_path(zip_cache_root(parent_dirname))
+    try:
+        entries = list_zip_cache_entries(parent_dirname)
+    except Exception:
+        return 0, 0
+
+    for entry in entries:
+        if entry.kind in ("extract", "zip-copy"):
+            kept.append(entry)
+            continue
+        stale_after = LEASE_STALE_SECONDS if entry.kind == "partial" else INCOMPLETE_STALE_SECONDS
+        if not entry.leased and now - entry.last_used > stale_after and _remove_entry(entry, root_fs):
+            removed += 1
+            freed += entry.bytes
+
+    total = sum(e.bytes for e in kept)
+    for entry in sorted(kept, key=lambda e: e.last_used):
+        if total <= quota:
+            break
+        if entry.leased:
+            continue
+        if _remove_entry(entry, root_fs):
+            removed += 1
+            freed += entry.bytes
+            total -= entry.bytes
+    return removed, freed
+
+
+def purge_zip_cache(parent_dirname: str = ZIP_CACHE_DIRNAME) -> Tuple[int, int]:
+    """Delete every entry that is not in use (extractions in progress younger than LEASE_STALE_SECONDS are kept)."""
+    removed = 0
+    freed = 0
+    now = time.time()
+    root_fs = to_long_path(zip_cache_root(parent_dirname))
+    for entry in list_zip_cache_entries(parent_dirname):
+        if entry.leased or (entry.kind == "partial" and now - entry.last_used <= LEASE_STALE_SECONDS):
+            continue
+        if _remove_entry(entry, root_fs):
+            removed += 1
+            freed += entry.bytes
+    return removed, freed
+
+
+def run_zip_cache_command(action: str, module_name: str = "[ZIP Cache]", parent_dirname: str = ZIP_CACHE_DIRNAME) -> None:
+    """CLI entry point (--zip-cache list|purge)."""
+    root = zip_cache_root(parent_dirname)
+    action = str(action or "").strip().lower()
+    if action == "purge":
+        removed, freed = purge_zip_cache(parent_dirname)
+        print(f"{module_name} [INFO] Purged {removed} entries ({freed / (1024 * 1024):.1f} MB) from '{pretty_path(root)}'")
+        return
+
+    entries = list_zip_cache_entries(parent_dirname)
+    total = sum(e.bytes for e in entries)
+    print(f"{module_name} [INFO] Cache folder: '{pretty_path(root)}' ({len(entries)} entries, {total / (1024 * 1024):.1f} MB, quota {zip_cache_quota_bytes() / (1024 * 1024):.0f} MB)")
+    for e in sorted(entries, key=lambda x: x.last_used, reverse=True):
+        last_used = datetime.fromtimestamp(e.last_used).strftime("%Y-%m-%d %H:%M")
+        in_use = " [IN USE]" if e.leased else ""
+        source = f" <- '{e.source_zip}'" if e.source_zip else ""
+        print(f"{module_name} [INFO]   {e.kind:<10} {e.bytes / (1024 * 1024):>10.1f} MB  {last_used}  '{pretty_path(e.path)}'{source}{in_use}")
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import re
 import shutil
 import zipfile
+import zlib
 from logging.handlers import RotatingFileHandler
 import secrets
 import shlex
@@ -22,6 +24,7 @@ from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, File, Form, Request, UploadFile, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
@@ -251,6 +254,19 @@ INPUTS_REPOSITORY_DIR = DATA_DIR / "inputs"
 INPUTS_REPOSITORY_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUTS_DIR = DATA_DIR / "outputs"
 OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
+UPLOADS_STAGING_DIR = DATA_DIR / "uploads_staging"  # partial files of resumable chunked uploads
+UPLOADS_STAGING_DIR.mkdir(parents=True, exist_ok=True)
+INPUTS_BLOBS_DIR = DATA_DIR / "inputs_blobs"  # uploaded ZIPs stored once by SHA-256; repository entries are hard links
+INPUTS_BLOBS_DIR.mkdir(parents=True, exist_ok=True)
+CHUNKED_UPLOAD_DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MIN_CHUNK_BYTES = 1024 * 1024
+CHUNKED_UPLOAD_MAX_CHUNK_BYTES = 64 * 1024 * 1024
+CHUNKED_UPLOAD_ABANDON_SECONDS = 24 * 3600  # uploads without any chunk received for this long are deleted
+CHUNKED_UPLOAD_CLEANUP_INTERVAL_SECONDS = 3600
+PARSE_CACHE_DIR = Path(os.environ.get("SSB_RA_PARSE_CACHE_DIR") or (DATA_DIR / "parse_cache"))  # parsed log tables shared by every run
+PARSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+WARM_PARSE_CACHE_ENV = "SSB_RA_WEB_WARM_PARSE_CACHE"  # 0 disables the pre-parse job started after each upload
+WARM_PROGRESS_UPDATE_SECONDS = 1.0
 
 MAX_CPU_DEFAULT = 80
 MAX_MEMORY_DEFAULT = 80
@@ -263,6 +279,10 @@ worker_started = False
 worker_lock = threading.Lock()
 backup_worker_started = False
 backup_worker_lock = threading.Lock()
+last_chunked_upload_cleanup = 0.0
+warm_event = threading.Event()
+warm_worker_started = False
+warm_worker_lock = threading.Lock()
 running_processes: dict[int, subprocess.Popen[str]] = {}
 running_processes_lock = threading.Lock()
 canceled_task_ids: set[int] = set()
@@ -310,6 +330,9 @@ def recover_incomplete_tasks() -> None:
         )
         conn.commit()
         logger.warning("Recovered %s interrupted task(s) after startup and moved them back to queue.", pending_count)
+    # Pre-parse jobs interrupted by the restart start over (entries already stored in the parse cache are skipped)
+    conn.execute("UPDATE inputs_repository SET warm_status = 'queued', warm_progress = 0 WHERE warm_status = 'running'")
+    conn.commit()
     conn.close()
 
 
@@ -444,6 +467,18 @@ def is_safe_path(base_dir: Path, target: Path) -> bool:
         return False
 
 
+def repository_input_dir(input_name: str) -> Path | None:
+    """Folder of an Inputs Repository entry, or None if the name would resolve outside its own INPUTS_REPOSITORY_DIR child."""
+    if input_name in {"", ".", ".."}:
+        return None
+    target_dir = INPUTS_REPOSITORY_DIR / input_name
+    if target_dir.parent != INPUTS_REPOSITORY_DIR or not is_safe_path(INPUTS_REPOSITORY_DIR, target_dir):
+        return None
+    if target_dir.resolve() == INPUTS_REPOSITORY_DIR.resolve():
+        return None
+    return target_dir
+
+
 def compute_dir_size(path: Path) -> int:
     if not path.exists():
         return 0
@@ -859,11 +894,50 @@ def init_db() -> None:
             input_path TEXT NOT NULL,
             uploaded_at TEXT NOT NULL,
             size_bytes INTEGER NOT NULL DEFAULT 0,
+            warm_status TEXT NOT NULL DEFAULT '',
+            warm_progress INTEGER NOT NULL DEFAULT 0,
+            warm_message TEXT,
+            warm_updated_at TEXT,
+            content_sha256 TEXT,
             FOREIGN KEY(user_id) REFERENCES users(id)
         )
         """
     )
 
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chunked_uploads (
+            upload_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            input_name TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            total_size INTEGER NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            total_chunks INTEGER NOT NULL,
+            overwrite INTEGER NOT NULL DEFAULT 0,
+            part_path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'uploading',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chunked_upload_parts (
+            upload_id TEXT NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            chunk_offset INTEGER NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            crc32 TEXT NOT NULL,
+            received_at TEXT NOT NULL,
+            PRIMARY KEY(upload_id, chunk_index),
+            FOREIGN KEY(upload_id) REFERENCES chunked_uploads(upload_id) ON DELETE CASCADE
+        )
+        """
+    )
+
     existing_columns = {row["name"] for row in cur.execute("PRAGMA table_info(task_runs)").fetchall()}
     if "input_dir" not in existing_columns:
         cur.execute("ALTER TABLE task_runs ADD COLUMN input_dir TEXT")
@@ -889,6 +963,18 @@ def init_db() -> None:
         cur.execute("ALTER TABLE sessions ADD COLUMN last_activity_at TEXT")
         cur.execute("UPDATE sessions SET last_activity_at = last_seen_at WHERE last_activity_at IS NULL")
 
+    input_columns = {row["name"] for row in cur.execute("PRAGMA table_info(inputs_repository)").fetchall()}
+    if "warm_status" not in input_columns:
+        cur.execute("ALTER TABLE inputs_repository ADD COLUMN warm_status TEXT NOT NULL DEFAULT ''")
+    if "warm_progress" not in input_columns:
+        cur.execute("ALTER TABLE inputs_repository ADD COLUMN warm_progress INTEGER NOT NULL DEFAULT 0")
+    if "warm_message" not in input_columns:
+        cur.execute("ALTER TABLE inputs_repository ADD COLUMN warm_message TEXT")
+    if "warm_updated_at" not in input_columns:
+        cur.execute("ALTER TABLE inputs_repository ADD COLUMN warm_updated_at TEXT")
+    if "content_sha256" not in input_columns:
+        cur.execute("ALTER TABLE inputs_repository ADD COLUMN content_sha256 TEXT")
+
     admin = cur.execute(
         "SELECT id, password_hash FROM users WHERE username = ?", ("admin",)
     ).fetchone()
@@ -1401,7 +1487,7 @@ def list_inputs_repository() -> list[dict[str, Any]]:
     conn = get_conn()
     rows = conn.execute(
         """
-        SELECT ir.id, ir.input_name, ir.input_path, ir.uploaded_at, ir.size_bytes, u.username
+        SELECT ir.id, ir.input_name, ir.input_path, ir.uploaded_at, ir.size_bytes, ir.warm_status, ir.warm_progress, ir.warm_message, u.username
         FROM inputs_repository ir
         LEFT JOIN users u ON u.id = ir.user_id
         ORDER BY ir.uploaded_at DESC
@@ -1418,11 +1504,26 @@ def list_inputs_repository() -> list[dict[str, Any]]:
                 "uploaded_by": row["username"] or "unknown",
                 "uploaded_at": format_timestamp(row["uploaded_at"]),
                 "size_mb": format_mb(row["size_bytes"] or 0),
+                "warm_status": row["warm_status"] or "",
+                "warm_display": format_warm_status(row["warm_status"], row["warm_progress"]),
+                "warm_message": row["warm_message"] or "",
             }
         )
     return items
 
 
+def format_warm_status(status: str | None, progress: int | None) -> str:
+    normalized = (status or "").strip().lower()
+    if normalized == "running":
+        return f"Parsing {int(progress or 0)}%"
+    mapping = {
+        "queued": "Queued",
+        "ready": "Ready",
+        "error": "Error",
+    }
+    return mapping.get(normalized, "—")
+
+
 
 
 def list_inputs_uploaders() -> list[str]:
@@ -1440,7 +1541,13 @@ def list_inputs_uploaders() -> list[str]:
 
 def get_inputs_repository_total_size() -> str:
     conn = get_conn()
-    row = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) AS total_size FROM inputs_repository").fetchone()
+    # Deduplicated inputs share one blob: count each content once
+    row = conn.execute(
+        """
+        SELECT COALESCE(SUM(size_bytes), 0) AS total_size
+        FROM (SELECT MAX(size_bytes) AS size_bytes FROM inputs_repository GROUP BY COALESCE(NULLIF(content_sha256, ''), 'id:' || id))
+        """
+    ).fetchone()
     conn.close()
     return format_mb(int(row["total_size"] or 0))
 
@@ -1497,7 +1604,7 @@ def run_queued_task(task_row: sqlite3.Row) -> None:
             encoding="utf-8",
             errors="replace",
             bufsize=1,
-            env={**os.environ, "TERM": "xterm", "SSB_RA_NO_CLEAR": "1"},
+            env=build_cli_environment(),
         )
         with running_processes_lock:
             running_processes[task_id] = proc
@@ -1735,11 +1842,24 @@ def ensure_worker_started() -> None:
         worker_started = True
 
 def database_backup_worker() -> None:
+    global last_chunked_upload_cleanup
     while True:
         try:
             run_scheduled_database_backup_if_needed()
         except Exception as exc:
             logger.exception("Automatic database backup worker error: %s", exc)
+        # Abandoned chunked uploads are purged from the same housekeeping loop (hourly)
+        if time.time() - last_chunked_upload_cleanup >= CHUNKED_UPLOAD_CLEANUP_INTERVAL_SECONDS:
+            last_chunked_upload_cleanup = time.time()
+            try:
+                cleanup_abandoned_chunked_uploads()
+            except Exception as exc:
+                logger.exception("Chunked upload cleanup error: %s", exc)
+            try:
+                deduplicate_repository_inputs()
+                cleanup_unreferenced_input_blobs()
+            except Exception as exc:
+                logger.exception("Inputs blob store housekeeping error: %s", exc)
         time.sleep(30)
 
 
@@ -1752,6 +1872,116 @@ def ensure_backup_worker_started() -> None:
         backup_worker_started = True
 
 
+# ---- Parse cache pre-parse ("warm") job ----
+# After an upload the input is queued (inputs_repository.warm_status) and a single background worker runs
+# 'SSB_RetuningAutomations.py --parse-cache-warm --input <input>': the CLI validates the ZIP(s), parses every log and
+# stores the MO tables in PARSE_CACHE_DIR, so the first audit on that input loads PHASE 1 from the cache. Progress is
+# read from the '(<done>/<total>)' suffix of the CLI lines and shown in the Inputs Repository panel.
+WARM_PROGRESS_RE = re.compile(r"\((\d+)/(\d+)\)\s*$")
+
+
+def warm_parse_cache_enabled() -> bool:
+    raw = os.environ.get(WARM_PARSE_CACHE_ENV, "")
+    return parse_bool(raw) if raw.strip() else True
+
+
+def update_input_warm_state(input_id: int, uploaded_at: str, status: str, progress: int, message: str) -> None:
+    # uploaded_at guards against a re-upload of the same input name while its previous pre-parse job was running
+    conn = get_conn()
+    conn.execute(
+        "UPDATE inputs_repository SET warm_status = ?, warm_progress = ?, warm_message = ?, warm_updated_at = ? WHERE id = ? AND uploaded_at = ?",
+        (status, max(0, min(100, int(progress))), message[:500], now_iso(), input_id, uploaded_at),
+    )
+    conn.commit()
+    conn.close()
+
+
+def claim_next_warm_job() -> sqlite3.Row | None:
+    conn = get_conn()
+    try:
+        while True:
+            row = conn.execute(
+                "SELECT id, input_path, uploaded_at FROM inputs_repository WHERE warm_status = 'queued' ORDER BY uploaded_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            updated = conn.execute(
+                "UPDATE inputs_repository SET warm_status = 'running', warm_progress = 0, warm_updated_at = ? WHERE id = ? AND uploaded_at = ? AND warm_status = 'queued'",
+                (now_iso(), row["id"], row["uploaded_at"]),
+            )
+            conn.commit()
+            if updated.rowcount:
+                return row
+    finally:
+        conn.close()
+
+
+def run_input_warm_job(row: sqlite3.Row) -> None:
+    cmd = [sys.executable, "src/SSB_RetuningAutomations.py", "--no-gui", "--parse-cache-warm", "--input", row["input_path"]]
+    progress = 0
+    message = ""
+    last_update = 0.0
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=str(PROJECT_ROOT),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            env=build_cli_environment(),
+        )
+        stream = proc.stdout
+        if stream is not None:
+            for line in iter(stream.readline, ""):
+                clean = strip_ansi(line).strip()
+                if not clean.startswith("[Parse Cache]"):
+                    continue
+                message = clean[len("[Parse Cache]"):].strip()
+                match = WARM_PROGRESS_RE.search(clean)
+                if match and int(match.group(2)):
+                    progress = int(match.group(1)) * 100 // int(match.group(2))
+                if time.perf_counter() - last_update >= WARM_PROGRESS_UPDATE_SECONDS:
+                    update_input_warm_state(row["id"], row["uploaded_at"], "running", progress, message)
+                    last_update = time.perf_counter()
+            stream.close()
+        proc.wait()
+        status = "ready" if proc.returncode == 0 else "error"
+    except Exception as exc:
+        status = "error"
+        message = f"Pre-parse error: {exc}"
+    update_input_warm_state(row["id"], row["uploaded_at"], status, 100 if status == "ready" else progress, message)
+    if status == "error":
+        logger.warning("Pre-parse job failed for input %s: %s", row["input_path"], message)
+
+
+def parse_cache_warm_worker() -> None:
+    # One pre-parse job at a time: it runs next to the task queue and must not compete with it for every CPU
+    while True:
+        warm_event.wait(timeout=60)
+        warm_event.clear()
+        while True:
+            try:
+                row = claim_next_warm_job()
+            except Exception as exc:
+                logger.exception("Pre-parse worker error: %s", exc)
+                break
+            if row is None:
+                break
+            run_input_warm_job(row)
+
+
+def ensure_warm_worker_started() -> None:
+    global warm_worker_started
+    with warm_worker_lock:
+        if warm_worker_started:
+            return
+        threading.Thread(target=parse_cache_warm_worker, daemon=True, name="parse-cache-warm-worker").start()
+        warm_worker_started = True
+
+
 
 def load_persistent_config() -> dict[str, str]:
     return load_cfg_values(CONFIG_PATH, CONFIG_SECTION, CFG_FIELD_MAP, *CFG_FIELDS)
@@ -2078,6 +2308,11 @@ def build_cli_command(payload: dict[str, Any]) -> list[str]:
     return cmd
 
 
+def build_cli_environment() -> dict[str, str]:
+    # Every CLI process shares the parse cache, so runs reuse the tables pre-parsed after upload (and each other's)
+    return {**os.environ, "TERM": "xterm", "SSB_RA_NO_CLEAR": "1", "SSB_RA_PARSE_CACHE_DIR": str(PARSE_CACHE_DIR)}
+
+
 
 
 def resolve_run_zip_path(conn: sqlite3.Connection, user_id: int, username: str, run_id: int, stored_output_zip: str | None, stored_output_dir: str | None, module: str | None, tool_version: str | None, finished_at_raw: str | None) -> Path | None:
@@ -2380,7 +2615,9 @@ def startup() -> None:
     recover_incomplete_tasks()
     ensure_worker_started()
     ensure_backup_worker_started()
+    ensure_warm_worker_started()
     queue_event.set()
+    warm_event.set()
 
 
 # ========= System Section ===========
@@ -2877,6 +3114,183 @@ async def apply_system_config(request: Request):
 
 
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def register_repository_input(user_id: int, input_name: str, target_dir: Path, size_bytes: int, content_sha256: str | None = None) -> None:
+    # New uploads are queued for the pre-parse job (parse_cache_warm_worker) unless it is disabled
+    warm_status = "queued" if warm_parse_cache_enabled() else ""
+    conn = get_conn()
+    conn.execute(
+        """
+        INSERT INTO inputs_repository(user_id, input_name, input_path, uploaded_at, size_bytes, warm_status, warm_progress, warm_message, warm_updated_at, content_sha256)
+        VALUES (?, ?, ?, ?, ?, ?, 0, NULL, ?, ?)
+        ON CONFLICT(input_name) DO UPDATE SET
+            user_id = excluded.user_id,
+            input_path = excluded.input_path,
+            uploaded_at = excluded.uploaded_at,
+            size_bytes = excluded.size_bytes,
+            warm_status = excluded.warm_status,
+            warm_progress = 0,
+            warm_message = NULL,
+            warm_updated_at = excluded.warm_updated_at,
+            content_sha256 = excluded.content_sha256
+        """,
+        (user_id, input_name, str(target_dir), now_iso(), size_bytes, warm_status, now_iso(), content_sha256),
+    )
+    conn.commit()
+    conn.close()
+    if warm_status:
+        warm_event.set()
+
+
+# ---- Content-addressed blob store (deduplicated Inputs Repository) ----
+# Every repository ZIP is hashed (SHA-256) and stored once as INPUTS_BLOBS_DIR/<sha[:2]>/<sha>.zip. The entry keeps its
+# usual layout (<input_name>/<input_name>.zip, used by the CLI runs) as a HARD LINK to the blob, so the same Step0 ZIP
+# uploaded under several names takes its disk space once. The link count is the reference count: a blob whose only link
+# is the blob store itself is no longer used by any entry and is deleted by the hourly housekeeping. Extraction
+# (__unzipped_logs__) and parse caches are keyed by content, so deduplicated entries share them as well. On filesystems
+# without hard links the upload is kept as a regular file (no deduplication).
+
+# content_sha256 of entries kept out of the blob store (no hard links, size mismatch, not a single ZIP): never retried
+INPUT_BLOB_UNLINKED = ""
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def input_blob_path(content_sha256: str) -> Path:
+    return INPUTS_BLOBS_DIR / content_sha256[:2] / f"{content_sha256}.zip"
+
+
+def store_repository_zip_blob(zip_target: Path) -> str | None:
+    """
+    Hash a repository ZIP and share its storage with the blob of the same content (blocking: run it in a worker thread).
+    Returns the SHA-256 when the entry is linked to the blob store, None when hard links are not available.
+    """
+    content_sha256 = sha256_file(zip_target)
+    blob = input_blob_path(content_sha256)
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(zip_target, blob)  # first copy of this content: the upload becomes the blob
+        return content_sha256
+    except FileExistsError:
+        pass
+    except OSError as exc:
+        logger.warning("Inputs blob store disabled for %s (hard links not supported): %s", zip_target, exc)
+        return None
+
+    # Same content already stored: replace the upload with a link to the existing blob
+    if blob.stat().st_size != zip_target.stat().st_size:
+        logger.warning("Inputs blob %s does not match %s in size; upload kept as a regular file", blob, zip_target)
+        return None
+    if os.path.samefile(blob, zip_target):
+        return content_sha256
+    link_tmp = zip_target.with_name(f"{zip_target.name}.{secrets.token_hex(4)}.link")
+    try:
+        os.link(blob, link_tmp)
+        os.replace(link_tmp, zip_target)
+    except OSError as exc:
+        link_tmp.unlink(missing_ok=True)
+        logger.warning("Could not link %s to inputs blob %s: %s", zip_target, blob, exc)
+        return None
+    return content_sha256
+
+
+def repository_entry_zip(input_path: Path) -> Path | None:
+    """The single ZIP of a repository entry folder (uploads always store one ZIP), or None."""
+    if not input_path.is_dir():
+        return None
+    zips = [p for p in input_path.iterdir() if p.is_file() and p.suffix.lower() == ".zip"]
+    return zips[0] if len(zips) == 1 else None
+
+
+def deduplicate_repository_inputs() -> int:
+    """
+    Move entries uploaded before the blob store (content_sha256 NULL) into it. Returns the number of entries linked.
+    Entries that cannot be linked are marked INPUT_BLOB_UNLINKED so they are not hashed again on every run.
+    """
+    conn = get_conn()
+    rows = conn.execute("SELECT id, input_path, uploaded_at FROM inputs_repository WHERE content_sha256 IS NULL").fetchall()
+    conn.close()
+    linked = 0
+    for row in rows:
+        zip_path = repository_entry_zip(Path(row["input_path"] or ""))
+        content_sha256 = None
+        if zip_path is not None and is_safe_path(INPUTS_REPOSITORY_DIR, zip_path):
+            content_sha256 = store_repository_zip_blob(zip_path)
+        conn = get_conn()
+        conn.execute(
+            "UPDATE inputs_repository SET content_sha256 = ? WHERE id = ? AND uploaded_at = ?",
+            (content_sha256 or INPUT_BLOB_UNLINKED, row["id"], row["uploaded_at"]),
+        )
+        conn.commit()
+        conn.close()
+        if content_sha256:
+            linked += 1
+    return linked
+
+
+def cleanup_unreferenced_input_blobs() -> int:
+    """Delete blobs no repository entry links to any more (link count 1). Returns the number of blobs deleted."""
+    removed = 0
+    for blob in INPUTS_BLOBS_DIR.glob("*/*.zip"):
+        try:
+            if blob.stat().st_nlink <= 1:
+                blob.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def upload_zip_member_name(upload: UploadFile, requested_name: str) -> str:
+    raw_name = (upload.filename or "uploaded_input").replace("\\", "/").strip("/")
+    path_parts = [sanitize_component(part) for part in raw_name.split("/") if part and part not in {".", ".."}]
+    if len(path_parts) > 1 and path_parts[0] == requested_name:
+        return "/".join(path_parts[1:])
+    if len(path_parts) > 1:
+        return "/".join(path_parts)
+    return path_parts[0] if path_parts else "uploaded_input.log"
+
+
+def write_uploads_to_repository_zip(zip_target: Path, accepted_files: list[UploadFile], requested_name: str) -> int:
+    """Stream the uploads into <input_name>.zip chunk by chunk (blocking: run it in a worker thread). Returns the ZIP size."""
+    with zip_target.open("wb") as buffer:
+        # Keep already compressed uploads as-is to avoid unnecessary recompression,
+        # but normalize the zip filename to <input_name>.zip.
+        if len(accepted_files) == 1 and (accepted_files[0].filename or "").lower().endswith(".zip"):
+            source = accepted_files[0].file
+            source.seek(0)
+            written = 0
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                buffer.write(chunk)
+                written += len(chunk)
+            return written
+
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for upload in accepted_files:
+                upload_size = getattr(upload, "size", None)
+                source = upload.file
+                source.seek(0)
+                # Size is unknown to ZipFile while streaming: force ZIP64 headers when the member may exceed 2 GiB
+                force_zip64 = upload_size is None or upload_size >= zipfile.ZIP64_LIMIT
+                with zf.open(upload_zip_member_name(upload, requested_name), "w", force_zip64=force_zip64) as member:
+                    shutil.copyfileobj(source, member, UPLOAD_CHUNK_BYTES)
+        return buffer.tell()
+
+
 @app.post("/inputs/upload", tags=["Inputs"])
 async def inputs_upload(
     request: Request,
@@ -2901,7 +3315,9 @@ async def inputs_upload(
     if not requested_name:
         requested_name = inferred_parent or "uploaded_input"
 
-    target_dir = INPUTS_REPOSITORY_DIR / requested_name
+    target_dir = repository_input_dir(requested_name)
+    if target_dir is None:
+        return {"ok": False, "error": "invalid_name"}
     zip_target = target_dir / f"{requested_name}.zip"
     should_overwrite = parse_bool(overwrite)
     if target_dir.exists() and not should_overwrite:
@@ -2922,55 +3338,331 @@ async def inputs_upload(
 
     target_dir.mkdir(parents=True, exist_ok=True)
 
-    # Keep already compressed uploads as-is to avoid unnecessary recompression,
-    # but normalize the zip filename to <input_name>.zip.
-    if len(accepted_files) == 1 and (accepted_files[0].filename or "").lower().endswith(".zip"):
-        source_upload = accepted_files[0]
-        with zip_target.open("wb") as buffer:
-            while True:
-                chunk = await source_upload.read(1024 * 1024)
-                if not chunk:
-                    break
-                buffer.write(chunk)
+    # Uploads are streamed to disk (and compressed) in a worker thread so the event loop is never blocked and no upload is
+    # held in memory; size_bytes is the number of bytes written, so no directory walk is needed afterwards.
+    size_bytes = await run_in_threadpool(write_uploads_to_repository_zip, zip_target, accepted_files, requested_name)
+    content_sha256 = await run_in_threadpool(store_repository_zip_blob, zip_target)
+    register_repository_input(user["id"], requested_name, target_dir, size_bytes, content_sha256 or INPUT_BLOB_UNLINKED)
+
+    return {"ok": True, "path": str(target_dir), "input_name": requested_name}
+
+
+# ---- Resumable chunked uploads (large Step0 ZIPs) ----
+# init -> PUT chunk n (offset + CRC-32, any order / in parallel) -> complete. Chunks are written in place into
+# UPLOADS_STAGING_DIR/<upload_id>.part and tracked in chunked_upload_parts, so an interrupted transfer resumes with the
+# chunks still missing (init with the same input name / file / size returns the same upload). On completion the file is
+# moved into the Inputs Repository and registered like a regular upload.
+
+def chunked_upload_received_chunks(conn: sqlite3.Connection, upload_id: str) -> list[int]:
+    rows = conn.execute("SELECT chunk_index FROM chunked_upload_parts WHERE upload_id = ? ORDER BY chunk_index", (upload_id,)).fetchall()
+    return [int(row["chunk_index"]) for row in rows]
+
+
+def get_user_chunked_upload(conn: sqlite3.Connection, upload_id: str, user_id: int) -> sqlite3.Row | None:
+    return conn.execute("SELECT * FROM chunked_uploads WHERE upload_id = ? AND user_id = ?", (upload_id, user_id)).fetchone()
+
+
+def write_upload_chunk(part_path: Path, offset: int, data: bytes) -> None:
+    # Chunks cover disjoint ranges, so concurrent requests can each write through their own handle
+    with part_path.open("r+b") as fh:
+        fh.seek(offset)
+        fh.write(data)
+
+
+def install_repository_zip(source: Path, target_dir: Path, zip_name: str) -> Path:
+    """Move 'source' to target_dir/zip_name; an existing target_dir is only replaced once the new file is in place.
+
+    The file is renamed into a hidden temp folder of INPUTS_REPOSITORY_DIR and the folders are then swapped. On failure
+    'source' is moved back and the previous entry is kept.
+    """
+    token = secrets.token_hex(4)
+    temp_dir = INPUTS_REPOSITORY_DIR / f".{target_dir.name}.{token}.tmp"
+    old_dir = INPUTS_REPOSITORY_DIR / f".{target_dir.name}.{token}.old"
+    temp_zip = temp_dir / zip_name
+    temp_dir.mkdir(parents=True)
+    try:
+        shutil.move(str(source), str(temp_zip))
+        if target_dir.exists():
+            target_dir.rename(old_dir)
+        try:
+            temp_dir.rename(target_dir)
+        except OSError:
+            if old_dir.exists():
+                old_dir.rename(target_dir)
+            raise
+    except OSError:
+        if temp_zip.exists():
+            shutil.move(str(temp_zip), str(source))
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return target_dir / zip_name
+
+
+def delete_chunked_upload(conn: sqlite3.Connection, upload_id: str, part_path: str | None) -> None:
+    if part_path:
+        path = Path(part_path)
+        if is_safe_path(UPLOADS_STAGING_DIR, path):
+            path.unlink(missing_ok=True)
+    conn.execute("DELETE FROM chunked_upload_parts WHERE upload_id = ?", (upload_id,))
+    conn.execute("DELETE FROM chunked_uploads WHERE upload_id = ?", (upload_id,))
+
+
+def cleanup_abandoned_chunked_uploads(max_age_seconds: int = CHUNKED_UPLOAD_ABANDON_SECONDS) -> int:
+    """Delete chunked uploads (and orphan .part files) without activity for max_age_seconds. Returns the uploads removed."""
+    cutoff = datetime.now().astimezone() - timedelta(seconds=max_age_seconds)
+    conn = get_conn()
+    removed = 0
+    known_parts: set[str] = set()
+    for row in conn.execute("SELECT upload_id, part_path, updated_at FROM chunked_uploads").fetchall():
+        updated_at = parse_iso_datetime(row["updated_at"])
+        if updated_at is not None and updated_at >= cutoff:
+            known_parts.add(Path(row["part_path"]).name)
+            continue
+        delete_chunked_upload(conn, row["upload_id"], row["part_path"])
+        removed += 1
+    conn.commit()
+    conn.close()
+
+    for part_file in UPLOADS_STAGING_DIR.glob("*.part"):
+        try:
+            if part_file.name not in known_parts and datetime.fromtimestamp(part_file.stat().st_mtime).astimezone() < cutoff:
+                part_file.unlink(missing_ok=True)
+        except OSError:
+            continue
+    if removed:
+        logger.info("Removed %s abandoned chunked upload(s).", removed)
+    return removed
+
+
+@app.post("/inputs/upload/init", tags=["Inputs"])
+async def inputs_upload_init(request: Request):
+    try:
+        user = require_user(request)
+    except PermissionError:
+        return JSONResponse({"ok": False, "error": "auth"}, status_code=401)
+
+    try:
+        payload = await request.json()
+    except Exception:
+        return JSONResponse({"ok": False, "error": "invalid_json"}, status_code=400)
+    if not isinstance(payload, dict):
+        return JSONResponse({"ok": False, "error": "invalid_payload"}, status_code=400)
+
+    filename = str(payload.get("filename") or "").strip().replace("\\", "/")
+    if not filename.lower().endswith(".zip"):
+        return {"ok": False, "error": "invalid_file"}
+    total_size = coerce_int(payload.get("total_size"), 0, 0, 2**63 - 1)
+    if total_size <= 0:
+        return {"ok": False, "error": "invalid_file"}
+    chunk_size = coerce_int(payload.get("chunk_size"), CHUNKED_UPLOAD_DEFAULT_CHUNK_BYTES, CHUNKED_UPLOAD_MIN_CHUNK_BYTES, CHUNKED_UPLOAD_MAX_CHUNK_BYTES)
+    total_chunks = -(-total_size // chunk_size)
+
+    parent_folder_name = str(payload.get("parent_folder_name") or "")
+    input_name = str(payload.get("input_name") or "")
+    inferred_parent = sanitize_component(parent_folder_name) if parent_folder_name.strip() else sanitize_component(Path(filename.rsplit("/", 1)[-1]).stem)
+    requested_name = sanitize_component(input_name) if input_name.strip() else inferred_parent
+    if not requested_name:
+        requested_name = inferred_parent or "uploaded_input"
+
+    target_dir = repository_input_dir(requested_name)
+    if target_dir is None:
+        return {"ok": False, "error": "invalid_name"}
+    should_overwrite = parse_bool(payload.get("overwrite"))
+    if target_dir.exists() and not should_overwrite:
+        return {"ok": False, "error": "already_exists", "existing_name": requested_name}
+
+    conn = get_conn()
+    # Resume an unfinished upload of the same file into the same input instead of starting from scratch
+    row = conn.execute(
+        """
+        SELECT upload_id, part_path FROM chunked_uploads
+        WHERE user_id = ? AND input_name = ? AND filename = ? AND total_size = ? AND chunk_size = ? AND status = 'uploading'
+        ORDER BY updated_at DESC LIMIT 1
+        """,
+        (user["id"], requested_name, filename, total_size, chunk_size),
+    ).fetchone()
+    if row is not None and Path(row["part_path"]).exists():
+        upload_id = row["upload_id"]
+        conn.execute("UPDATE chunked_uploads SET overwrite = ?, updated_at = ? WHERE upload_id = ?", (1 if should_overwrite else 0, now_iso(), upload_id))
+        received = chunked_upload_received_chunks(conn, upload_id)
     else:
-        with zipfile.ZipFile(zip_target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for upload in accepted_files:
-                raw_name = (upload.filename or "uploaded_input").replace("\\", "/").strip("/")
-                path_parts = [sanitize_component(part) for part in raw_name.split("/") if part and part not in {".", ".."}]
-                if len(path_parts) > 1 and path_parts[0] == requested_name:
-                    zip_member = "/".join(path_parts[1:])
-                elif len(path_parts) > 1:
-                    zip_member = "/".join(path_parts)
-                else:
-                    zip_member = path_parts[0] if path_parts else "uploaded_input.log"
-                raw_bytes = bytearray()
-                while True:
-                    chunk = await upload.read(1024 * 1024)
-                    if not chunk:
-                        break
-                    raw_bytes.extend(chunk)
-                zf.writestr(zip_member, bytes(raw_bytes))
-
-    size_bytes = compute_path_size(target_dir)
+        if row is not None:
+            delete_chunked_upload(conn, row["upload_id"], row["part_path"])
+        upload_id = secrets.token_hex(16)
+        part_path = UPLOADS_STAGING_DIR / f"{upload_id}.part"
+        part_path.touch()
+        created_at = now_iso()
+        conn.execute(
+            """
+            INSERT INTO chunked_uploads(upload_id, user_id, input_name, filename, total_size, chunk_size, total_chunks, overwrite, part_path, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'uploading', ?, ?)
+            """,
+            (upload_id, user["id"], requested_name, filename, total_size, chunk_size, total_chunks, 1 if should_overwrite else 0, str(part_path), created_at, created_at),
+        )
+        received = []
+    conn.commit()
+    conn.close()
+
+    return {"ok": True, "upload_id": upload_id, "input_name": requested_name, "chunk_size": chunk_size, "total_chunks": total_chunks, "received": received}
+
+
+@app.put("/inputs/upload/{upload_id}/chunk/{chunk_index}", tags=["Inputs"])
+async def inputs_upload_chunk(request: Request, upload_id: str, chunk_index: int, offset: int, crc32: str = ""):
+    try:
+        user = require_user(request)
+    except PermissionError:
+        return JSONResponse({"ok": False, "error": "auth"}, status_code=401)
+
     conn = get_conn()
-    conn.execute(
+    row = get_user_chunked_upload(conn, upload_id, user["id"])
+    conn.close()
+    if row is None or row["status"] != "uploading":
+        return JSONResponse({"ok": False, "error": "unknown_upload"}, status_code=404)
+
+    chunk_size = int(row["chunk_size"])
+    if chunk_index < 0 or chunk_index >= int(row["total_chunks"]) or offset != chunk_index * chunk_size:
+        return JSONResponse({"ok": False, "error": "invalid_chunk"}, status_code=400)
+    if not crc32:
+        return JSONResponse({"ok": False, "error": "missing_checksum"}, status_code=400)
+
+    data = await request.body()
+    if len(data) != min(chunk_size, int(row["total_size"]) - offset):
+        return JSONResponse({"ok": False, "error": "invalid_chunk_size"}, status_code=400)
+    actual_crc32 = f"{zlib.crc32(data) & 0xFFFFFFFF:08x}"
+    if crc32.strip().lower() != actual_crc32:
+        return JSONResponse({"ok": False, "error": "checksum_mismatch", "crc32": actual_crc32}, status_code=422)
+
+    # The body may take long to arrive: the upload can have been aborted, cleaned up or completed meanwhile
+    conn = get_conn()
+    row = get_user_chunked_upload(conn, upload_id, user["id"])
+    conn.close()
+    if row is None or row["status"] != "uploading":
+        return JSONResponse({"ok": False, "error": "unknown_upload"}, status_code=404)
+    try:
+        await run_in_threadpool(write_upload_chunk, Path(row["part_path"]), offset, data)
+    except OSError:
+        return JSONResponse({"ok": False, "error": "unknown_upload"}, status_code=404)
+
+    received_at = now_iso()
+    conn = get_conn()
+    # Only record the part while the upload still exists (no orphan rows for an upload deleted during the write)
+    recorded = conn.execute(
         """
-        INSERT INTO inputs_repository(user_id, input_name, input_path, uploaded_at, size_bytes)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(input_name) DO UPDATE SET
-            user_id = excluded.user_id,
-            input_path = excluded.input_path,
-            uploaded_at = excluded.uploaded_at,
-            size_bytes = excluded.size_bytes
+        INSERT OR REPLACE INTO chunked_upload_parts(upload_id, chunk_index, chunk_offset, chunk_size, crc32, received_at)
+        SELECT ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM chunked_uploads WHERE upload_id = ? AND status = 'uploading')
         """,
-        (user["id"], requested_name, str(target_dir), now_iso(), size_bytes),
+        (upload_id, chunk_index, offset, len(data), actual_crc32, received_at, upload_id),
     )
+    if recorded.rowcount == 0:
+        conn.close()
+        return JSONResponse({"ok": False, "error": "unknown_upload"}, status_code=404)
+    conn.execute("UPDATE chunked_uploads SET updated_at = ? WHERE upload_id = ?", (received_at, upload_id))
     conn.commit()
     conn.close()
+    return {"ok": True, "chunk_index": chunk_index, "crc32": actual_crc32}
+
+
+@app.get("/inputs/upload/{upload_id}", tags=["Inputs"])
+def inputs_upload_status(request: Request, upload_id: str):
+    try:
+        user = require_user(request)
+    except PermissionError:
+        return JSONResponse({"ok": False, "error": "auth"}, status_code=401)
+
+    conn = get_conn()
+    row = get_user_chunked_upload(conn, upload_id, user["id"])
+    received = chunked_upload_received_chunks(conn, upload_id) if row is not None else []
+    conn.close()
+    if row is None:
+        return JSONResponse({"ok": False, "error": "unknown_upload"}, status_code=404)
+    return {"ok": True, "upload_id": upload_id, "status": row["status"], "input_name": row["input_name"], "chunk_size": row["chunk_size"], "total_chunks": row["total_chunks"], "received": received}
 
+
+@app.post("/inputs/upload/{upload_id}/complete", tags=["Inputs"])
+async def inputs_upload_complete(request: Request, upload_id: str):
+    try:
+        user = require_user(request)
+    except PermissionError:
+        return JSONResponse({"ok": False, "error": "auth"}, status_code=401)
+
+    conn = get_conn()
+    row = get_user_chunked_upload(conn, upload_id, user["id"])
+    if row is None:
+        conn.close()
+        return JSONResponse({"ok": False, "error": "unknown_upload"}, status_code=404)
+
+    received = set(chunked_upload_received_chunks(conn, upload_id))
+    missing = [idx for idx in range(int(row["total_chunks"])) if idx not in received]
+    part_path = Path(row["part_path"])
+    if missing:
+        conn.close()
+        return {"ok": False, "error": "missing_chunks", "missing": missing[:1000]}
+    try:
+        part_size = part_path.stat().st_size
+    except OSError:
+        part_size = -1
+    if part_size != int(row["total_size"]):
+        conn.close()
+        return {"ok": False, "error": "size_mismatch"}
+
+    requested_name = row["input_name"]
+    target_dir = repository_input_dir(requested_name)
+    if target_dir is None:
+        conn.close()
+        return {"ok": False, "error": "invalid_name"}
+
+    # Only one complete request may assemble the file
+    claimed = conn.execute("UPDATE chunked_uploads SET status = 'completing', updated_at = ? WHERE upload_id = ? AND status = 'uploading'", (now_iso(), upload_id))
+    conn.commit()
+    if claimed.rowcount == 0:
+        conn.close()
+        return {"ok": False, "error": "already_completing"}
+
+    # Any exit before the upload is registered hands it back to 'uploading' so it can be completed (or aborted) again
+    completed = False
+    try:
+        if target_dir.exists() and not int(row["overwrite"]):
+            return {"ok": False, "error": "already_exists", "existing_name": requested_name}
+
+        # Staging and repository live under the same data folder: these are renames, not copies
+        zip_target = await run_in_threadpool(install_repository_zip, part_path, target_dir, f"{requested_name}.zip")
+        content_sha256 = await run_in_threadpool(store_repository_zip_blob, zip_target)
+        register_repository_input(user["id"], requested_name, target_dir, part_size, content_sha256 or INPUT_BLOB_UNLINKED)
+
+        delete_chunked_upload(conn, upload_id, None)
+        conn.commit()
+        completed = True
+    except OSError as exc:
+        logger.warning("Unable to complete chunked upload %s into %s: %s", upload_id, target_dir, exc)
+        return {"ok": False, "error": "complete_failed"}
+    finally:
+        if not completed:
+            try:
+                conn.execute("UPDATE chunked_uploads SET status = 'uploading', updated_at = ? WHERE upload_id = ?", (now_iso(), upload_id))
+                conn.commit()
+            except sqlite3.Error as exc:
+                logger.warning("Unable to reset chunked upload %s: %s", upload_id, exc)
+        conn.close()
     return {"ok": True, "path": str(target_dir), "input_name": requested_name}
 
 
+@app.delete("/inputs/upload/{upload_id}", tags=["Inputs"])
+def inputs_upload_abort(request: Request, upload_id: str):
+    try:
+        user = require_user(request)
+    except PermissionError:
+        return JSONResponse({"ok": False, "error": "auth"}, status_code=401)
+
+    conn = get_conn()
+    row = get_user_chunked_upload(conn, upload_id, user["id"])
+    if row is not None and row["status"] == "uploading":
+        delete_chunked_upload(conn, upload_id, row["part_path"])
+        conn.commit()
+    conn.close()
+    return {"ok": row is not None}
+
+
 @app.get("/inputs/list", tags=["Inputs"])
 def inputs_list(request: Request):
     try:
@@ -3011,6 +3703,7 @@ async def inputs_delete(request: Request):
         conn.execute("DELETE FROM inputs_repository WHERE id = ?", (row["id"],))
     conn.commit()
     conn.close()
+    await run_in_threadpool(cleanup_unreferenced_input_blobs)
     if denied_count:
         return {
             "ok": False,
@@ -3784,6 +4477,7 @@ async def admin_delete_inputs(request: Request):
     conn.execute("DELETE FROM inputs_repository WHERE id IN (%s)" % ",".join("?" for _ in input_ids), tuple(input_ids))
     conn.commit()
     conn.close()
+    await run_in_threadpool(cleanup_unreferenced_input_blobs)
     return {"ok": True}
 
 
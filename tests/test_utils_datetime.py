@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# tests/test_utils_datetime.py
+
+from datetime import datetime
+
+import pytest
+
+from src.utils import utils_datetime
+
+
+class _FixedYearDatetime(datetime):
+    """datetime whose now() is pinned to 2026, so the 'prefer the current year' rule does not depend on the test date."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 6, 15, 12, 0, 0, tzinfo=tz)
+
+
+@pytest.fixture(autouse=True)
+def fixed_current_year(monkeypatch):
+    monkeypatch.setattr(utils_datetime, "datetime", _FixedYearDatetime)
+    utils_datetime._extract_date_cached.cache_clear()
+    yield
+    utils_datetime._extract_date_cached.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "folder_name, expected",
+    [
+        # Documented examples (extract_date docstring)
+        ("20250103_0900_Step0", "2025-01-03"),
+        ("Step0_2025.1.3", "2025-01-03"),
+        ("logs_Jan-03-2025", "2025-01-03"),
+        ("03Jan2025_Indiana", "2025-01-03"),
+        ("Indiana", None),
+        # Several dates in one folder name: equal-priority candidates are tried in descending text order
+        ("20240115_20250101", "2025-01-01"),
+        ("2503 1213", "2003-02-05"),
+        ("030412_011503", "2012-03-04"),
+        ("01222022_02112011", "2011-02-11"),
+        ("04172011_01152020", "2011-04-17"),
+        ("09072029 12052018", "2018-12-05"),
+        ("0000.1998-04-09.01-08-1999", "1998-04-09"),
+        ("06.12.02_2005-02-05_09.10.96", "2005-02-05"),
+        ("080703-155345-250217", "2017-02-25"),
+        ("09-09-2019_1996_11_23", "1996-11-23"),
+        # A candidate with the current year always wins
+        ("20240115_20260101", "2026-01-01"),
+    ],
+)
+def test_extract_date(folder_name, expected):
+    assert utils_datetime.extract_date(folder_name) == expected